@@ -6,7 +6,16 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('images/Helper_Icon.png', 'images')],
-    hiddenimports=[],
+    # Dialog modules are imported on first use through ui_dialogs.__getattr__.
+    hiddenimports=[
+        'ui_dialogs.item_picker',
+        'ui_dialogs.items',
+        'ui_dialogs.machine_metadata',
+        'ui_dialogs.managers',
+        'ui_dialogs.merge',
+        'ui_dialogs.recipes',
+        'ui_dialogs.storage',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
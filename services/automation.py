@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import sqlite3
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.planner import RatePlan, RateStep
 
 
 def list_plans(conn: sqlite3.Connection) -> list[sqlite3.Row]:
@@ -103,3 +107,64 @@ def update_step_status(conn: sqlite3.Connection, step_id: int, status: str) -> N
 def delete_step(conn: sqlite3.Connection, step_id: int) -> None:
     conn.execute("DELETE FROM automation_steps WHERE id = ?", (step_id,))
     conn.commit()
+
+
+def _rate_step_notes(step: RateStep) -> str:
+    parts = [f"{step.output_rate:,.3g} {step.output_unit}/s"]
+    if step.machines is not None:
+        machines = f"{step.machines:,.3g} machines"
+        if step.machine_tier:
+            machines += f" @ {step.machine_tier}"
+        if step.machines_available is not None:
+            machines += f" ({step.machines_available} available)"
+        parts.append(machines)
+    if step.total_eu_per_tick:
+        parts.append(f"{step.total_eu_per_tick:,.0f} EU/t")
+    return " · ".join(parts)
+
+
+def import_rate_plan(conn: sqlite3.Connection, name: str, rate_plan: RatePlan, notes: str = "") -> int:
+    """Create an automation plan with one step per throughput step, in one transaction."""
+    rows = []
+    for step in rate_plan.steps:
+        machine_name = step.machine_item_name or step.machine or step.method.title()
+        first_input = step.inputs[0] if step.inputs else None
+        first_byproduct = step.byproducts[0] if step.byproducts else None
+        rows.append(
+            (
+                step.machine_item_id,
+                machine_name,
+                first_input[0] if first_input else None,
+                ", ".join(input_name for _id, input_name, _rate, _unit in step.inputs),
+                step.output_item_id,
+                step.output_item_name,
+                first_byproduct[0] if first_byproduct else None,
+                first_byproduct[1] if first_byproduct else None,
+                _rate_step_notes(step),
+            )
+        )
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO automation_plans(name, notes) VALUES(?, ?)",
+            (name.strip(), notes.strip() or None),
+        )
+        plan_id = int(cur.lastrowid)
+        conn.executemany(
+            """
+            INSERT INTO automation_steps(
+                plan_id,
+                step_order,
+                machine_item_id,
+                machine_name,
+                input_item_id,
+                input_name,
+                output_item_id,
+                output_name,
+                byproduct_item_id,
+                byproduct_name,
+                notes
+            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(plan_id, step_order, *row) for step_order, row in enumerate(rows, start=1)],
+        )
+    return plan_id
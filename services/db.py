@@ -3,45 +3,111 @@ import shutil
 import sqlite3
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import quote
+
+from services.tiers import ALL_TIERS, set_tiers
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "gtnh.db"
-ALL_TIERS = [
-    "Stone Age",
-    "Steam Age",
-    "ULV",
-    "LV",
-    "MV",
-    "HV",
-    "EV",
-    "IV",
-    "LuV",
-    "ZPM",
-    "UV",
-    "UHV",
-    "UEV",
-    "UIV",
-    "UMV",
-    "UXV",
-    "OpV",
-    "MAX",
+
+GT_VOLTAGES = [
+    (8, "ULV"), (32, "LV"), (128, "MV"), (512, "HV"), (2048, "EV"),
+    (8192, "IV"), (32768, "LuV"), (131072, "ZPM"), (524288, "UV"),
+    (2147483647, "MAX")
 ]
 
 def set_all_tiers(tiers: list[str]) -> None:
-    ALL_TIERS.clear()
-    ALL_TIERS.extend(tiers)
+    set_tiers(tiers)
+
 
+PROFILE_BUSY_TIMEOUT_MS = 5000
 
-def connect_profile(db_path: Path | str) -> sqlite3.Connection:
+# WAL lets the planner worker read the profile while the GUI writes inventory.
+# synchronous=NORMAL is crash-safe under WAL; only an OS crash or power loss
+# can drop the most recent commits.
+PROFILE_PRAGMAS: tuple[tuple[str, str], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", "-8192"),  # KiB
+    ("mmap_size", str(64 * 1024 * 1024)),
+    ("temp_store", "MEMORY"),
+)
+
+
+def configure_connection(
+    conn: sqlite3.Connection,
+    pragmas: tuple[tuple[str, str], ...] = (),
+    *,
+    busy_timeout_ms: int | None = None,
+) -> None:
+    """Apply per-connection settings before any other statement runs.
+
+    ``busy_timeout_ms`` makes a connection wait for a competing writer instead
+    of failing with "database is locked".
+    """
+    if busy_timeout_ms is not None:
+        conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    for name, value in pragmas:
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def connect_profile(
+    db_path: Path | str,
+    *,
+    content_path: Path | str | None = None,
+    content_immutable: bool = False,
+) -> sqlite3.Connection:
     """Connect to a per-user profile DB.
 
     The profile DB stores player-specific settings (enabled tiers, unlocks, etc.)
-    and MUST remain writable in client mode.
+    and MUST remain writable in client mode. Every connection uses
+    ``PROFILE_PRAGMAS``, so GUI writes and background readers do not block
+    each other. With ``content_path`` the content DB is also attached
+    read-only (see ``attach_content``).
     """
     db_path = Path(db_path)
-    conn = sqlite3.connect(str(db_path))
+    # Opened as a URI so ATTACH accepts the ``mode=ro`` content URI on SQLite
+    # builds without SQLITE_USE_URI, where it would name a new empty file.
+    conn = sqlite3.connect(_file_uri(db_path), uri=True)
     conn.row_factory = sqlite3.Row
+    configure_connection(conn, PROFILE_PRAGMAS, busy_timeout_ms=PROFILE_BUSY_TIMEOUT_MS)
     conn.execute("PRAGMA foreign_keys=ON")
+    _migrate(conn, _ensure_profile_layout, _PROFILE_MIGRATIONS)
+    if content_path is not None:
+        attach_content(conn, content_path, immutable=content_immutable)
+    return conn
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("PRAGMA user_version").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _migrate(
+    conn: sqlite3.Connection,
+    baseline: Callable[[sqlite3.Connection], None],
+    steps: tuple[tuple[int, Callable[[sqlite3.Connection], None]], ...],
+) -> None:
+    """Bring a DB up to the newest version in ``steps``, tracked in ``PRAGMA user_version``.
+
+    A DB that is already current costs one pragma read. Otherwise ``baseline``
+    (the idempotent catch-up predating versioned migrations) runs first, then
+    every step newer than the stored version, in order. DBs stamped by a newer
+    build are left alone.
+    """
+    current = _user_version(conn)
+    target = steps[-1][0]
+    if current >= target:
+        return
+    baseline(conn)
+    for version, step in steps:
+        if version > current:
+            step(conn)
+    conn.execute(f"PRAGMA user_version={int(target)}")
+    conn.commit()
+
+
+def _ensure_profile_layout(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS app_settings (
@@ -117,19 +183,6 @@ def connect_profile(db_path: Path | str) -> sqlite3.Connection:
         """
     )
 
-    # Backfill legacy single-container columns into placement rows.
-    conn.execute(
-        """
-        INSERT INTO storage_container_placements(storage_id, item_id, placed_count)
-        SELECT su.id, su.container_item_id, su.placed_count
-        FROM storage_units su
-        WHERE su.container_item_id IS NOT NULL
-          AND COALESCE(su.placed_count, 0) > 0
-        ON CONFLICT(storage_id, item_id)
-        DO UPDATE SET placed_count=excluded.placed_count
-        """
-    )
-
     assignment_cols = {
         row["name"]
         for row in conn.execute("PRAGMA table_info(storage_assignments)").fetchall()
@@ -239,21 +292,94 @@ def connect_profile(db_path: Path | str) -> sqlite3.Connection:
     ).fetchone()
     if default_storage is None:
         conn.execute("INSERT INTO storage_units(name, kind) VALUES(?, ?)", ("Main Storage", "generic"))
-    conn.commit()
-    return conn
 
 
-def connect(db_path: Path | str = DEFAULT_DB_PATH, *, read_only: bool = False) -> sqlite3.Connection:
+def _backfill_container_placements(conn: sqlite3.Connection) -> None:
+    # Backfill legacy single-container columns into placement rows.
+    conn.execute(
+        """
+        INSERT INTO storage_container_placements(storage_id, item_id, placed_count)
+        SELECT su.id, su.container_item_id, su.placed_count
+        FROM storage_units su
+        WHERE su.container_item_id IS NOT NULL
+          AND COALESCE(su.placed_count, 0) > 0
+        ON CONFLICT(storage_id, item_id)
+        DO UPDATE SET placed_count=excluded.placed_count
+        """
+    )
+
+
+def _track_inventory_version(conn: sqlite3.Connection) -> None:
+    # Bumped on every change that can alter inventory quantities or which
+    # storages the planner may draw from; in-memory ledgers reload on a bump.
+    conn.execute(
+        """
+        INSERT INTO app_settings(key, value)
+        VALUES('inventory_version', '0')
+        ON CONFLICT(key) DO NOTHING
+        """
+    )
+    events = {
+        "trg_inventory_version_assignment_insert": "AFTER INSERT ON storage_assignments",
+        "trg_inventory_version_assignment_update": "AFTER UPDATE ON storage_assignments",
+        "trg_inventory_version_assignment_delete": "AFTER DELETE ON storage_assignments",
+        "trg_inventory_version_storage_insert": "AFTER INSERT ON storage_units",
+        "trg_inventory_version_storage_update": "AFTER UPDATE OF id, priority, allow_planner_use ON storage_units",
+        "trg_inventory_version_storage_delete": "AFTER DELETE ON storage_units",
+    }
+    for name, event in events.items():
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {name}
+            {event}
+            BEGIN
+                UPDATE app_settings
+                SET value = CAST(COALESCE(value, '0') AS INTEGER) + 1
+                WHERE key = 'inventory_version';
+            END
+            """
+        )
+
+
+# Append new (version, step) pairs here; never renumber or edit shipped steps.
+_PROFILE_MIGRATIONS = (
+    (1, _backfill_container_placements),
+    (2, _track_inventory_version),
+)
+PROFILE_SCHEMA_VERSION = _PROFILE_MIGRATIONS[-1][0]
+
+
+# Read-only content connections map the file instead of copying pages into a
+# private cache, so the GUI and worker connections share the OS page cache.
+CONTENT_MMAP_SIZE = 256 * 1024 * 1024
+CONTENT_READ_PRAGMAS: tuple[tuple[str, str], ...] = (
+    ("mmap_size", str(CONTENT_MMAP_SIZE)),
+    ("query_only", "ON"),
+)
+
+
+def connect(
+    db_path: Path | str = DEFAULT_DB_PATH,
+    *,
+    read_only: bool = False,
+    immutable: bool = False,
+) -> sqlite3.Connection:
     """Connect to a GTNH Recipe *content* DB.
 
-    In client mode, pass read_only=True to prevent content edits.
-    Schema migrations are still applied so older DB files remain readable.
+    In client mode, pass read_only=True to prevent content edits. A file whose
+    schema is current is then opened through connect_reader; older files are
+    migrated first so they remain readable. ``immutable`` is passed on to
+    connect_reader.
     """
     db_path = Path(db_path)
     if read_only:
+        conn = connect_reader(db_path, immutable=immutable)
+        if _user_version(conn) >= CONTENT_SCHEMA_VERSION:
+            return conn
+        conn.close()
         # Open read/write to allow schema migrations, but require the DB file
         # to exist (same failure behavior as strict read-only mode).
-        uri = f"file:{db_path.as_posix()}?mode=rw"
+        uri = f"{_file_uri(db_path)}?mode=rw"
         conn = sqlite3.connect(uri, uri=True)
     else:
         conn = sqlite3.connect(str(db_path))
@@ -262,11 +388,71 @@ def connect(db_path: Path | str = DEFAULT_DB_PATH, *, read_only: bool = False) -
     ensure_schema(conn)
     if read_only:
         # Enforce read-only behavior for the remainder of this connection.
-        conn.execute("PRAGMA query_only=ON")
+        configure_connection(conn, CONTENT_READ_PRAGMAS)
+    return conn
+
+
+def connect_reader(db_path: Path | str, *, immutable: bool = False) -> sqlite3.Connection:
+    """Open an existing content DB for queries, e.g. from a worker thread.
+
+    No schema work is attempted; the UI connection has already migrated the file.
+    Only pass ``immutable=True`` when nothing can write the file while the
+    connection is open (client mode): SQLite then skips locking and change
+    detection entirely.
+    """
+    conn = sqlite3.connect(_reader_uri(db_path, immutable=immutable), uri=True)
+    conn.row_factory = sqlite3.Row
+    configure_connection(conn, CONTENT_READ_PRAGMAS)
     return conn
 
 
+def _file_uri(db_path: Path | str) -> str:
+    if str(db_path) == ":memory:":
+        return "file::memory:"
+    return f"file:{quote(Path(db_path).as_posix(), safe='/:')}"
+
+
+def _reader_uri(db_path: Path | str, *, immutable: bool) -> str:
+    uri = f"{_file_uri(db_path)}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return uri
+
+
+# Schema name of the content DB when attached to a profile connection, so
+# profile queries can join content tables as ``content.items``.
+CONTENT_SCHEMA = "content"
+
+
+def attach_content(conn: sqlite3.Connection, db_path: Path | str, *, immutable: bool = False) -> bool:
+    """Attach an existing content DB read-only to ``conn`` as ``CONTENT_SCHEMA``.
+
+    Returns False, leaving ``conn`` unchanged, when the file cannot be opened
+    (e.g. an in-memory or missing content DB); callers then fall back to
+    querying the content connection separately.
+    """
+    if attached_content(conn):
+        return True
+    if str(db_path) == ":memory:" or not Path(db_path).is_file():
+        return False
+    try:
+        conn.execute(f"ATTACH DATABASE ? AS {CONTENT_SCHEMA}", (_reader_uri(db_path, immutable=immutable),))
+    except sqlite3.OperationalError:
+        return False
+    conn.execute(f"PRAGMA {CONTENT_SCHEMA}.mmap_size={CONTENT_MMAP_SIZE}")
+    return True
+
+
+def attached_content(conn: sqlite3.Connection) -> bool:
+    return any(row[1] == CONTENT_SCHEMA for row in conn.execute("PRAGMA database_list").fetchall())
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Migrate a content DB to ``CONTENT_SCHEMA_VERSION``; a no-op pragma read when current."""
+    _migrate(conn, _ensure_content_layout, _CONTENT_MIGRATIONS)
+
+
+def _ensure_content_layout(conn: sqlite3.Connection) -> None:
     # Item kinds (Ore, Dust, Ingot, Plate, etc.) are a user-editable taxonomy.
     # NOTE: The existing `items.kind` column is reserved for the high-level
     # type (item vs fluid). The more detailed classification lives in
@@ -636,64 +822,222 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         conn.execute(
             "ALTER TABLE item_container_transforms ADD COLUMN empty_item_is_consumed INTEGER NOT NULL DEFAULT 0"
         )
-    def _get_user_version() -> int:
-        row = conn.execute("PRAGMA user_version").fetchone()
-        return int(row[0]) if row else 0
+    conn.execute(
+        """
+    CREATE TABLE IF NOT EXISTS app_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """
+    )
 
-    user_version = _get_user_version()
-    if user_version < 1:
-        machine_rows = conn.execute(
-            """
-            SELECT machine_item_id
-            FROM machine_io_slots
-            GROUP BY machine_item_id
-            HAVING SUM(CASE WHEN slot_index=0 THEN 1 ELSE 0 END)=0
-               AND MIN(slot_index) >= 1
-            """
-        ).fetchall()
-        for row in machine_rows:
-            conn.execute(
-                "UPDATE machine_io_slots SET slot_index=slot_index-1 WHERE machine_item_id=?",
-                (row["machine_item_id"],),
-            )
 
-        recipe_machine_rows = conn.execute(
-            """
-            SELECT r.machine_item_id AS machine_item_id
-            FROM recipes r
-            JOIN recipe_lines rl ON rl.recipe_id = r.id
-            WHERE r.machine_item_id IS NOT NULL
-              AND rl.direction='out'
-              AND rl.output_slot_index IS NOT NULL
-            GROUP BY r.machine_item_id
-            HAVING SUM(CASE WHEN rl.output_slot_index=0 THEN 1 ELSE 0 END)=0
-               AND MIN(rl.output_slot_index) >= 1
+def _shift_slot_indexes_to_zero_based(conn: sqlite3.Connection) -> None:
+    machine_rows = conn.execute(
+        """
+        SELECT machine_item_id
+        FROM machine_io_slots
+        GROUP BY machine_item_id
+        HAVING SUM(CASE WHEN slot_index=0 THEN 1 ELSE 0 END)=0
+           AND MIN(slot_index) >= 1
+        """
+    ).fetchall()
+    for row in machine_rows:
+        conn.execute(
+            "UPDATE machine_io_slots SET slot_index=slot_index-1 WHERE machine_item_id=?",
+            (row["machine_item_id"],),
+        )
+
+    recipe_machine_rows = conn.execute(
+        """
+        SELECT r.machine_item_id AS machine_item_id
+        FROM recipes r
+        JOIN recipe_lines rl ON rl.recipe_id = r.id
+        WHERE r.machine_item_id IS NOT NULL
+          AND rl.direction='out'
+          AND rl.output_slot_index IS NOT NULL
+        GROUP BY r.machine_item_id
+        HAVING SUM(CASE WHEN rl.output_slot_index=0 THEN 1 ELSE 0 END)=0
+           AND MIN(rl.output_slot_index) >= 1
+        """
+    ).fetchall()
+    for row in recipe_machine_rows:
+        conn.execute(
             """
-        ).fetchall()
-        for row in recipe_machine_rows:
-            conn.execute(
-                """
-                UPDATE recipe_lines
-                SET output_slot_index=output_slot_index-1
-                WHERE recipe_id IN (SELECT id FROM recipes WHERE machine_item_id=?)
-                  AND direction='out'
-                  AND output_slot_index IS NOT NULL
-                """,
-                (row["machine_item_id"],),
+            UPDATE recipe_lines
+            SET output_slot_index=output_slot_index-1
+            WHERE recipe_id IN (SELECT id FROM recipes WHERE machine_item_id=?)
+              AND direction='out'
+              AND output_slot_index IS NOT NULL
+            """,
+            (row["machine_item_id"],),
+        )
+
+
+def _recipe_stats_refresh_sql(where: str) -> str:
+    # Mirrors planner.get_calculated_tier; NULL means "first configured tier",
+    # which is resolved at read time because the tier list is user-editable.
+    ws = "' ' || char(9) || char(10) || char(13)"
+    voltage_cases = " ".join(f"WHEN eu <= {voltage} THEN '{name}'" for voltage, name in GT_VOLTAGES)
+    return f"""
+        INSERT OR REPLACE INTO recipe_stats(
+            recipe_id, fluid_req_count, item_req_count, input_qty, calculated_tier
+        )
+        SELECT
+            r.id,
+            COALESCE(SUM(CASE WHEN rl.id IS NOT NULL AND i.kind IN ('fluid','gas') THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN rl.id IS NOT NULL AND (i.kind NOT IN ('fluid','gas') OR i.kind IS NULL) THEN 1 ELSE 0 END), 0),
+            COALESCE(SUM(CASE WHEN rl.id IS NOT NULL THEN COALESCE(rl.qty_count, rl.qty_liters, 1) ELSE 0 END), 0),
+            (
+                SELECT CASE
+                    WHEN TRIM(COALESCE(t.tier, ''), {ws}) <> '' THEN TRIM(t.tier, {ws})
+                    WHEN LOWER(TRIM(COALESCE(t.method, ''), {ws})) = 'crafting' THEN NULL
+                    WHEN eu <= 0 THEN NULL
+                    {voltage_cases}
+                    ELSE 'MAX'
+                END
+                FROM (
+                    SELECT r.tier AS tier, r.method AS method,
+                           CAST(CAST(COALESCE(r.eu_per_tick, 0) AS REAL) AS INTEGER) AS eu
+                ) t
             )
+        FROM recipes r
+        LEFT JOIN recipe_lines rl ON rl.recipe_id = r.id AND rl.direction = 'in'
+        LEFT JOIN items i ON i.id = rl.item_id
+        WHERE {where}
+        GROUP BY r.id
+    """
 
-        conn.execute("PRAGMA user_version=1")
 
+def rebuild_recipe_stats(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM recipe_stats")
+    conn.execute(_recipe_stats_refresh_sql("1=1"))
+
+
+def _ensure_recipe_stats(conn: sqlite3.Connection) -> None:
+    """Per-recipe facts used by recipe selection, kept current by triggers."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recipe_lines_recipe ON recipe_lines(recipe_id, direction)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recipe_lines_item ON recipe_lines(item_id, direction)")
     conn.execute(
         """
-    CREATE TABLE IF NOT EXISTS app_settings (
-        key TEXT PRIMARY KEY,
-        value TEXT
+    CREATE TABLE IF NOT EXISTS recipe_stats (
+        recipe_id INTEGER PRIMARY KEY,
+        fluid_req_count INTEGER NOT NULL DEFAULT 0,
+        item_req_count INTEGER NOT NULL DEFAULT 0,
+        input_qty REAL NOT NULL DEFAULT 0,
+        calculated_tier TEXT
     )
     """
     )
 
-    conn.commit()
+    triggers = {
+        "trg_recipe_stats_recipe_insert": (
+            "AFTER INSERT ON recipes",
+            _recipe_stats_refresh_sql("r.id = NEW.id"),
+        ),
+        "trg_recipe_stats_recipe_update": (
+            "AFTER UPDATE OF id, tier, method, eu_per_tick ON recipes",
+            "DELETE FROM recipe_stats WHERE recipe_id = OLD.id; "
+            + _recipe_stats_refresh_sql("r.id = NEW.id"),
+        ),
+        "trg_recipe_stats_recipe_delete": (
+            "AFTER DELETE ON recipes",
+            "DELETE FROM recipe_stats WHERE recipe_id = OLD.id",
+        ),
+        "trg_recipe_stats_line_insert": (
+            "AFTER INSERT ON recipe_lines WHEN NEW.direction = 'in'",
+            _recipe_stats_refresh_sql("r.id = NEW.recipe_id"),
+        ),
+        "trg_recipe_stats_line_update": (
+            "AFTER UPDATE ON recipe_lines WHEN OLD.direction = 'in' OR NEW.direction = 'in'",
+            _recipe_stats_refresh_sql("r.id IN (OLD.recipe_id, NEW.recipe_id)"),
+        ),
+        "trg_recipe_stats_line_delete": (
+            "AFTER DELETE ON recipe_lines WHEN OLD.direction = 'in'",
+            _recipe_stats_refresh_sql("r.id = OLD.recipe_id"),
+        ),
+        "trg_recipe_stats_item_kind": (
+            "AFTER UPDATE OF kind ON items WHEN OLD.kind IS NOT NEW.kind",
+            _recipe_stats_refresh_sql(
+                "r.id IN (SELECT recipe_id FROM recipe_lines WHERE item_id = NEW.id AND direction = 'in')"
+            ),
+        ),
+    }
+    for name, (event, body) in triggers.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body}; END")
+
+    stats_count = conn.execute("SELECT COUNT(*) FROM recipe_stats").fetchone()[0]
+    recipe_count = conn.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
+    if stats_count != recipe_count:
+        rebuild_recipe_stats(conn)
+
+
+def canonical_name(name: str | None) -> str:
+    """Case- and whitespace-insensitive form of a name, as stored in ``*_canonical`` columns."""
+    return " ".join((name or "").split()).casefold()
+
+
+def item_canonical_name(display_name: str | None, key: str | None) -> str:
+    """``items.name_canonical``: the display label, or the key when it is blank."""
+    return canonical_name(display_name) or canonical_name(key)
+
+
+def _add_canonical_name_column(
+    conn: sqlite3.Connection,
+    table: str,
+    name_columns: tuple[str, ...] = ("name",),
+    name_of: Callable[..., str] = canonical_name,
+) -> None:
+    """Add an indexed ``name_canonical`` column to ``table`` and fill it.
+
+    ``name_of`` maps a row's ``name_columns`` to the stored value. Writers keep
+    the column current themselves; a trigger would need ``canonical_name``
+    registered on every connection that writes the file.
+    """
+    cols = {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    if "name_canonical" not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN name_canonical TEXT")
+    rows = conn.execute(f"SELECT id, {', '.join(name_columns)} FROM {table}").fetchall()
+    conn.executemany(
+        f"UPDATE {table} SET name_canonical=? WHERE id=?",
+        [(name_of(*row[1:]), row[0]) for row in rows],
+    )
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_name_canonical ON {table}(name_canonical)")
+
+
+def _track_recipe_canonical_names(conn: sqlite3.Connection) -> None:
+    """Indexed ``recipes.name_canonical`` for name lookups, written by every recipe writer."""
+    _add_canonical_name_column(conn, "recipes")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recipes_duplicate_of ON recipes(duplicate_of_recipe_id)")
+    conn.execute(
+        """
+        INSERT INTO app_settings(key, value)
+        VALUES('recipes_version', '0')
+        ON CONFLICT(key) DO NOTHING
+        """
+    )
+
+
+def _track_canonical_names(conn: sqlite3.Connection) -> None:
+    """``name_canonical`` on items (display label), item kinds and materials."""
+    item_cols = {row[1] for row in conn.execute("PRAGMA table_info(items)").fetchall()}
+    if "display_name" not in item_cols:
+        # Every reader already expects it; only the oldest files lack it.
+        conn.execute("ALTER TABLE items ADD COLUMN display_name TEXT")
+    _add_canonical_name_column(conn, "items", ("display_name", "key"), item_canonical_name)
+    _add_canonical_name_column(conn, "item_kinds")
+    _add_canonical_name_column(conn, "materials")
+
+
+# Append new (version, step) pairs here; never renumber or edit shipped steps.
+# Version 1 predates this table and was stamped by the inline slot-index fix.
+_CONTENT_MIGRATIONS = (
+    (1, _shift_slot_indexes_to_zero_based),
+    (2, _ensure_recipe_stats),
+    (3, _track_recipe_canonical_names),
+    (4, _track_canonical_names),
+)
+CONTENT_SCHEMA_VERSION = _CONTENT_MIGRATIONS[-1][0]
 
 
 def get_setting(conn: sqlite3.Connection, key: str, default: str | None = None) -> str | None:
@@ -724,16 +1068,19 @@ def export_db(conn: sqlite3.Connection, dest_path: Path | str) -> None:
         dst.close()
 
 
-def _canonical_kind_name(name: str) -> str:
-    return " ".join((name or "").split()).strip().casefold()
-
-
-def _canonical_item_label(name: str) -> str:
-    return " ".join((name or "").split()).strip().casefold()
+def import_db(conn: sqlite3.Connection, source_path: Path | str) -> None:
+    """Replace the DB behind ``conn`` with the contents of source_path.
 
-
-def _canonical_recipe_name(name: str) -> str:
-    return " ".join((name or "").split()).strip().casefold()
+    Uses SQLite's backup API, so pages still in the source's WAL are included
+    and the destination's own WAL stays consistent; copying the file would
+    miss the former and leave a stale ``-wal``/``-shm`` beside the latter.
+    """
+    conn.commit()
+    src = sqlite3.connect(str(Path(source_path)))
+    try:
+        src.backup(conn)
+    finally:
+        src.close()
 
 
 def _recipe_line_signature(line: dict[str, Any] | sqlite3.Row) -> tuple:
@@ -780,26 +1127,23 @@ def find_item_merge_conflicts(dest_conn: sqlite3.Connection, src_path: Path | st
     ensure_schema(src)
     try:
         dest_rows = dest_conn.execute(
-            "SELECT id, key, COALESCE(NULLIF(TRIM(display_name), ''), key) AS label FROM items"
+            "SELECT id, key, display_name, COALESCE(NULLIF(TRIM(display_name), ''), key) AS label FROM items"
         ).fetchall()
         dest_by_label: dict[str, list[sqlite3.Row]] = {}
         for row in dest_rows:
-            canon = _canonical_item_label(row["label"])
-            if not canon:
-                continue
-            dest_by_label.setdefault(canon, []).append(row)
+            canon = item_canonical_name(row["display_name"], row["key"])
+            if canon:
+                dest_by_label.setdefault(canon, []).append(row)
 
         dest_keys = {row["key"] for row in dest_rows}
 
         conflicts: list[dict[str, Any]] = []
         src_rows = src.execute(
-            "SELECT id, key, COALESCE(NULLIF(TRIM(display_name), ''), key) AS label FROM items"
+            "SELECT id, key, display_name, COALESCE(NULLIF(TRIM(display_name), ''), key) AS label FROM items"
         ).fetchall()
         for row in src_rows:
-            if row["key"] in dest_keys:
-                continue
-            canon = _canonical_item_label(row["label"])
-            if not canon:
+            canon = item_canonical_name(row["display_name"], row["key"])
+            if row["key"] in dest_keys or not canon:
                 continue
             matches = dest_by_label.get(canon, [])
             if len(matches) != 1:
@@ -880,26 +1224,24 @@ def merge_db(
     try:
         # ---- Material mapping ----
         dest_material_map: dict[int, int] = {}
-        dest_material_by_canon: dict[str, int] = {}
-        for row in dest_conn.execute("SELECT id, name FROM materials").fetchall():
-            canon = _canonical_kind_name(row["name"] or "")
-            if not canon:
-                continue
-            dest_material_by_canon[canon] = row["id"]
+        dest_material_by_canon: dict[str, int] = {
+            canonical_name(row["name"]): row["id"] for row in dest_conn.execute("SELECT id, name FROM materials")
+        }
+        dest_material_by_canon.pop("", None)
 
         src_materials = src.execute("SELECT id, name, attributes FROM materials ORDER BY id").fetchall()
         for mat in src_materials:
             name = (mat["name"] or "").strip()
             if not name:
                 continue
-            canon = _canonical_kind_name(name)
+            canon = canonical_name(name)
             dest_id = dest_material_by_canon.get(canon)
             if dest_id is not None:
                 dest_material_map[mat["id"]] = dest_id
                 continue
             dest_conn.execute(
-                "INSERT INTO materials(name, attributes) VALUES(?, ?)",
-                (name, mat["attributes"]),
+                "INSERT INTO materials(name, name_canonical, attributes) VALUES(?, ?, ?)",
+                (name, canon, mat["attributes"]),
             )
             new_id = dest_conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
             dest_material_map[mat["id"]] = new_id
@@ -910,13 +1252,11 @@ def merge_db(
         dest_kind_map: dict[int, int] = {}
         dest_kind_by_canon: dict[str, list[int]] = {}
         dest_kind_name_by_id: dict[int, str] = {}
-        for row in dest_conn.execute("SELECT id, name, applies_to FROM item_kinds").fetchall():
-            kind_name = (row["name"] or "").strip()
-            dest_kind_name_by_id[row["id"]] = kind_name
-            canon = _canonical_kind_name(kind_name)
-            if not canon:
-                continue
-            dest_kind_by_canon.setdefault(canon, []).append(row["id"])
+        for row in dest_conn.execute("SELECT id, name FROM item_kinds ORDER BY id").fetchall():
+            dest_kind_name_by_id[row["id"]] = (row["name"] or "").strip()
+            canon = canonical_name(row["name"])
+            if canon:
+                dest_kind_by_canon.setdefault(canon, []).append(row["id"])
         src_kinds = src.execute(
             "SELECT id, name, sort_order, applies_to FROM item_kinds ORDER BY id"
         ).fetchall()
@@ -924,20 +1264,16 @@ def merge_db(
             name = (k["name"] or "").strip()
             if not name:
                 continue
-            row = dest_conn.execute(
-                "SELECT id FROM item_kinds WHERE LOWER(name)=LOWER(?)",
-                (name,),
-            ).fetchone()
-            if row:
-                dest_kind_map[k["id"]] = row["id"]
+            canon = canonical_name(name)
+            if canon in dest_kind_by_canon:
+                dest_kind_map[k["id"]] = dest_kind_by_canon[canon][0]
                 continue
             applies_to = (k["applies_to"] or "item").strip().lower()
             if applies_to not in ("item", "fluid"):
                 applies_to = "item"
-            canonical_name = _canonical_kind_name(name)
             singular_match_id = None
-            if canonical_name.endswith("s") and len(canonical_name) > 3:
-                singular_canon = canonical_name[:-1]
+            if canon.endswith("s") and len(canon) > 3:
+                singular_canon = canon[:-1]
                 singular_matches = dest_kind_by_canon.get(singular_canon, [])
                 if len(singular_matches) == 1:
                     singular_match_id = singular_matches[0]
@@ -945,19 +1281,18 @@ def merge_db(
                 dest_kind_map[k["id"]] = singular_match_id
                 continue
             dest_conn.execute(
-                "INSERT INTO item_kinds(name, sort_order, is_builtin, applies_to) VALUES(?, ?, 0, ?)",
-                (name, int(k["sort_order"] or 0), applies_to),
+                "INSERT INTO item_kinds(name, name_canonical, sort_order, is_builtin, applies_to) VALUES(?, ?, ?, 0, ?)",
+                (name, canon, int(k["sort_order"] or 0), applies_to),
             )
             new_id = dest_conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
             dest_kind_map[k["id"]] = new_id
             dest_kind_name_by_id[new_id] = name
-            if canonical_name:
-                dest_kind_by_canon.setdefault(canonical_name, []).append(new_id)
+            if canon:
+                dest_kind_by_canon.setdefault(canon, []).append(new_id)
             stats["kinds_added"] += 1
 
         # Grab Machine kind id for backfills
-        mk = dest_conn.execute("SELECT id FROM item_kinds WHERE LOWER(name)=LOWER('Machine')").fetchone()
-        dest_machine_kind_id = mk["id"] if mk else None
+        dest_machine_kind_id = dest_kind_by_canon.get("machine", [None])[0]
 
         # ---- Items ----
         src_items = src.execute(
@@ -1060,9 +1395,9 @@ def merge_db(
 
             if not dest_row:
                 insert_sql = (
-                    "INSERT INTO items(key, display_name, kind, is_base, max_stack_size, is_machine, machine_tier, machine_type, "
-                    "item_kind_id, material_id, crafting_grid_size, content_fluid_id, content_qty_liters, needs_review) "
-                    "VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+                    "INSERT INTO items(key, display_name, name_canonical, kind, is_base, max_stack_size, is_machine, machine_tier, "
+                    "machine_type, item_kind_id, material_id, crafting_grid_size, content_fluid_id, content_qty_liters, needs_review) "
+                    "VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
                 )
                 needs_review = _needs_review_for_item(
                     kind=it["kind"],
@@ -1075,6 +1410,7 @@ def merge_db(
                 insert_values = (
                     key,
                     it["display_name"],
+                    item_canonical_name(it["display_name"], key),
                     it["kind"],
                     int(it["is_base"] or 0),
                     max(1, int(it["max_stack_size"] or 64)),
@@ -1102,6 +1438,7 @@ def merge_db(
             updates: dict[str, Any] = {}
             if (dest_row["display_name"] is None or str(dest_row["display_name"]).strip() == "") and (it["display_name"] or "").strip():
                 updates["display_name"] = it["display_name"]
+                updates["name_canonical"] = item_canonical_name(it["display_name"], key)
             if (dest_row["item_kind_id"] is None) and mapped_kind_id is not None:
                 updates["item_kind_id"] = mapped_kind_id
             if (dest_row["material_id"] is None) and mapped_material_id is not None:
@@ -1205,7 +1542,7 @@ def merge_db(
             "SELECT id, name, method, machine, machine_item_id, grid_size, station_item_id, circuit, tier, duration_ticks, eu_per_tick, notes "
             "FROM recipes"
         ).fetchall()
-        dest_name_keys = {r["id"]: _canonical_recipe_name(r["name"]) for r in dest_recipes}
+        dest_name_keys = {r["id"]: canonical_name(r["name"]) for r in dest_recipes}
         dest_lines_rows = dest_conn.execute(
             """
             SELECT rl.recipe_id, rl.direction, i.key AS item_key, rl.qty_count, rl.qty_liters,
@@ -1239,7 +1576,7 @@ def merge_db(
                 n += 1
 
         def _closest_recipe_id(name: str) -> int | None:
-            canon = _canonical_recipe_name(name)
+            canon = canonical_name(name)
             best_id = None
             best_ratio = 0.0
             for r in dest_recipes:
@@ -1296,10 +1633,11 @@ def merge_db(
                     machine_dest_id = item_key_to_dest_id.get(k)
 
             dest_conn.execute(
-                "INSERT INTO recipes(name, method, machine, machine_item_id, grid_size, station_item_id, circuit, tier, duration_ticks, eu_per_tick, notes, duplicate_of_recipe_id) "
-                "VALUES(?,?,?,?,?,?,?,?,?,?,?,?)",
+                "INSERT INTO recipes(name, name_canonical, method, machine, machine_item_id, grid_size, station_item_id, circuit, tier, duration_ticks, eu_per_tick, notes, duplicate_of_recipe_id) "
+                "VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)",
                 (
                     new_name,
+                    canonical_name(new_name),
                     r["method"],
                     r["machine"],
                     machine_dest_id,
@@ -8,16 +8,18 @@ from pathlib import Path
 
 from services.db import (
     DEFAULT_DB_PATH,
-    ALL_TIERS,
     connect,
     connect_profile,
     export_db,
     get_setting,
+    import_db,
     merge_database,
     set_all_tiers,
     set_setting,
 )
+from services.startup_profile import startup_profiler
 from services.storage import default_storage_id, list_storage_units
+from services.tiers import ALL_TIERS, default_tier
 from ui_constants import (
     SETTINGS_CRAFT_6X6_UNLOCKED,
     SETTINGS_CRAFTING_GRIDS,
@@ -33,7 +35,7 @@ from ui_constants import (
 
 
 def _default_tier() -> str:
-    return ALL_TIERS[0] if ALL_TIERS else "Stone Age"
+    return default_tier()
 
 
 @dataclass
@@ -46,12 +48,17 @@ class DbLifecycle:
     last_open_error: Exception | None = field(init=False, default=None)
 
     def __post_init__(self) -> None:
+        profiler = startup_profiler()
         self.db_path = Path(self.db_path)
-        self.conn = self._open_content_db(self.db_path)
+        with profiler.phase("open content db"):
+            self.conn = self._open_content_db(self.db_path)
         self.profile_db_path = self._profile_path_for_content(self.db_path)
-        self.profile_conn = connect_profile(self.profile_db_path)
-        self._migrate_profile_settings_if_needed()
-        self._apply_tier_list()
+        with profiler.phase("open profile db"):
+            self.profile_conn = self._open_profile_db(self.profile_db_path, self.db_path)
+        with profiler.phase("migrate profile settings"):
+            self._migrate_profile_settings_if_needed()
+        with profiler.phase("apply tier list"):
+            self._apply_tier_list()
 
     def close(self) -> None:
         try:
@@ -77,7 +84,7 @@ class DbLifecycle:
         new_conn = self._open_content_db(target_path)
         new_profile_db_path = self._profile_path_for_content(target_path)
         try:
-            new_profile_conn = connect_profile(new_profile_db_path)
+            new_profile_conn = self._open_profile_db(new_profile_db_path, target_path)
         except Exception:
             new_conn.close()
             raise
@@ -105,6 +112,11 @@ class DbLifecycle:
     def export_profile_db(self, target: Path) -> None:
         export_db(self.profile_conn, target)
 
+    def import_profile_db(self, source: Path) -> None:
+        import_db(self.profile_conn, source)
+        # Reopen so profile migrations and settings apply to the imported data.
+        self.switch_db(self.db_path)
+
     def merge_db(self, source: Path, *, item_conflicts: dict[int, int] | None = None) -> dict[str, int]:
         return merge_database(self.conn, source, item_conflicts=item_conflicts)
 
@@ -126,7 +138,6 @@ class DbLifecycle:
     def set_all_tiers(self, tiers: list[str]) -> None:
         set_setting(self.profile_conn, SETTINGS_TIER_LIST, ",".join(tiers))
         set_all_tiers(tiers)
-        self._sync_planner_tier_order(tiers)
 
     def is_crafting_6x6_unlocked(self) -> bool:
         raw = (get_setting(self.profile_conn, SETTINGS_CRAFT_6X6_UNLOCKED, "0") or "0").strip()
@@ -286,15 +297,15 @@ class DbLifecycle:
     def _apply_tier_list(self) -> None:
         tiers = self.get_all_tiers()
         set_all_tiers(tiers)
-        self._sync_planner_tier_order(tiers)
 
-    @staticmethod
-    def _sync_planner_tier_order(tiers: list[str]) -> None:
-        try:
-            from services import planner
-        except ImportError:
-            return
-        planner.set_tier_order(tiers)
+    def _open_profile_db(self, path: Path, content_path: Path) -> sqlite3.Connection:
+        # The content DB is attached read-only so storage queries can join item
+        # metadata; skipped when the content DB fell back to an in-memory one.
+        return connect_profile(
+            path,
+            content_path=None if self.last_open_error is not None else content_path,
+            content_immutable=not self.editor_enabled,
+        )
 
     def _open_content_db(self, path: Path) -> sqlite3.Connection:
         try:
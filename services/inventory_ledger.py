@@ -0,0 +1,419 @@
+"""In-memory inventory ledger over ``storage_assignments``.
+
+The ledger loads every assignment once and keeps per-item, planner-usable and
+per-storage totals up to date as rows change, so reads never aggregate in SQL.
+Adjustments are applied in memory and written back in batches by ``flush()``;
+each flush is a single transaction, so a crash loses at most the unflushed
+window and never leaves a half-applied batch. The owner decides when to flush
+(the UI uses a short timer plus explicit flushes before other readers).
+
+Writes that bypass the ledger bump ``inventory_version`` through triggers in
+the profile DB; the ledger notices on its next read and reloads, flushing its
+own pending rows first. When rows it has pending changes for were written
+meanwhile, ``apply()`` adjustments are re-applied on top of the newer values
+as quantity deltas, so neither side's additions are lost; rows set or deleted
+outright replace whatever the other writer stored. Pending rows are never
+written while another caller has a transaction open on the shared connection;
+they stay pending until the next read or flush after it ends.
+
+Per-storage slot usage is kept alongside the quantity totals once the owner
+supplies item stack sizes through ``set_item_metadata()``, so capacity checks
+cost one ``storage_units`` lookup however many stacks a storage holds.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any, Callable, Iterable, Mapping
+
+from services.storage import (
+    AssignmentKey,
+    assignment_slot_usage,
+    resolve_inventory_adjustments,
+    storage_fit,
+    write_assignment_rows,
+)
+
+# Called with the item ids whose quantities changed, or None after a reload.
+LedgerListener = Callable[[frozenset[int] | None], None]
+
+
+def inventory_version(profile_conn: sqlite3.Connection) -> int:
+    row = profile_conn.execute("SELECT value FROM app_settings WHERE key='inventory_version'").fetchone()
+    return int(row["value"] or 0) if row else 0
+
+
+_QTY_FIELDS = ("qty_count", "qty_liters")
+
+
+def _stored_fields(row: Mapping[str, Any] | None) -> tuple | None:
+    if row is None:
+        return None
+    return (row["qty_count"], row["qty_liters"], int(row["locked"] or 0))
+
+
+def _rebase_row(
+    base: Mapping[str, Any] | None,
+    target: Mapping[str, Any] | None,
+    current: Mapping[str, Any] | None,
+) -> dict[str, Any] | None:
+    """Move the quantity change from ``base`` to ``target`` onto ``current``, the row as stored now."""
+    if _stored_fields(current) == _stored_fields(base):
+        return None if target is None else dict(target)
+    rebased: dict[str, Any] = {}
+    for field in _QTY_FIELDS:
+        before = base[field] if base is not None else None
+        after = target[field] if target is not None else None
+        now = current[field] if current is not None else None
+        if after == before:
+            rebased[field] = now
+            continue
+        qty = (now or 0) + (after or 0) - (before or 0)
+        rebased[field] = qty if qty > 0 else None
+    if all(rebased[field] is None for field in _QTY_FIELDS):
+        return None
+    base_locked = int(base["locked"] or 0) if base is not None else 0
+    target_locked = int(target["locked"] or 0) if target is not None else base_locked
+    current_locked = int(current["locked"] or 0) if current is not None else 0
+    rebased["locked"] = target_locked if target_locked != base_locked else current_locked
+    return rebased
+
+
+class _Totals:
+    """Running SUM()s that stay NULL while no non-NULL value contributes."""
+
+    __slots__ = ("entries", "count", "count_n", "liters", "liters_n")
+
+    def __init__(self) -> None:
+        self.entries = 0
+        self.count = 0.0
+        self.count_n = 0
+        self.liters = 0.0
+        self.liters_n = 0
+
+    def add(self, row: Mapping[str, Any], sign: int) -> None:
+        self.entries += sign
+        if row["qty_count"] is not None:
+            self.count += sign * float(row["qty_count"])
+            self.count_n += sign
+            if not self.count_n:
+                self.count = 0.0
+        if row["qty_liters"] is not None:
+            self.liters += sign * float(row["qty_liters"])
+            self.liters_n += sign
+            if not self.liters_n:
+                self.liters = 0.0
+
+    def as_row(self) -> dict[str, float | None]:
+        return {
+            "qty_count": self.count if self.count_n else None,
+            "qty_liters": self.liters if self.liters_n else None,
+        }
+
+
+class InventoryLedger:
+    def __init__(self, profile_conn: sqlite3.Connection):
+        self.profile_conn = profile_conn
+        self._version: int | None = None
+        self._rows: dict[int, dict[int, dict[str, Any]]] = {}
+        self._storages: dict[int, tuple[int, bool]] = {}
+        self._item_totals: dict[int, _Totals] = {}
+        self._planner_totals: dict[int, _Totals] = {}
+        self._storage_totals: dict[int, _Totals] = {}
+        self._all_totals = _Totals()
+        self._stack_sizes: dict[int, int] = {}
+        self._container_item_ids: frozenset[int] = frozenset()
+        self._storage_slots: dict[int, int] = {}
+        self._dirty: dict[AssignmentKey, dict[str, Any] | None] = {}
+        # Stored row each pending change was made against, to rebase it on conflicts.
+        self._dirty_base: dict[AssignmentKey, dict[str, Any] | None] = {}
+        # Pending rows set or deleted outright; the rest hold apply() deltas.
+        self._dirty_absolute: set[AssignmentKey] = set()
+        self._listeners: list[LedgerListener] = []
+
+    # ---------- events ----------
+    def subscribe(self, listener: LedgerListener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: LedgerListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _emit(self, item_ids: frozenset[int] | None) -> None:
+        for listener in list(self._listeners):
+            listener(item_ids)
+
+    # ---------- loading ----------
+    def invalidate(self) -> None:
+        """Drop the cached rows; the next read reloads (pending rows are kept)."""
+        self._version = None
+
+    def _sync(self) -> None:
+        version = inventory_version(self.profile_conn)
+        if version == self._version:
+            return
+        if self._dirty:
+            if self.profile_conn.in_transaction:
+                # Reloading now would drop the pending rows; keep serving them.
+                return
+            self._write_pending()
+        self._load()
+
+    def _load(self) -> None:
+        self._version = inventory_version(self.profile_conn)
+        self._storages = {
+            int(row["id"]): (int(row["priority"] or 0), bool(row["allow_planner_use"]))
+            for row in self.profile_conn.execute("SELECT id, priority, allow_planner_use FROM storage_units").fetchall()
+        }
+        self._rows = {}
+        self._item_totals = {}
+        self._planner_totals = {}
+        self._storage_totals = {}
+        self._all_totals = _Totals()
+        self._storage_slots = {}
+        for row in self.profile_conn.execute(
+            "SELECT storage_id, item_id, qty_count, qty_liters, locked FROM storage_assignments"
+        ).fetchall():
+            record = {"qty_count": row["qty_count"], "qty_liters": row["qty_liters"], "locked": int(row["locked"] or 0)}
+            self._rows.setdefault(int(row["item_id"]), {})[int(row["storage_id"])] = record
+            self._count((int(row["storage_id"]), int(row["item_id"])), record, 1)
+        self._emit(None)
+
+    def _count(self, key: AssignmentKey, row: Mapping[str, Any], sign: int) -> None:
+        storage_id, item_id = key
+        self._item_totals.setdefault(item_id, _Totals()).add(row, sign)
+        self._storage_totals.setdefault(storage_id, _Totals()).add(row, sign)
+        self._all_totals.add(row, sign)
+        slots = self._slot_usage(item_id, row)
+        if slots:
+            self._storage_slots[storage_id] = self._storage_slots.get(storage_id, 0) + sign * slots
+        if not int(row["locked"] or 0) and self._storages.get(storage_id, (0, False))[1]:
+            self._planner_totals.setdefault(item_id, _Totals()).add(row, sign)
+
+    def _slot_usage(self, item_id: int, row: Mapping[str, Any] | None) -> int:
+        if row is None or item_id in self._container_item_ids:
+            return 0
+        return assignment_slot_usage(row["qty_count"], self._stack_sizes.get(item_id, 64))
+
+    def set_item_metadata(self, stack_sizes: Mapping[int, int], container_item_ids: Iterable[int]) -> None:
+        """Stack sizes and container ids used for slot usage; recounts only when they change."""
+        stack_sizes = {int(item_id): max(1, int(size or 64)) for item_id, size in stack_sizes.items()}
+        container_item_ids = frozenset(int(item_id) for item_id in container_item_ids)
+        if stack_sizes == self._stack_sizes and container_item_ids == self._container_item_ids:
+            return
+        self._stack_sizes = stack_sizes
+        self._container_item_ids = container_item_ids
+        self._storage_slots = {}
+        for item_id, item_rows in self._rows.items():
+            for storage_id, row in item_rows.items():
+                slots = self._slot_usage(item_id, row)
+                if slots:
+                    self._storage_slots[storage_id] = self._storage_slots.get(storage_id, 0) + slots
+
+    def _replace(self, key: AssignmentKey, row: Mapping[str, Any] | None) -> None:
+        storage_id, item_id = key
+        item_rows = self._rows.setdefault(item_id, {})
+        old = item_rows.pop(storage_id, None)
+        if old is not None:
+            self._count(key, old, -1)
+        if row is not None:
+            record = {"qty_count": row["qty_count"], "qty_liters": row["qty_liters"], "locked": int(row["locked"] or 0)}
+            item_rows[storage_id] = record
+            self._count(key, record, 1)
+        elif not item_rows:
+            del self._rows[item_id]
+        for totals in (self._item_totals, self._planner_totals):
+            if item_id in totals and not totals[item_id].entries:
+                del totals[item_id]
+
+    # ---------- reads ----------
+    def get(self, storage_id: int, item_id: int) -> dict[str, Any] | None:
+        self._sync()
+        row = self._rows.get(int(item_id), {}).get(int(storage_id))
+        return dict(row) if row is not None else None
+
+    def item_totals(self, item_id: int) -> dict[str, float | None]:
+        """Like ``aggregate_assignment_for_item``: SUM()s across all storages."""
+        self._sync()
+        totals = self._item_totals.get(int(item_id))
+        return totals.as_row() if totals else {"qty_count": None, "qty_liters": None}
+
+    def planner_totals(self) -> dict[int, dict[str, float | None]]:
+        """Like ``aggregated_assignment_rows_for_planner``, keyed by item id."""
+        self._sync()
+        return {item_id: totals.as_row() for item_id, totals in self._planner_totals.items()}
+
+    def storage_totals(self, storage_id: int | None = None) -> dict[str, int]:
+        """Like ``storage_inventory_totals`` for one storage or all storages."""
+        self._sync()
+        totals = self._all_totals if storage_id is None else self._storage_totals.get(int(storage_id), _Totals())
+        return {
+            "entry_count": int(totals.entries),
+            "total_count": int(round(totals.count)),
+            "total_liters": int(round(totals.liters)),
+        }
+
+    def storage_usage(self, storage_id: int) -> dict[str, int | float]:
+        """Slots and liters used in one storage, like ``storage_slot_usage``."""
+        self._sync()
+        storage_id = int(storage_id)
+        totals = self._storage_totals.get(storage_id)
+        return {
+            "slot_used": int(self._storage_slots.get(storage_id, 0)),
+            "liter_used": float(totals.liters) if totals else 0.0,
+        }
+
+    def validate_fit(
+        self,
+        *,
+        storage_id: int,
+        item_id: int,
+        qty_count: int | float | None,
+        qty_liters: int | float | None,
+    ) -> dict[str, int | float | bool | None]:
+        """Like ``validate_storage_fit_for_item`` but from the maintained usage counters."""
+        self._sync()
+        storage_id = int(storage_id)
+        item_id = int(item_id)
+        storage = self.profile_conn.execute(
+            "SELECT slot_count, liter_capacity FROM storage_units WHERE id=?",
+            (storage_id,),
+        ).fetchone()
+        if storage is None:
+            return storage_fit(None, slot_usage=0, liter_usage=0)
+        current = self._rows.get(item_id, {}).get(storage_id)
+        proposed = {"qty_count": qty_count, "qty_liters": qty_liters}
+        usage = self.storage_usage(storage_id)
+        slot_usage = usage["slot_used"] - self._slot_usage(item_id, current) + self._slot_usage(item_id, proposed)
+        liter_usage = (
+            usage["liter_used"]
+            - float((current["qty_liters"] if current else 0) or 0)
+            + float(qty_liters or 0)
+        )
+        return storage_fit(storage, slot_usage=slot_usage, liter_usage=liter_usage)
+
+    def item_ids_in_storage(self, storage_id: int) -> set[int]:
+        self._sync()
+        storage_id = int(storage_id)
+        return {item_id for item_id, rows in self._rows.items() if storage_id in rows}
+
+    # ---------- writes ----------
+    @property
+    def pending(self) -> bool:
+        return bool(self._dirty)
+
+    def apply(
+        self,
+        adjustments: Iterable[tuple[int, int]],
+        *,
+        item_kinds: Mapping[int, str],
+        storage_id: int | None,
+        consume_by_priority: bool = False,
+    ) -> frozenset[int]:
+        """Apply ``(item_id, delta)`` adjustments in memory; see ``resolve_inventory_adjustments``.
+
+        Returns the ids of items whose quantities changed. Call ``flush()`` to persist.
+        """
+        self._sync()
+        changes = resolve_inventory_adjustments(
+            self._rows,
+            self._storages,
+            adjustments,
+            item_kinds=item_kinds,
+            storage_id=storage_id,
+            consume_by_priority=consume_by_priority,
+        )
+        return self._stage(changes, absolute=False)
+
+    def set_assignment(
+        self,
+        *,
+        storage_id: int,
+        item_id: int,
+        qty_count: int | float | None,
+        qty_liters: int | float | None,
+        locked: bool = False,
+    ) -> None:
+        self._sync()
+        row = {"qty_count": qty_count, "qty_liters": qty_liters, "locked": 1 if locked else 0}
+        self._stage({(int(storage_id), int(item_id)): row}, absolute=True)
+
+    def delete_assignment(self, *, storage_id: int, item_id: int) -> None:
+        self._sync()
+        self._stage({(int(storage_id), int(item_id)): None}, absolute=True)
+
+    def _stage(
+        self,
+        changes: Mapping[AssignmentKey, Mapping[str, Any] | None],
+        *,
+        absolute: bool,
+    ) -> frozenset[int]:
+        for key, row in changes.items():
+            if key not in self._dirty:
+                stored = self._rows.get(key[1], {}).get(key[0])
+                self._dirty_base[key] = dict(stored) if stored is not None else None
+            if absolute:
+                self._dirty_absolute.add(key)
+            self._replace(key, row)
+            self._dirty[key] = None if row is None else dict(row)
+        item_ids = frozenset(key[1] for key in changes)
+        if item_ids:
+            self._emit(item_ids)
+        return item_ids
+
+    def adopt_pending(self, other: InventoryLedger) -> None:
+        """Take over ``other``'s unwritten rows, e.g. after the profile connection was reopened.
+
+        They are written (and rebased onto the stored rows) by the next read or flush.
+        """
+        for key, row in other._dirty.items():
+            if key not in self._dirty:
+                self._dirty_base[key] = other._dirty_base.get(key)
+            self._dirty[key] = row
+            if key in other._dirty_absolute:
+                self._dirty_absolute.add(key)
+        other._dirty = {}
+        other._dirty_base = {}
+        other._dirty_absolute = set()
+        self.invalidate()
+
+    def flush(self) -> bool:
+        """Write pending rows in one transaction; returns False when nothing was written.
+
+        Nothing is written while another caller has a transaction open on the
+        connection; the rows stay pending for a later flush.
+        """
+        if not self._dirty or self.profile_conn.in_transaction:
+            return False
+        external_change = inventory_version(self.profile_conn) != self._version
+        self._write_pending()
+        if external_change:
+            self._load()
+        else:
+            self._version = inventory_version(self.profile_conn)
+        return True
+
+    def _write_pending(self) -> None:
+        with self.profile_conn:
+            if inventory_version(self.profile_conn) != self._version:
+                self._rebase_pending()
+            write_assignment_rows(self.profile_conn, self._dirty)
+        self._dirty = {}
+        self._dirty_base = {}
+        self._dirty_absolute = set()
+
+    def _rebase_pending(self) -> None:
+        item_ids = sorted({item_id for _storage_id, item_id in self._dirty})
+        current = {
+            (int(row["storage_id"]), int(row["item_id"])): row
+            for row in self.profile_conn.execute(
+                "SELECT storage_id, item_id, qty_count, qty_liters, locked FROM storage_assignments "
+                "WHERE item_id IN (SELECT value FROM json_each(?))",
+                (json.dumps(item_ids),),
+            ).fetchall()
+        }
+        self._dirty = {
+            key: row if key in self._dirty_absolute else _rebase_row(self._dirty_base.get(key), row, current.get(key))
+            for key, row in self._dirty.items()
+        }
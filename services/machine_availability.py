@@ -0,0 +1,187 @@
+"""Machine availability index shared by the planner and recipe filtering.
+
+The profile DB bumps ``machine_availability_version`` on every change to
+``machine_availability``; the index is rebuilt only when that version (or the
+tier registry version) moves. Per machine type it keeps owned/online counts by
+tier rank plus suffix sums, so "can run tier X", "best tier" and "how many"
+are constant-time lookups.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, field
+
+from services.tiers import TierTable, tier_table
+
+
+@dataclass(frozen=True)
+class MachineTypeAvailability:
+    # tier name -> {"owned", "online", "rank"}; includes tiers missing from the registry
+    tiers: dict[str, dict[str, int | None]]
+    owned_by_rank: tuple[int, ...]
+    online_by_rank: tuple[int, ...]
+    # Suffix sums: owned/online machines whose tier rank is >= index.
+    owned_at_or_above: tuple[int, ...]
+    online_at_or_above: tuple[int, ...]
+    best_rank: int
+    best_online_rank: int
+    best_tier: str | None
+    max_count: int
+    online_tiers: frozenset[str] = field(default_factory=frozenset)
+
+    def can_run(self, required_rank: int | None, *, online_only: bool = False) -> bool:
+        if required_rank is None:
+            return False
+        best = self.best_online_rank if online_only else self.best_rank
+        return best >= required_rank
+
+    def can_run_tier(self, tier: str, required_rank: int | None, *, online_only: bool = False) -> bool:
+        if tier in (self.online_tiers if online_only else self.tiers):
+            return True
+        return self.can_run(required_rank, online_only=online_only)
+
+    def count_for_tier(self, tier: str | None) -> int:
+        if tier and tier in self.tiers:
+            record = self.tiers[tier]
+            return max(int(record["online"] or 0), int(record["owned"] or 0))
+        return self.max_count
+
+    def count_at_or_above(self, rank: int | None, *, online_only: bool = False) -> int:
+        sums = self.online_at_or_above if online_only else self.owned_at_or_above
+        if rank is None or not sums:
+            return 0
+        if rank < 0:
+            rank = 0
+        if rank >= len(sums):
+            return 0
+        return sums[rank]
+
+
+@dataclass(frozen=True)
+class MachineAvailabilityIndex:
+    version: tuple[int, int]
+    machines: dict[str, MachineTypeAvailability]
+
+    def __contains__(self, machine_type: object) -> bool:
+        return machine_type in self.machines
+
+    def __bool__(self) -> bool:
+        return bool(self.machines)
+
+    @property
+    def has_online(self) -> bool:
+        return any(entry.online_tiers for entry in self.machines.values())
+
+    def get(self, machine_type: str) -> MachineTypeAvailability | None:
+        return self.machines.get(machine_type)
+
+    def tiers_for(self, machine_type: str) -> dict[str, dict[str, int | None]]:
+        entry = self.machines.get(machine_type)
+        return entry.tiers if entry else {}
+
+
+def _build_machine_type(tiers: dict[str, dict[str, int | None]], table: TierTable) -> MachineTypeAvailability:
+    size = len(table.names)
+    owned_by_rank = [0] * size
+    online_by_rank = [0] * size
+    best_rank = -1
+    best_online_rank = -1
+    best_tier = None
+    max_count = 0
+    online_tiers = set()
+    for tier, record in tiers.items():
+        owned = int(record["owned"] or 0)
+        online = int(record["online"] or 0)
+        max_count = max(max_count, online, owned)
+        if online > 0:
+            online_tiers.add(tier)
+        rank = record["rank"]
+        if rank is None:
+            continue
+        owned_by_rank[rank] += owned
+        online_by_rank[rank] += online
+        if rank > best_rank:
+            best_rank = rank
+            best_tier = tier
+        if online > 0 and rank > best_online_rank:
+            best_online_rank = rank
+
+    owned_suffix = [0] * (size + 1)
+    online_suffix = [0] * (size + 1)
+    for rank in range(size - 1, -1, -1):
+        owned_suffix[rank] = owned_suffix[rank + 1] + owned_by_rank[rank]
+        online_suffix[rank] = online_suffix[rank + 1] + online_by_rank[rank]
+
+    return MachineTypeAvailability(
+        tiers=tiers,
+        owned_by_rank=tuple(owned_by_rank),
+        online_by_rank=tuple(online_by_rank),
+        owned_at_or_above=tuple(owned_suffix),
+        online_at_or_above=tuple(online_suffix),
+        best_rank=best_rank,
+        best_online_rank=best_online_rank,
+        best_tier=best_tier,
+        max_count=max_count,
+        online_tiers=frozenset(online_tiers),
+    )
+
+
+def machine_availability_version(profile_conn: sqlite3.Connection) -> int:
+    row = profile_conn.execute(
+        "SELECT value FROM app_settings WHERE key='machine_availability_version'"
+    ).fetchone()
+    return int(row["value"] or 0) if row else 0
+
+
+def build_machine_availability_index(
+    profile_conn: sqlite3.Connection | None,
+    *,
+    version: int | None = None,
+) -> MachineAvailabilityIndex:
+    table = tier_table()
+    if profile_conn is None:
+        return MachineAvailabilityIndex(version=(0, table.version), machines={})
+    if version is None:
+        version = machine_availability_version(profile_conn)
+    rows = profile_conn.execute(
+        "SELECT machine_type, tier, owned, online FROM machine_availability"
+    ).fetchall()
+    grouped: dict[str, dict[str, dict[str, int | None]]] = {}
+    for row in rows:
+        owned = int(row["owned"] or 0)
+        online = int(row["online"] or 0)
+        if owned <= 0 and online <= 0:
+            continue
+        machine_type = (row["machine_type"] or "").strip().lower()
+        if not machine_type:
+            continue
+        tier = (row["tier"] or "").strip()
+        grouped.setdefault(machine_type, {})[tier] = {
+            "owned": owned,
+            "online": online,
+            "rank": table.rank(tier),
+        }
+    machines = {machine_type: _build_machine_type(tiers, table) for machine_type, tiers in grouped.items()}
+    return MachineAvailabilityIndex(version=(version, table.version), machines=machines)
+
+
+class MachineAvailabilityCache:
+    """Rebuilds the index only when the availability or tier version changes."""
+
+    def __init__(self, profile_conn: sqlite3.Connection | None):
+        self.profile_conn = profile_conn
+        self._index: MachineAvailabilityIndex | None = None
+
+    def clear(self) -> None:
+        self._index = None
+
+    def get(self) -> MachineAvailabilityIndex:
+        if self.profile_conn is None:
+            self._index = build_machine_availability_index(None)
+            return self._index
+        version = (machine_availability_version(self.profile_conn), tier_table().version)
+        if self._index is not None and self._index.version == version:
+            return self._index
+        self._index = build_machine_availability_index(self.profile_conn, version=version[0])
+        return self._index
@@ -3,7 +3,7 @@ from __future__ import annotations
 import sqlite3
 import re
 
-from services.db import ALL_TIERS
+from services.db import ALL_TIERS, item_canonical_name
 
 
 def fetch_machine_metadata(conn: sqlite3.Connection, *, tiers: list[str] | None = None) -> list[sqlite3.Row]:
@@ -41,7 +41,32 @@ def _slugify_key(text: str) -> str:
     return key or "machine"
 
 
+MACHINE_METADATA_COLUMNS = (
+    "machine_type",
+    "tier",
+    "machine_name",
+    "input_slots",
+    "output_slots",
+    "byproduct_slots",
+    "storage_slots",
+    "power_slots",
+    "circuit_slots",
+    "input_tanks",
+    "input_tank_capacity_l",
+    "output_tanks",
+    "output_tank_capacity_l",
+)
+
+
+def _machine_item_name(machine_type: str, tier: str, machine_name: str | None) -> str:
+    return (machine_name or "").strip() or f"{tier} {machine_type}"
+
+
 def _sync_machine_items(conn: sqlite3.Connection) -> None:
+    """Make machine items match ``machine_metadata``, one item per (type, tier).
+
+    Both tables are read once and only items that differ are written.
+    """
     metadata_rows = conn.execute(
         """
         SELECT machine_type, tier, machine_name
@@ -57,92 +82,118 @@ def _sync_machine_items(conn: sqlite3.Connection) -> None:
         tier = (row["tier"] or "").strip()
         if not machine_type or not tier:
             continue
-        machine_name = (row["machine_name"] or "").strip() or f"{tier} {machine_type}"
-        metadata_by_key[(machine_type, tier)] = machine_name
+        metadata_by_key[(machine_type, tier)] = _machine_item_name(machine_type, tier, row["machine_name"])
 
     existing_rows = conn.execute(
         """
-        SELECT id, machine_type, machine_tier
+        SELECT id, display_name, is_machine, machine_type, machine_tier
         FROM items
         WHERE kind='machine'
         ORDER BY id
         """
     ).fetchall()
 
-    existing_by_key: dict[tuple[str, str], list[int]] = {}
+    existing_by_key: dict[tuple[str, str], list[sqlite3.Row]] = {}
+    stale_ids: list[int] = []
     for row in existing_rows:
-        item_id = int(row["id"])
-        machine_type = (row["machine_type"] or "").strip()
-        tier = (row["machine_tier"] or "").strip()
-        key = (machine_type, tier)
+        key = ((row["machine_type"] or "").strip(), (row["machine_tier"] or "").strip())
         if key not in metadata_by_key:
-            conn.execute("DELETE FROM items WHERE id=?", (item_id,))
+            stale_ids.append(int(row["id"]))
             continue
-        existing_by_key.setdefault(key, []).append(item_id)
+        existing_by_key.setdefault(key, []).append(row)
 
+    updates: list[tuple] = []
+    inserts: list[tuple] = []
+    # Item keys are only probed for new machines, so read the taken ones once.
+    taken_keys: set[str] | None = None
     for (machine_type, tier), machine_name in sorted(metadata_by_key.items()):
-        existing_ids = existing_by_key.get((machine_type, tier), [])
-        if existing_ids:
-            keep_id = existing_ids[0]
-            conn.execute(
-                """
-                UPDATE items
-                SET display_name=?, is_machine=1, machine_type=?, machine_tier=?
-                WHERE id=?
-                """,
-                (machine_name, machine_type, tier, keep_id),
-            )
-            for duplicate_id in existing_ids[1:]:
-                conn.execute("DELETE FROM items WHERE id=?", (duplicate_id,))
+        existing = existing_by_key.get((machine_type, tier), [])
+        if existing:
+            keep = existing[0]
+            if (keep["display_name"], keep["is_machine"], keep["machine_type"], keep["machine_tier"]) != (
+                machine_name,
+                1,
+                machine_type,
+                tier,
+            ):
+                updates.append(
+                    (machine_name, item_canonical_name(machine_name, None), machine_type, tier, int(keep["id"]))
+                )
+            stale_ids.extend(int(row["id"]) for row in existing[1:])
             continue
 
+        if taken_keys is None:
+            taken_keys = {
+                row["key"]
+                for row in conn.execute("SELECT key FROM items WHERE key >= 'machine_' AND key < 'machine`'")
+            }
         base_key = f"machine_{_slugify_key(machine_type)}_{_slugify_key(tier)}"
         key = base_key
         suffix = 2
-        while conn.execute("SELECT 1 FROM items WHERE key=?", (key,)).fetchone():
+        while key in taken_keys:
             key = f"{base_key}_{suffix}"
             suffix += 1
+        taken_keys.add(key)
+        inserts.append((key, machine_name, item_canonical_name(machine_name, key), tier, machine_type))
 
-        conn.execute(
-            """
-            INSERT INTO items(
-                key,
-                display_name,
-                kind,
-                is_base,
-                is_machine,
-                machine_tier,
-                machine_type,
-                is_multiblock
-            )
-            VALUES(?, ?, 'machine', 0, 1, ?, ?, 0)
-            """,
-            (key, machine_name, tier, machine_type),
+    conn.executemany("DELETE FROM items WHERE id=?", [(item_id,) for item_id in stale_ids])
+    conn.executemany(
+        """
+        UPDATE items
+        SET display_name=?, name_canonical=?, is_machine=1, machine_type=?, machine_tier=?
+        WHERE id=?
+        """,
+        updates,
+    )
+    conn.executemany(
+        """
+        INSERT INTO items(
+            key,
+            display_name,
+            name_canonical,
+            kind,
+            is_base,
+            is_machine,
+            machine_tier,
+            machine_type,
+            is_multiblock
         )
+        VALUES(?, ?, ?, 'machine', 0, 1, ?, ?, 0)
+        """,
+        inserts,
+    )
 
 
 def replace_machine_metadata(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """Make ``machine_metadata`` equal to ``rows`` (in ``MACHINE_METADATA_COLUMNS`` order).
+
+    Only added, changed and removed (machine_type, tier) rows are written;
+    machine items are then synced, writing only the items that differ.
+    """
     with conn:
-        conn.execute("DELETE FROM machine_metadata")
+        current = {
+            (row["machine_type"], row["tier"]): tuple(row)
+            for row in conn.execute(f"SELECT {', '.join(MACHINE_METADATA_COLUMNS)} FROM machine_metadata")
+        }
+        desired = {(row[0], row[1]): tuple(row) for row in rows}
+        removed = [key for key in current if key not in desired]
+        added = [row for key, row in desired.items() if key not in current]
+        changed = [row for key, row in desired.items() if key in current and current[key] != row]
+
+        conn.executemany("DELETE FROM machine_metadata WHERE machine_type=? AND tier=?", removed)
         conn.executemany(
-            """
-            INSERT INTO machine_metadata(
-                machine_type,
-                tier,
-                machine_name,
-                input_slots,
-                output_slots,
-                byproduct_slots,
-                storage_slots,
-                power_slots,
-                circuit_slots,
-                input_tanks,
-                input_tank_capacity_l,
-                output_tanks,
-                output_tank_capacity_l
-            )
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            f"""
+            INSERT INTO machine_metadata({', '.join(MACHINE_METADATA_COLUMNS)})
+            VALUES({', '.join(['?'] * len(MACHINE_METADATA_COLUMNS))})
+            """,
+            added,
+        )
+        conn.executemany(
+            f"""
+            UPDATE machine_metadata
+            SET {', '.join(f'{col}=?' for col in MACHINE_METADATA_COLUMNS[2:])}
+            WHERE machine_type=? AND tier=?
             """,
-            rows,
+            [row[2:] + row[:2] for row in changed],
         )
         _sync_machine_items(conn)
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import sqlite3
 
+from services.db import canonical_name
+
 
 def fetch_materials(conn: sqlite3.Connection) -> list[sqlite3.Row]:
     return conn.execute(
@@ -11,8 +13,8 @@ def fetch_materials(conn: sqlite3.Connection) -> list[sqlite3.Row]:
 
 def add_material(conn: sqlite3.Connection, name: str, attributes: str | None = None) -> int:
     cur = conn.execute(
-        "INSERT INTO materials(name, attributes) VALUES(?, ?)",
-        (name, attributes),
+        "INSERT INTO materials(name, name_canonical, attributes) VALUES(?, ?, ?)",
+        (name, canonical_name(name), attributes),
     )
     conn.commit()
     return int(cur.lastrowid)
@@ -20,8 +22,8 @@ def add_material(conn: sqlite3.Connection, name: str, attributes: str | None = N
 
 def update_material(conn: sqlite3.Connection, material_id: int, name: str, attributes: str | None = None) -> None:
     conn.execute(
-        "UPDATE materials SET name=?, attributes=? WHERE id=?",
-        (name, attributes, material_id),
+        "UPDATE materials SET name=?, name_canonical=?, attributes=? WHERE id=?",
+        (name, canonical_name(name), attributes, material_id),
     )
     conn.commit()
 
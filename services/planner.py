@@ -1,48 +1,57 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
+import json
 import math
 import sqlite3
 from typing import Iterable
 
-from services.db import ALL_TIERS
-from services.storage import aggregated_assignment_rows_for_planner
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; ranking falls back to the array module.
+    np = None
 
-GT_VOLTAGES = [
-    (8, "ULV"), (32, "LV"), (128, "MV"), (512, "HV"), (2048, "EV"),
-    (8192, "IV"), (32768, "LuV"), (131072, "ZPM"), (524288, "UV"),
-    (2147483647, "MAX")
-]
-TIER_ORDER = {tier: idx for idx, tier in enumerate(ALL_TIERS)}
+from services.db import GT_VOLTAGES, attached_content
+from services.inventory_ledger import InventoryLedger
+from services.machine_availability import MachineAvailabilityCache, MachineAvailabilityIndex
+from services.recipe_optimizer import OBJECTIVES, RecipeFlow, solve_recipe_flows, solver_available
+from services.storage import aggregated_assignment_rows_for_planner
+from services.tiers import default_tier, tier_rank, tier_table
+
+# Candidate sets at least this large are ranked column-wise instead of row by row.
+BATCH_RANK_MIN_ROWS = 8
+TICKS_PER_SECOND = 20
+# Optimizer: crafting recipes without a duration count as this many ticks, as in ranking.
+CRAFTING_DURATION_TICKS = 200
+# Optimizer: cost of buying an item that should be crafted but has no usable recipe,
+# as a multiple of the dearest candidate recipe (and at least of one raw item).
+MISSING_RECIPE_PENALTY = 1e6
+# Optimizer: weight of raw materials when the objective is energy or time.
+RAW_TIEBREAK_WEIGHT = 1e-3
+# Optimizer: cost of every craft, so recipes that make nothing needed are never picked.
+CRAFT_TIEBREAK_COST = 1e-6
+# Optimizer: give up (and keep the greedy choice) beyond this many candidate recipes.
+OPTIMIZER_MAX_RECIPES = 20000
+
+NETTING_MODES = {
+    "conservative": "Net guaranteed byproducts",
+    "expected": "Net expected byproducts",
+}
+# Netting: rounds of byproduct crediting before falling back to no credit.
+NETTING_MAX_ROUNDS = 32
 
 
 def _default_tier() -> str:
-    return ALL_TIERS[0] if ALL_TIERS else "Stone Age"
-
-
-def set_tier_order(tiers: Iterable[str]) -> None:
-    TIER_ORDER.clear()
-    for idx, tier in enumerate(tiers):
-        TIER_ORDER[str(tier)] = idx
+    return default_tier()
 
 
 def _tier_rank(tier: str | None) -> int | None:
-    if not tier:
-        return None
-    return TIER_ORDER.get(tier.strip())
+    return tier_rank(tier)
 
 
 def _highest_tier(tiers: Iterable[str]) -> str | None:
-    best = None
-    best_rank = -1
-    for tier in tiers:
-        rank = _tier_rank(tier)
-        if rank is None:
-            continue
-        if rank > best_rank:
-            best_rank = rank
-            best = tier
-    return best
+    return tier_table().highest(tiers)
 
 
 def apply_overclock(
@@ -121,6 +130,101 @@ def get_calculated_tier(row: sqlite3.Row) -> str:
     return "MAX"
 
 
+def _best_rank_index_array(cols: dict[str, array]) -> int:
+    """Index of the lowest ranking key, matching ``min()`` over ``_recipe_rank``."""
+    inf = float("inf")
+    best_idx = 0
+    best_key = None
+    for idx, (avail, count, req_rank, machine_rank, max_rank, t_rank, crafting, perfect, inputs, output, duration, eu) in enumerate(
+        zip(
+            cols["avail"],
+            cols["count"],
+            cols["req_rank"],
+            cols["machine_rank"],
+            cols["max_rank"],
+            cols["t_rank"],
+            cols["crafting"],
+            cols["perfect"],
+            cols["inputs"],
+            cols["output"],
+            cols["duration"],
+            cols["eu"],
+        )
+    ):
+        if req_rank >= 0 and machine_rank >= 0 and machine_rank != req_rank:
+            if (max_rank >= 0 and machine_rank > max_rank) or machine_rank < req_rank:
+                duration = eu = math.nan
+            else:
+                diff = machine_rank - req_rank
+                if duration > 0:
+                    duration = max(1, math.ceil(duration / ((4 if perfect else 2) ** diff)))
+                if eu > 0:
+                    eu = max(0, math.ceil(eu * (4**diff)))
+        if crafting:
+            if math.isnan(duration) or duration <= 0:
+                duration = 200.0
+            if math.isnan(eu):
+                eu = 0.0
+        output_safe = output if output > 0 else 0.0
+        ratio = inputs / output_safe if output_safe > 0 else 999.0
+        duration_safe = 0.0 if math.isnan(duration) else float(duration)
+        time_per_item = duration_safe / output_safe if output_safe > 0 else duration_safe
+        if math.isnan(eu) or math.isnan(duration) or output_safe <= 0:
+            energy_per_item = inf
+        else:
+            energy_per_item = (float(eu) * float(duration)) / output_safe
+        key = (avail, -count, ratio, time_per_item, energy_per_item, t_rank)
+        if best_key is None or key < best_key:
+            best_key = key
+            best_idx = idx
+    return best_idx
+
+
+def _best_rank_index_numpy(cols: dict[str, array]) -> int:
+    """Vectorized twin of ``_best_rank_index_array``."""
+    avail = np.frombuffer(cols["avail"], dtype=np.intc)
+    count = np.frombuffer(cols["count"], dtype=np.intc)
+    req_rank = np.frombuffer(cols["req_rank"], dtype=np.intc)
+    machine_rank = np.frombuffer(cols["machine_rank"], dtype=np.intc)
+    max_rank = np.frombuffer(cols["max_rank"], dtype=np.intc)
+    t_rank = np.frombuffer(cols["t_rank"], dtype=np.intc)
+    crafting = np.frombuffer(cols["crafting"], dtype=np.int8).astype(bool)
+    perfect = np.frombuffer(cols["perfect"], dtype=np.int8).astype(bool)
+    inputs = np.frombuffer(cols["inputs"], dtype=np.float64)
+    output = np.frombuffer(cols["output"], dtype=np.float64)
+    duration = np.frombuffer(cols["duration"], dtype=np.float64)
+    eu = np.frombuffer(cols["eu"], dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overclocked = (req_rank >= 0) & (machine_rank >= 0) & (machine_rank != req_rank)
+        impossible = overclocked & (((max_rank >= 0) & (machine_rank > max_rank)) | (machine_rank < req_rank))
+        scaled = overclocked & ~impossible
+        diff = np.where(scaled, machine_rank - req_rank, 0).astype(np.float64)
+        speed = np.where(perfect, 4.0, 2.0)
+        duration = np.where(scaled & (duration > 0), np.maximum(1.0, np.ceil(duration / speed**diff)), duration)
+        eu = np.where(scaled & (eu > 0), np.maximum(0.0, np.ceil(eu * 4.0**diff)), eu)
+        duration = np.where(impossible, np.nan, duration)
+        eu = np.where(impossible, np.nan, eu)
+
+        duration = np.where(crafting & (np.isnan(duration) | (duration <= 0)), 200.0, duration)
+        eu = np.where(crafting & np.isnan(eu), 0.0, eu)
+
+        has_output = output > 0
+        output_safe = np.where(has_output, output, 1.0)
+        ratio = np.where(has_output, inputs / output_safe, 999.0)
+        duration_safe = np.where(np.isnan(duration), 0.0, duration)
+        time_per_item = np.where(has_output, duration_safe / output_safe, duration_safe)
+        energy_per_item = np.where(
+            np.isnan(eu) | np.isnan(duration) | ~has_output,
+            np.inf,
+            (eu * duration) / output_safe,
+        )
+
+    # np.lexsort is stable, so ties resolve to the earliest row just like min().
+    order = np.lexsort((t_rank, energy_per_item, time_per_item, ratio, -count.astype(np.int64), avail))
+    return int(order[0])
+
+
 @dataclass
 class PlanStep:
     recipe_id: int
@@ -151,14 +255,114 @@ class PlanResult:
     steps: list[PlanStep]
     errors: list[str]
     missing_recipes: list[tuple[int, str, int]]
+    # Problems that did not stop the plan, e.g. byproduct netting that never settled.
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PlanSweep:
+    """Shopping lists for one target at several quantities.
+
+    Each ``shopping_table`` row is ``(name, unit, qtys)`` with one entry in
+    ``qtys`` per value of ``quantities``.
+    """
+
+    quantities: list[int]
+    shopping_table: list[tuple[str, str, list[int]]]
+    errors: list[str]
+
+    def shopping_list(self, index: int) -> list[tuple[str, int, str]]:
+        return [(name, qtys[index], unit) for name, unit, qtys in self.shopping_table if qtys[index] > 0]
+
+
+@dataclass
+class RateStep:
+    """One recipe running continuously; rates are per second."""
+
+    recipe_id: int
+    recipe_name: str
+    method: str
+    machine: str | None
+    machine_item_id: int | None
+    machine_item_name: str
+    machine_tier: str | None
+    output_item_id: int
+    output_item_name: str
+    output_unit: str
+    output_rate: float
+    crafts_per_second: float
+    duration_ticks: int | None
+    eu_per_tick: int | None
+    # Machines busy full time; None when the recipe has no duration.
+    machines: float | None
+    # None when no availability is recorded for the machine type.
+    machines_available: int | None
+    inputs: list[tuple[int, str, float, str]]
+    byproducts: list[tuple[int, str, float, str]]
+
+    @property
+    def machines_needed(self) -> int | None:
+        if self.machines is None:
+            return None
+        return math.ceil(self.machines - 1e-9)
+
+    @property
+    def total_eu_per_tick(self) -> float:
+        if self.machines is None or not self.eu_per_tick:
+            return 0.0
+        return self.machines * self.eu_per_tick
+
+    @property
+    def utilization(self) -> float | None:
+        """Share of the available machines this step keeps busy."""
+        if self.machines is None or self.machines_available is None:
+            return None
+        if self.machines_available <= 0:
+            return math.inf
+        return self.machines / self.machines_available
+
+
+@dataclass
+class RatePlan:
+    target_item_id: int
+    target_rate: float
+    # Producers come before the steps that consume them.
+    steps: list[RateStep]
+    raw_inputs: list[tuple[str, float, str]]
+    errors: list[str]
+
+    @property
+    def total_eu_per_tick(self) -> float:
+        return sum(step.total_eu_per_tick for step in self.steps)
+
+    @property
+    def bottlenecks(self) -> list[RateStep]:
+        """Steps that need more machines than are available, worst first."""
+        over = [step for step in self.steps if (step.utilization or 0) > 1]
+        return sorted(over, key=lambda step: -step.utilization)
+
+    @property
+    def max_target_rate(self) -> float | None:
+        """Highest target rate the available machines sustain, if every step is limited."""
+        utilizations = [step.utilization for step in self.steps if step.utilization is not None]
+        if not utilizations or max(utilizations) <= 0:
+            return None
+        return self.target_rate / max(utilizations)
 
 
 class PlannerService:
-    def __init__(self, conn: sqlite3.Connection, profile_conn: sqlite3.Connection):
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        profile_conn: sqlite3.Connection,
+        *,
+        inventory_ledger: InventoryLedger | None = None,
+    ):
         self.conn = conn
         self.profile_conn = profile_conn
-        self._machine_availability_cache: dict[str, dict[str, dict[str, int]]] | None = None
-        self._machine_availability_cache_version: int | None = None
+        # When set, inventory is read from the ledger instead of aggregated in SQL.
+        self.inventory_ledger = inventory_ledger
+        self._machine_availability = MachineAvailabilityCache(profile_conn)
 
     # ---------- Public API ----------
     def plan(
@@ -170,12 +374,45 @@ class PlannerService:
         enabled_tiers: Iterable[str],
         crafting_6x6_unlocked: bool,
         inventory_override: dict[int, int] | None = None,
+        objective: str | None = None,
+        netting: str | None = None,
     ) -> PlanResult:
+        """Expand ``target_item_id`` into steps and a shopping list.
+
+        With an ``objective`` from ``OBJECTIVES`` the recipes come from
+        ``optimize_recipe_choices``; items it leaves open, or every item when
+        no solver is installed, use the greedy ranking. With a ``netting``
+        mode from ``NETTING_MODES`` byproducts are credited across the whole
+        plan (see ``_net_plan``) instead of in visit order.
+        """
+        if netting is not None and netting not in NETTING_MODES:
+            raise ValueError(f"Unknown netting mode {netting!r}; expected one of {sorted(NETTING_MODES)}.")
+        recipe_choices = None
+        if objective is not None:
+            recipe_choices = self.optimize_recipe_choices(
+                target_item_id,
+                target_qty,
+                objective=objective,
+                enabled_tiers=enabled_tiers,
+                crafting_6x6_unlocked=crafting_6x6_unlocked,
+            )
+        recipe_choices = recipe_choices or {}
         items = self._load_items()
         if inventory_override is not None:
             inventory = dict(inventory_override)
         else:
             inventory = self._load_inventory(items) if use_inventory else {}
+        if netting is not None:
+            return self._net_plan(
+                target_item_id,
+                target_qty,
+                netting=netting,
+                stock=inventory if use_inventory else {},
+                items=items,
+                enabled_tiers=enabled_tiers,
+                crafting_6x6_unlocked=crafting_6x6_unlocked,
+                recipe_choices=recipe_choices,
+            )
         errors: list[str] = []
         missing_recipes: list[tuple[int, str, int]] = []
         steps: list[PlanStep] = []
@@ -184,6 +421,7 @@ class PlannerService:
         required_base_needed: dict[int, int] = {}
         storage_used: dict[int, int] = {}
         visiting: set[int] = set()
+        resolutions: dict[int, dict] = {}
 
         stack = [
             {
@@ -199,28 +437,7 @@ class PlannerService:
             if state == "exit":
                 item_id = frame["item_id"]
                 plan_data = frame["plan_data"]
-                steps.append(
-                    PlanStep(
-                        recipe_id=plan_data["recipe_id"],
-                        recipe_name=plan_data["recipe_name"],
-                        method=plan_data["method"],
-                        machine=plan_data["machine"],
-                        machine_item_id=plan_data["machine_item_id"],
-                        machine_item_name=plan_data["machine_item_name"],
-                        grid_size=plan_data["grid_size"],
-                        station_item_id=plan_data["station_item_id"],
-                        station_item_name=plan_data["station_item_name"],
-                        circuit=plan_data["circuit"],
-                        output_item_id=item_id,
-                        output_item_name=plan_data["output_item_name"],
-                        output_qty=plan_data["output_qty"],
-                        output_unit=plan_data["output_unit"],
-                        multiplier=plan_data["multiplier"],
-                        inputs=plan_data["inputs"],
-                        reusable_inputs=plan_data.get("reusable_inputs", []),
-                        byproducts=plan_data["byproducts"],
-                    )
-                )
+                steps.append(self._plan_step(item_id, plan_data))
                 produced_qty = plan_data["output_qty"] * plan_data["multiplier"]
                 if produced_qty > 0:
                     inventory[item_id] = inventory.get(item_id, 0) + produced_qty
@@ -309,14 +526,22 @@ class PlannerService:
                 shopping_needed[item_id] = shopping_needed.get(item_id, 0) + qty_needed
                 continue
 
-            # Pass 'items' to helper to access machine stats
-            recipe = self._pick_recipe_for_item(item_id, enabled_tiers, crafting_6x6_unlocked, items)
+            resolution = resolutions.get(item_id)
+            if resolution is None:
+                resolution = resolutions[item_id] = self._resolve_recipe(
+                    item,
+                    enabled_tiers,
+                    crafting_6x6_unlocked,
+                    items,
+                    preferred_recipe_id=recipe_choices.get(item_id),
+                )
+            recipe = resolution["recipe"]
             if not recipe:
                 errors.append(f"No recipe found for {item['name']}.")
                 missing_recipes.append((item_id, item["name"], qty_needed))
                 continue
 
-            output_qty = self._recipe_output_qty(recipe["id"], item_id, item["kind"])
+            output_qty = resolution["output_qty"]
             if output_qty <= 0:
                 errors.append(f"Recipe '{recipe['name']}' has no usable output for {item['name']}.")
                 continue
@@ -324,32 +549,7 @@ class PlannerService:
             multiplier = max(1, math.ceil(qty_needed / output_qty))
             inputs = []
             input_frames = []
-            input_requirements: dict[int, dict[str, int | float | str]] = {}
-            reusable_requirements: dict[int, int] = {}
-            input_lines = self._recipe_inputs(recipe["id"])
-            for line in input_lines:
-                input_item = items.get(line["item_id"])
-                if not input_item:
-                    continue
-                input_qty = self._line_qty(line, input_item["kind"])
-                if input_qty <= 0:
-                    continue
-                consumption_chance = self._normalize_consumption_chance(line["consumption_chance"])
-                if consumption_chance <= 0:
-                    reusable_requirements[input_item["id"]] = reusable_requirements.get(input_item["id"], 0) + input_qty
-                existing = input_requirements.get(input_item["id"])
-                if existing:
-                    existing["minimum_qty"] = int(existing["minimum_qty"]) + input_qty
-                    existing["expected_consumed"] = float(existing["expected_consumed"]) + (input_qty * consumption_chance)
-                else:
-                    input_requirements[input_item["id"]] = {
-                        "id": input_item["id"],
-                        "name": input_item["name"],
-                        "minimum_qty": input_qty,
-                        "expected_consumed": input_qty * consumption_chance,
-                        "unit": self._unit_for_kind(input_item["kind"]),
-                    }
-            for requirement in input_requirements.values():
+            for requirement in resolution["input_requirements"].values():
                 total_qty = self._required_input_qty(
                     minimum_qty=int(requirement["minimum_qty"]),
                     multiplier=multiplier,
@@ -371,79 +571,843 @@ class PlannerService:
                     }
                 )
 
-            byproducts = []
-            output_lines = self._recipe_outputs(recipe["id"])
-            for line in output_lines:
-                if line["item_id"] == item_id:
+            visiting.add(item_id)
+            stack.append(
+                {
+                    "state": "exit",
+                    "item_id": item_id,
+                    "plan_data": self._recipe_plan_data(item, resolution, multiplier, inputs),
+                }
+            )
+            for input_frame in reversed(input_frames):
+                stack.append(input_frame)
+
+        return self._plan_result(
+            items,
+            shopping_needed=shopping_needed,
+            required_base_needed=required_base_needed,
+            storage_used=storage_used,
+            steps=self._merge_plan_steps(steps),
+            errors=errors,
+            missing_recipes=missing_recipes,
+        )
+
+    def _net_plan(
+        self,
+        target_item_id: int,
+        target_qty: int,
+        *,
+        netting: str,
+        stock: dict[int, int],
+        items: dict[int, dict],
+        enabled_tiers: Iterable[str],
+        crafting_6x6_unlocked: bool,
+        recipe_choices: dict[int, int],
+    ) -> PlanResult:
+        """Plan with byproducts credited against all demand, whatever the visit order.
+
+        Every item is one node of the resolved DAG. Crafts are solved on each
+        item's total demand, consumers before producers, with the byproducts
+        of the previous round credited first. Rounds repeat until the crafts
+        stop changing; if they never settle, the last round whose credits its
+        own crafts actually produce is used and a warning says so.
+        "conservative" credits guaranteed outputs only, "expected" also the
+        expected value of chanced outputs, rounded down. A recipe's
+        byproducts never cover its own inputs, and filled containers in
+        storage are not emptied in this mode.
+        """
+        enabled_tiers = list(enabled_tiers)
+        container_transforms = self._load_container_transforms(items)
+        errors: list[str] = []
+        nodes: dict[int, dict] = {}
+        state: dict[int, str] = {}
+        topo_order: list[int] = []
+        bought_edges: set[tuple[int, int]] = set()
+
+        stack: list[tuple[str, int, int | None]] = [("enter", target_item_id, None)]
+        while stack:
+            action, item_id, consumer_id = stack.pop()
+            if action == "exit":
+                state[item_id] = "done"
+                topo_order.append(item_id)
+                continue
+            if state.get(item_id) == "visiting":
+                bought_edges.add((consumer_id, item_id))
+                continue
+            if state.get(item_id) == "done":
+                continue
+            item = items.get(item_id)
+            if not item:
+                errors.append("Unknown item selected.")
+                state[item_id] = "done"
+                continue
+            node = nodes[item_id] = self._net_node(
+                item,
+                enabled_tiers,
+                crafting_6x6_unlocked,
+                items,
+                container_transforms,
+                recipe_choices.get(item_id),
+            )
+            if not node["requirements"]:
+                state[item_id] = "done"
+                topo_order.append(item_id)
+                continue
+            state[item_id] = "visiting"
+            stack.append(("exit", item_id, None))
+            for requirement in reversed(node["requirements"]):
+                stack.append(("enter", requirement["id"], item_id))
+
+        def _solve(credits: dict[int, int]) -> dict[str, dict[int, int]]:
+            demand = {target_item_id: target_qty}
+            crafts: dict[int, int] = {}
+            bought: dict[int, int] = {}
+            used_stock: dict[int, int] = {}
+            for item_id in reversed(topo_order):
+                qty = demand.get(item_id, 0)
+                node = nodes.get(item_id)
+                if qty <= 0 or node is None:
                     continue
-                output_item = items.get(line["item_id"])
-                if not output_item:
+                from_stock = min(stock.get(item_id, 0), qty)
+                if from_stock > 0:
+                    used_stock[item_id] = from_stock
+                net = qty - from_stock
+                net -= min(credits.get(item_id, 0), net)
+                if net <= 0:
                     continue
-                output_qty_line = self._line_qty(line, output_item["kind"])
-                if output_qty_line <= 0:
+                if node["kind"] == "base":
+                    bought[item_id] = bought.get(item_id, 0) + net
                     continue
-                chance = line["chance_percent"]
-                chance_value = float(chance) if chance is not None else 100.0
-                byproducts.append(
+                if node["kind"] == "missing":
+                    continue
+                multiplier = max(1, math.ceil(net / node["output_qty"]))
+                crafts[item_id] = multiplier
+                for requirement in node["requirements"]:
+                    need = self._required_input_qty(
+                        minimum_qty=int(requirement["minimum_qty"]),
+                        multiplier=multiplier,
+                        expected_consumed_per_craft=float(requirement["expected_consumed"]),
+                    )
+                    if (item_id, requirement["id"]) in bought_edges:
+                        bought[requirement["id"]] = bought.get(requirement["id"], 0) + need
+                    else:
+                        demand[requirement["id"]] = demand.get(requirement["id"], 0) + need
+            return {"demand": demand, "crafts": crafts, "bought": bought, "used_stock": used_stock}
+
+        def _byproduct_credits(crafts: dict[int, int]) -> dict[int, int]:
+            supply: dict[int, float] = {}
+            for item_id, multiplier in crafts.items():
+                node = nodes[item_id]
+                own_inputs = {requirement["id"] for requirement in node["requirements"]}
+                for byproduct_id, _name, qty, _unit, chance in node["byproducts"]:
+                    if byproduct_id in own_inputs:
+                        continue
+                    if chance >= 100:
+                        share = 1.0
+                    elif netting == "expected":
+                        share = chance / 100.0
+                    else:
+                        continue
+                    supply[byproduct_id] = supply.get(byproduct_id, 0.0) + multiplier * qty * share
+            return {item_id: math.floor(qty + 1e-9) for item_id, qty in supply.items() if qty >= 1 - 1e-9}
+
+        warnings: list[str] = []
+        credits: dict[int, int] = {}
+        settled = solution = _solve(credits)
+        for _round in range(NETTING_MAX_ROUNDS):
+            next_credits = _byproduct_credits(solution["crafts"])
+            if all(next_credits.get(item_id, 0) >= qty for item_id, qty in credits.items()):
+                # Every credit this round took is covered by its own byproducts.
+                settled = solution
+            if next_credits == credits:
+                break
+            credits = next_credits
+            solution = _solve(credits)
+        else:
+            solution = settled
+            warnings.append(
+                "Byproduct netting did not settle; only byproducts the plan is sure to produce are credited."
+            )
+
+        steps = []
+        for item_id in topo_order:
+            multiplier = solution["crafts"].get(item_id)
+            if not multiplier:
+                continue
+            item = items[item_id]
+            node = nodes[item_id]
+            if node["kind"] == "fill":
+                plan_data = self._container_fill_plan(
+                    container_item=item,
+                    qty_needed=multiplier,
+                    items=items,
+                    container_transforms=container_transforms,
+                )
+            else:
+                inputs = [
                     (
-                        output_item["id"],
-                        output_item["name"],
-                        output_qty_line * multiplier,
-                        self._unit_for_kind(output_item["kind"]),
-                        chance_value,
+                        requirement["id"],
+                        requirement["name"],
+                        self._required_input_qty(
+                            minimum_qty=int(requirement["minimum_qty"]),
+                            multiplier=multiplier,
+                            expected_consumed_per_craft=float(requirement["expected_consumed"]),
+                        ),
+                        requirement["unit"],
                     )
+                    for requirement in node["requirements"]
+                ]
+                plan_data = self._recipe_plan_data(item, node["resolution"], multiplier, inputs)
+            steps.append(self._plan_step(item_id, plan_data))
+
+        missing_recipes = []
+        required_base_needed = {}
+        for item_id in reversed(topo_order):
+            qty = solution["demand"].get(item_id, 0)
+            node = nodes.get(item_id)
+            if qty <= 0 or node is None:
+                continue
+            if node["kind"] == "base":
+                required_base_needed[item_id] = qty
+            elif node["kind"] == "missing":
+                errors.append(node["error"])
+                if node["resolution"]["recipe"] is None:
+                    missing_recipes.append((item_id, items[item_id]["name"], qty))
+
+        return self._plan_result(
+            items,
+            shopping_needed=solution["bought"],
+            required_base_needed=required_base_needed,
+            storage_used=solution["used_stock"],
+            steps=steps,
+            errors=errors,
+            missing_recipes=missing_recipes,
+            warnings=warnings,
+        )
+
+    def _net_node(
+        self,
+        item: dict,
+        enabled_tiers: list[str],
+        crafting_6x6_unlocked: bool,
+        items: dict[int, dict],
+        container_transforms: list[dict],
+        preferred_recipe_id: int | None,
+    ) -> dict:
+        fill_plan = self._container_fill_plan(
+            container_item=item,
+            qty_needed=1,
+            items=items,
+            container_transforms=container_transforms,
+        )
+        if fill_plan is not None:
+            return {
+                "kind": "fill",
+                "output_qty": 1,
+                "requirements": [
+                    {"id": input_item_id, "name": name, "minimum_qty": qty, "expected_consumed": qty, "unit": unit}
+                    for input_item_id, name, qty, unit in fill_plan["inputs"]
+                ],
+                "byproducts": [],
+            }
+        if item["is_base"]:
+            return {"kind": "base", "requirements": []}
+        resolution = self._resolve_recipe(
+            item,
+            enabled_tiers,
+            crafting_6x6_unlocked,
+            items,
+            preferred_recipe_id=preferred_recipe_id,
+        )
+        recipe = resolution["recipe"]
+        if not recipe:
+            error = f"No recipe found for {item['name']}."
+        elif resolution["output_qty"] <= 0:
+            error = f"Recipe '{recipe['name']}' has no usable output for {item['name']}."
+        else:
+            return {
+                "kind": "recipe",
+                "resolution": resolution,
+                "output_qty": resolution["output_qty"],
+                "requirements": list(resolution["input_requirements"].values()),
+                "byproducts": resolution["byproducts"],
+            }
+        return {"kind": "missing", "resolution": resolution, "error": error, "requirements": []}
+
+    def sweep(
+        self,
+        target_item_id: int,
+        quantities: Iterable[int],
+        *,
+        enabled_tiers: Iterable[str],
+        crafting_6x6_unlocked: bool,
+        objective: str | None = None,
+        netting: str | None = None,
+    ) -> PlanSweep:
+        """Plan ``target_item_id`` for every quantity in one pass.
+
+        Lane ``i`` of the result matches ``plan(..., quantities[i],
+        use_inventory=False, objective=objective, netting=netting).shopping_list``.
+        Greedy, un-netted sweeps resolve recipes once per item and carry one
+        quantity per lane through the tree; an objective or netting mode picks
+        recipes for the quantity as a whole, so each lane is planned on its own.
+        """
+        quantities = [max(int(qty), 0) for qty in quantities]
+        enabled_tiers = list(enabled_tiers)
+        if objective is not None or netting is not None:
+            return self._sweep_by_plans(
+                target_item_id,
+                quantities,
+                enabled_tiers=enabled_tiers,
+                crafting_6x6_unlocked=crafting_6x6_unlocked,
+                objective=objective,
+                netting=netting,
+            )
+        items = self._load_items()
+        container_transforms = self._load_container_transforms(items)
+        errors: list[str] = []
+        shopping_needed: dict[int, list[int]] = {}
+        visiting: set[int] = set()
+        resolutions: dict[int, dict] = {}
+        fill_plans: dict[int, dict | None] = {}
+
+        def _add_shopping(item_id: int, qtys: list[int]) -> None:
+            totals = shopping_needed.setdefault(item_id, [0] * len(quantities))
+            for lane, qty in enumerate(qtys):
+                totals[lane] += qty
+
+        def _add_error(message: str) -> None:
+            if message not in errors:
+                errors.append(message)
+
+        stack: list[dict] = [{"state": "enter", "item_id": target_item_id, "qtys": quantities}]
+        while stack:
+            frame = stack.pop()
+            item_id = frame["item_id"]
+            if frame["state"] == "exit":
+                visiting.discard(item_id)
+                continue
+
+            qtys = frame["qtys"]
+            if not any(qty > 0 for qty in qtys):
+                continue
+
+            item = items.get(item_id)
+            if not item:
+                _add_error("Unknown item selected.")
+                continue
+
+            if item_id not in fill_plans:
+                fill_plans[item_id] = self._container_fill_plan(
+                    container_item=item,
+                    qty_needed=1,
+                    items=items,
+                    container_transforms=container_transforms,
                 )
+            fill_plan = fill_plans[item_id]
+            if fill_plan is not None:
+                if item_id in visiting:
+                    _add_shopping(item_id, qtys)
+                    continue
+                visiting.add(item_id)
+                stack.append({"state": "exit", "item_id": item_id})
+                for input_item_id, _name, per_container, _unit in reversed(fill_plan["inputs"]):
+                    stack.append(
+                        {
+                            "state": "enter",
+                            "item_id": input_item_id,
+                            "qtys": [qty * per_container for qty in qtys],
+                        }
+                    )
+                continue
 
-            machine_item_name = ""
-            if recipe["machine_item_id"] is not None:
-                machine_item = items.get(recipe["machine_item_id"])
-                if machine_item:
-                    machine_item_name = machine_item["name"]
+            if item["is_base"] or item_id in visiting:
+                _add_shopping(item_id, qtys)
+                continue
 
-            station_item_name = ""
-            if recipe["station_item_id"] is not None:
-                station_item = items.get(recipe["station_item_id"])
-                if station_item:
-                    station_item_name = station_item["name"]
+            resolution = resolutions.get(item_id)
+            if resolution is None:
+                resolution = resolutions[item_id] = self._resolve_recipe(
+                    item, enabled_tiers, crafting_6x6_unlocked, items
+                )
+            recipe = resolution["recipe"]
+            if not recipe:
+                _add_error(f"No recipe found for {item['name']}.")
+                continue
+            output_qty = resolution["output_qty"]
+            if output_qty <= 0:
+                _add_error(f"Recipe '{recipe['name']}' has no usable output for {item['name']}.")
+                continue
 
+            multipliers = [max(1, math.ceil(qty / output_qty)) if qty > 0 else 0 for qty in qtys]
             visiting.add(item_id)
-            stack.append(
-                {
-                    "state": "exit",
-                    "item_id": item_id,
-                    "plan_data": {
-                        "recipe_id": recipe["id"],
-                        "recipe_name": recipe["name"],
-                        "method": (recipe["method"] or "machine").strip().lower(),
-                        "machine": recipe["machine"],
-                        "machine_item_id": recipe["machine_item_id"],
-                        "machine_item_name": machine_item_name,
-                        "grid_size": recipe["grid_size"],
-                        "station_item_id": recipe["station_item_id"],
-                        "station_item_name": station_item_name,
-                        "circuit": None if recipe["circuit"] is None else str(recipe["circuit"]),
-                        "output_item_name": item["name"],
-                        "output_qty": output_qty,
-                        "output_unit": self._unit_for_kind(item["kind"]),
-                        "multiplier": multiplier,
-                        "inputs": inputs,
-                        "reusable_inputs": [
-                            (
-                                requirement["id"],
-                                requirement["name"],
-                                reusable_qty,
-                                requirement["unit"],
+            stack.append({"state": "exit", "item_id": item_id})
+            for requirement in reversed(list(resolution["input_requirements"].values())):
+                minimum_qty = int(requirement["minimum_qty"])
+                expected_consumed = float(requirement["expected_consumed"])
+                stack.append(
+                    {
+                        "state": "enter",
+                        "item_id": requirement["id"],
+                        "qtys": [
+                            self._required_input_qty(
+                                minimum_qty=minimum_qty,
+                                multiplier=multiplier,
+                                expected_consumed_per_craft=expected_consumed,
                             )
-                            for reusable_item_id, reusable_qty in reusable_requirements.items()
-                            if (requirement := input_requirements.get(reusable_item_id))
+                            if multiplier
+                            else 0
+                            for multiplier in multipliers
                         ],
-                        "byproducts": byproducts,
-                    },
-                }
+                    }
+                )
+
+        shopping_table = []
+        for item_id, qtys in shopping_needed.items():
+            item = items.get(item_id)
+            if not item:
+                continue
+            name = item["name"] or item.get("key") or f"Item {item_id}"
+            shopping_table.append((name, self._unit_for_kind(item["kind"]), qtys))
+        shopping_table.sort(key=lambda row: (row[0] or "").lower())
+
+        return PlanSweep(quantities=quantities, shopping_table=shopping_table, errors=errors)
+
+    def _sweep_by_plans(
+        self,
+        target_item_id: int,
+        quantities: list[int],
+        *,
+        enabled_tiers: list[str],
+        crafting_6x6_unlocked: bool,
+        objective: str | None,
+        netting: str | None,
+    ) -> PlanSweep:
+        errors: list[str] = []
+        rows: dict[tuple[str, str], list[int]] = {}
+        for lane, qty in enumerate(quantities):
+            if qty <= 0:
+                continue
+            result = self.plan(
+                target_item_id,
+                qty,
+                use_inventory=False,
+                enabled_tiers=enabled_tiers,
+                crafting_6x6_unlocked=crafting_6x6_unlocked,
+                objective=objective,
+                netting=netting,
             )
-            for input_frame in reversed(input_frames):
-                stack.append(input_frame)
+            for message in result.errors:
+                if message not in errors:
+                    errors.append(message)
+            for name, item_qty, unit in result.shopping_list:
+                rows.setdefault((name, unit), [0] * len(quantities))[lane] += item_qty
+        shopping_table = [(name, unit, qtys) for (name, unit), qtys in rows.items()]
+        shopping_table.sort(key=lambda row: (row[0] or "").lower())
+        return PlanSweep(quantities=quantities, shopping_table=shopping_table, errors=errors)
+
+    def plan_rate(
+        self,
+        target_item_id: int,
+        target_rate: float,
+        *,
+        enabled_tiers: Iterable[str],
+        crafting_6x6_unlocked: bool,
+    ) -> RatePlan:
+        """Machines and power needed to sustain ``target_rate`` per second.
+
+        Each item gets one recipe, so the chosen recipes form a DAG and the
+        flow balance is triangular in topological order: one pass from the
+        target down to raw inputs solves it. Inputs are charged at their
+        expected consumption; an input that closes a cycle is bought instead.
+        """
+        enabled_tiers = list(enabled_tiers)
+        items = self._load_items()
+        container_transforms = self._load_container_transforms(items)
+        available_machines = self._load_machine_availability()
+        errors: list[str] = []
+        nodes: dict[int, dict | None] = {}
+        state: dict[int, str] = {}
+        topo_order: list[int] = []
+        bought_edges: set[tuple[int, int]] = set()
+
+        stack: list[tuple[str, int, int | None]] = [("enter", target_item_id, None)]
+        while stack:
+            action, item_id, consumer_id = stack.pop()
+            if action == "exit":
+                state[item_id] = "done"
+                topo_order.append(item_id)
+                continue
+            if state.get(item_id) == "visiting":
+                bought_edges.add((consumer_id, item_id))
+                continue
+            if state.get(item_id) == "done":
+                continue
+            item = items.get(item_id)
+            if not item:
+                errors.append("Unknown item selected.")
+                state[item_id] = "done"
+                continue
+            node = self._rate_node(item, enabled_tiers, crafting_6x6_unlocked, items, container_transforms, errors)
+            nodes[item_id] = node
+            if node is None:
+                state[item_id] = "done"
+                topo_order.append(item_id)
+                continue
+            state[item_id] = "visiting"
+            stack.append(("exit", item_id, None))
+            for input_item_id, _per_craft in reversed(node["inputs"]):
+                stack.append(("enter", input_item_id, item_id))
+
+        rates: dict[int, float] = {target_item_id: float(target_rate)}
+        crafts: dict[int, float] = {}
+        raw_rates: dict[int, float] = {}
+        for item_id in reversed(topo_order):
+            rate = rates.get(item_id, 0.0)
+            if rate <= 0:
+                continue
+            node = nodes.get(item_id)
+            if node is None:
+                raw_rates[item_id] = raw_rates.get(item_id, 0.0) + rate
+                continue
+            crafts[item_id] = rate / node["output_qty"]
+            for input_item_id, per_craft in node["inputs"]:
+                demand = crafts[item_id] * per_craft
+                if (item_id, input_item_id) in bought_edges:
+                    raw_rates[input_item_id] = raw_rates.get(input_item_id, 0.0) + demand
+                else:
+                    rates[input_item_id] = rates.get(input_item_id, 0.0) + demand
+
+        steps = []
+        for item_id in topo_order:
+            if item_id not in crafts:
+                continue
+            steps.append(self._rate_step(items[item_id], nodes[item_id], crafts[item_id], items, available_machines))
+
+        raw_inputs = []
+        for item_id, rate in raw_rates.items():
+            item = items.get(item_id)
+            if not item:
+                continue
+            name = item["name"] or item.get("key") or f"Item {item_id}"
+            raw_inputs.append((name, rate, self._unit_for_kind(item["kind"])))
+        raw_inputs.sort(key=lambda row: (row[0] or "").lower())
+
+        return RatePlan(
+            target_item_id=target_item_id,
+            target_rate=float(target_rate),
+            steps=steps,
+            raw_inputs=raw_inputs,
+            errors=errors,
+        )
+
+    def _rate_node(
+        self,
+        item: dict,
+        enabled_tiers: list[str],
+        crafting_6x6_unlocked: bool,
+        items: dict[int, dict],
+        container_transforms: list[dict],
+        errors: list[str],
+    ) -> dict | None:
+        """Per-craft flows for ``item``, or None when it is bought."""
+        fill_plan = self._container_fill_plan(
+            container_item=item,
+            qty_needed=1,
+            items=items,
+            container_transforms=container_transforms,
+        )
+        if fill_plan is not None:
+            return {
+                "recipe": None,
+                "output_qty": 1,
+                "inputs": [(input_item_id, float(qty)) for input_item_id, _name, qty, _unit in fill_plan["inputs"]],
+                "byproducts": [],
+                "machine_item_name": "",
+            }
+        if item["is_base"]:
+            return None
+        resolution = self._resolve_recipe(item, enabled_tiers, crafting_6x6_unlocked, items)
+        recipe = resolution["recipe"]
+        if not recipe:
+            errors.append(f"No recipe found for {item['name']}.")
+            return None
+        if resolution["output_qty"] <= 0:
+            errors.append(f"Recipe '{recipe['name']}' has no usable output for {item['name']}.")
+            return None
+        return {
+            "recipe": recipe,
+            "output_qty": resolution["output_qty"],
+            "inputs": [
+                (requirement["id"], float(requirement["expected_consumed"]))
+                for requirement in resolution["input_requirements"].values()
+                if float(requirement["expected_consumed"]) > 0
+            ],
+            "byproducts": resolution["byproducts"],
+            "machine_item_name": resolution["machine_item_name"],
+        }
+
+    def _rate_step(
+        self,
+        item: dict,
+        node: dict,
+        crafts_per_second: float,
+        items: dict[int, dict],
+        available_machines: MachineAvailabilityIndex,
+    ) -> RateStep:
+        recipe = node["recipe"]
+        inputs = []
+        for input_item_id, per_craft in node["inputs"]:
+            input_item = items[input_item_id]
+            inputs.append(
+                (input_item_id, input_item["name"], crafts_per_second * per_craft, self._unit_for_kind(input_item["kind"]))
+            )
+        byproducts = [
+            (byproduct_id, name, crafts_per_second * qty * chance / 100.0, unit)
+            for byproduct_id, name, qty, unit, chance in node["byproducts"]
+        ]
+        step = RateStep(
+            recipe_id=0,
+            recipe_name="Filling",
+            method="filling",
+            machine=None,
+            machine_item_id=None,
+            machine_item_name="",
+            machine_tier=None,
+            output_item_id=item["id"],
+            output_item_name=item["name"],
+            output_unit=self._unit_for_kind(item["kind"]),
+            output_rate=crafts_per_second * node["output_qty"],
+            crafts_per_second=crafts_per_second,
+            duration_ticks=None,
+            eu_per_tick=None,
+            machines=None,
+            machines_available=None,
+            inputs=inputs,
+            byproducts=byproducts,
+        )
+        if recipe is None:
+            return step
+
+        method = (recipe["method"] or "machine").strip().lower()
+        machine_type = (recipe["machine"] or "").strip().lower()
+        req_tier = recipe["calculated_tier"] or _default_tier()
+        machine_tier = self._pick_machine_tier(recipe, available_machines)
+        duration, eu_per_tick = apply_overclock(
+            recipe["duration_ticks"],
+            recipe["eu_per_tick"],
+            req_tier,
+            machine_tier,
+            is_perfect_overclock=bool(recipe["is_perfect_overclock"]),
+            max_tier=recipe["max_tier"],
+        )
+        if duration is None and machine_tier:
+            # The available tier cannot run it; size the step for a machine at the recipe's own tier.
+            machine_tier = req_tier
+            duration, eu_per_tick = recipe["duration_ticks"], recipe["eu_per_tick"]
+
+        step.recipe_id = recipe["id"]
+        step.recipe_name = recipe["name"]
+        step.method = method
+        step.machine = recipe["machine"]
+        step.machine_item_id = recipe["machine_item_id"]
+        step.machine_item_name = node["machine_item_name"]
+        step.machine_tier = machine_tier if method == "machine" else None
+        step.duration_ticks = int(duration) if duration is not None else None
+        step.eu_per_tick = int(eu_per_tick) if eu_per_tick is not None else None
+        if step.duration_ticks and step.duration_ticks > 0:
+            step.machines = crafts_per_second * step.duration_ticks / TICKS_PER_SECOND
+        if method == "machine" and machine_type in available_machines:
+            # Unlisted machine types are unknown, not zero: they are not bottlenecks.
+            step.machines_available = self._machine_count_for_tier(machine_type, machine_tier, available_machines)
+        return step
+
+    def optimize_recipe_choices(
+        self,
+        target_item_id: int,
+        target_qty: float,
+        *,
+        objective: str,
+        enabled_tiers: Iterable[str],
+        crafting_6x6_unlocked: bool,
+    ) -> dict[int, int] | None:
+        """Choose recipes for the whole graph at once with a linear program.
+
+        Every recipe that can make an item under the target is a column;
+        only recipes runnable at the enabled tiers and with the available
+        machines are offered. The result maps item id to the recipe making
+        most of it. Returns None when SciPy is missing, the graph is too
+        large or the program has no solution, so callers fall back to the
+        greedy ranking.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {objective!r}; expected one of {sorted(OBJECTIVES)}.")
+        if not solver_available():
+            return None
+        items = self._load_items()
+        container_transforms = self._load_container_transforms(items)
+        available_machines = self._load_machine_availability()
+        enabled_tiers_set = set(enabled_tiers)
+        flows: dict[int, RecipeFlow] = {}
+        candidates: dict[int, list[int]] = {}
+        buy_costs: dict[int, float] = {}
+        missing_weights: dict[int, float] = {}
+
+        pending = [target_item_id]
+        seen = {target_item_id}
+        while pending:
+            item_id = pending.pop()
+            item = items.get(item_id)
+            if not item:
+                continue
+            raw_weight = self._raw_weight(item)
+            fill_plan = self._container_fill_plan(
+                container_item=item,
+                qty_needed=1,
+                items=items,
+                container_transforms=container_transforms,
+            )
+            if fill_plan is not None:
+                # Filling is not a choice; a negative id keeps it apart from real recipes.
+                fill_flow = RecipeFlow(outputs={item_id: 1.0}, cost=CRAFT_TIEBREAK_COST)
+                for input_item_id, _name, qty, _unit in fill_plan["inputs"]:
+                    fill_flow.inputs[input_item_id] = fill_flow.inputs.get(input_item_id, 0.0) + qty
+                flows[-item_id] = fill_flow
+                new_inputs = list(fill_flow.inputs)
+            elif item["is_base"]:
+                buy_costs[item_id] = raw_weight
+                continue
+            else:
+                rows = [
+                    row
+                    for row in self._candidate_recipes(item_id, crafting_6x6_unlocked, items)
+                    if self._recipe_allowed(row, available_machines, enabled_tiers_set)
+                ]
+                if not rows:
+                    missing_weights[item_id] = raw_weight
+                    continue
+                candidates[item_id] = [row["id"] for row in rows]
+                new_rows = [row for row in rows if row["id"] not in flows]
+                new_inputs = []
+                for row, flow in zip(new_rows, self._recipe_flows(new_rows, items)):
+                    flow.cost = self._recipe_objective_cost(row, objective, available_machines) + CRAFT_TIEBREAK_COST
+                    flows[row["id"]] = flow
+                    new_inputs.extend(flow.inputs)
+                if len(flows) > OPTIMIZER_MAX_RECIPES:
+                    return None
+            for input_item_id in new_inputs:
+                if input_item_id not in seen:
+                    seen.add(input_item_id)
+                    pending.append(input_item_id)
+
+        if objective != "raw":
+            buy_costs = {item_id: cost * RAW_TIEBREAK_WEIGHT for item_id, cost in buy_costs.items()}
+        # Buying what cannot be made must stay dearer than any route that makes it.
+        missing_cost = MISSING_RECIPE_PENALTY * max([1.0] + [flow.cost for flow in flows.values()])
+        buy_costs.update((item_id, missing_cost * weight) for item_id, weight in missing_weights.items())
+        crafts = solve_recipe_flows(flows, buy_costs, {target_item_id: float(target_qty)})
+        if crafts is None:
+            return None
+
+        choices = {}
+        for item_id, recipe_ids in candidates.items():
+            made = {
+                recipe_id: crafts.get(recipe_id, 0.0) * flows[recipe_id].outputs.get(item_id, 0.0)
+                for recipe_id in recipe_ids
+            }
+            best = max(recipe_ids, key=lambda recipe_id: made[recipe_id])
+            if made[best] > 0:
+                choices[item_id] = best
+        return choices
 
+    def _recipe_allowed(
+        self,
+        row,
+        available_machines: MachineAvailabilityIndex,
+        enabled_tiers_set: set[str],
+    ) -> bool:
+        """Owned or at an unlocked tier, the first two availability classes of the ranking."""
+        return (
+            self._recipe_avail_score(
+                (row["method"] or "machine").strip().lower(),
+                (row["machine"] or "").strip().lower(),
+                row["calculated_tier"] or _default_tier(),
+                self._pick_machine_tier(row, available_machines),
+                (row["max_tier"] or "").strip(),
+                available_machines,
+                enabled_tiers_set,
+            )
+            <= 1
+        )
+
+    def _recipe_flows(self, rows: list, items: dict[int, dict]) -> list[RecipeFlow]:
+        """Expected per-craft inputs and outputs for ``rows`` from one query."""
+        flows = {row["id"]: RecipeFlow() for row in rows}
+        if not flows:
+            return []
+        lines = self.conn.execute(
+            "SELECT recipe_id, direction, item_id, qty_count, qty_liters, consumption_chance, chance_percent "
+            "FROM recipe_lines WHERE recipe_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(flows)),),
+        ).fetchall()
+        for line in lines:
+            line_item = items.get(line["item_id"])
+            if not line_item:
+                continue
+            qty = self._line_qty(line, line_item["kind"])
+            if qty <= 0:
+                continue
+            flow = flows[line["recipe_id"]]
+            if line["direction"] == "in":
+                consumed = qty * self._normalize_consumption_chance(line["consumption_chance"])
+                if consumed > 0:
+                    flow.inputs[line["item_id"]] = flow.inputs.get(line["item_id"], 0.0) + consumed
+            else:
+                chance = line["chance_percent"]
+                produced = qty * (float(chance) / 100.0 if chance is not None else 1.0)
+                flow.outputs[line["item_id"]] = flow.outputs.get(line["item_id"], 0.0) + produced
+        return [flows[row["id"]] for row in rows]
+
+    def _recipe_objective_cost(self, row, objective: str, available_machines: MachineAvailabilityIndex) -> float:
+        if objective == "raw":
+            return 0.0
+        method = (row["method"] or "machine").strip().lower()
+        duration, eu_per_tick = apply_overclock(
+            row["duration_ticks"],
+            row["eu_per_tick"],
+            row["calculated_tier"] or _default_tier(),
+            self._pick_machine_tier(row, available_machines),
+            is_perfect_overclock=bool(row["is_perfect_overclock"]),
+            max_tier=row["max_tier"],
+        )
+        if duration is None:
+            duration, eu_per_tick = row["duration_ticks"], row["eu_per_tick"]
+        if method == "crafting" and not duration:
+            duration = CRAFTING_DURATION_TICKS
+        duration = float(duration or 0)
+        if objective == "time":
+            return duration
+        return duration * float(eu_per_tick or 0)
+
+    def _raw_weight(self, item: dict) -> float:
+        # A bucket (1000 L) of fluid weighs as much as one item.
+        return 0.001 if self._unit_for_kind(item["kind"]) == "L" else 1.0
+
+    def clear_cache(self) -> None:
+        self._machine_availability.clear()
+
+    def _plan_result(
+        self,
+        items: dict[int, dict],
+        *,
+        shopping_needed: dict[int, int],
+        required_base_needed: dict[int, int],
+        storage_used: dict[int, int],
+        steps: list[PlanStep],
+        errors: list[str],
+        missing_recipes: list[tuple[int, str, int]],
+        warnings: list[str] | None = None,
+    ) -> PlanResult:
         shopping_list = []
         required_base_list = []
         storage_requirements = []
@@ -476,20 +1440,72 @@ class PlannerService:
         required_base_list.sort(key=lambda row: (row[0] or "").lower())
         storage_requirements.sort(key=lambda row: (row[2] == 0, (row[0] or "").lower()))
 
-        merged_steps = self._merge_plan_steps(steps)
-
         return PlanResult(
             shopping_list=shopping_list,
             required_base_list=required_base_list,
             storage_requirements=storage_requirements,
-            steps=merged_steps,
+            steps=steps,
             errors=errors,
             missing_recipes=missing_recipes,
+            warnings=list(warnings or []),
         )
 
-    def clear_cache(self) -> None:
-        self._machine_availability_cache = None
-        self._machine_availability_cache_version = None
+    def _recipe_plan_data(self, item: dict, resolution: dict, multiplier: int, inputs: list) -> dict:
+        recipe = resolution["recipe"]
+        input_requirements = resolution["input_requirements"]
+        return {
+            "recipe_id": recipe["id"],
+            "recipe_name": recipe["name"],
+            "method": (recipe["method"] or "machine").strip().lower(),
+            "machine": recipe["machine"],
+            "machine_item_id": recipe["machine_item_id"],
+            "machine_item_name": resolution["machine_item_name"],
+            "grid_size": recipe["grid_size"],
+            "station_item_id": recipe["station_item_id"],
+            "station_item_name": resolution["station_item_name"],
+            "circuit": None if recipe["circuit"] is None else str(recipe["circuit"]),
+            "output_item_name": item["name"],
+            "output_qty": resolution["output_qty"],
+            "output_unit": self._unit_for_kind(item["kind"]),
+            "multiplier": multiplier,
+            "inputs": inputs,
+            "reusable_inputs": [
+                (
+                    requirement["id"],
+                    requirement["name"],
+                    reusable_qty,
+                    requirement["unit"],
+                )
+                for reusable_item_id, reusable_qty in resolution["reusable_requirements"].items()
+                if (requirement := input_requirements.get(reusable_item_id))
+            ],
+            "byproducts": [
+                (byproduct_id, name, qty * multiplier, unit, chance)
+                for byproduct_id, name, qty, unit, chance in resolution["byproducts"]
+            ],
+        }
+
+    def _plan_step(self, item_id: int, plan_data: dict) -> PlanStep:
+        return PlanStep(
+            recipe_id=plan_data["recipe_id"],
+            recipe_name=plan_data["recipe_name"],
+            method=plan_data["method"],
+            machine=plan_data["machine"],
+            machine_item_id=plan_data["machine_item_id"],
+            machine_item_name=plan_data["machine_item_name"],
+            grid_size=plan_data["grid_size"],
+            station_item_id=plan_data["station_item_id"],
+            station_item_name=plan_data["station_item_name"],
+            circuit=plan_data["circuit"],
+            output_item_id=item_id,
+            output_item_name=plan_data["output_item_name"],
+            output_qty=plan_data["output_qty"],
+            output_unit=plan_data["output_unit"],
+            multiplier=plan_data["multiplier"],
+            inputs=plan_data["inputs"],
+            reusable_inputs=plan_data.get("reusable_inputs", []),
+            byproducts=plan_data["byproducts"],
+        )
 
     def _merge_plan_steps(self, steps: list[PlanStep]) -> list[PlanStep]:
         merged: list[PlanStep] = []
@@ -619,19 +1635,24 @@ class PlannerService:
         return {row["id"]: row for row in rows}
 
     def _load_inventory(self, items: dict[int, dict] | None = None) -> dict[int, int]:
-        rows = aggregated_assignment_rows_for_planner(self.profile_conn)
         item_kinds: dict[int, str] = {}
+        if self.inventory_ledger is not None:
+            rows = [{"item_id": item_id, **totals} for item_id, totals in self.inventory_ledger.planner_totals().items()]
+        elif items is None and attached_content(self.profile_conn):
+            # Quantities and kinds in one query against the attached content DB.
+            rows = aggregated_assignment_rows_for_planner(self.profile_conn, with_kinds=True)
+            item_kinds = {int(row["item_id"]): ((row["kind"] or "").strip().lower()) for row in rows}
+        else:
+            rows = aggregated_assignment_rows_for_planner(self.profile_conn)
         if items is not None:
             item_kinds = {
                 int(item_id): ((((item["kind"] if item and "kind" in item.keys() else "") or "").strip().lower()))
                 for item_id, item in items.items()
             }
-        elif rows:
-            item_ids = [int(row["item_id"]) for row in rows]
-            placeholders = ",".join("?" for _ in item_ids)
+        elif rows and not item_kinds:
             kind_rows = self.conn.execute(
-                f"SELECT id, kind FROM items WHERE id IN ({placeholders})",
-                item_ids,
+                "SELECT id, kind FROM items WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([int(row["item_id"]) for row in rows]),),
             ).fetchall()
             item_kinds = {
                 int(kind_row["id"]): (((kind_row["kind"] or "").strip().lower()))
@@ -810,37 +1831,145 @@ class PlannerService:
         }
 
     # ---------- Recipe helpers ----------
+    def _resolve_recipe(
+        self,
+        item: dict,
+        enabled_tiers: Iterable[str],
+        crafting_6x6_unlocked: bool,
+        items: dict[int, dict],
+        *,
+        preferred_recipe_id: int | None = None,
+    ) -> dict:
+        """Pick the recipe for ``item`` and collect its per-craft lines.
+
+        Everything here is independent of the quantity being planned, so
+        callers cache the result per item for the whole plan.
+        """
+        item_id = item["id"]
+        # Pass 'items' to helper to access machine stats
+        recipe = self._pick_recipe_for_item(
+            item_id,
+            enabled_tiers,
+            crafting_6x6_unlocked,
+            items,
+            preferred_recipe_id=preferred_recipe_id,
+        )
+        resolution = {
+            "recipe": recipe,
+            "output_qty": 0,
+            "input_requirements": {},
+            "reusable_requirements": {},
+            "byproducts": [],
+            "machine_item_name": "",
+            "station_item_name": "",
+        }
+        if not recipe:
+            return resolution
+        resolution["output_qty"] = self._recipe_output_qty(recipe["id"], item_id, item["kind"])
+
+        input_requirements: dict[int, dict[str, int | float | str]] = resolution["input_requirements"]
+        reusable_requirements: dict[int, int] = resolution["reusable_requirements"]
+        for line in self._recipe_inputs(recipe["id"]):
+            input_item = items.get(line["item_id"])
+            if not input_item:
+                continue
+            input_qty = self._line_qty(line, input_item["kind"])
+            if input_qty <= 0:
+                continue
+            consumption_chance = self._normalize_consumption_chance(line["consumption_chance"])
+            if consumption_chance <= 0:
+                reusable_requirements[input_item["id"]] = reusable_requirements.get(input_item["id"], 0) + input_qty
+            existing = input_requirements.get(input_item["id"])
+            if existing:
+                existing["minimum_qty"] = int(existing["minimum_qty"]) + input_qty
+                existing["expected_consumed"] = float(existing["expected_consumed"]) + (input_qty * consumption_chance)
+            else:
+                input_requirements[input_item["id"]] = {
+                    "id": input_item["id"],
+                    "name": input_item["name"],
+                    "minimum_qty": input_qty,
+                    "expected_consumed": input_qty * consumption_chance,
+                    "unit": self._unit_for_kind(input_item["kind"]),
+                }
+
+        # Byproduct quantities are per craft; callers scale them by the multiplier.
+        for line in self._recipe_outputs(recipe["id"]):
+            if line["item_id"] == item_id:
+                continue
+            output_item = items.get(line["item_id"])
+            if not output_item:
+                continue
+            output_qty_line = self._line_qty(line, output_item["kind"])
+            if output_qty_line <= 0:
+                continue
+            chance = line["chance_percent"]
+            resolution["byproducts"].append(
+                (
+                    output_item["id"],
+                    output_item["name"],
+                    output_qty_line,
+                    self._unit_for_kind(output_item["kind"]),
+                    float(chance) if chance is not None else 100.0,
+                )
+            )
+
+        if recipe["machine_item_id"] is not None:
+            machine_item = items.get(recipe["machine_item_id"])
+            if machine_item:
+                resolution["machine_item_name"] = machine_item["name"]
+        if recipe["station_item_id"] is not None:
+            station_item = items.get(recipe["station_item_id"])
+            if station_item:
+                resolution["station_item_name"] = station_item["name"]
+        return resolution
+
     def _pick_recipe_for_item(
         self,
         item_id: int,
         enabled_tiers: Iterable[str],
         crafting_6x6_unlocked: bool,
         items: dict[int, dict],
+        *,
+        preferred_recipe_id: int | None = None,
     ):
-        # 1. Fetch ALL recipes, calculating separate input counts for items vs fluids
+        rows = self._candidate_recipes(item_id, crafting_6x6_unlocked, items)
+        if not rows:
+            return None
+        if preferred_recipe_id is not None:
+            preferred = next((row for row in rows if row["id"] == preferred_recipe_id), None)
+            if preferred is not None:
+                return preferred
+
+        available_machines = self._load_machine_availability()
+        enabled_tiers_set = set(enabled_tiers)
+        if len(rows) >= BATCH_RANK_MIN_ROWS:
+            return rows[self._best_recipe_index(rows, available_machines, enabled_tiers_set)]
+        return min(rows, key=lambda row: self._recipe_rank(row, available_machines, enabled_tiers_set))
+
+    def _candidate_recipes(
+        self,
+        item_id: int,
+        crafting_6x6_unlocked: bool,
+        items: dict[int, dict],
+    ) -> list[sqlite3.Row]:
+        """Recipes producing ``item_id`` that the grid and machine capacity allow."""
+        # 1. Fetch ALL recipes; per-recipe input counts and tier come precomputed from recipe_stats
         sql = (
             "SELECT r.id, r.name, r.method, r.machine, r.machine_item_id, r.grid_size, "
             "r.station_item_id, r.circuit, r.tier, r.max_tier, r.is_perfect_overclock, r.duration_ticks, r.eu_per_tick, "
             "mi.machine_tier AS machine_item_tier, "
             "COALESCE(mi.display_name, mi.key) AS machine_item_name, "
-            # Calculate item input count vs fluid input count
-            "COALESCE(SUM(CASE WHEN rl_in.direction='in' AND (input_item.kind IN ('fluid','gas')) THEN 1 ELSE 0 END), 0) AS fluid_req_count, "
-            "COALESCE(SUM(CASE WHEN rl_in.direction='in' AND (input_item.kind NOT IN ('fluid','gas') OR input_item.kind IS NULL) THEN 1 ELSE 0 END), 0) AS item_req_count, "
-            
-            "COALESCE(SUM(CASE WHEN rl_in.direction='in' "
-            "THEN COALESCE(rl_in.qty_count, rl_in.qty_liters, 1) ELSE 0 END), 0) AS input_qty "
-            ", COALESCE(MAX(CASE WHEN rl_out.direction='out' "
-            "THEN COALESCE(rl_out.qty_count, rl_out.qty_liters, 1) ELSE NULL END), 0) AS output_qty "
-            "FROM recipes r "
+            "rs.fluid_req_count, rs.item_req_count, rs.input_qty, rs.calculated_tier, "
+            "COALESCE(MAX(COALESCE(rl_out.qty_count, rl_out.qty_liters, 1)), 0) AS output_qty "
+            "FROM recipe_lines rl_out "
+            "JOIN recipes r ON r.id = rl_out.recipe_id "
+            "JOIN recipe_stats rs ON rs.recipe_id = r.id "
             "LEFT JOIN items mi ON mi.id = r.machine_item_id "
-            "JOIN recipe_lines rl_out ON rl_out.recipe_id = r.id "
-            "LEFT JOIN recipe_lines rl_in ON rl_in.recipe_id = r.id AND rl_in.direction='in' "
-            "LEFT JOIN items input_item ON input_item.id = rl_in.item_id "
             "WHERE rl_out.direction='out' AND rl_out.item_id=? "
             "GROUP BY r.id "
             "ORDER BY r.name"
         )
-        
+
         rows = self.conn.execute(sql, [item_id]).fetchall()
         
         # 2. Hard Filter: 6x6 Crafting
@@ -848,13 +1977,9 @@ class PlannerService:
             rows = [r for r in rows if not (r["method"] == "crafting" and (r["grid_size"] or "").strip() == "6x6")]
         
         if not rows:
-            return None
-
-        # 3. Setup Availability
-        available_machines = self._load_machine_availability()
-        enabled_tiers_set = set(enabled_tiers)
-        tier_sort_map = {name: i for i, name in enumerate(ALL_TIERS)}
+            return []
 
+        # 3. Drop machine variants whose slots or tanks cannot hold the inputs
         def _machine_can_run_recipe(row) -> bool:
             machine_item_id = row["machine_item_id"]
             if not machine_item_id:
@@ -870,178 +1995,237 @@ class PlannerService:
             avail_tanks = int(m_item["machine_input_tanks"] or 0)
             return req_items <= avail_slots and req_fluids <= avail_tanks
 
-        rows = [row for row in rows if _machine_can_run_recipe(row)]
-        if not rows:
-            return None
-        
-        def recipe_rank(row) -> tuple:
-            # We want the lowest score (tuple comparison).
-            
-            # --- PRE-CALCULATION ---
-            req_tier = get_calculated_tier(row)
-            method = (row["method"] or "machine").strip().lower()
-            machine_type = (row["machine"] or "").strip().lower()
-            machine_tier = self._pick_machine_tier(row, available_machines)
-            
-            # --- CRITERIA 1: AVAILABILITY SCORE ---
-            # 0 = Owned / Immediate
-            # 1 = Unlocked Tier
-            # 2 = Locked Tier
-            # 3 = Capacity Error (Impossible)
-            
-            avail_score = 2 
-            
-            # Check Capacity First
-            if avail_score != 3:
-                # Normal ownership logic
-                if method == "crafting":
-                    avail_score = 0
-                elif method == "machine" and machine_type:
-                    if machine_type in available_machines:
-                        owned_tiers = available_machines[machine_type]
-                        if self._tier_available(req_tier, owned_tiers):
-                            avail_score = 0
-
-                if method == "machine" and machine_tier:
-                    required_rank = _tier_rank(req_tier)
-                    machine_rank = _tier_rank(machine_tier)
-                    max_rank = _tier_rank((row["max_tier"] or "").strip())
-                    if (
-                        required_rank is not None
-                        and machine_rank is not None
-                        and machine_rank < required_rank
-                    ):
-                        avail_score = 3
-                    if max_rank is not None and machine_rank is not None and machine_rank > max_rank:
-                        avail_score = 3
-
-                if avail_score > 0:
-                    if req_tier in enabled_tiers_set:
-                        avail_score = 1
-                    elif req_tier == _default_tier():
-                        avail_score = 1
-
-            # --- CRITERIA 2: MACHINE COUNT (Prefer more available machines) ---
-            machine_count = 0
-            if method == "machine" and machine_type:
-                machine_count = self._machine_count_for_tier(machine_type, machine_tier, available_machines)
+        return [row for row in rows if _machine_can_run_recipe(row)]
 
-            # --- CRITERIA 3: EFFICIENCY (Input per Output) ---
-            raw_output_qty = row["output_qty"]
-            output_qty = float(raw_output_qty) if raw_output_qty is not None else 0.0
-            input_unit_count = float(row["item_req_count"] or 0) + float(row["fluid_req_count"] or 0)
-            output_qty_safe = output_qty if output_qty > 0 else 0.0
-            ratio = input_unit_count / output_qty_safe if output_qty_safe > 0 else 999.0
-
-            # --- CRITERIA 4: SPEED + POWER ---
-            scaled_duration, scaled_eu = apply_overclock(
-                row["duration_ticks"],
-                row["eu_per_tick"],
-                req_tier,
-                machine_tier,
-                is_perfect_overclock=bool(row["is_perfect_overclock"]),
-                max_tier=row["max_tier"],
+    def _recipe_avail_score(
+        self,
+        method: str,
+        machine_type: str,
+        req_tier: str,
+        machine_tier: str | None,
+        max_tier: str,
+        available_machines: MachineAvailabilityIndex,
+        enabled_tiers_set: set[str],
+    ) -> int:
+        # 0 = Owned / Immediate
+        # 1 = Unlocked Tier
+        # 2 = Locked Tier
+        # 3 = Capacity Error (Impossible)
+        avail_score = 2
+        if method == "crafting":
+            avail_score = 0
+        elif method == "machine" and machine_type:
+            entry = available_machines.get(machine_type)
+            if entry is not None and entry.can_run_tier(req_tier, _tier_rank(req_tier)):
+                avail_score = 0
+
+        if method == "machine" and machine_tier:
+            required_rank = _tier_rank(req_tier)
+            machine_rank = _tier_rank(machine_tier)
+            max_rank = _tier_rank(max_tier)
+            if (
+                required_rank is not None
+                and machine_rank is not None
+                and machine_rank < required_rank
+            ):
+                avail_score = 3
+            if max_rank is not None and machine_rank is not None and machine_rank > max_rank:
+                avail_score = 3
+
+        if avail_score > 0:
+            if req_tier in enabled_tiers_set:
+                avail_score = 1
+            elif req_tier == _default_tier():
+                avail_score = 1
+        return avail_score
+
+    def _recipe_rank(
+        self,
+        row,
+        available_machines: MachineAvailabilityIndex,
+        enabled_tiers_set: set[str],
+    ) -> tuple:
+        # We want the lowest score (tuple comparison).
+
+        # --- PRE-CALCULATION ---
+        req_tier = row["calculated_tier"] or _default_tier()
+        method = (row["method"] or "machine").strip().lower()
+        machine_type = (row["machine"] or "").strip().lower()
+        machine_tier = self._pick_machine_tier(row, available_machines)
+
+        # --- CRITERIA 1: AVAILABILITY SCORE ---
+        avail_score = self._recipe_avail_score(
+            method,
+            machine_type,
+            req_tier,
+            machine_tier,
+            (row["max_tier"] or "").strip(),
+            available_machines,
+            enabled_tiers_set,
+        )
+
+        # --- CRITERIA 2: MACHINE COUNT (Prefer more available machines) ---
+        machine_count = 0
+        if method == "machine" and machine_type:
+            machine_count = self._machine_count_for_tier(machine_type, machine_tier, available_machines)
+
+        # --- CRITERIA 3: EFFICIENCY (Input per Output) ---
+        raw_output_qty = row["output_qty"]
+        output_qty = float(raw_output_qty) if raw_output_qty is not None else 0.0
+        input_unit_count = float(row["item_req_count"] or 0) + float(row["fluid_req_count"] or 0)
+        output_qty_safe = output_qty if output_qty > 0 else 0.0
+        ratio = input_unit_count / output_qty_safe if output_qty_safe > 0 else 999.0
+
+        # --- CRITERIA 4: SPEED + POWER ---
+        scaled_duration, scaled_eu = apply_overclock(
+            row["duration_ticks"],
+            row["eu_per_tick"],
+            req_tier,
+            machine_tier,
+            is_perfect_overclock=bool(row["is_perfect_overclock"]),
+            max_tier=row["max_tier"],
+        )
+        duration_value = scaled_duration
+        if method == "crafting":
+            if duration_value is None or float(duration_value) <= 0:
+                duration_value = 200
+        duration = float(duration_value) if duration_value is not None else 0.0
+        time_per_item = duration / output_qty_safe if output_qty_safe > 0 else duration
+
+        # --- CRITERIA 5: ENERGY COST ---
+        if method == "crafting" and scaled_eu is None:
+            scaled_eu = 0
+        if scaled_eu is None or duration_value is None:
+            energy_per_item = float("inf")
+        else:
+            energy_per_item = (
+                (float(scaled_eu) * float(duration_value)) / output_qty_safe
+                if output_qty_safe > 0
+                else float("inf")
             )
-            duration_value = scaled_duration
-            if method == "crafting":
-                if duration_value is None or float(duration_value) <= 0:
-                    duration_value = 200
-            duration = float(duration_value) if duration_value is not None else 0.0
-            time_per_item = duration / output_qty_safe if output_qty_safe > 0 else duration
-
-            # --- CRITERIA 5: ENERGY COST ---
-            if method == "crafting" and scaled_eu is None:
-                scaled_eu = 0
-            if scaled_eu is None or duration_value is None:
-                energy_per_item = float("inf")
-            else:
-                energy_per_item = (
-                    (float(scaled_eu) * float(duration_value)) / output_qty_safe
-                    if output_qty_safe > 0
-                    else float("inf")
+
+        # --- CRITERIA 6: TIER RANK ---
+        t_rank = tier_table().ids.get(req_tier, 999)
+
+        return (
+            avail_score,
+            -machine_count,
+            ratio,
+            time_per_item,
+            energy_per_item,
+            t_rank,
+        )
+
+    def _recipe_rank_columns(
+        self,
+        rows: list,
+        available_machines: MachineAvailabilityIndex,
+        enabled_tiers_set: set[str],
+    ) -> dict[str, array]:
+        # Everything that depends on strings (tier names, machine types, availability)
+        # is resolved once per distinct value; the numeric criteria are left as
+        # columns so they can be scored in a single pass.
+        n = len(rows)
+        cols = {
+            "avail": array("i", bytes(4 * n)),
+            "count": array("i", bytes(4 * n)),
+            "req_rank": array("i", bytes(4 * n)),
+            "machine_rank": array("i", bytes(4 * n)),
+            "max_rank": array("i", bytes(4 * n)),
+            "t_rank": array("i", bytes(4 * n)),
+            "crafting": array("b", bytes(n)),
+            "perfect": array("b", bytes(n)),
+            "inputs": array("d", bytes(8 * n)),
+            "output": array("d", bytes(8 * n)),
+            "duration": array("d", bytes(8 * n)),
+            "eu": array("d", bytes(8 * n)),
+        }
+        tiers = tier_table()
+        machine_tier_cache: dict[tuple[str, str, str], str | None] = {}
+        avail_cache: dict[tuple, int] = {}
+        count_cache: dict[tuple[str, str | None], int] = {}
+        nan = float("nan")
+
+        for idx, row in enumerate(rows):
+            req_tier = row["calculated_tier"] or tiers.default
+            method = (row["method"] or "machine").strip().lower()
+            machine_type = (row["machine"] or "").strip().lower()
+            max_tier = (row["max_tier"] or "").strip()
+
+            tier_key = (method, machine_type, (row["machine_item_tier"] or "").strip())
+            if tier_key not in machine_tier_cache:
+                machine_tier_cache[tier_key] = self._pick_machine_tier(row, available_machines)
+            machine_tier = machine_tier_cache[tier_key]
+
+            avail_key = (method, machine_type, req_tier, machine_tier, max_tier)
+            if avail_key not in avail_cache:
+                avail_cache[avail_key] = self._recipe_avail_score(
+                    method,
+                    machine_type,
+                    req_tier,
+                    machine_tier,
+                    max_tier,
+                    available_machines,
+                    enabled_tiers_set,
                 )
+            cols["avail"][idx] = avail_cache[avail_key]
 
-            # --- CRITERIA 6: TIER RANK ---
-            t_rank = tier_sort_map.get(req_tier, 999)
+            if method == "machine" and machine_type:
+                count_key = (machine_type, machine_tier)
+                if count_key not in count_cache:
+                    count_cache[count_key] = self._machine_count_for_tier(
+                        machine_type, machine_tier, available_machines
+                    )
+                cols["count"][idx] = count_cache[count_key]
+
+            req_rank = tiers.rank(req_tier)
+            machine_rank = tiers.rank(machine_tier) if machine_tier else None
+            max_rank = tiers.rank(max_tier)
+            cols["req_rank"][idx] = -1 if req_rank is None else req_rank
+            cols["machine_rank"][idx] = -1 if machine_rank is None else machine_rank
+            cols["max_rank"][idx] = -1 if max_rank is None else max_rank
+            cols["t_rank"][idx] = tiers.ids.get(req_tier, 999)
+            cols["crafting"][idx] = 1 if method == "crafting" else 0
+            cols["perfect"][idx] = 1 if row["is_perfect_overclock"] else 0
 
-            return (
-                avail_score,
-                -machine_count,
-                ratio,
-                time_per_item,
-                energy_per_item,
-                t_rank,
-            )
+            raw_output_qty = row["output_qty"]
+            cols["output"][idx] = float(raw_output_qty) if raw_output_qty is not None else 0.0
+            cols["inputs"][idx] = float(row["item_req_count"] or 0) + float(row["fluid_req_count"] or 0)
+            duration_ticks = row["duration_ticks"]
+            eu_per_tick = row["eu_per_tick"]
+            cols["duration"][idx] = float(duration_ticks) if duration_ticks is not None else nan
+            cols["eu"][idx] = float(eu_per_tick) if eu_per_tick is not None else nan
+        return cols
+
+    def _best_recipe_index(
+        self,
+        rows: list,
+        available_machines: MachineAvailabilityIndex,
+        enabled_tiers_set: set[str],
+    ) -> int:
+        cols = self._recipe_rank_columns(rows, available_machines, enabled_tiers_set)
+        if np is not None:
+            return _best_rank_index_numpy(cols)
+        return _best_rank_index_array(cols)
 
-        return min(rows, key=recipe_rank)
-
-    def _load_machine_availability(self) -> dict[str, dict[str, dict[str, int]]]:
-        if self.profile_conn is None:
-            self._machine_availability_cache = {}
-            self._machine_availability_cache_version = None
-            return self._machine_availability_cache
-        version_row = self.profile_conn.execute(
-            "SELECT value FROM app_settings WHERE key='machine_availability_version'"
-        ).fetchone()
-        current_version = int(version_row["value"] or 0) if version_row else 0
-        if (
-            self._machine_availability_cache is not None
-            and self._machine_availability_cache_version == current_version
-        ):
-            return self._machine_availability_cache
-        rows = self.profile_conn.execute(
-            "SELECT machine_type, tier, owned, online FROM machine_availability"
-        ).fetchall()
-        available: dict[str, dict[str, dict[str, int]]] = {}
-        for row in rows:
-            owned = int(row["owned"] or 0)
-            online = int(row["online"] or 0)
-            if owned <= 0 and online <= 0:
-                continue
-            machine_type = (row["machine_type"] or "").strip().lower()
-            if not machine_type:
-                continue
-            tier = (row["tier"] or "").strip()
-            available.setdefault(machine_type, {})[tier] = {"owned": owned, "online": online}
-        self._machine_availability_cache = available
-        self._machine_availability_cache_version = current_version
-        return available
-
-    def _tier_available(self, required_tier: str, owned_tiers: dict[str, dict[str, int]]) -> bool:
-        if required_tier in owned_tiers:
-            return True
-        required_rank = _tier_rank(required_tier)
-        if required_rank is None:
-            return False
-        for owned in owned_tiers.keys():
-            owned_rank = _tier_rank(owned)
-            if owned_rank is not None and owned_rank >= required_rank:
-                return True
-        return False
+    def _load_machine_availability(self) -> MachineAvailabilityIndex:
+        return self._machine_availability.get()
 
     def _machine_count_for_tier(
         self,
         machine_type: str,
         machine_tier: str | None,
-        available_machines: dict[str, dict[str, dict[str, int]]],
+        available_machines: MachineAvailabilityIndex,
     ) -> int:
-        tiers = available_machines.get(machine_type, {})
-        if not tiers:
+        entry = available_machines.get(machine_type)
+        if entry is None:
             return 0
-        if machine_tier and machine_tier in tiers:
-            record = tiers[machine_tier]
-            return max(int(record.get("online", 0)), int(record.get("owned", 0)))
-        best = 0
-        for record in tiers.values():
-            count = max(int(record.get("online", 0)), int(record.get("owned", 0)))
-            if count > best:
-                best = count
-        return best
+        return entry.count_for_tier(machine_tier)
 
     def _pick_machine_tier(
         self,
         row: sqlite3.Row,
-        available_machines: dict[str, dict[str, dict[str, int]]],
+        available_machines: MachineAvailabilityIndex,
     ) -> str | None:
         method = (row["method"] or "machine").strip().lower()
         if method != "machine":
@@ -1049,16 +2233,16 @@ class PlannerService:
         machine_type = (row["machine"] or "").strip().lower()
         if not machine_type:
             return None
-        tiers = available_machines.get(machine_type)
-        if tiers:
-            return _highest_tier(tiers.keys())
+        entry = available_machines.get(machine_type)
+        if entry is not None:
+            return entry.best_tier
         machine_item_tier = (row["machine_item_tier"] or "").strip()
         return machine_item_tier or None
 
     def _recipe_machine_available(
         self,
         row: sqlite3.Row,
-        available_machines: dict[str, dict[str, dict[str, int]]],
+        available_machines: MachineAvailabilityIndex,
     ) -> bool:
         # Legacy method kept for safety, but main logic is now in ranking
         method = (row["method"] or "machine").strip().lower()
@@ -1068,7 +2252,7 @@ class PlannerService:
         machine_type = (machine_name or row["machine"] or "").strip().lower()
         if not machine_type:
             return True
-        tiers = available_machines.get(machine_type)
+        tiers = available_machines.tiers_for(machine_type)
         if not tiers:
             return False
         tier = (row["tier"] or "").strip() or (row["machine_item_tier"] or "").strip()
@@ -1081,7 +2265,7 @@ class PlannerService:
     def _recipe_machine_match_rank(
         self,
         row: sqlite3.Row,
-        available_machines: dict[str, dict[str, dict[str, int]]],
+        available_machines: MachineAvailabilityIndex,
     ) -> int:
         if not available_machines:
             return 1
@@ -1092,7 +2276,7 @@ class PlannerService:
         machine_type = (machine_name or row["machine"] or "").strip().lower()
         if not machine_type:
             return 1
-        tiers = available_machines.get(machine_type)
+        tiers = available_machines.tiers_for(machine_type)
         if not tiers:
             return 1
         tier = (row["tier"] or "").strip() or (row["machine_item_tier"] or "").strip()
@@ -0,0 +1,94 @@
+"""Optional linear-programming recipe selection.
+
+The planner's greedy path ranks each item's recipes in isolation. This
+module instead chooses crafts for every candidate recipe at once, so shared
+byproducts and globally cheaper combinations are taken into account. It
+needs SciPy (``scipy.optimize.linprog`` with HiGHS); without it
+``solve_recipe_flows`` returns None and callers keep the greedy choice.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+try:
+    from scipy.optimize import linprog
+    from scipy.sparse import coo_matrix
+except ImportError:  # SciPy is optional; the planner falls back to greedy ranking.
+    linprog = None
+    coo_matrix = None
+
+OBJECTIVES = {
+    "raw": "Fewest raw materials",
+    "eu": "Least energy",
+    "time": "Fastest",
+}
+
+# Crafts below this are solver noise, not a chosen recipe.
+MIN_CRAFTS = 1e-9
+
+
+@dataclass
+class RecipeFlow:
+    """Per-craft expected consumption and production of one recipe."""
+
+    inputs: dict[int, float] = field(default_factory=dict)
+    outputs: dict[int, float] = field(default_factory=dict)
+    cost: float = 0.0
+
+
+def solver_available() -> bool:
+    return linprog is not None
+
+
+def solve_recipe_flows(
+    flows: dict[int, RecipeFlow],
+    buy_costs: dict[int, float],
+    demand: dict[int, float],
+) -> dict[int, float] | None:
+    """Crafts per recipe that cover ``demand`` at the lowest total cost.
+
+    Every item gets one row: production minus consumption plus purchases
+    must reach its demand, and any surplus is allowed, so one recipe's
+    byproduct can feed another. Only items in ``buy_costs`` can be bought.
+    Returns None when no solver is installed or the program has no solution.
+    """
+    if linprog is None:
+        return None
+    recipe_ids = list(flows)
+    bought = list(buy_costs)
+    items = set(buy_costs) | set(demand)
+    for flow in flows.values():
+        items.update(flow.inputs)
+        items.update(flow.outputs)
+    row_of = {item_id: row for row, item_id in enumerate(sorted(items))}
+
+    rows: list[int] = []
+    cols: list[int] = []
+    values: list[float] = []
+    for col, recipe_id in enumerate(recipe_ids):
+        flow = flows[recipe_id]
+        net = dict(flow.outputs)
+        for item_id, qty in flow.inputs.items():
+            net[item_id] = net.get(item_id, 0.0) - qty
+        for item_id, qty in net.items():
+            if qty:
+                rows.append(row_of[item_id])
+                cols.append(col)
+                values.append(-qty)
+    for offset, item_id in enumerate(bought):
+        rows.append(row_of[item_id])
+        cols.append(len(recipe_ids) + offset)
+        values.append(-1.0)
+
+    costs = [flows[recipe_id].cost for recipe_id in recipe_ids] + [buy_costs[item_id] for item_id in bought]
+    bounds = [-demand.get(item_id, 0.0) for item_id in sorted(items)]
+    matrix = coo_matrix((values, (rows, cols)), shape=(len(row_of), len(costs)))
+    result = linprog(costs, A_ub=matrix, b_ub=bounds, bounds=(0, None), method="highs")
+    if result.status != 0:
+        return None
+    return {
+        recipe_id: float(crafts)
+        for recipe_id, crafts in zip(recipe_ids, result.x)
+        if crafts > MIN_CRAFTS
+    }
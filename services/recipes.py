@@ -1,81 +1,355 @@
 from __future__ import annotations
 
+import heapq
+import json
 import sqlite3
 
-from services.db import ALL_TIERS
+from services.db import canonical_name
+from services.machine_availability import MachineAvailabilityIndex, build_machine_availability_index
+from services.tiers import tier_table
 
-def load_online_machine_availability(profile_conn: sqlite3.Connection | None) -> dict[str, set[str]]:
-    if profile_conn is None:
-        return {}
-    rows = profile_conn.execute(
-        "SELECT machine_type, tier, online FROM machine_availability",
-    ).fetchall()
-    available: dict[str, set[str]] = {}
-    for row in rows:
-        online = int(row["online"] or 0)
-        if online <= 0:
-            continue
-        machine_type = (row["machine_type"] or "").strip().lower()
-        if not machine_type:
-            continue
-        tier = (row["tier"] or "").strip()
-        available.setdefault(machine_type, set()).add(tier)
-    return available
-
-def _recipe_machine_available(row: sqlite3.Row, available_machines: dict[str, set[str]]) -> bool:
-    method = (row["method"] or "machine").strip().lower()
-    if method != "machine":
-        return True
-    machine_name = (row["machine_item_name"] or "").strip()
-    machine_type = (machine_name or row["machine"] or "").strip().lower()
-    if not machine_type:
-        return True
-    tiers = available_machines.get(machine_type)
-    if not tiers:
-        return False
-    tier = (row["tier"] or "").strip() or (row["machine_item_tier"] or "").strip()
-    if not tier:
-        return True
-
-    # Check for exact match or higher tier
-    if tier in tiers:
-        return True
+def load_online_machine_availability(profile_conn: sqlite3.Connection | None) -> MachineAvailabilityIndex:
+    return build_machine_availability_index(profile_conn)
 
-    try:
-        req_idx = ALL_TIERS.index(tier)
-        for owned in tiers:
-            try:
-                if ALL_TIERS.index(owned) >= req_idx:
-                    return True
-            except ValueError:
-                continue
-    except ValueError:
-        pass
-
-    return False
+def _availability_filter_params(available_machines: MachineAvailabilityIndex) -> tuple[str, str]:
+    online = [
+        [machine_type, tier, entry.tiers[tier]["rank"]]
+        for machine_type, entry in available_machines.machines.items()
+        for tier in sorted(entry.online_tiers)
+    ]
+    return json.dumps(online), json.dumps(tier_table().ids)
 
 def fetch_recipes(
     conn: sqlite3.Connection,
-    enabled_tiers: list[str],
-    available_machines: dict[str, set[str]] | None = None,
+    enabled_tiers: list[str] | None,
+    available_machines: MachineAvailabilityIndex | None = None,
 ) -> list[sqlite3.Row]:
-    if not enabled_tiers:
-        enabled_tiers = ["Stone Age"]
-    placeholders = ",".join(["?"] * len(enabled_tiers))
-    sql = (
-        "SELECT r.id, r.name, r.method, r.machine, r.machine_item_id, r.grid_size, r.station_item_id, "
-        "       r.tier, r.circuit, r.duration_ticks, r.eu_per_tick, r.duplicate_of_recipe_id, "
-        "       mi.machine_tier AS machine_item_tier, "
-        "       COALESCE(mi.display_name, mi.key) AS machine_item_name "
-        "FROM recipes r "
-        "LEFT JOIN items mi ON mi.id = r.machine_item_id "
-        f"WHERE (r.tier IS NULL OR TRIM(r.tier)='' OR r.tier IN ({placeholders})) "
-        "ORDER BY r.name"
+    """Recipes in name order, limited to ``enabled_tiers`` (``None``: every tier)."""
+    tier_sql = ""
+    if enabled_tiers is not None:
+        if not enabled_tiers:
+            enabled_tiers = ["Stone Age"]
+        placeholders = ",".join(["?"] * len(enabled_tiers))
+        tier_sql = f"WHERE (r.tier IS NULL OR TRIM(r.tier)='' OR r.tier IN ({placeholders}))"
+    params: list = []
+    availability_sql = ""
+    if available_machines is not None and available_machines.has_online:
+        # Online machines and tier ranks are bound as JSON so the filter works on
+        # query_only connections, where temp tables cannot be created.
+        availability_sql = """
+          AND (
+            base.method_key <> 'machine'
+            OR base.machine_type_key = ''
+            OR (
+              EXISTS (SELECT 1 FROM online_machines o WHERE o.machine_type = base.machine_type_key)
+              AND (
+                base.tier_key = ''
+                OR EXISTS (
+                  SELECT 1 FROM online_machines o
+                  WHERE o.machine_type = base.machine_type_key
+                    AND (
+                      o.tier = base.tier_key
+                      OR o.tier_rank >= (SELECT t.tier_rank FROM tier_ranks t WHERE t.tier = base.tier_key)
+                    )
+                )
+              )
+            )
+          )
+        """
+        params.extend(_availability_filter_params(available_machines))
+    else:
+        params.extend(["[]", "{}"])
+    sql = f"""
+        WITH online_machines(machine_type, tier, tier_rank) AS (
+            SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+            FROM json_each(?)
+        ),
+        tier_ranks(tier, tier_rank) AS (
+            SELECT key, value FROM json_each(?)
+        )
+        SELECT id, name, method, machine, machine_item_id, grid_size, station_item_id,
+               tier, circuit, duration_ticks, eu_per_tick, duplicate_of_recipe_id,
+               machine_item_tier, machine_item_name
+        FROM (
+            SELECT r.id, r.name, r.method, r.machine, r.machine_item_id, r.grid_size, r.station_item_id,
+                   r.tier, r.circuit, r.duration_ticks, r.eu_per_tick, r.duplicate_of_recipe_id,
+                   mi.machine_tier AS machine_item_tier,
+                   COALESCE(mi.display_name, mi.key) AS machine_item_name,
+                   LOWER(TRIM(COALESCE(NULLIF(r.method, ''), 'machine'))) AS method_key,
+                   LOWER(TRIM(COALESCE(
+                       NULLIF(TRIM(COALESCE(mi.display_name, mi.key, '')), ''),
+                       NULLIF(r.machine, ''),
+                       ''
+                   ))) AS machine_type_key,
+                   COALESCE(NULLIF(TRIM(COALESCE(r.tier, '')), ''), TRIM(COALESCE(mi.machine_tier, ''))) AS tier_key
+            FROM recipes r
+            LEFT JOIN items mi ON mi.id = r.machine_item_id
+            {tier_sql}
+        ) base
+        WHERE 1=1
+        {availability_sql}
+        ORDER BY name
+    """
+    params.extend(enabled_tiers or ())
+    return conn.execute(sql, tuple(params)).fetchall()
+
+class RecipeTierIndex:
+    """Recipe rows bucketed by tier, so a tier toggle is a bucket lookup.
+
+    Built from ``fetch_recipes(conn, None)``; ``recipes(enabled_tiers)`` then
+    returns what ``fetch_recipes(conn, enabled_tiers)`` would, without a query.
+    Untiered recipes are always included, as in ``fetch_recipes``. Rebuild the
+    index when recipes change.
+    """
+
+    def __init__(self, rows: list[sqlite3.Row]):
+        self._rows = list(rows)
+        self._untiered: list[int] = []
+        self._buckets: dict[str, list[int]] = {}
+        for position, row in enumerate(self._rows):
+            tier = row["tier"]
+            if tier is None or not tier.strip(" "):  # SQL TRIM() strips spaces only
+                self._untiered.append(position)
+            else:
+                self._buckets.setdefault(tier, []).append(position)
+
+    def recipes(self, enabled_tiers: list[str]) -> list[sqlite3.Row]:
+        if not enabled_tiers:
+            enabled_tiers = ["Stone Age"]
+        buckets = [self._untiered] + [self._buckets[tier] for tier in dict.fromkeys(enabled_tiers) if tier in self._buckets]
+        return [self._rows[position] for position in heapq.merge(*buckets)]
+
+# Columns written by save_recipe, in the order of the recipe mapping it takes.
+RECIPE_FIELDS = (
+    "name",
+    "method",
+    "machine",
+    "machine_item_id",
+    "grid_size",
+    "station_item_id",
+    "circuit",
+    "tier",
+    "duration_ticks",
+    "eu_per_tick",
+    "notes",
+    "max_tier",
+    "is_perfect_overclock",
+)
+_RECIPE_DEFAULTS = {"method": "machine", "is_perfect_overclock": 0}
+
+# Each statement takes the RECIPE_FIELDS values followed by canonical_name(name).
+_INSERT_RECIPE_SQL = (
+    f"INSERT INTO recipes({', '.join(RECIPE_FIELDS)}, name_canonical, duplicate_of_recipe_id) "
+    f"VALUES({', '.join(['?'] * (len(RECIPE_FIELDS) + 2))})"
+)
+_UPDATE_RECIPE_SQL = (
+    f"UPDATE recipes SET {', '.join(f'{field}=?' for field in RECIPE_FIELDS)}, name_canonical=? WHERE id=?"
+)
+_UPDATE_VARIANT_SQL = (
+    f"UPDATE recipes SET {', '.join(f'{field}=?' for field in RECIPE_FIELDS)}, name_canonical=?, "
+    "duplicate_of_recipe_id=? WHERE id=?"
+)
+_INSERT_LINE_SQL = """
+    INSERT INTO recipe_lines(
+        recipe_id, direction, item_id, qty_count, qty_liters,
+        chance_percent, consumption_chance, output_slot_index, input_slot_index
+    )
+    VALUES(?,?,?,?,?,?,?,?,?)
+"""
+
+def recipes_version(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM app_settings WHERE key='recipes_version'").fetchone()
+    return int(row["value"] or 0) if row else 0
+
+def save_recipe(
+    conn: sqlite3.Connection,
+    recipe: dict,
+    inputs: list[dict],
+    outputs: list[dict],
+    *,
+    recipe_id: int | None = None,
+    name_item_id: int | None = None,
+    sync_variants: bool = True,
+) -> int:
+    """Insert a recipe, or update ``recipe_id``, with its lines in one transaction.
+
+    ``recipe`` maps ``RECIPE_FIELDS`` (missing ones take the column default)
+    and lines are the editor's dicts. With ``sync_variants``, every output
+    other than ``name_item_id`` without a canonical recipe of its own gets a
+    duplicate variant carrying the same fields and lines, and stale variants
+    are removed. ``recipes_version`` is bumped once per save. Returns the
+    recipe id; on error nothing is written.
+    """
+    values = tuple(recipe.get(field, _RECIPE_DEFAULTS.get(field)) for field in RECIPE_FIELDS)
+    values += (canonical_name(values[0]),)
+    with conn:
+        if recipe_id is None:
+            recipe_id = int(conn.execute(_INSERT_RECIPE_SQL, values + (None,)).lastrowid)
+        else:
+            conn.execute(_UPDATE_RECIPE_SQL, values + (recipe_id,))
+            conn.execute("DELETE FROM recipe_lines WHERE recipe_id=?", (recipe_id,))
+        line_ids = [recipe_id]
+        if sync_variants:
+            line_ids.extend(_sync_output_variants(conn, recipe_id, values, outputs, name_item_id))
+        conn.executemany(
+            _INSERT_LINE_SQL,
+            [params for line_recipe_id in line_ids for params in _recipe_line_params(line_recipe_id, inputs, outputs)],
+        )
+        conn.execute(
+            """
+            UPDATE app_settings
+            SET value = CAST(COALESCE(value, '0') AS INTEGER) + 1
+            WHERE key = 'recipes_version'
+            """
+        )
+    return recipe_id
+
+def _recipe_line_params(recipe_id: int, inputs: list[dict], outputs: list[dict]) -> list[tuple]:
+    params = []
+    for direction, lines in (("in", inputs), ("out", outputs)):
+        for line in lines:
+            is_liquid = line["kind"] in ("fluid", "gas")
+            params.append(
+                (
+                    recipe_id,
+                    direction,
+                    line["item_id"],
+                    None if is_liquid else line["qty_count"],
+                    line["qty_liters"] if is_liquid else None,
+                    line.get("chance_percent", 100.0) if direction == "out" else None,
+                    line.get("consumption_chance", 1.0) if direction == "in" else 1.0,
+                    line.get("output_slot_index") if direction == "out" else None,
+                    line.get("input_slot_index") if direction == "in" else None,
+                )
+            )
+    return params
+
+def _sync_output_variants(
+    conn: sqlite3.Connection,
+    base_recipe_id: int,
+    values: tuple,
+    outputs: list[dict],
+    name_item_id: int | None,
+) -> list[int]:
+    """Bring the duplicate variants of ``base_recipe_id`` in line with its outputs.
+
+    Stale variants are deleted; kept and new ones are written without lines.
+    Returns the ids of the variants that need lines.
+    """
+    item_ids = [
+        int(line["item_id"])
+        for line in outputs
+        if line.get("item_id") is not None and line["item_id"] != name_item_id
+    ]
+    item_names = {
+        row["id"]: row["name"]
+        for row in conn.execute(
+            "SELECT id, COALESCE(display_name, key) AS name FROM items WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(item_ids),),
+        )
+    }
+    wanted: dict[str, str] = {}
+    for line in outputs:
+        item_id = line.get("item_id")
+        if item_id is None or item_id == name_item_id:
+            continue
+        name = item_names.get(int(item_id)) or (line.get("name") or "")
+        if name:
+            wanted[canonical_name(name)] = name
+    # Outputs that already have a canonical recipe of their own get no variant.
+    taken = {
+        row["name_canonical"]
+        for row in conn.execute(
+            """
+            SELECT DISTINCT name_canonical FROM recipes
+            WHERE name_canonical IN (SELECT value FROM json_each(?)) AND duplicate_of_recipe_id IS NULL
+            """,
+            (json.dumps(list(wanted)),),
+        )
+    }
+    desired = {canon: name for canon, name in wanted.items() if canon not in taken}
+
+    existing = {
+        canonical_name(row["name"]): int(row["id"])
+        for row in conn.execute("SELECT id, name FROM recipes WHERE duplicate_of_recipe_id=?", (base_recipe_id,))
+        if row["name"]
+    }
+    kept = [(existing[canon], name) for canon, name in desired.items() if canon in existing]
+    rewritten = [recipe_id for canon, recipe_id in existing.items() if canon not in desired] + [
+        recipe_id for recipe_id, _name in kept
+    ]
+    conn.execute(
+        "DELETE FROM recipe_lines WHERE recipe_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(rewritten),),
     )
-    rows = conn.execute(sql, tuple(enabled_tiers)).fetchall()
-    if not available_machines:
-        return rows
-    return [row for row in rows if _recipe_machine_available(row, available_machines)]
+    conn.executemany(
+        "DELETE FROM recipes WHERE id=?",
+        [(recipe_id,) for canon, recipe_id in existing.items() if canon not in desired],
+    )
+    conn.executemany(
+        _UPDATE_VARIANT_SQL,
+        [(name,) + values[1:-1] + (canonical_name(name), base_recipe_id, recipe_id) for recipe_id, name in kept],
+    )
+    variant_ids = [recipe_id for recipe_id, _name in kept]
+    for canon, name in desired.items():
+        if canon not in existing:
+            cursor = conn.execute(_INSERT_RECIPE_SQL, (name,) + values[1:-1] + (canon, base_recipe_id))
+            variant_ids.append(int(cursor.lastrowid))
+    return variant_ids
+
+def search_recipe_ids_by_output(conn: sqlite3.Connection, search_text: str) -> set[int]:
+    """Ids of recipes with an output whose name, kind or material contains ``search_text``.
+
+    Matching items are found first and their output lines are reached through
+    ``idx_recipe_lines_item``, so the statement never carries a recipe id list.
+    """
+    query = (search_text or "").strip().casefold()
+    if not query:
+        return set()
+    pattern = f"%{query}%"
+    rows = conn.execute(
+        """
+        WITH matched_items AS (
+            SELECT i.id
+            FROM items i
+            LEFT JOIN item_kinds k ON k.id = i.item_kind_id
+            LEFT JOIN materials m ON m.id = i.material_id
+            WHERE LOWER(COALESCE(i.display_name, i.key, '')) LIKE ?
+               OR LOWER(COALESCE(k.name, '')) LIKE ?
+               OR LOWER(COALESCE(m.name, '')) LIKE ?
+               OR LOWER(COALESCE(i.kind, '')) LIKE ?
+        )
+        SELECT DISTINCT rl.recipe_id
+        FROM matched_items mi
+        JOIN recipe_lines rl ON rl.item_id = mi.id AND rl.direction='out'
+        """,
+        (pattern, pattern, pattern, pattern),
+    ).fetchall()
+    return {row["recipe_id"] for row in rows}
+
+def fetch_recipe_outputs(conn: sqlite3.Connection, recipe_ids: list[int]) -> list[sqlite3.Row]:
+    # The ids travel as one JSON parameter: no SQLITE_MAX_VARIABLE_NUMBER limit
+    # and one statement text for the statement cache whatever the list size.
+    if not recipe_ids:
+        return []
+    return conn.execute(
+        """
+        SELECT rl.recipe_id,
+               rl.item_id,
+               i.kind,
+               COALESCE(i.display_name, i.key) AS item_name,
+               k.name AS item_kind_name,
+               m.name AS material_name
+        FROM recipe_lines rl
+        JOIN items i ON i.id = rl.item_id
+        LEFT JOIN item_kinds k ON k.id = i.item_kind_id
+        LEFT JOIN materials m ON m.id = i.material_id
+        WHERE rl.direction='out'
+          AND rl.recipe_id IN (SELECT value FROM json_each(?))
+        ORDER BY rl.recipe_id, rl.id
+        """,
+        (json.dumps([int(recipe_id) for recipe_id in recipe_ids]),),
+    ).fetchall()
 
 def fetch_recipe_lines(conn: sqlite3.Connection, recipe_id: int) -> list[sqlite3.Row]:
     return conn.execute(
@@ -0,0 +1,122 @@
+"""Opt-in startup phase timings.
+
+Enable with the ``GTNH_PROFILE_STARTUP`` environment variable or the
+``--profile-startup[=PATH]`` command-line flag. A value of ``1`` prints the
+report to stderr; a path ending in ``.json`` receives a JSON report and any
+other path a plain-text log. When disabled, ``phase()`` costs one attribute
+check.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Mapping, Sequence
+
+ENV_VAR = "GTNH_PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+
+
+@dataclass
+class StartupProfiler:
+    enabled: bool = False
+    output: Path | None = None
+    origin: float = field(default_factory=time.perf_counter)
+    phases: list[dict[str, object]] = field(default_factory=list)
+    finished: bool = False
+    _depth: int = field(default=0, repr=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled or self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases.append(
+                {
+                    "name": name,
+                    "depth": depth,
+                    "start_ms": round((start - self.origin) * 1000, 3),
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+            )
+
+    def report(self) -> dict[str, object]:
+        return {
+            "total_ms": round((time.perf_counter() - self.origin) * 1000, 3),
+            "phases": sorted(self.phases, key=lambda phase: (phase["start_ms"], phase["depth"])),
+        }
+
+    def format_report(self, report: dict[str, object] | None = None) -> str:
+        report = report or self.report()
+        lines = [f"startup total: {report['total_ms']:.1f} ms"]
+        for phase in report["phases"]:
+            indent = "  " * (int(phase["depth"]) + 1)
+            lines.append(f"{phase['duration_ms']:10.1f} ms {indent}{phase['name']}")
+        return "\n".join(lines) + "\n"
+
+    def finish(self) -> dict[str, object] | None:
+        """Stop recording and write the report once; later calls are no-ops."""
+        if not self.enabled or self.finished:
+            return None
+        report = self.report()
+        self.finished = True
+        if self.output is None:
+            sys.stderr.write(self.format_report(report))
+        elif self.output.suffix.lower() == ".json":
+            self.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        else:
+            self.output.write_text(self.format_report(report), encoding="utf-8")
+        return report
+
+
+_profiler = StartupProfiler()
+
+
+def startup_profiler() -> StartupProfiler:
+    return _profiler
+
+
+def _parse_target(value: str | None) -> tuple[bool, Path | None]:
+    value = (value or "").strip()
+    if not value or value.lower() in {"0", "false", "no", "off"}:
+        return False, None
+    if value.lower() in {"1", "true", "yes", "on"}:
+        return True, None
+    return True, Path(value)
+
+
+def configure_startup_profiler(
+    argv: Sequence[str] | None = None,
+    environ: Mapping[str, str] | None = None,
+) -> tuple[StartupProfiler, list[str]]:
+    """Install the process-wide profiler from the CLI flag or env var.
+
+    Returns the profiler and ``argv`` with the profiling flag removed. The
+    flag wins over the environment variable; the clock starts here.
+    """
+    global _profiler
+    argv = list(sys.argv if argv is None else argv)
+    environ = os.environ if environ is None else environ
+    enabled, output = _parse_target(environ.get(ENV_VAR))
+    remaining = []
+    for arg in argv:
+        if arg == CLI_FLAG:
+            enabled, output = True, None
+        elif arg.startswith(f"{CLI_FLAG}="):
+            enabled, output = _parse_target(arg.split("=", 1)[1])
+        else:
+            remaining.append(arg)
+    _profiler = StartupProfiler(enabled=enabled, output=output)
+    return _profiler, remaining
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
 import math
 import sqlite3
-from typing import Any
+from typing import Any, Iterable, Mapping
+
+from services.db import CONTENT_SCHEMA, attached_content
 
 
 MAIN_STORAGE_NAME = "Main Storage"
@@ -126,25 +129,24 @@ def validate_storage_fit_for_item(
     known_item_stack_sizes: dict[int, int] | None = None,
     known_container_item_ids: set[int] | None = None,
 ) -> dict[str, int | float | bool | None]:
+    """Projected fit of a storage with the item's row set to the given quantities.
+
+    Without the ``known_*`` maps, item metadata comes from the content DB when
+    it is attached to ``conn``; otherwise every item counts as a 64-stack.
+    """
     storage = conn.execute(
         "SELECT slot_count, liter_capacity FROM storage_units WHERE id=?",
         (storage_id,),
     ).fetchone()
     if storage is None:
-        return {
-            "fits": False,
-            "fits_slots": False,
-            "fits_liters": False,
-            "slot_count": None,
-            "slot_usage": 0,
-            "slot_overflow": 0,
-            "liter_capacity": None,
-            "liter_usage": 0,
-            "liter_overflow": 0,
-        }
+        return storage_fit(None, slot_usage=0, liter_usage=0)
 
-    slot_count = storage["slot_count"]
-    liter_capacity = storage["liter_capacity"]
+    if known_item_stack_sizes is None and known_container_item_ids is None and attached_content(conn):
+        slot_usage, liter_usage = _joined_storage_usage(conn, storage_id, exclude_item_id=item_id)
+        if not _is_container_item(conn, item_id):
+            slot_usage += assignment_slot_usage(qty_count, item_max_stack_size)
+        liter_usage += float(qty_liters or 0)
+        return storage_fit(storage, slot_usage=slot_usage, liter_usage=liter_usage)
 
     rows = conn.execute(
         "SELECT item_id, qty_count, qty_liters FROM storage_assignments WHERE storage_id=?",
@@ -174,6 +176,75 @@ def validate_storage_fit_for_item(
             slot_usage += assignment_slot_usage(qty_count, item_max_stack_size)
         liter_usage += float(qty_liters or 0)
 
+    return storage_fit(storage, slot_usage=slot_usage, liter_usage=liter_usage)
+
+
+# Container items provide space rather than occupy it, so they use no slots.
+_CONTAINER_ITEM_SQL = "(COALESCE(i.is_storage_container, 0)=1 OR COALESCE(i.storage_slot_count, 0)>0)"
+
+
+def _joined_storage_usage(
+    conn: sqlite3.Connection,
+    storage_id: int,
+    *,
+    exclude_item_id: int | None = None,
+) -> tuple[int, float]:
+    """Slot and liter usage of a storage, reading item metadata from the attached content DB."""
+    row = conn.execute(
+        f"""
+        SELECT
+            COALESCE(SUM(
+                CASE WHEN u.qty <= 0 OR u.is_container THEN 0
+                ELSE CAST(u.qty / u.stack AS INTEGER) + (u.qty / u.stack > CAST(u.qty / u.stack AS INTEGER))
+                END
+            ), 0) AS slot_usage,
+            COALESCE(SUM(u.liters), 0) AS liter_usage
+        FROM (
+            SELECT
+                COALESCE(a.qty_count, 0) * 1.0 AS qty,
+                COALESCE(a.qty_liters, 0) AS liters,
+                MAX(1, COALESCE(NULLIF(i.max_stack_size, 0), 64)) AS stack,
+                {_CONTAINER_ITEM_SQL} AS is_container
+            FROM storage_assignments a
+            LEFT JOIN {CONTENT_SCHEMA}.items i ON i.id = a.item_id
+            WHERE a.storage_id=? AND a.item_id IS NOT ?
+        ) u
+        """,
+        (storage_id, exclude_item_id),
+    ).fetchone()
+    return int(row["slot_usage"]), float(row["liter_usage"])
+
+
+def _is_container_item(conn: sqlite3.Connection, item_id: int) -> bool:
+    row = conn.execute(
+        f"SELECT {_CONTAINER_ITEM_SQL} AS is_container FROM {CONTENT_SCHEMA}.items i WHERE i.id=?",
+        (item_id,),
+    ).fetchone()
+    return bool(row and row["is_container"])
+
+
+def storage_fit(
+    storage: Mapping[str, Any] | None,
+    *,
+    slot_usage: int,
+    liter_usage: float,
+) -> dict[str, int | float | bool | None]:
+    """Fit/overflow summary for a ``storage_units`` row given its projected usage."""
+    if storage is None:
+        return {
+            "fits": False,
+            "fits_slots": False,
+            "fits_liters": False,
+            "slot_count": None,
+            "slot_usage": 0,
+            "slot_overflow": 0,
+            "liter_capacity": None,
+            "liter_usage": 0,
+            "liter_overflow": 0,
+        }
+
+    slot_count = storage["slot_count"]
+    liter_capacity = storage["liter_capacity"]
     if slot_count is None:
         fits_slots = True
         slot_overflow = 0
@@ -246,15 +317,26 @@ def aggregated_assignment_rows(conn: sqlite3.Connection) -> list[sqlite3.Row]:
     ).fetchall()
 
 
-def aggregated_assignment_rows_for_planner(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+def aggregated_assignment_rows_for_planner(
+    conn: sqlite3.Connection,
+    *,
+    with_kinds: bool = False,
+) -> list[sqlite3.Row]:
+    """Planner-usable quantities per item; ``with_kinds`` adds the attached content DB's item kind."""
+    kind_column = kind_join = ""
+    if with_kinds:
+        kind_column = ", i.kind"
+        kind_join = f"LEFT JOIN {CONTENT_SCHEMA}.items i ON i.id = a.item_id"
     return conn.execute(
-        """
+        f"""
         SELECT
             a.item_id,
             SUM(a.qty_count) AS qty_count,
             SUM(a.qty_liters) AS qty_liters
+            {kind_column}
         FROM storage_assignments a
         INNER JOIN storage_units s ON s.id = a.storage_id
+        {kind_join}
         WHERE s.allow_planner_use = 1
           AND a.locked = 0
         GROUP BY a.item_id
@@ -372,6 +454,156 @@ def consume_assignment_qty_for_planner(
     return consumed_total
 
 
+
+AssignmentKey = tuple[int, int]  # (storage_id, item_id)
+
+
+def resolve_inventory_adjustments(
+    rows: Mapping[int, Mapping[int, Mapping[str, Any]]],
+    storages: Mapping[int, tuple[int, bool]],
+    adjustments: Iterable[tuple[int, int]],
+    *,
+    item_kinds: Mapping[int, str],
+    storage_id: int | None,
+    consume_by_priority: bool = False,
+) -> dict[AssignmentKey, dict[str, Any] | None]:
+    """Work out the final assignment rows for ``(item_id, delta)`` adjustments.
+
+    ``rows`` maps item id -> storage id -> assignment row and ``storages`` maps
+    storage id -> (priority, allow_planner_use); neither is modified. Each
+    adjustment behaves like ``adjust_assignment_qty_for_storage`` on
+    ``storage_id``, except that with ``consume_by_priority`` a negative delta
+    drains planner-usable, unlocked assignments in priority order like
+    ``consume_assignment_qty_for_planner``. Adjustments are applied in order, so
+    repeated items see the effect of earlier entries; entries needing a storage
+    are skipped when ``storage_id`` is None. Returns the new row (or None for a
+    deleted row) of every touched assignment.
+    """
+    changes: dict[AssignmentKey, dict[str, Any] | None] = {}
+
+    def row_for(key: AssignmentKey) -> Mapping[str, Any] | None:
+        if key in changes:
+            return changes[key]
+        return rows.get(key[1], {}).get(key[0])
+
+    def current_qty(row: Mapping[str, Any] | None, qty_column: str) -> int:
+        try:
+            return int(float((row or {}).get(qty_column) or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def set_qty(key: AssignmentKey, qty_column: str, qty: int, locked: bool) -> None:
+        if qty <= 0:
+            changes[key] = None
+            return
+        changes[key] = {
+            "qty_count": qty if qty_column == "qty_count" else None,
+            "qty_liters": qty if qty_column == "qty_liters" else None,
+            "locked": 1 if locked else 0,
+        }
+
+    for item_id, delta in adjustments:
+        item_id, delta = int(item_id), int(delta or 0)
+        if not delta:
+            continue
+        qty_column = "qty_liters" if (item_kinds.get(item_id) or "").strip().lower() in ("fluid", "gas") else "qty_count"
+        if delta < 0 and consume_by_priority:
+            storage_ids = set(rows.get(item_id, {})) | {key[0] for key in changes if key[1] == item_id}
+            candidates = []
+            for candidate_storage_id in storage_ids:
+                key = (candidate_storage_id, item_id)
+                row = row_for(key)
+                priority, allow_planner_use = storages.get(candidate_storage_id, (0, False))
+                if row is None or int(row["locked"] or 0) or not allow_planner_use:
+                    continue
+                available = current_qty(row, qty_column)
+                if available > 0:
+                    candidates.append((-priority, candidate_storage_id, available))
+            remaining = -delta
+            for _priority, candidate_storage_id, available in sorted(candidates):
+                if remaining <= 0:
+                    break
+                used = min(available, remaining)
+                set_qty((candidate_storage_id, item_id), qty_column, available - used, False)
+                remaining -= used
+            continue
+        if storage_id is None:
+            continue
+        key = (int(storage_id), item_id)
+        row = row_for(key)
+        locked = bool(int(row["locked"] or 0)) if row is not None else False
+        set_qty(key, qty_column, max(current_qty(row, qty_column) + delta, 0), locked)
+    return changes
+
+
+def write_assignment_rows(
+    conn: sqlite3.Connection,
+    changes: Mapping[AssignmentKey, Mapping[str, Any] | None],
+) -> None:
+    """Persist resolved assignment rows with one DELETE and one upsert batch."""
+    deletes = [key for key in sorted(changes) if changes[key] is None]
+    upserts = [
+        (key[0], key[1], row["qty_count"], row["qty_liters"], 1 if int(row["locked"] or 0) else 0)
+        for key, row in sorted(changes.items())
+        if row is not None
+    ]
+    if deletes:
+        conn.executemany("DELETE FROM storage_assignments WHERE storage_id=? AND item_id=?", deletes)
+    if upserts:
+        conn.executemany(
+            """
+            INSERT INTO storage_assignments(storage_id, item_id, qty_count, qty_liters, locked)
+            VALUES(?, ?, ?, ?, ?)
+            ON CONFLICT(storage_id, item_id)
+            DO UPDATE SET qty_count=excluded.qty_count, qty_liters=excluded.qty_liters, locked=excluded.locked
+            """,
+            upserts,
+        )
+
+
+def apply_inventory_adjustments(
+    conn: sqlite3.Connection,
+    adjustments: Iterable[tuple[int, int]],
+    *,
+    item_kinds: Mapping[int, str],
+    storage_id: int | None,
+    consume_by_priority: bool = False,
+) -> None:
+    """Apply ``(item_id, delta)`` adjustments with one read and batched writes.
+
+    See ``resolve_inventory_adjustments`` for the semantics.
+    """
+    adjustments = [(int(item_id), int(delta or 0)) for item_id, delta in adjustments]
+    adjustments = [(item_id, delta) for item_id, delta in adjustments if delta]
+    if not adjustments:
+        return
+
+    storages = {
+        int(row["id"]): (int(row["priority"] or 0), bool(row["allow_planner_use"]))
+        for row in conn.execute("SELECT id, priority, allow_planner_use FROM storage_units").fetchall()
+    }
+    rows: dict[int, dict[int, dict[str, Any]]] = {}
+    item_ids = sorted({item_id for item_id, _delta in adjustments})
+    for row in conn.execute(
+        """
+        SELECT storage_id, item_id, qty_count, qty_liters, locked
+        FROM storage_assignments
+        WHERE item_id IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(item_ids),),
+    ).fetchall():
+        rows.setdefault(int(row["item_id"]), {})[int(row["storage_id"])] = dict(row)
+    changes = resolve_inventory_adjustments(
+        rows,
+        storages,
+        adjustments,
+        item_kinds=item_kinds,
+        storage_id=storage_id,
+        consume_by_priority=consume_by_priority,
+    )
+    write_assignment_rows(conn, changes)
+
+
 def storage_inventory_totals(conn: sqlite3.Connection, storage_id: int | None = None) -> dict[str, float | int]:
     """Return assignment/totals summary for one storage or all storages."""
     if storage_id is None:
@@ -467,20 +699,25 @@ def placed_container_count(
     return int(row["c"] or 0)
 
 
-def recompute_storage_slot_capacities(
-    conn: sqlite3.Connection,
-    player_slots: int = 36,
-    *,
-    content_conn: sqlite3.Connection | None = None,
-) -> None:
-    source = content_conn or conn
-    item_cols = {row["name"] for row in source.execute("PRAGMA table_info(items)").fetchall()}
+def _content_items(conn: sqlite3.Connection, content_conn: sqlite3.Connection | None) -> tuple[sqlite3.Connection, str]:
+    """Connection and schema to read content ``items`` from for profile ``conn``.
+
+    A content DB attached to ``conn`` wins, so lookups become joins on ``conn``.
+    """
+    if attached_content(conn):
+        return conn, CONTENT_SCHEMA
+    return content_conn or conn, "main"
+
+
+def _container_capacity_sql(source: sqlite3.Connection, schema: str = "main") -> str:
+    """SELECT of ``id, slot_capacity, liter_capacity`` per container in ``schema.items``."""
+    item_cols = {row["name"] for row in source.execute(f"PRAGMA {schema}.table_info(items)").fetchall()}
     has_content_qty = "content_qty_liters" in item_cols
     has_content_fluid = "content_fluid_id" in item_cols
     has_kind = "kind" in item_cols
 
     qty_expr = "COALESCE(i.content_qty_liters, 0)" if has_content_qty else "0"
-    join_clause = "LEFT JOIN items content ON content.id = i.content_fluid_id" if has_content_fluid else ""
+    join_clause = f"LEFT JOIN {schema}.items content ON content.id = i.content_fluid_id" if has_content_fluid else ""
 
     kind_checks: list[str] = []
     if has_content_fluid:
@@ -497,47 +734,136 @@ def recompute_storage_slot_capacities(
         kind_checks.append("WHEN COALESCE(i.content_qty_liters, 0) > 0 THEN 'fluid'")
     kind_expr = ("CASE " + " ".join(kind_checks) + " ELSE 'item' END") if kind_checks else "'item'"
 
-    container_rows = source.execute(
-        f"""
+    return f"""
         SELECT
             i.id,
-            COALESCE(i.storage_slot_count, 0) AS storage_slot_count,
-            {qty_expr} AS content_qty_liters,
-            {kind_expr} AS container_storage_kind
-        FROM items i
+            COALESCE(i.storage_slot_count, 0) AS slot_capacity,
+            CASE WHEN {kind_expr} IN ('fluid', 'gas') THEN {qty_expr} ELSE 0 END AS liter_capacity
+        FROM {schema}.items i
         {join_clause}
-        """
-    ).fetchall()
-    slot_map = {int(r["id"]): int(r["storage_slot_count"] or 0) for r in container_rows}
-    liter_map = {
-        int(r["id"]): (float(r["content_qty_liters"] or 0) if str(r["container_storage_kind"] or "").lower() in ("fluid", "gas") else 0.0)
-        for r in container_rows
+    """
+
+
+def container_capacities(
+    source: sqlite3.Connection,
+    item_ids: Iterable[int] | None = None,
+    *,
+    schema: str = "main",
+) -> dict[int, tuple[int, float]]:
+    """Slots and liters one placed container of each item adds to a storage.
+
+    ``source`` is the content DB (or any connection with an ``items`` table in
+    ``schema``); pass ``item_ids`` to look up only those items.
+    """
+    sql = f"SELECT * FROM ({_container_capacity_sql(source, schema)}) c"
+    params: tuple[str, ...] = ()
+    if item_ids is not None:
+        sql += " WHERE c.id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(sorted({int(item_id) for item_id in item_ids})),)
+    return {
+        int(r["id"]): (int(r["slot_capacity"] or 0), float(r["liter_capacity"] or 0))
+        for r in source.execute(sql, params).fetchall()
     }
 
-    storages = list_storage_units(conn)
-    for storage in storages:
-        storage_id = int(storage["id"])
-        placed_rows = conn.execute(
-            """
-            SELECT p.item_id, p.placed_count
+
+def place_storage_containers(
+    conn: sqlite3.Connection,
+    *,
+    storage_id: int,
+    item_id: int,
+    placed_count: int,
+    content_conn: sqlite3.Connection | None = None,
+) -> None:
+    """Set a container placement and shift the storage's capacity by the difference.
+
+    Touches one placement row and one storage row instead of rebuilding every
+    storage; ``recompute_storage_slot_capacities`` remains the full rebuild and
+    is used here when the storage's capacity has never been computed.
+    """
+    placed = max(0, int(placed_count))
+    row = conn.execute(
+        "SELECT placed_count FROM storage_container_placements WHERE storage_id=? AND item_id=?",
+        (storage_id, item_id),
+    ).fetchone()
+    delta = placed - (int(row["placed_count"] or 0) if row else 0)
+    set_storage_container_placement(conn, storage_id=storage_id, item_id=item_id, placed_count=placed)
+    storage = conn.execute(
+        "SELECT slot_count, liter_capacity FROM storage_units WHERE id=?",
+        (storage_id,),
+    ).fetchone()
+    if storage is None:
+        return
+    if storage["slot_count"] is None or storage["liter_capacity"] is None:
+        recompute_storage_slot_capacities(conn, content_conn=content_conn, storage_ids=(storage_id,))
+        return
+    if not delta:
+        return
+    source, schema = _content_items(conn, content_conn)
+    slots, liters = container_capacities(source, (item_id,), schema=schema).get(int(item_id), (0, 0.0))
+    if not slots and not liters:
+        return
+    conn.execute(
+        """
+        UPDATE storage_units
+        SET slot_count=slot_count + ?, liter_capacity=liter_capacity + ?
+        WHERE id=?
+        """,
+        (delta * slots, delta * liters, storage_id),
+    )
+
+
+def recompute_storage_slot_capacities(
+    conn: sqlite3.Connection,
+    player_slots: int = 36,
+    *,
+    content_conn: sqlite3.Connection | None = None,
+    storage_ids: Iterable[int] | None = None,
+) -> int:
+    """Rebuild storage capacities from their container placements.
+
+    This is the full rebuild behind the incremental ``place_storage_containers``
+    updates; pass ``storage_ids`` to rebuild only those storages. Only rows whose
+    capacity changed are written. Returns the number of storages updated.
+    """
+    wanted = None if storage_ids is None else {int(storage_id) for storage_id in storage_ids}
+    source, schema = _content_items(conn, content_conn)
+    totals: dict[int, tuple[int, float]] = {}
+    if source is conn:
+        # Placements and container metadata are reachable from one connection.
+        for row in conn.execute(
+            f"""
+            SELECT
+                p.storage_id,
+                SUM(p.placed_count * c.slot_capacity) AS slot_capacity,
+                SUM(p.placed_count * c.liter_capacity) AS liter_capacity
             FROM storage_container_placements p
-            WHERE p.storage_id=?
-            """,
-            (storage_id,),
-        ).fetchall()
-        slots_from_containers = sum(
-            int(row["placed_count"] or 0) * int(slot_map.get(int(row["item_id"]), 0))
-            for row in placed_rows
-        )
-        liters_from_containers = sum(
-            int(row["placed_count"] or 0) * float(liter_map.get(int(row["item_id"]), 0.0))
-            for row in placed_rows
-        )
-        base_slots = int(player_slots) if str(storage.get("name") or "") == MAIN_STORAGE_NAME else 0
-        conn.execute(
-            "UPDATE storage_units SET slot_count=?, liter_capacity=? WHERE id=?",
-            (base_slots + slots_from_containers, liters_from_containers, storage_id),
-        )
+            JOIN ({_container_capacity_sql(conn, schema)}) c ON c.id = p.item_id
+            GROUP BY p.storage_id
+            """
+        ).fetchall():
+            totals[int(row["storage_id"])] = (int(row["slot_capacity"] or 0), float(row["liter_capacity"] or 0))
+    else:
+        placements = conn.execute("SELECT storage_id, item_id, placed_count FROM storage_container_placements").fetchall()
+        capacities = container_capacities(source, {int(row["item_id"]) for row in placements}) if placements else {}
+        for row in placements:
+            slots, liters = capacities.get(int(row["item_id"]), (0, 0.0))
+            placed = int(row["placed_count"] or 0)
+            storage_slots, storage_liters = totals.get(int(row["storage_id"]), (0, 0.0))
+            totals[int(row["storage_id"])] = (storage_slots + placed * slots, storage_liters + placed * liters)
+
+    updates: list[tuple[int, float, int]] = []
+    for storage in list_storage_units(conn):
+        storage_id = int(storage["id"])
+        if wanted is not None and storage_id not in wanted:
+            continue
+        slots, liters = totals.get(storage_id, (0, 0.0))
+        if str(storage.get("name") or "") == MAIN_STORAGE_NAME:
+            slots += int(player_slots)
+        if storage.get("slot_count") != slots or storage.get("liter_capacity") != liters:
+            updates.append((slots, liters, storage_id))
+    if updates:
+        conn.executemany("UPDATE storage_units SET slot_count=?, liter_capacity=? WHERE id=?", updates)
+    return len(updates)
 
 
 def storage_slot_usage(
@@ -547,20 +873,24 @@ def storage_slot_usage(
     known_item_stack_sizes: dict[int, int] | None = None,
     known_container_item_ids: set[int] | None = None,
 ) -> dict[str, int | None]:
+    """Slot capacity and usage of a storage; item metadata as in ``validate_storage_fit_for_item``."""
     storage = conn.execute("SELECT slot_count FROM storage_units WHERE id=?", (storage_id,)).fetchone()
     slot_count = int(storage["slot_count"]) if storage and storage["slot_count"] is not None else None
 
-    rows = conn.execute(
-        "SELECT item_id, qty_count FROM storage_assignments WHERE storage_id=?",
-        (storage_id,),
-    ).fetchall()
-    used = 0
-    for row in rows:
-        item_id = int(row["item_id"])
-        if item_id in (known_container_item_ids or set()):
-            continue
-        stack_size = (known_item_stack_sizes or {}).get(item_id, 64)
-        used += assignment_slot_usage(row["qty_count"], stack_size)
+    if known_item_stack_sizes is None and known_container_item_ids is None and attached_content(conn):
+        used = _joined_storage_usage(conn, storage_id)[0]
+    else:
+        rows = conn.execute(
+            "SELECT item_id, qty_count FROM storage_assignments WHERE storage_id=?",
+            (storage_id,),
+        ).fetchall()
+        used = 0
+        for row in rows:
+            item_id = int(row["item_id"])
+            if item_id in (known_container_item_ids or set()):
+                continue
+            stack_size = (known_item_stack_sizes or {}).get(item_id, 64)
+            used += assignment_slot_usage(row["qty_count"], stack_size)
 
     free = None if slot_count is None else max(0, int(slot_count - used))
     return {"slot_count": slot_count, "slot_used": int(used), "slot_free": free}
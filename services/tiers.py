@@ -0,0 +1,113 @@
+"""Global tier registry.
+
+Tier names are interned to small integer ids (their position in the configured
+tier list) so hot paths compare ints instead of normalizing strings. The
+registry is versioned; anything that caches ranks should key on ``version``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+DEFAULT_TIERS = (
+    "Stone Age",
+    "Steam Age",
+    "ULV",
+    "LV",
+    "MV",
+    "HV",
+    "EV",
+    "IV",
+    "LuV",
+    "ZPM",
+    "UV",
+    "UHV",
+    "UEV",
+    "UIV",
+    "UMV",
+    "UXV",
+    "OpV",
+    "MAX",
+)
+
+# Legacy list view of the registry for callers that still read ``ALL_TIERS``.
+# It is updated in place by ``set_tiers`` and must not be mutated directly.
+ALL_TIERS: list[str] = list(DEFAULT_TIERS)
+
+# Distinct raw strings memoized per table; past this, lookups are recomputed so
+# free-form values (e.g. typed into a filter) cannot grow the memo unbounded.
+LOOKUP_MEMO_LIMIT = 1024
+
+
+@dataclass(frozen=True)
+class TierTable:
+    version: int
+    names: tuple[str, ...]
+    ids: dict[str, int]
+    _lookup: dict[object, int | None] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def default(self) -> str:
+        return self.names[0] if self.names else "Stone Age"
+
+    def rank(self, tier: str | None) -> int | None:
+        """Interned id for ``tier``; raw strings are normalized once and memoized (up to a limit)."""
+        try:
+            return self._lookup[tier]
+        except KeyError:
+            pass
+        except TypeError:
+            return None
+        rank = self.ids.get(tier.strip()) if isinstance(tier, str) and tier else None
+        if len(self._lookup) < LOOKUP_MEMO_LIMIT:
+            self._lookup[tier] = rank
+        return rank
+
+    def name(self, rank: int | None) -> str | None:
+        if rank is None or rank < 0 or rank >= len(self.names):
+            return None
+        return self.names[rank]
+
+    def highest(self, tiers: Iterable[str]) -> str | None:
+        best = None
+        best_rank = -1
+        for tier in tiers:
+            rank = self.rank(tier)
+            if rank is not None and rank > best_rank:
+                best_rank = rank
+                best = tier
+        return best
+
+
+def _build_table(tiers: Iterable[str], version: int) -> TierTable:
+    names = tuple(str(tier) for tier in tiers)
+    ids: dict[str, int] = {}
+    for idx, name in enumerate(names):
+        ids[name] = idx
+    return TierTable(version=version, names=names, ids=ids)
+
+
+_table = _build_table(DEFAULT_TIERS, 0)
+
+
+def tier_table() -> TierTable:
+    return _table
+
+
+def set_tiers(tiers: Iterable[str]) -> TierTable:
+    global _table
+    names = [str(tier) for tier in tiers]
+    if tuple(names) == _table.names:
+        return _table
+    _table = _build_table(names, _table.version + 1)
+    ALL_TIERS[:] = names
+    return _table
+
+
+def tier_rank(tier: str | None) -> int | None:
+    return _table.rank(tier)
+
+
+def default_tier() -> str:
+    return _table.default
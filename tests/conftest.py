@@ -4,3 +4,13 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _reset_tier_registry():
+    yield
+    from services import tiers
+
+    tiers.set_tiers(tiers.DEFAULT_TIERS)
@@ -1,5 +1,14 @@
-from services.automation import add_step, create_plan, list_plans, list_steps, update_step_status, delete_step
+from services.automation import (
+    add_step,
+    create_plan,
+    delete_step,
+    import_rate_plan,
+    list_plans,
+    list_steps,
+    update_step_status,
+)
 from services.db import connect_profile
+from services.planner import RatePlan, RateStep
 
 
 def test_automation_plan_lifecycle(tmp_path):
@@ -37,3 +46,38 @@ def test_automation_plan_lifecycle(tmp_path):
 
     delete_step(conn, step_id)
     assert list_steps(conn, plan_id) == []
+
+
+def test_import_rate_plan_writes_one_step_per_rate_step(tmp_path):
+    conn = connect_profile(tmp_path / "profile.db")
+    step = RateStep(
+        recipe_id=1,
+        recipe_name="Macerate",
+        method="machine",
+        machine="macerator",
+        machine_item_id=10,
+        machine_item_name="Basic Macerator",
+        machine_tier="LV",
+        output_item_id=12,
+        output_item_name="Crushed Iron Ore",
+        output_unit="count",
+        output_rate=2.0,
+        crafts_per_second=2.0,
+        duration_ticks=20,
+        eu_per_tick=2,
+        machines=2.0,
+        machines_available=1,
+        inputs=[(11, "Iron Ore", 2.0, "count")],
+        byproducts=[(13, "Stone Dust", 0.2, "count")],
+    )
+    rate_plan = RatePlan(target_item_id=12, target_rate=2.0, steps=[step], raw_inputs=[], errors=[])
+
+    plan_id = import_rate_plan(conn, "Crushed Iron", rate_plan)
+
+    assert [row["name"] for row in list_plans(conn)] == ["Crushed Iron"]
+    steps = list_steps(conn, plan_id)
+    assert [
+        (row["step_order"], row["machine_name"], row["input_name"], row["output_name"], row["byproduct_name"])
+        for row in steps
+    ] == [(1, "Basic Macerator", "Iron Ore", "Crushed Iron Ore", "Stone Dust")]
+    assert steps[0]["notes"] == "2 count/s · 2 machines @ LV (1 available) · 4 EU/t"
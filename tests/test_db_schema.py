@@ -136,3 +136,253 @@ def test_connect_read_only_applies_schema_migrations(tmp_path):
 def test_default_db_path_is_repo_relative():
     expected = Path(db.__file__).resolve().parent.parent / "gtnh.db"
     assert db.DEFAULT_DB_PATH == expected
+
+
+def test_recipe_stats_tracks_recipe_and_line_edits():
+    from services.planner import get_calculated_tier
+
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db.ensure_schema(conn)
+
+    conn.execute("INSERT INTO items(key, display_name, kind) VALUES('ore', 'Ore', 'item')")
+    conn.execute("INSERT INTO items(key, display_name, kind) VALUES('water', 'Water', 'fluid')")
+    conn.execute("INSERT INTO recipes(name, method, eu_per_tick) VALUES('Wash', 'machine', 30)")
+    recipe_id = conn.execute("SELECT id FROM recipes").fetchone()["id"]
+    conn.execute(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_count) VALUES(?, 'in', 1, 2)",
+        (recipe_id,),
+    )
+    conn.execute(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_liters) VALUES(?, 'in', 2, 1000)",
+        (recipe_id,),
+    )
+    conn.execute(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_count) VALUES(?, 'out', 1, 1)",
+        (recipe_id,),
+    )
+
+    stats = conn.execute("SELECT * FROM recipe_stats WHERE recipe_id=?", (recipe_id,)).fetchone()
+    assert (stats["item_req_count"], stats["fluid_req_count"], stats["input_qty"]) == (1, 1, 1002)
+    assert stats["calculated_tier"] == "LV"
+
+    conn.execute("UPDATE items SET kind='item' WHERE key='water'")
+    conn.execute("UPDATE recipes SET eu_per_tick=500 WHERE id=?", (recipe_id,))
+    conn.execute("DELETE FROM recipe_lines WHERE recipe_id=? AND qty_count=2", (recipe_id,))
+    stats = conn.execute("SELECT * FROM recipe_stats WHERE recipe_id=?", (recipe_id,)).fetchone()
+    assert (stats["item_req_count"], stats["fluid_req_count"], stats["input_qty"]) == (1, 0, 1000)
+    assert stats["calculated_tier"] == "HV"
+
+    for tier, method, eu in ((" IV ", "machine", 30), (None, "crafting", 30), (None, "machine", 0), (None, "machine", "9000.5")):
+        conn.execute("UPDATE recipes SET tier=?, method=?, eu_per_tick=? WHERE id=?", (tier, method, eu, recipe_id))
+        row = conn.execute(
+            "SELECT r.*, rs.calculated_tier FROM recipes r JOIN recipe_stats rs ON rs.recipe_id=r.id"
+        ).fetchone()
+        assert (row["calculated_tier"] or db.ALL_TIERS[0]) == get_calculated_tier(row)
+
+    conn.execute("DELETE FROM recipes WHERE id=?", (recipe_id,))
+    assert conn.execute("SELECT COUNT(*) FROM recipe_stats").fetchone()[0] == 0
+
+
+def test_ensure_schema_rebuilds_missing_recipe_stats():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db.ensure_schema(conn)
+    conn.execute("INSERT INTO recipes(name, method, tier) VALUES('Smelt', 'machine', 'Steam Age')")
+    conn.execute("DELETE FROM recipe_stats")
+    # As left behind by a build from before recipe_stats existed.
+    conn.execute("PRAGMA user_version=1")
+
+    db.ensure_schema(conn)
+
+    row = conn.execute("SELECT calculated_tier FROM recipe_stats").fetchone()
+    assert row["calculated_tier"] == "Steam Age"
+
+
+def test_canonical_name_columns_are_backfilled_and_indexed():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db.ensure_schema(conn)
+    conn.execute("INSERT INTO items(key, display_name, kind) VALUES('plateIron', '  Iron   PLATE ', 'item')")
+    conn.execute("INSERT INTO items(key, display_name, kind) VALUES('unnamed', ' ', 'item')")
+    conn.execute("UPDATE item_kinds SET name='Plates' WHERE name='Plate'")
+    # As left behind by a build from before the canonical name columns.
+    for table in ("items", "recipes", "item_kinds", "materials"):
+        conn.execute(f"UPDATE {table} SET name_canonical=NULL")
+    conn.execute("PRAGMA user_version=2")
+
+    db.ensure_schema(conn)
+    material_id = materials.add_material(conn, "Stainless  Steel")
+
+    assert conn.execute("SELECT name_canonical FROM items WHERE key='plateIron'").fetchone()[0] == "iron plate"
+    assert conn.execute("SELECT name_canonical FROM items WHERE key='unnamed'").fetchone()[0] == "unnamed"
+    assert conn.execute("SELECT id FROM materials WHERE name_canonical='stainless steel'").fetchone()[0] == material_id
+    assert conn.execute("SELECT name FROM item_kinds WHERE name_canonical='plates'").fetchone()[0] == "Plates"
+    conn.execute("INSERT INTO items(key, kind) VALUES('written_elsewhere', 'item')")
+
+    for table in ("items", "recipes", "item_kinds", "materials"):
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM {table} WHERE name_canonical=?", ("x",)).fetchall()
+        assert f"idx_{table}_name_canonical" in plan[0]["detail"]
+
+
+def _traced_statements(conn: sqlite3.Connection) -> list[str]:
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    return statements
+
+
+def test_current_schema_costs_one_pragma_read(tmp_path):
+    content_path = tmp_path / "content.db"
+    profile_path = tmp_path / "profile.db"
+    db.connect(content_path).close()
+    db.connect_profile(profile_path).close()
+
+    conn = sqlite3.connect(content_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == db.CONTENT_SCHEMA_VERSION
+    statements = _traced_statements(conn)
+    db.ensure_schema(conn)
+    assert statements == ["PRAGMA user_version"]
+    conn.close()
+
+    conn = db.connect_profile(profile_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == db.PROFILE_SCHEMA_VERSION
+    statements = _traced_statements(conn)
+    db._migrate(conn, db._ensure_profile_layout, db._PROFILE_MIGRATIONS)
+    assert statements == ["PRAGMA user_version"]
+    conn.close()
+
+
+def test_migration_catches_up_db_stamped_by_older_build(tmp_path):
+    db_path = tmp_path / "old.db"
+    db.connect(db_path).close()
+    legacy = sqlite3.connect(db_path)
+    legacy.execute("ALTER TABLE items DROP COLUMN storage_slot_count")
+    legacy.execute("PRAGMA user_version=1")
+    legacy.commit()
+    legacy.close()
+
+    conn = db.connect(db_path)
+    try:
+        assert "storage_slot_count" in _table_columns(conn, "items")
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == db.CONTENT_SCHEMA_VERSION
+    finally:
+        conn.close()
+
+
+def test_migration_leaves_newer_schema_alone():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA user_version={db.CONTENT_SCHEMA_VERSION + 1}")
+
+    db.ensure_schema(conn)
+
+    assert conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall() == []
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == db.CONTENT_SCHEMA_VERSION + 1
+
+
+def test_profile_connections_use_wal_and_do_not_block_readers(tmp_path):
+    profile_path = tmp_path / "profile.db"
+    writer = db.connect_profile(profile_path)
+    reader = db.connect_profile(profile_path)
+    try:
+        assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert reader.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert reader.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert reader.execute("PRAGMA busy_timeout").fetchone()[0] == db.PROFILE_BUSY_TIMEOUT_MS
+
+        writer.execute("INSERT INTO inventory(item_id, qty_count) VALUES(1, 5)")
+        # The writer holds an open transaction; WAL readers see the last commit.
+        assert reader.execute("SELECT COUNT(*) FROM inventory").fetchone()[0] == 0
+        writer.commit()
+        assert reader.execute("SELECT qty_count FROM inventory").fetchone()[0] == 5
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_read_only_connect_uses_mapped_reader_for_current_db(tmp_path):
+    db_path = tmp_path / "content.db"
+    db.connect(db_path).close()
+
+    for immutable in (False, True):
+        conn = db.connect(db_path, read_only=True, immutable=immutable)
+        try:
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] > 0
+            assert conn.execute("SELECT COUNT(*) FROM item_kinds").fetchone()[0] > 0
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items(key, kind) VALUES('bar', 'item')")
+        finally:
+            conn.close()
+
+
+def test_read_only_connect_requires_existing_file(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        db.connect(tmp_path / "missing.db", read_only=True)
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_profile_connection_attaches_content_read_only(tmp_path):
+    content_path = tmp_path / "content.db"
+    content = db.connect(content_path)
+    content.execute("INSERT INTO items(key, kind) VALUES('water', 'fluid')")
+    content.commit()
+    content.close()
+
+    conn = db.connect_profile(tmp_path / "profile.db", content_path=content_path)
+    try:
+        assert db.attached_content(conn)
+        assert conn.execute("SELECT kind FROM content.items WHERE key='water'").fetchone()[0] == "fluid"
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO content.items(key, kind) VALUES('bar', 'item')")
+        # Profile writes are unaffected by the attached reader.
+        conn.execute("INSERT INTO storage_units(name) VALUES('Tank')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    for missing in (":memory:", tmp_path / "missing.db"):
+        conn = db.connect_profile(tmp_path / "profile.db", content_path=missing)
+        try:
+            assert not db.attached_content(conn)
+        finally:
+            conn.close()
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_profile_connection_attaches_content_from_paths_needing_uri_escapes(tmp_path):
+    folder = tmp_path / "GTNH saves #2 (100%)"
+    folder.mkdir()
+    content_path = folder / "content.db"
+    db.connect(content_path).close()
+
+    conn = db.connect_profile(folder / "profile.db", content_path=content_path)
+    try:
+        assert db.attached_content(conn)
+        assert conn.execute("SELECT COUNT(*) FROM content.items").fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert sorted(path.name for path in folder.iterdir() if path.suffix == ".db") == ["content.db", "profile.db"]
+    assert not any(path.name.startswith("file:") for path in tmp_path.rglob("*"))
+
+
+def test_import_db_includes_pages_still_in_the_source_wal(tmp_path):
+    source_path = tmp_path / "exported_profile.db"
+    source = db.connect_profile(source_path)
+    source.execute("PRAGMA wal_autocheckpoint=0")
+    db.set_setting(source, "theme", "dark")
+    source.commit()
+    assert (tmp_path / "exported_profile.db-wal").stat().st_size > 0
+
+    profile_path = tmp_path / "profile.db"
+    profile = db.connect_profile(profile_path)
+    db.set_setting(profile, "theme", "light")
+    profile.commit()
+    db.import_db(profile, source_path)
+    source.close()
+    profile.close()
+
+    assert not (tmp_path / "profile.db-wal").exists()
+    reopened = db.connect_profile(profile_path)
+    assert db.get_setting(reopened, "theme") == "dark"
+    reopened.close()
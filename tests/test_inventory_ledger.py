@@ -0,0 +1,192 @@
+from services.db import connect_profile
+from services.inventory_ledger import InventoryLedger, inventory_version
+from services.storage import (
+    aggregate_assignment_for_item,
+    aggregated_assignment_rows_for_planner,
+    create_storage_unit,
+    get_assignment,
+    storage_inventory_totals,
+    update_storage_unit,
+    upsert_assignment,
+    validate_storage_fit_for_item,
+)
+
+
+def _seed(conn) -> tuple[int, int]:
+    high = create_storage_unit(conn, name="High", priority=9)
+    low = create_storage_unit(conn, name="Low", priority=1)
+    upsert_assignment(conn, storage_id=high, item_id=1, qty_count=5, qty_liters=None)
+    upsert_assignment(conn, storage_id=low, item_id=1, qty_count=30, qty_liters=None)
+    upsert_assignment(conn, storage_id=low, item_id=2, qty_count=None, qty_liters=1000, locked=True)
+    conn.commit()
+    return high, low
+
+
+def _assert_matches_db(ledger: InventoryLedger, conn) -> None:
+    planner_rows = {
+        int(row["item_id"]): {"qty_count": row["qty_count"], "qty_liters": row["qty_liters"]}
+        for row in aggregated_assignment_rows_for_planner(conn)
+    }
+    assert ledger.planner_totals() == planner_rows
+    for item_id in (1, 2, 3):
+        assert ledger.item_totals(item_id) == dict(aggregate_assignment_for_item(conn, item_id))
+    storage_ids = [None] + [int(row["id"]) for row in conn.execute("SELECT id FROM storage_units")]
+    for storage_id in storage_ids:
+        assert ledger.storage_totals(storage_id) == storage_inventory_totals(conn, storage_id)
+
+
+def test_ledger_applies_in_memory_and_flushes_in_one_batch() -> None:
+    conn = connect_profile(":memory:")
+    high, low = _seed(conn)
+    ledger = InventoryLedger(conn)
+    events = []
+    ledger.subscribe(events.append)
+    _assert_matches_db(ledger, conn)
+    events.clear()
+
+    changed = ledger.apply(
+        [(1, -12), (3, 4), (2, -10)],
+        item_kinds={1: "item", 2: "fluid", 3: "item"},
+        storage_id=high,
+        consume_by_priority=True,
+    )
+
+    assert changed == {1, 3}
+    assert events == [frozenset({1, 3})]
+    assert ledger.pending
+    assert ledger.get(high, 1) is None
+    assert ledger.get(low, 1)["qty_count"] == 23
+    # Nothing reached the DB yet.
+    assert get_assignment(conn, storage_id=low, item_id=1)["qty_count"] == 30
+
+    assert ledger.flush()
+    assert not ledger.pending
+    assert get_assignment(conn, storage_id=high, item_id=1) is None
+    assert get_assignment(conn, storage_id=low, item_id=1)["qty_count"] == 23
+    assert get_assignment(conn, storage_id=high, item_id=3)["qty_count"] == 4
+    _assert_matches_db(ledger, conn)
+    # The ledger's own flush does not count as an outside change.
+    assert events == [frozenset({1, 3})]
+
+
+def test_ledger_reloads_after_outside_writes() -> None:
+    conn = connect_profile(":memory:")
+    high, low = _seed(conn)
+    ledger = InventoryLedger(conn)
+    before = inventory_version(conn)
+    assert ledger.item_totals(1)["qty_count"] == 35
+
+    upsert_assignment(conn, storage_id=high, item_id=1, qty_count=50, qty_liters=None)
+    update_storage_unit(conn, low, allow_planner_use=False)
+    conn.commit()
+
+    assert inventory_version(conn) > before
+    assert ledger.item_totals(1)["qty_count"] == 80
+    assert ledger.planner_totals()[1]["qty_count"] == 50
+    _assert_matches_db(ledger, conn)
+
+
+def test_ledger_flushes_pending_rows_before_reloading() -> None:
+    conn = connect_profile(":memory:")
+    high, _low = _seed(conn)
+    ledger = InventoryLedger(conn)
+    ledger.set_assignment(storage_id=high, item_id=7, qty_count=3, qty_liters=None)
+
+    upsert_assignment(conn, storage_id=high, item_id=8, qty_count=2, qty_liters=None)
+    conn.commit()
+
+    assert ledger.item_ids_in_storage(high) == {1, 7, 8}
+    assert not ledger.pending
+    assert get_assignment(conn, storage_id=high, item_id=7)["qty_count"] == 3
+
+
+def test_planner_reads_inventory_from_ledger() -> None:
+    from services.planner import PlannerService
+
+    conn = connect_profile(":memory:")
+    _seed(conn)
+    items = {1: {"id": 1, "kind": "item"}, 2: {"id": 2, "kind": "fluid"}}
+    ledger = InventoryLedger(conn)
+
+    with_ledger = PlannerService(None, conn, inventory_ledger=ledger).load_inventory(items)
+    from_sql = PlannerService(None, conn).load_inventory(items)
+
+    assert with_ledger == from_sql == {1: 35}
+
+
+def test_ledger_fit_checks_match_full_scan() -> None:
+    conn = connect_profile(":memory:")
+    high, low = _seed(conn)
+    update_storage_unit(conn, low, slot_count=2, liter_capacity=1500)
+    upsert_assignment(conn, storage_id=low, item_id=4, qty_count=3, qty_liters=None)
+    conn.commit()
+    stack_sizes = {1: 16, 2: 64, 3: 1, 4: 64}
+    container_ids = {4}
+    ledger = InventoryLedger(conn)
+    ledger.set_item_metadata(stack_sizes, container_ids)
+
+    assert ledger.storage_usage(low) == {"slot_used": 2, "liter_used": 1000.0}
+    ledger.apply([(3, 2)], item_kinds={3: "item"}, storage_id=low)
+    ledger.flush()
+    assert ledger.storage_usage(low)["slot_used"] == 4
+
+    for item_id, qty_count, qty_liters in [(1, 40, None), (1, 0, None), (3, 1, None), (2, None, 400), (5, 64, None)]:
+        expected = validate_storage_fit_for_item(
+            conn,
+            storage_id=low,
+            item_id=item_id,
+            qty_count=qty_count,
+            qty_liters=qty_liters,
+            item_max_stack_size=stack_sizes.get(item_id, 64),
+            known_item_stack_sizes=stack_sizes,
+            known_container_item_ids=container_ids,
+        )
+        assert ledger.validate_fit(storage_id=low, item_id=item_id, qty_count=qty_count, qty_liters=qty_liters) == expected
+
+    ledger.set_item_metadata({**stack_sizes, 1: 64}, container_ids)
+    assert ledger.storage_usage(low)["slot_used"] == 3
+    assert not ledger.validate_fit(storage_id=999, item_id=1, qty_count=1, qty_liters=None)["fits"]
+
+
+def test_ledger_reapplies_deltas_and_keeps_absolute_rows_over_outside_writes() -> None:
+    conn = connect_profile(":memory:")
+    high, low = _seed(conn)
+    ledger = InventoryLedger(conn)
+    ledger.apply([(1, -10)], item_kinds={1: "item"}, storage_id=low)
+    ledger.set_assignment(storage_id=low, item_id=2, qty_count=None, qty_liters=300, locked=False)
+
+    # Another writer changes the same rows before the ledger flushes.
+    upsert_assignment(conn, storage_id=low, item_id=1, qty_count=40, qty_liters=None)
+    upsert_assignment(conn, storage_id=low, item_id=2, qty_count=None, qty_liters=1500, locked=True)
+    upsert_assignment(conn, storage_id=high, item_id=1, qty_count=8, qty_liters=None)
+    conn.commit()
+
+    assert ledger.flush()
+
+    assert get_assignment(conn, storage_id=low, item_id=1)["qty_count"] == 30
+    assert get_assignment(conn, storage_id=high, item_id=1)["qty_count"] == 8
+    fluid = get_assignment(conn, storage_id=low, item_id=2)
+    assert (fluid["qty_liters"], fluid["locked"]) == (300, 0)
+    _assert_matches_db(ledger, conn)
+
+
+def test_ledger_waits_for_open_transactions_and_hands_over_pending_rows() -> None:
+    conn = connect_profile(":memory:")
+    _high, low = _seed(conn)
+    ledger = InventoryLedger(conn)
+    ledger.apply([(1, 5)], item_kinds={1: "item"}, storage_id=low)
+
+    # Another caller's transaction is open: reads and flushes must not commit it.
+    conn.execute("UPDATE storage_units SET priority=3 WHERE id=?", (low,))
+    assert conn.in_transaction
+    assert ledger.item_totals(1)["qty_count"] == 40
+    assert not ledger.flush()
+    assert conn.in_transaction and ledger.pending
+    conn.rollback()
+
+    reopened = InventoryLedger(conn)
+    reopened.adopt_pending(ledger)
+    assert not ledger.pending
+    assert reopened.flush()
+    assert get_assignment(conn, storage_id=low, item_id=1)["qty_count"] == 35
+    _assert_matches_db(reopened, conn)
@@ -48,6 +48,7 @@ def test_inventory_search_expands_all_groups_for_matching_items() -> None:
 
     tab.render_items([row])
     tab.search_entry.setText("refined")
+    tab.search_controller.flush()
     app.processEvents()
 
     tree = tab.inventory_trees["All"]
@@ -98,6 +98,7 @@ def test_search_expands_all_nodes() -> None:
     assert not top.isExpanded()
 
     tab.search_edit.setText("copper")
+    tab.search_controller.flush()
     app.processEvents()
 
     top = tab.item_tree.topLevelItem(0)
@@ -32,3 +32,88 @@ def test_machine_availability_rejects_invalid_transition():
             )
     finally:
         conn.close()
+
+
+def _add_availability(conn, machine_type, tier, owned, online):
+    conn.execute(
+        "INSERT INTO machine_availability(machine_type, tier, owned, online) VALUES(?,?,?,?)",
+        (machine_type, tier, owned, online),
+    )
+
+
+def test_machine_availability_index_answers_tier_queries():
+    from services.machine_availability import build_machine_availability_index
+    from services.tiers import tier_rank
+
+    conn = db.connect_profile(":memory:")
+    try:
+        _add_availability(conn, "Lathe", "LV", 3, 1)
+        _add_availability(conn, "lathe ", "HV", 2, 0)
+        _add_availability(conn, "macerator", "MV", 0, 0)
+        _add_availability(conn, "sifter", "Custom Tier", 1, 1)
+
+        index = build_machine_availability_index(conn)
+        lathe = index.get("lathe")
+
+        assert "macerator" not in index
+        assert lathe.best_tier == "HV"
+        assert lathe.can_run(tier_rank("MV"))
+        assert not lathe.can_run(tier_rank("MV"), online_only=True)
+        assert lathe.can_run(tier_rank("LV"), online_only=True)
+        assert lathe.count_at_or_above(tier_rank("LV")) == 5
+        assert lathe.count_at_or_above(tier_rank("MV")) == 2
+        assert lathe.count_at_or_above(tier_rank("LV"), online_only=True) == 1
+        assert lathe.count_for_tier("LV") == 3
+        assert lathe.count_for_tier("EV") == 3
+
+        sifter = index.get("sifter")
+        assert sifter.best_tier is None
+        assert sifter.can_run_tier("Custom Tier", None)
+        assert not sifter.can_run_tier("LV", tier_rank("LV"))
+    finally:
+        conn.close()
+
+
+def test_machine_availability_cache_rebuilds_only_on_version_change():
+    from services.machine_availability import MachineAvailabilityCache
+
+    conn = db.connect_profile(":memory:")
+    try:
+        _add_availability(conn, "lathe", "LV", 1, 1)
+        conn.commit()
+        cache = MachineAvailabilityCache(conn)
+
+        first = cache.get()
+        assert cache.get() is first
+
+        conn.execute("UPDATE machine_availability SET owned=2 WHERE machine_type='lathe'")
+        conn.commit()
+        second = cache.get()
+
+        assert second is not first
+        assert second.get("lathe").count_for_tier("LV") == 2
+    finally:
+        conn.close()
+
+
+def test_fetch_recipes_filters_by_online_machine_index():
+    from services.recipes import fetch_recipes, load_online_machine_availability
+
+    content = sqlite3.connect(":memory:")
+    content.row_factory = sqlite3.Row
+    db.ensure_schema(content)
+    content.execute("INSERT INTO recipes(name, method, machine, tier) VALUES('Turn Rod', 'machine', 'lathe', 'LV')")
+    content.execute("INSERT INTO recipes(name, method, machine, tier) VALUES('Grind Ore', 'machine', 'macerator', 'LV')")
+    content.execute("INSERT INTO recipes(name, method, tier) VALUES('Craft Plank', 'crafting', 'LV')")
+
+    profile = db.connect_profile(":memory:")
+    try:
+        _add_availability(profile, "lathe", "MV", 1, 1)
+        _add_availability(profile, "macerator", "HV", 1, 0)
+
+        rows = fetch_recipes(content, ["LV"], load_online_machine_availability(profile))
+
+        assert [row["name"] for row in rows] == ["Craft Plank", "Turn Rod"]
+    finally:
+        profile.close()
+        content.close()
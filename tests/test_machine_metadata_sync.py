@@ -116,3 +116,35 @@ def test_replace_machine_metadata_works_inside_existing_transaction() -> None:
 
     assert row is not None
     assert row["display_name"] == "Basic Cutting Machine"
+
+
+def test_replace_machine_metadata_writes_only_changed_rows() -> None:
+    conn = _setup_conn()
+    rows = [
+        ("Cutting Machine", "LV", "Basic Cutting Machine", 1, 1, 0, 0, 0, 0, 0, 0, 0, 0),
+        ("Cutting Machine", "MV", "Advanced Cutting Machine", 2, 1, 0, 0, 0, 0, 0, 0, 0, 0),
+        ("Macerator", "LV", "Basic Macerator", 1, 2, 0, 0, 0, 0, 0, 0, 0, 0),
+    ]
+    replace_machine_metadata(conn, rows)
+    item_ids = {
+        row["display_name"]: row["id"] for row in conn.execute("SELECT id, display_name FROM items WHERE kind='machine'")
+    }
+    writes: list[str] = []
+    conn.set_trace_callback(
+        lambda sql: writes.append(sql) if sql.lstrip().split(" ", 1)[0].upper() in {"INSERT", "UPDATE", "DELETE"} else None
+    )
+
+    replace_machine_metadata(conn, rows)
+    assert writes == []
+
+    rows[1] = ("Cutting Machine", "MV", "Advanced Cutter", 2, 1, 0, 0, 0, 0, 0, 0, 0, 0)
+    rows[2] = ("Macerator", "LV", "Basic Macerator", 1, 3, 0, 0, 0, 0, 0, 0, 0, 0)
+    replace_machine_metadata(conn, rows)
+    conn.set_trace_callback(None)
+
+    # Statements are traced again for each trigger they fire, hence the sets.
+    assert len({sql for sql in writes if "machine_metadata" in sql}) == 2
+    assert len({sql for sql in writes if "UPDATE items" in sql}) == 1
+    assert conn.execute("SELECT output_slots FROM machine_metadata WHERE machine_type='Macerator'").fetchone()[0] == 3
+    renamed = conn.execute("SELECT id FROM items WHERE display_name='Advanced Cutter'").fetchone()
+    assert renamed["id"] == item_ids["Advanced Cutting Machine"]
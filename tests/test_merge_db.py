@@ -98,6 +98,34 @@ def test_merge_db_normalizes_kind_names(tmp_path: Path):
     ).fetchone() is None
 
 
+def test_merge_db_matches_kind_and_material_names_ignoring_case_and_spacing(tmp_path: Path):
+    dest_conn = _connect(":memory:")
+    dest_conn.execute("INSERT INTO materials(name) VALUES('Stainless Steel')")
+    plate_kind = dest_conn.execute("SELECT id FROM item_kinds WHERE name='Plate'").fetchone()["id"]
+    dest_material = dest_conn.execute("SELECT id FROM materials WHERE name='Stainless Steel'").fetchone()["id"]
+
+    src_path = tmp_path / "src.db"
+    src_conn = _connect(src_path)
+    src_conn.execute("INSERT INTO item_kinds(name, sort_order, is_builtin) VALUES('  PLATE ', 70, 0)")
+    src_kind_id = src_conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
+    src_conn.execute("INSERT INTO materials(name) VALUES('stainless   steel')")
+    src_material_id = src_conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
+    src_conn.execute(
+        "INSERT INTO items(key, display_name, kind, item_kind_id, material_id) VALUES(?,?,?,?,?)",
+        ("plateStainlessSteel", "Stainless Steel Plate", "item", src_kind_id, src_material_id),
+    )
+    src_conn.commit()
+
+    stats = merge_db(dest_conn, src_path)
+
+    assert stats["kinds_added"] == 0
+    merged_item = dest_conn.execute(
+        "SELECT item_kind_id, material_id FROM items WHERE key='plateStainlessSteel'"
+    ).fetchone()
+    assert (merged_item["item_kind_id"], merged_item["material_id"]) == (plate_kind, dest_material)
+    assert dest_conn.execute("SELECT COUNT(*) FROM materials").fetchone()[0] == 1
+
+
 def test_merge_db_keeps_distinct_kind_names(tmp_path: Path):
     dest_conn = _connect(":memory:")
 
@@ -3,6 +3,8 @@ import sqlite3
 import pytest
 
 from services.db import ensure_schema, connect_profile
+import services.planner as planner_module
+import services.recipe_optimizer as recipe_optimizer
 from services.planner import PlannerService, apply_overclock
 
 
@@ -625,6 +627,361 @@ def test_plan_missing_recipe_reports_error():
     assert result.shopping_list == []
 
 
+def test_sweep_matches_plan_without_inventory_for_each_quantity(monkeypatch):
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+
+    salt = _insert_item(conn, key="salt", name="Salt", is_base=1)
+    catalyst = _insert_item(conn, key="catalyst", name="Catalyst", is_base=1)
+    chlorine = _insert_item(conn, key="chlorine", name="Chlorine", kind="gas")
+    empty_cell = _insert_item(conn, key="cell", name="Cell", is_base=1)
+    chlorine_cell = _insert_item(
+        conn,
+        key="chlorine_cell",
+        name="Chlorine Cell",
+        content_fluid_id=chlorine,
+        content_qty_liters=1000,
+    )
+    plate = _insert_item(conn, key="plate", name="Plate")
+    widget = _insert_item(conn, key="widget", name="Widget")
+    unobtainium = _insert_item(conn, key="unobtainium", name="Unobtainium")
+
+    chlorine_recipe = _insert_recipe(conn, name="Make Chlorine")
+    _insert_line(conn, recipe_id=chlorine_recipe, direction="out", item_id=chlorine, qty_liters=250)
+    _insert_line(conn, recipe_id=chlorine_recipe, direction="in", item_id=salt, qty_count=3)
+    plate_recipe = _insert_recipe(conn, name="Make Plate")
+    _insert_line(conn, recipe_id=plate_recipe, direction="out", item_id=plate, qty_count=4)
+    _insert_line(conn, recipe_id=plate_recipe, direction="in", item_id=salt, qty_count=1)
+    _insert_line(conn, recipe_id=plate_recipe, direction="in", item_id=catalyst, qty_count=1, consumption_chance=0.3)
+    widget_recipe = _insert_recipe(conn, name="Make Widget")
+    _insert_line(conn, recipe_id=widget_recipe, direction="out", item_id=widget, qty_count=2)
+    _insert_line(conn, recipe_id=widget_recipe, direction="in", item_id=plate, qty_count=3)
+    _insert_line(conn, recipe_id=widget_recipe, direction="in", item_id=chlorine_cell, qty_count=1)
+    _insert_line(conn, recipe_id=widget_recipe, direction="in", item_id=unobtainium, qty_count=1)
+
+    planner = PlannerService(conn, profile_conn)
+    quantities = [0, 1, 2, 7, 64, 1000]
+    picks = []
+    pick_recipe = planner._pick_recipe_for_item
+    monkeypatch.setattr(
+        planner,
+        "_pick_recipe_for_item",
+        lambda item_id, *args, **kwargs: picks.append(item_id) or pick_recipe(item_id, *args, **kwargs),
+    )
+
+    sweep = planner.sweep(widget, quantities, enabled_tiers=[], crafting_6x6_unlocked=True)
+
+    assert sweep.quantities == quantities
+    assert sweep.errors == ["No recipe found for Unobtainium."]
+    assert sorted(picks) == sorted([widget, plate, chlorine, unobtainium])
+    for index, qty in enumerate(quantities):
+        result = planner.plan(
+            widget,
+            qty,
+            use_inventory=False,
+            enabled_tiers=[],
+            crafting_6x6_unlocked=True,
+        )
+        assert sweep.shopping_list(index) == result.shopping_list
+    assert [name for name, _unit, _qtys in sweep.shopping_table] == ["Catalyst", "Cell", "Salt"]
+
+
+def test_plan_rate_sizes_machines_and_power_across_shared_inputs():
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+
+    ore = _insert_item(conn, key="ore", name="Ore", is_base=1)
+    dust = _insert_item(conn, key="dust", name="Dust")
+    plate = _insert_item(conn, key="plate", name="Plate")
+    gear = _insert_item(conn, key="gear", name="Gear")
+
+    macerate = _insert_recipe(conn, name="Macerate", method="machine", duration_ticks=200, eu_per_tick=2)
+    _set_recipe_machine(conn, recipe_id=macerate, machine="macerator", tier="LV")
+    _insert_line(conn, recipe_id=macerate, direction="out", item_id=dust, qty_count=2)
+    _insert_line(conn, recipe_id=macerate, direction="in", item_id=ore, qty_count=1)
+    bend = _insert_recipe(conn, name="Bend", method="machine", duration_ticks=100, eu_per_tick=30)
+    _set_recipe_machine(conn, recipe_id=bend, machine="bender", tier="LV")
+    _insert_line(conn, recipe_id=bend, direction="out", item_id=plate, qty_count=1)
+    _insert_line(conn, recipe_id=bend, direction="in", item_id=dust, qty_count=1)
+    assemble = _insert_recipe(conn, name="Assemble Gear")
+    _insert_line(conn, recipe_id=assemble, direction="out", item_id=gear, qty_count=1)
+    _insert_line(conn, recipe_id=assemble, direction="in", item_id=plate, qty_count=2)
+    _insert_line(conn, recipe_id=assemble, direction="in", item_id=dust, qty_count=1)
+
+    _set_machine_availability(profile_conn, machine_type="macerator", tier="LV", owned=1, online=1)
+    _set_machine_availability(profile_conn, machine_type="bender", tier="MV", owned=5, online=5)
+
+    planner = PlannerService(conn, profile_conn)
+    result = planner.plan_rate(gear, 1.0, enabled_tiers=["LV", "MV"], crafting_6x6_unlocked=True)
+
+    assert result.errors == []
+    assert [step.recipe_name for step in result.steps] == ["Macerate", "Bend", "Assemble Gear"]
+    macerate_step, bend_step, assemble_step = result.steps
+    assert macerate_step.output_rate == pytest.approx(3.0)
+    assert macerate_step.machines == pytest.approx(15.0)
+    assert macerate_step.machines_needed == 15
+    assert macerate_step.machines_available == 1
+    assert (bend_step.machine_tier, bend_step.duration_ticks, bend_step.eu_per_tick) == ("MV", 50, 120)
+    assert bend_step.machines == pytest.approx(5.0)
+    assert bend_step.utilization == pytest.approx(1.0)
+    assert assemble_step.machines is None
+    assert result.raw_inputs == [("Ore", pytest.approx(1.5), "count")]
+    assert result.total_eu_per_tick == pytest.approx(15 * 2 + 5 * 120)
+    assert result.bottlenecks == [macerate_step]
+    assert result.max_target_rate == pytest.approx(1 / 15)
+
+
+def test_plan_rate_treats_unlisted_machine_types_as_unknown():
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+
+    ore = _insert_item(conn, key="ore", name="Ore", is_base=1)
+    dust = _insert_item(conn, key="dust", name="Dust")
+    plate = _insert_item(conn, key="plate", name="Plate")
+    macerate = _insert_recipe(conn, name="Macerate", method="machine", duration_ticks=200, eu_per_tick=2)
+    _set_recipe_machine(conn, recipe_id=macerate, machine="macerator", tier="LV")
+    _insert_line(conn, recipe_id=macerate, direction="out", item_id=dust, qty_count=1)
+    _insert_line(conn, recipe_id=macerate, direction="in", item_id=ore, qty_count=1)
+    bend = _insert_recipe(conn, name="Bend", method="machine", duration_ticks=400, eu_per_tick=30)
+    _set_recipe_machine(conn, recipe_id=bend, machine="bender", tier="LV")
+    _insert_line(conn, recipe_id=bend, direction="out", item_id=plate, qty_count=1)
+    _insert_line(conn, recipe_id=bend, direction="in", item_id=dust, qty_count=1)
+
+    # Only the macerator has an availability row; nothing is known about benders.
+    _set_machine_availability(profile_conn, machine_type="macerator", tier="LV", owned=20, online=20)
+
+    result = PlannerService(conn, profile_conn).plan_rate(
+        plate, 1.0, enabled_tiers=["LV"], crafting_6x6_unlocked=True
+    )
+
+    macerate_step, bend_step = result.steps
+    assert macerate_step.machines_available == 20
+    assert bend_step.machines == pytest.approx(20.0)
+    assert bend_step.machines_available is None
+    assert bend_step.utilization is None
+    assert result.bottlenecks == []
+    assert result.max_target_rate == pytest.approx(2.0)
+
+
+def _build_shared_byproduct_recipes(conn):
+    ore_x = _insert_item(conn, key="ore_x", name="Ore X", is_base=1)
+    ore_y = _insert_item(conn, key="ore_y", name="Ore Y", is_base=1)
+    ore_z = _insert_item(conn, key="ore_z", name="Ore Z", is_base=1)
+    part_a = _insert_item(conn, key="part_a", name="Part A")
+    part_b = _insert_item(conn, key="part_b", name="Part B")
+    target = _insert_item(conn, key="target", name="Target")
+
+    recipes = {}
+    recipes["a_from_y"] = _insert_recipe(conn, name="A from Y")
+    _insert_line(conn, recipe_id=recipes["a_from_y"], direction="out", item_id=part_a, qty_count=2)
+    _insert_line(conn, recipe_id=recipes["a_from_y"], direction="in", item_id=ore_y, qty_count=1)
+    recipes["a_and_b"] = _insert_recipe(conn, name="A and B from X")
+    _insert_line(conn, recipe_id=recipes["a_and_b"], direction="out", item_id=part_a, qty_count=1)
+    _insert_line(conn, recipe_id=recipes["a_and_b"], direction="out", item_id=part_b, qty_count=1)
+    _insert_line(conn, recipe_id=recipes["a_and_b"], direction="in", item_id=ore_x, qty_count=1)
+    recipes["b_from_z"] = _insert_recipe(conn, name="B from Z")
+    _insert_line(conn, recipe_id=recipes["b_from_z"], direction="out", item_id=part_b, qty_count=1)
+    _insert_line(conn, recipe_id=recipes["b_from_z"], direction="in", item_id=ore_z, qty_count=3)
+    recipes["target"] = _insert_recipe(conn, name="Assemble Target")
+    _insert_line(conn, recipe_id=recipes["target"], direction="out", item_id=target, qty_count=1)
+    _insert_line(conn, recipe_id=recipes["target"], direction="in", item_id=part_a, qty_count=2)
+    _insert_line(conn, recipe_id=recipes["target"], direction="in", item_id=part_b, qty_count=2)
+    return target, {"part_a": part_a, "part_b": part_b}, recipes
+
+
+def test_optimized_plan_uses_shared_byproduct_recipe():
+    pytest.importorskip("scipy.optimize")
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+    target, parts, recipes = _build_shared_byproduct_recipes(conn)
+
+    planner = PlannerService(conn, profile_conn)
+    choices = planner.optimize_recipe_choices(
+        target, 1, objective="raw", enabled_tiers=[], crafting_6x6_unlocked=True
+    )
+    result = planner.plan(
+        target,
+        1,
+        use_inventory=True,
+        inventory_override={},
+        enabled_tiers=[],
+        crafting_6x6_unlocked=True,
+        objective="raw",
+    )
+
+    assert choices == {
+        target: recipes["target"],
+        parts["part_a"]: recipes["a_and_b"],
+        parts["part_b"]: recipes["a_and_b"],
+    }
+    assert result.errors == []
+    assert result.shopping_list == [("Ore X", 2, "count")]
+
+
+def test_plan_objective_falls_back_to_greedy_without_solver(monkeypatch):
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+    target, _parts, _recipes = _build_shared_byproduct_recipes(conn)
+    monkeypatch.setattr(planner_module, "solver_available", lambda: False)
+
+    planner = PlannerService(conn, profile_conn)
+    plan_kwargs = dict(use_inventory=False, enabled_tiers=[], crafting_6x6_unlocked=True)
+    greedy = planner.plan(target, 1, **plan_kwargs)
+    fallback = planner.plan(target, 1, objective="raw", **plan_kwargs)
+
+    assert planner.optimize_recipe_choices(
+        target, 1, objective="raw", enabled_tiers=[], crafting_6x6_unlocked=True
+    ) is None
+    assert fallback.shopping_list == greedy.shopping_list
+    assert [step.recipe_name for step in fallback.steps] == [step.recipe_name for step in greedy.steps]
+
+
+class _RecordedMatrix:
+    def __init__(self, data, shape):
+        values, (rows, cols) = data
+        self.entries = {(row, col): value for row, col, value in zip(rows, cols, values)}
+        self.shape = shape
+
+
+def test_optimizer_model_prices_unmakeable_inputs_above_any_recipe(monkeypatch):
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+    ore = _insert_item(conn, key="ore", name="Ore", is_base=1)
+    catalyst = _insert_item(conn, key="catalyst", name="Catalyst")
+    target = _insert_item(conn, key="target", name="Target")
+    quick = _insert_recipe(conn, name="Quick Target", duration_ticks=20)
+    _insert_line(conn, recipe_id=quick, direction="out", item_id=target, qty_count=1)
+    _insert_line(conn, recipe_id=quick, direction="in", item_id=catalyst, qty_count=1)
+    slow = _insert_recipe(conn, name="Slow Target", duration_ticks=5_000_000)
+    _insert_line(conn, recipe_id=slow, direction="out", item_id=target, qty_count=1)
+    _insert_line(conn, recipe_id=slow, direction="in", item_id=ore, qty_count=4)
+
+    models = []
+
+    def fake_linprog(costs, *, A_ub, b_ub, bounds, method):
+        models.append((costs, A_ub, b_ub))
+        # Columns are the recipes, then the purchases; answer with the slow route.
+        x = [0.0, 3.0] + [12.0 if item_id == ore else 0.0 for item_id in captured["buy_costs"]]
+        return type("Result", (), {"status": 0, "x": x})()
+
+    monkeypatch.setattr(recipe_optimizer, "linprog", fake_linprog)
+    monkeypatch.setattr(recipe_optimizer, "coo_matrix", _RecordedMatrix)
+    captured = {}
+    real_solve = planner_module.solve_recipe_flows
+
+    def spy_solve(flows, buy_costs, demand):
+        captured.update(flows=flows, buy_costs=buy_costs, demand=demand)
+        return real_solve(flows, buy_costs, demand)
+
+    monkeypatch.setattr(planner_module, "solve_recipe_flows", spy_solve)
+
+    choices = PlannerService(conn, profile_conn).optimize_recipe_choices(
+        target, 3, objective="time", enabled_tiers=[], crafting_6x6_unlocked=True
+    )
+
+    flows, buy_costs = captured["flows"], captured["buy_costs"]
+    assert list(flows) == [quick, slow]
+    assert buy_costs[ore] == pytest.approx(planner_module.RAW_TIEBREAK_WEIGHT)
+    quick_route = flows[quick].cost + buy_costs[catalyst]
+    slow_route = flows[slow].cost + 4 * buy_costs[ore]
+    assert slow_route < quick_route
+
+    costs, matrix, bounds = models[0]
+    assert costs == [flows[quick].cost, flows[slow].cost] + list(buy_costs.values())
+    rows = sorted({ore, catalyst, target})
+    target_row = rows.index(target)
+    assert bounds[target_row] == -3.0
+    assert matrix.entries[(target_row, 0)] == matrix.entries[(target_row, 1)] == -1.0
+    assert matrix.entries[(rows.index(ore), 1)] == 4.0
+    assert matrix.shape == (3, 4)
+    assert choices == {target: slow}
+
+
+@pytest.mark.parametrize("stone_dust_first", [True, False])
+def test_plan_netting_credits_byproducts_regardless_of_visit_order(stone_dust_first):
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+
+    ore = _insert_item(conn, key="ore", name="Ore", is_base=1)
+    gem = _insert_item(conn, key="gem", name="Gem", is_base=1)
+    stone_dust = _insert_item(conn, key="stone_dust", name="Stone Dust", is_base=1)
+    crushed = _insert_item(conn, key="crushed", name="Crushed Ore")
+    brick = _insert_item(conn, key="brick", name="Brick")
+
+    macerate = _insert_recipe(conn, name="Macerate Ore")
+    _insert_line(conn, recipe_id=macerate, direction="out", item_id=crushed, qty_count=1)
+    _insert_line(conn, recipe_id=macerate, direction="in", item_id=ore, qty_count=1)
+    _insert_line(conn, recipe_id=macerate, direction="out", item_id=stone_dust, qty_count=1)
+    conn.execute(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_count, chance_percent) VALUES(?, 'out', ?, 1, 10)",
+        (macerate, gem),
+    )
+    bake = _insert_recipe(conn, name="Bake Brick")
+    _insert_line(conn, recipe_id=bake, direction="out", item_id=brick, qty_count=1)
+    brick_inputs = [(stone_dust, 5), (crushed, 10), (gem, 1)]
+    if not stone_dust_first:
+        brick_inputs.reverse()
+    for item_id, qty in brick_inputs:
+        _insert_line(conn, recipe_id=bake, direction="in", item_id=item_id, qty_count=qty)
+
+    planner = PlannerService(conn, profile_conn)
+    plan_kwargs = dict(use_inventory=False, enabled_tiers=[], crafting_6x6_unlocked=True)
+    plain = planner.plan(brick, 1, **plan_kwargs)
+    conservative = planner.plan(brick, 1, netting="conservative", **plan_kwargs)
+    expected = planner.plan(brick, 1, netting="expected", **plan_kwargs)
+
+    assert plain.shopping_list == [("Gem", 1, "count"), ("Ore", 10, "count"), ("Stone Dust", 5, "count")]
+    assert conservative.errors == []
+    assert conservative.shopping_list == [("Gem", 1, "count"), ("Ore", 10, "count")]
+    assert expected.shopping_list == [("Ore", 10, "count")]
+    assert [(step.recipe_name, step.multiplier) for step in expected.steps] == [
+        ("Macerate Ore", 10),
+        ("Bake Brick", 1),
+    ]
+    assert ("Stone Dust", 5, 0, "count") in expected.required_base_list
+
+    sweep = planner.sweep(brick, [1, 3], netting="expected", enabled_tiers=[], crafting_6x6_unlocked=True)
+    assert sweep.shopping_list(0) == expected.shopping_list
+    assert sweep.shopping_list(1) == planner.plan(brick, 3, netting="expected", **plan_kwargs).shopping_list
+
+
+def test_plan_netting_keeps_stable_credits_when_rounds_oscillate():
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+
+    ore = _insert_item(conn, key="ore", name="Ore", is_base=1)
+    slag = _insert_item(conn, key="slag", name="Slag", is_base=1)
+    left = _insert_item(conn, key="left", name="Left")
+    right = _insert_item(conn, key="right", name="Right")
+    metal = _insert_item(conn, key="metal", name="Metal")
+    frame = _insert_item(conn, key="frame", name="Frame")
+
+    # Left and Right each yield the other, so crediting one cancels the craft
+    # that produced the credit and the rounds flip forever; Slag is stable.
+    for name, main, other in (("Make Left", left, right), ("Make Right", right, left)):
+        recipe = _insert_recipe(conn, name=name)
+        _insert_line(conn, recipe_id=recipe, direction="out", item_id=main, qty_count=1)
+        _insert_line(conn, recipe_id=recipe, direction="out", item_id=other, qty_count=1)
+        _insert_line(conn, recipe_id=recipe, direction="in", item_id=ore, qty_count=1)
+    smelt = _insert_recipe(conn, name="Smelt Metal")
+    _insert_line(conn, recipe_id=smelt, direction="out", item_id=metal, qty_count=1)
+    _insert_line(conn, recipe_id=smelt, direction="out", item_id=slag, qty_count=1)
+    _insert_line(conn, recipe_id=smelt, direction="in", item_id=ore, qty_count=1)
+    assemble = _insert_recipe(conn, name="Assemble Frame")
+    _insert_line(conn, recipe_id=assemble, direction="out", item_id=frame, qty_count=1)
+    for item_id in (left, right, metal, slag):
+        _insert_line(conn, recipe_id=assemble, direction="in", item_id=item_id, qty_count=1)
+
+    result = PlannerService(conn, profile_conn).plan(
+        frame, 1, use_inventory=False, enabled_tiers=[], crafting_6x6_unlocked=True, netting="conservative"
+    )
+
+    assert result.errors == []
+    assert result.shopping_list == [("Ore", 3, "count")]
+    assert len(result.warnings) == 1
+    assert "did not settle" in result.warnings[0]
+
+
 def test_plan_selects_online_machine_tier_recipe():
     conn = _setup_conn()
     profile_conn = connect_profile(":memory:")
@@ -857,8 +1214,9 @@ def test_apply_overclock_rejects_lower_tier_machine():
 
 def test_get_calculated_tier_uses_first_configured_tier_for_non_eu_recipe(monkeypatch):
     from services import planner as planner_module
+    from services import tiers as tiers_module
 
-    monkeypatch.setattr(planner_module, "ALL_TIERS", ["Primitive", "LV", "MV"])
+    monkeypatch.setattr(tiers_module, "_table", tiers_module._build_table(["Primitive", "LV", "MV"], 99))
     row = {"tier": "", "method": "machine", "eu_per_tick": 0}
 
     assert planner_module.get_calculated_tier(row) == "Primitive"
@@ -927,6 +1285,33 @@ def test_load_inventory_preserves_unit_column_by_item_kind():
     assert inventory[item_solid] == 7
     assert inventory[item_fluid] == 800
 
+def test_load_inventory_reads_kinds_from_attached_content_db(tmp_path):
+    content_path = tmp_path / "content.db"
+    conn = sqlite3.connect(content_path)
+    conn.row_factory = sqlite3.Row
+    ensure_schema(conn)
+    item_solid = _insert_item(conn, key="item_a", name="Item A", kind="item", is_base=1)
+    item_fluid = _insert_item(conn, key="fluid_a", name="Fluid A", kind="fluid", is_base=1)
+    conn.commit()
+    profile_conn = connect_profile(tmp_path / "profile.db", content_path=content_path)
+    main_storage = profile_conn.execute("SELECT id FROM storage_units WHERE name='Main Storage'").fetchone()["id"]
+    profile_conn.executemany(
+        "INSERT INTO storage_assignments(storage_id, item_id, qty_count, qty_liters) VALUES(?,?,?,?)",
+        [(main_storage, item_solid, 7, 700), (main_storage, item_fluid, 8, 800)],
+    )
+    profile_conn.commit()
+
+    traced: list[str] = []
+    conn.set_trace_callback(traced.append)
+    inventory = PlannerService(conn, profile_conn).load_inventory()
+    conn.set_trace_callback(None)
+
+    assert inventory == {item_solid: 7, item_fluid: 800}
+    assert traced == []
+    profile_conn.close()
+    conn.close()
+
+
 def test_load_inventory_excludes_locked_and_disallowed_storage_rows():
     conn = _setup_conn()
     profile_conn = connect_profile(":memory:")
@@ -1501,3 +1886,107 @@ def test_pick_recipe_handles_zero_output_qty_without_division_errors():
 
     assert picked is not None
     assert picked["id"] == good_recipe
+
+
+def _build_ranking_candidates(conn, profile_conn):
+    ore = _insert_item(conn, key="rank_ore", name="Ore", is_base=1)
+    water = _insert_item(conn, key="rank_water", name="Water", kind="fluid", is_base=1)
+    output_item = _insert_item(conn, key="rank_dust", name="Dust")
+    specs = [
+        ("Hand Crush", "crafting", None, None, None, None, None, 0, 1),
+        ("Hand Crush Fast", "crafting", 40, 0, None, None, None, 0, 2),
+        ("Macerate LV", "machine", 400, 2, "LV", None, "macerator", 0, 1),
+        ("Macerate MV", "machine", 200, 30, "MV", None, "macerator", 0, 2),
+        ("Macerate HV", "machine", 100, 120, "HV", None, "macerator", 1, 3),
+        ("Macerate Capped", "machine", 300, 8, "LV", "LV", "macerator", 0, 2),
+        ("Wash ULV", "machine", 600, 0, None, None, "ore_washer", 0, 1),
+        ("Wash Voltage", "machine", 500, 500, None, None, "ore_washer", 0, 2),
+        ("Centrifuge EV", "machine", 800, 1920, "EV", None, "centrifuge", 1, 4),
+        ("Centrifuge Zero", "machine", 800, 120, "MV", None, "centrifuge", 0, 0),
+        ("Sift", "machine", None, None, "LV", None, "sifter", 0, 1),
+        ("Sift Duplicate", "machine", None, None, "LV", None, "sifter", 0, 1),
+    ]
+    for name, method, duration, eu, tier, max_tier, machine, perfect, out_qty in specs:
+        recipe_id = _insert_recipe(
+            conn,
+            name=name,
+            method=method,
+            duration_ticks=duration,
+            eu_per_tick=eu,
+            tier=tier,
+            max_tier=max_tier,
+            is_perfect_overclock=perfect,
+        )
+        if machine:
+            conn.execute("UPDATE recipes SET machine=? WHERE id=?", (machine, recipe_id))
+        _insert_line(conn, recipe_id=recipe_id, direction="out", item_id=output_item, qty_count=out_qty)
+        _insert_line(conn, recipe_id=recipe_id, direction="in", item_id=ore, qty_count=1)
+        if machine == "ore_washer":
+            _insert_line(conn, recipe_id=recipe_id, direction="in", item_id=water, qty_liters=1000)
+    return output_item
+
+
+@pytest.mark.parametrize(
+    "availability",
+    [
+        [],
+        [("macerator", "MV", 2, 1)],
+        [("macerator", "HV", 1, 1), ("centrifuge", "EV", 4, 2)],
+        [("macerator", "LV", 3, 3), ("ore_washer", "LV", 1, 1), ("sifter", "LV", 2, 0)],
+        [("macerator", "IV", 1, 0), ("centrifuge", "LV", 8, 8)],
+    ],
+)
+@pytest.mark.parametrize("enabled_tiers", [[], ["Steam Age", "LV"], ["LV", "MV", "HV", "EV"]])
+def test_batched_recipe_rank_matches_per_row_rank(monkeypatch, availability, enabled_tiers):
+    from services import planner as planner_module
+
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+    output_item = _build_ranking_candidates(conn, profile_conn)
+    for machine_type, tier, owned, online in availability:
+        _set_machine_availability(profile_conn, machine_type=machine_type, tier=tier, owned=owned, online=online)
+    profile_conn.commit()
+
+    planner = PlannerService(conn, profile_conn)
+    items = planner._load_items()
+
+    def _pick():
+        picked = planner._pick_recipe_for_item(
+            output_item,
+            enabled_tiers=enabled_tiers,
+            crafting_6x6_unlocked=True,
+            items=items,
+        )
+        return picked["id"]
+
+    monkeypatch.setattr(planner_module, "BATCH_RANK_MIN_ROWS", 10_000)
+    per_row = _pick()
+    monkeypatch.setattr(planner_module, "BATCH_RANK_MIN_ROWS", 1)
+    monkeypatch.setattr(planner_module, "np", None)
+    batched_array = _pick()
+
+    assert batched_array == per_row
+
+
+def test_batched_recipe_rank_numpy_matches_array_fallback():
+    pytest.importorskip("numpy")
+    from services import planner as planner_module
+
+    conn = _setup_conn()
+    profile_conn = connect_profile(":memory:")
+    output_item = _build_ranking_candidates(conn, profile_conn)
+    _set_machine_availability(profile_conn, machine_type="macerator", tier="HV", owned=2, online=1)
+    profile_conn.commit()
+
+    planner = PlannerService(conn, profile_conn)
+    rows = conn.execute(
+        "SELECT r.*, NULL AS machine_item_tier, rs.item_req_count, rs.fluid_req_count, rs.calculated_tier, "
+        "rl.qty_count AS output_qty FROM recipes r "
+        "JOIN recipe_stats rs ON rs.recipe_id=r.id "
+        "JOIN recipe_lines rl ON rl.recipe_id=r.id AND rl.direction='out' "
+        "WHERE rl.item_id=? ORDER BY r.name",
+        (output_item,),
+    ).fetchall()
+    cols = planner._recipe_rank_columns(rows, planner._load_machine_availability(), {"LV", "MV"})
+
+    assert planner_module._best_rank_index_numpy(cols) == planner_module._best_rank_index_array(cols)
@@ -1,6 +1,8 @@
-from services.db import connect_profile
+import pytest
+
+from services.db import connect, connect_profile
 from services.storage import create_storage_unit
-from ui_tabs.planner_tab_qt import PlannerTab
+from ui_tabs.planner_tab_qt import PlannerTab, PlannerWorker
 
 
 class _DummyApp:
@@ -16,6 +18,7 @@ class _DummyApp:
 class _DummyTab:
     _planner_storage_id = PlannerTab._planner_storage_id
     _adjust_inventory_qty = PlannerTab._adjust_inventory_qty
+    _adjust_inventory_qtys = PlannerTab._adjust_inventory_qtys
 
     def __init__(self, app):
         self.app = app
@@ -211,3 +214,64 @@ def test_on_inventory_changed_skips_replan_during_active_build_progress() -> Non
     assert tab._refresh_steps_called is False
     assert tab.app.status_bar.messages
     assert "skipped auto re-plan" in tab.app.status_bar.messages[-1]
+
+
+def _write_plate_content(tmp_path):
+    content_path = tmp_path / "content.db"
+    conn = connect(content_path)
+    conn.execute("INSERT INTO items(id, key, display_name, kind, is_base) VALUES(1, 'ore', 'Ore', 'item', 1)")
+    conn.execute("INSERT INTO items(id, key, display_name, kind, is_base) VALUES(2, 'plate', 'Plate', 'item', 0)")
+    conn.execute("INSERT INTO recipes(id, name, method) VALUES(1, 'Press Plate', 'crafting')")
+    conn.executemany(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_count) VALUES(1, ?, ?, ?)",
+        [("in", 1, 3), ("out", 2, 2)],
+    )
+    conn.commit()
+    conn.close()
+    return content_path
+
+
+def test_planner_worker_runs_what_if_sweeps(tmp_path) -> None:
+    content_path = _write_plate_content(tmp_path)
+    emitted = []
+    worker = PlannerWorker(
+        db_path=content_path,
+        profile_db_path=tmp_path / "profile.db",
+        target_item_id=2,
+        target_qty=1,
+        use_inventory=False,
+        enabled_tiers=[],
+        crafting_6x6_unlocked=True,
+        sweep_quantities=[1, 4],
+    )
+    worker.finished.connect(lambda result, error: emitted.append((result, error)))
+
+    worker.run()
+
+    [(sweep, error)] = emitted
+    assert error is None
+    assert sweep.quantities == [1, 4]
+    assert sweep.shopping_table == [("Ore", "count", [3, 6])]
+
+
+def test_planner_worker_runs_rate_plans(tmp_path) -> None:
+    content_path = _write_plate_content(tmp_path)
+    emitted = []
+    worker = PlannerWorker(
+        db_path=content_path,
+        profile_db_path=tmp_path / "profile.db",
+        target_item_id=2,
+        target_qty=1,
+        use_inventory=False,
+        enabled_tiers=[],
+        crafting_6x6_unlocked=True,
+        target_rate=4.0,
+    )
+    worker.finished.connect(lambda result, error: emitted.append((result, error)))
+
+    worker.run()
+
+    [(rate_plan, error)] = emitted
+    assert error is None
+    assert [step.recipe_name for step in rate_plan.steps] == ["Press Plate"]
+    assert rate_plan.steps[0].output_rate == pytest.approx(4.0)
@@ -0,0 +1,194 @@
+import sqlite3
+
+import pytest
+
+from services import db
+from services.machine_availability import build_machine_availability_index
+from services.recipes import (
+    RecipeTierIndex,
+    fetch_recipe_outputs,
+    fetch_recipes,
+    recipes_version,
+    save_recipe,
+    search_recipe_ids_by_output,
+)
+
+
+def _content_conn():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    db.ensure_schema(conn)
+    return conn
+
+
+def test_fetch_recipes_returns_enabled_tiers_in_name_order():
+    conn = _content_conn()
+    for name, tier in (("Delta", "LV"), ("Alpha", "LV"), ("Charlie", "HV"), ("Bravo", None), ("Echo", "LV")):
+        conn.execute("INSERT INTO recipes(name, method, tier) VALUES(?, 'crafting', ?)", (name, tier))
+
+    rows = fetch_recipes(conn, ["LV"])
+
+    assert [row["name"] for row in rows] == ["Alpha", "Bravo", "Delta", "Echo"]
+
+
+def test_fetch_recipes_availability_filter_uses_machine_item_and_tier_fallbacks():
+    conn = _content_conn()
+    conn.execute(
+        "INSERT INTO items(key, display_name, kind, machine_tier) VALUES('basic_lathe', ' Lathe ', 'machine', 'HV')"
+    )
+    machine_id = conn.execute("SELECT id FROM items WHERE key='basic_lathe'").fetchone()["id"]
+    conn.execute(
+        "INSERT INTO recipes(name, method, machine_item_id) VALUES('Lathe Item Tier', 'machine', ?)",
+        (machine_id,),
+    )
+    conn.execute("INSERT INTO recipes(name, method, machine, tier) VALUES('Custom Tier', 'machine', 'sifter', 'Custom')")
+    conn.execute("INSERT INTO recipes(name, method, machine) VALUES('No Tier', 'machine', 'sifter')")
+    conn.execute("INSERT INTO recipes(name, method, machine, tier) VALUES('Too High', 'machine', 'sifter', 'EV')")
+
+    profile = db.connect_profile(":memory:")
+    try:
+        profile.execute(
+            "INSERT INTO machine_availability(machine_type, tier, owned, online) VALUES('lathe', 'IV', 1, 1)"
+        )
+        profile.execute(
+            "INSERT INTO machine_availability(machine_type, tier, owned, online) VALUES('sifter', 'Custom', 1, 1)"
+        )
+        index = build_machine_availability_index(profile)
+
+        rows = fetch_recipes(conn, ["LV", "Custom", "EV"], index)
+
+        assert [row["name"] for row in rows] == ["Custom Tier", "Lathe Item Tier", "No Tier"]
+    finally:
+        profile.close()
+        conn.close()
+
+
+def test_recipe_tier_index_matches_fetch_recipes():
+    conn = _content_conn()
+    for name, tier in (
+        ("Anvil", "LV"),
+        ("Bellows", None),
+        ("Crucible", "Stone Age"),
+        ("Drum", "MV"),
+        ("Easel", " "),
+        ("Forge", "LV"),
+    ):
+        conn.execute("INSERT INTO recipes(name, method, tier) VALUES(?, 'crafting', ?)", (name, tier))
+
+    index = RecipeTierIndex(fetch_recipes(conn, None))
+
+    for tiers in ([], ["LV"], ["MV", "LV"], ["Stone Age", "HV"], ["LV", "MV", "Stone Age"]):
+        expected = [row["id"] for row in fetch_recipes(conn, tiers)]
+        assert [row["id"] for row in index.recipes(tiers)] == expected
+    assert [row["name"] for row in index.recipes(["LV"])] == ["Anvil", "Bellows", "Easel", "Forge"]
+
+
+def _seed_outputs(conn):
+    conn.execute("INSERT INTO items(id, key, display_name, kind) VALUES(1, 'dustIron', 'Iron Dust', 'item')")
+    conn.execute("INSERT INTO items(id, key, display_name, kind) VALUES(2, 'ingotIron', 'Iron Ingot', 'item')")
+    conn.execute("INSERT INTO items(id, key, display_name, kind) VALUES(3, 'chlorine', 'Chlorine', 'gas')")
+    conn.execute("INSERT INTO recipes(id, name, method) VALUES(10, 'Smelt', 'machine')")
+    conn.execute("INSERT INTO recipes(id, name, method) VALUES(20, 'Grind', 'machine')")
+    conn.execute("INSERT INTO recipes(id, name, method) VALUES(30, 'Electrolyze', 'machine')")
+    conn.executemany(
+        "INSERT INTO recipe_lines(recipe_id, direction, item_id, qty_count) VALUES(?, ?, ?, 1)",
+        [(10, "in", 1), (10, "out", 2), (20, "out", 1), (30, "out", 3)],
+    )
+
+
+def test_search_recipe_ids_by_output_matches_output_lines_only():
+    conn = _content_conn()
+    _seed_outputs(conn)
+
+    assert search_recipe_ids_by_output(conn, "  DUST ") == {20}
+    assert search_recipe_ids_by_output(conn, "gas") == {30}
+    assert search_recipe_ids_by_output(conn, "iron") == {10, 20}
+    assert search_recipe_ids_by_output(conn, "   ") == set()
+
+
+def test_fetch_recipe_outputs_handles_more_ids_than_sql_variables():
+    conn = _content_conn()
+    _seed_outputs(conn)
+    # Well past SQLite's default 32766 bound-parameter limit.
+    recipe_ids = list(range(100, 40_000)) + [30, 10]
+
+    rows = fetch_recipe_outputs(conn, recipe_ids)
+
+    assert [(row["recipe_id"], row["item_name"]) for row in rows] == [(10, "Iron Ingot"), (30, "Chlorine")]
+    assert fetch_recipe_outputs(conn, []) == []
+
+
+def _recipe_fields(name):
+    return {"name": name, "method": "machine", "machine": "Electrolyzer", "tier": "LV", "duration_ticks": 200}
+
+
+def test_save_recipe_writes_lines_and_syncs_output_variants_in_one_save():
+    conn = _content_conn()
+    _seed_outputs(conn)
+    conn.execute("INSERT INTO items(id, key, display_name, kind) VALUES(4, 'hydrogen', 'Hydrogen', 'gas')")
+    conn.execute("UPDATE recipes SET name='  CHLORINE ', name_canonical='chlorine' WHERE id=30")
+    inputs = [{"item_id": 1, "kind": "item", "qty_count": 2, "input_slot_index": 0}]
+    outputs = [
+        {"item_id": 2, "kind": "item", "qty_count": 1, "output_slot_index": 0},
+        {"item_id": 3, "kind": "gas", "qty_liters": 500, "chance_percent": 50.0},
+        {"item_id": 4, "kind": "gas", "qty_liters": 250},
+    ]
+    version = recipes_version(conn)
+
+    recipe_id = save_recipe(conn, _recipe_fields("Iron Ingot"), inputs, outputs, name_item_id=2)
+
+    # Chlorine already has a canonical recipe, so only Hydrogen gets a variant.
+    variants = conn.execute(
+        "SELECT id, name, name_canonical, tier FROM recipes WHERE duplicate_of_recipe_id=?",
+        (recipe_id,),
+    ).fetchall()
+    assert [(row["name"], row["name_canonical"], row["tier"]) for row in variants] == [("Hydrogen", "hydrogen", "LV")]
+    for line_recipe_id in (recipe_id, variants[0]["id"]):
+        lines = conn.execute(
+            "SELECT direction, item_id, qty_count, qty_liters, chance_percent FROM recipe_lines WHERE recipe_id=? ORDER BY id",
+            (line_recipe_id,),
+        ).fetchall()
+        assert [tuple(row) for row in lines] == [
+            ("in", 1, 2, None, None),
+            ("out", 2, 1, None, 100.0),
+            ("out", 3, None, 500, 50.0),
+            ("out", 4, None, 250, 100.0),
+        ]
+    assert recipes_version(conn) == version + 1
+
+    save_recipe(conn, _recipe_fields("Iron Ingot"), inputs, outputs[:2], recipe_id=recipe_id, name_item_id=2)
+
+    assert conn.execute("SELECT COUNT(*) FROM recipes WHERE duplicate_of_recipe_id=?", (recipe_id,)).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM recipe_lines WHERE recipe_id=?", (variants[0]["id"],)).fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM recipe_lines WHERE recipe_id=?", (recipe_id,)).fetchone()[0] == 3
+    assert recipes_version(conn) == version + 2
+
+
+def test_save_recipe_rolls_back_on_error():
+    conn = _content_conn()
+    conn.execute("PRAGMA foreign_keys=ON")
+    _seed_outputs(conn)
+    version = recipes_version(conn)
+    outputs = [{"item_id": 999, "kind": "item", "qty_count": 1}]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        save_recipe(conn, _recipe_fields("Broken"), [], outputs)
+
+    assert conn.execute("SELECT COUNT(*) FROM recipes WHERE name='Broken'").fetchone()[0] == 0
+    assert recipes_version(conn) == version
+
+
+def test_save_recipe_needs_no_app_functions_on_the_connection(tmp_path):
+    content_path = tmp_path / "content.db"
+    db.connect(content_path).close()
+    conn = sqlite3.connect(content_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO recipes(name, method) VALUES('Imported', 'machine')")
+
+    recipe_id = save_recipe(conn, _recipe_fields("  Iron   INGOT "), [], [])
+    save_recipe(conn, _recipe_fields("Steel Ingot"), [], [], recipe_id=recipe_id)
+
+    row = conn.execute("SELECT name_canonical FROM recipes WHERE id=?", (recipe_id,)).fetchone()
+    assert row["name_canonical"] == "steel ingot"
+    triggers = conn.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='recipes'").fetchall()
+    assert not any("name_canonical" in row["name"] for row in triggers)
@@ -337,3 +337,56 @@ def test_delete_selected_recipe_deletes_only_selected_variant(monkeypatch) -> No
     assert app.conn.execute("SELECT COUNT(*) AS c FROM recipe_lines WHERE recipe_id=101").fetchone()["c"] == 0
     assert app.refreshed is True
     tab.deleteLater()
+
+
+def test_render_recipes_updates_tree_in_place_and_fetches_only_new_outputs(monkeypatch) -> None:
+    _get_app()
+
+    class DummyApp:
+        editor_enabled = False
+        conn = _seed_conn()
+        recipe_index = object()
+
+    tab = RecipesTab(DummyApp())
+    fetched: list[list[int]] = []
+    original_fetch = tab._fetch_recipe_outputs
+
+    def recording_fetch(recipes):
+        fetched.append(sorted(recipe["id"] for recipe in recipes))
+        return original_fetch(recipes)
+
+    monkeypatch.setattr(tab, "_fetch_recipe_outputs", recording_fetch)
+    monkeypatch.setattr(tab, "_render_item_recipes", lambda _item_id: None)
+    iron = {"id": 100, "name": "Iron Ingot", "duplicate_of_recipe_id": None}
+    copper = {"id": 200, "name": "Copper Dust", "duplicate_of_recipe_id": None}
+    chlorine = {"id": 300, "name": "Chlorine", "duplicate_of_recipe_id": None}
+
+    tab.render_recipes([iron, chlorine])
+    items_node = tab.recipe_tree.topLevelItem(0)
+    tab.render_recipes([iron, copper])
+    tab.render_recipes([iron, copper, chlorine])
+
+    assert fetched == [[100, 300], [200]]
+    assert tab.recipe_tree.topLevelItem(0) is items_node
+    assert [tab.recipe_tree.topLevelItem(i).text(0) for i in range(tab.recipe_tree.topLevelItemCount())] == [
+        "Items",
+        "Gases",
+    ]
+    assert [items_node.child(i).text(0) for i in range(items_node.childCount())] == ["Dust", "Ingot"]
+    assert sorted(tab.recipe_item_node_map.values()) == [1, 3, 4]
+
+    DummyApp.recipe_index = object()
+    tab.render_recipes([iron])
+
+    assert fetched[-1] == [100]
+    assert list(tab.recipe_item_node_map.values()) == [1]
+
+    # Re-reading the item list (e.g. after a rename) drops the cached output rows.
+    DummyApp.conn.execute("UPDATE items SET display_name='Wrought Iron' WHERE id=1")
+    DummyApp.items = []
+    tab.render_recipes([iron])
+
+    assert fetched[-1] == [100]
+    node = next(node for node, item_id in tab.recipe_item_node_map.items() if item_id == 1)
+    assert node.text(0) == "Wrought Iron"
+    tab.deleteLater()
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import pytest
+
+QtWidgets = pytest.importorskip("PySide6.QtWidgets", exc_type=ImportError)
+
+from ui_search import SearchController, apply_tree_filter
+
+
+def _get_app() -> QtWidgets.QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        app = QtWidgets.QApplication([])
+    return app
+
+
+def _wait_for(app, predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_search_controller_debounces_and_runs_off_gui_thread() -> None:
+    app = _get_app()
+    edit = QtWidgets.QLineEdit()
+    applied: list[tuple[str, object]] = []
+    job_threads: list[threading.Thread] = []
+
+    def make_job(text: str):
+        def run():
+            job_threads.append(threading.current_thread())
+            return text.upper()
+
+        return run
+
+    controller = SearchController(
+        edit,
+        make_job=make_job,
+        apply=lambda text, result: applied.append((text, result)),
+        delay_ms=10,
+    )
+    for text in ("c", "co", "cop"):
+        edit.setText(text)
+
+    _wait_for(app, lambda: applied)
+
+    assert applied == [("cop", "COP")]
+    assert job_threads and job_threads[0] is not threading.main_thread()
+    assert not controller.is_pending()
+    edit.deleteLater()
+
+
+def test_search_controller_drops_stale_results() -> None:
+    app = _get_app()
+    edit = QtWidgets.QLineEdit()
+    applied: list[str] = []
+    release = threading.Event()
+
+    def make_job(text: str):
+        def run():
+            if text == "slow":
+                release.wait(2.0)
+            return text
+
+        return run
+
+    controller = SearchController(
+        edit,
+        make_job=make_job,
+        apply=lambda _text, result: applied.append(result),
+        delay_ms=0,
+    )
+    edit.setText("slow")
+    _wait_for(app, lambda: not controller.is_pending())
+    edit.setText("fast")
+    _wait_for(app, lambda: not controller.is_pending())
+    release.set()
+    _wait_for(app, lambda: applied)
+    _wait_for(app, lambda: len(applied) > 1, timeout=0.2)
+
+    assert applied == ["fast"]
+    edit.deleteLater()
+
+
+def test_search_controller_reports_failures_and_keeps_last_result() -> None:
+    app = _get_app()
+    edit = QtWidgets.QLineEdit()
+    applied: list[str] = []
+    failures: list[tuple[str, str]] = []
+
+    def make_job(text: str):
+        def run():
+            if text == "bad":
+                raise ValueError("no index")
+            return text
+
+        return run
+
+    controller = SearchController(
+        edit,
+        make_job=make_job,
+        apply=lambda _text, result: applied.append(result),
+        delay_ms=0,
+    )
+    controller.failed.connect(lambda text, error: failures.append((text, str(error))))
+    edit.setText("good")
+    _wait_for(app, lambda: applied)
+    edit.setText("bad")
+    _wait_for(app, lambda: failures)
+
+    assert failures == [("bad", "no index")]
+    assert applied == ["good"]
+    edit.deleteLater()
+
+
+def test_apply_tree_filter_hides_unmatched_leaves_and_empty_groups() -> None:
+    _get_app()
+    from PySide6 import QtCore
+
+    tree = QtWidgets.QTreeWidget()
+    groups = {}
+    for group, item_id in (("Dust", 1), ("Dust", 2), ("Ingot", 3)):
+        parent = groups.get(group)
+        if parent is None:
+            parent = groups[group] = QtWidgets.QTreeWidgetItem([group])
+            tree.addTopLevelItem(parent)
+        leaf = QtWidgets.QTreeWidgetItem([str(item_id)])
+        leaf.setData(0, QtCore.Qt.UserRole, item_id)
+        parent.addChild(leaf)
+
+    apply_tree_filter(tree, {2})
+
+    assert not groups["Dust"].isHidden()
+    assert groups["Dust"].child(0).isHidden()
+    assert not groups["Dust"].child(1).isHidden()
+    assert groups["Ingot"].isHidden()
+
+    apply_tree_filter(tree, None)
+
+    assert not groups["Ingot"].isHidden()
+    assert not groups["Dust"].child(0).isHidden()
+    tree.deleteLater()
@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from services import startup_profile
+from services.startup_profile import StartupProfiler, configure_startup_profiler
+
+ROOT = Path(__file__).resolve().parents[1]
+# Opt-in limit (ms) on a cold start of the full window (imports, both DBs,
+# first tab) on an empty DB. Shared CI runners are too noisy for a wall-clock
+# limit, so it is only checked when set, e.g. GTNH_STARTUP_BUDGET_MS=5000.
+STARTUP_BUDGET_MS = os.environ.get("GTNH_STARTUP_BUDGET_MS")
+
+
+@pytest.fixture(autouse=True)
+def _restore_profiler():
+    original = startup_profile._profiler
+    yield
+    startup_profile._profiler = original
+
+
+def test_configure_reads_flag_then_env(tmp_path: Path) -> None:
+    profiler, argv = configure_startup_profiler(["app.py", "-style", "fusion"], {})
+    assert not profiler.enabled
+    assert argv == ["app.py", "-style", "fusion"]
+
+    profiler, _ = configure_startup_profiler(["app.py"], {"GTNH_PROFILE_STARTUP": "1"})
+    assert profiler.enabled and profiler.output is None
+
+    target = tmp_path / "startup.json"
+    profiler, argv = configure_startup_profiler(
+        ["app.py", f"--profile-startup={target}"],
+        {"GTNH_PROFILE_STARTUP": "0"},
+    )
+    assert profiler.enabled and profiler.output == target
+    assert argv == ["app.py"]
+    assert startup_profile.startup_profiler() is profiler
+
+
+def test_profiler_records_nested_phases_and_writes_once(tmp_path: Path) -> None:
+    target = tmp_path / "startup.json"
+    profiler = StartupProfiler(enabled=True, output=target)
+    with profiler.phase("outer"):
+        with profiler.phase("inner"):
+            pass
+
+    report = profiler.finish()
+
+    assert [(phase["name"], phase["depth"]) for phase in report["phases"]] == [("outer", 0), ("inner", 1)]
+    assert json.loads(target.read_text(encoding="utf-8"))["phases"][1]["name"] == "inner"
+    with profiler.phase("after finish"):
+        pass
+    assert profiler.finish() is None
+    assert len(profiler.phases) == 2
+
+
+def test_disabled_profiler_records_nothing() -> None:
+    profiler = StartupProfiler()
+    with profiler.phase("ignored"):
+        pass
+    assert profiler.phases == []
+    assert profiler.finish() is None
+
+
+def test_startup_profiles_real_startup_within_optional_budget(tmp_path: Path) -> None:
+    pytest.importorskip("PySide6.QtWidgets", exc_type=ImportError)
+    report_path = tmp_path / "startup.json"
+    # ui_main is patched as app.main imports it, so that import stays in the report.
+    script = textwrap.dedent(
+        f"""
+        import importlib.abc
+        import importlib.util
+        import sys
+        from pathlib import Path
+
+        import app
+        from services import db
+
+        db.DEFAULT_DB_PATH = Path({str(tmp_path / "gtnh.db")!r})
+
+
+        def patch_ui_main(ui_main):
+            from PySide6 import QtWidgets
+
+            finish_startup = ui_main.App._finish_startup
+
+            def finish_and_quit(self):
+                finish_startup(self)
+                QtWidgets.QApplication.quit()
+
+            ui_main.App._finish_startup = finish_and_quit
+            ui_main.App._detect_editor_enabled = lambda self: True
+
+
+        class PatchOnImport(importlib.abc.MetaPathFinder):
+            def find_spec(self, name, path, target=None):
+                if name != "ui_main":
+                    return None
+                sys.meta_path.remove(self)
+                spec = importlib.util.find_spec(name)
+                exec_module = spec.loader.exec_module
+
+                def exec_and_patch(module):
+                    exec_module(module)
+                    patch_ui_main(module)
+
+                spec.loader.exec_module = exec_and_patch
+                return spec
+
+
+        sys.meta_path.insert(0, PatchOnImport())
+        sys.exit(app.main(["app.py", "--profile-startup={report_path.as_posix()}"]))
+        """
+    )
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env.pop("GTNH_PROFILE_STARTUP", None)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    names = {phase["name"] for phase in report["phases"]}
+    assert {"import ui_main", "App.__init__", "DbLifecycle", "open content db", "window.show", "first tab"} <= names
+    if STARTUP_BUDGET_MS:
+        assert report["total_ms"] < float(STARTUP_BUDGET_MS), report
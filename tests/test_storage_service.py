@@ -4,6 +4,7 @@ from services.db import connect_profile
 from services.storage import (
     MAIN_STORAGE_NAME,
     adjust_assignment_qty_for_storage,
+    apply_inventory_adjustments,
     aggregate_assignment_for_item,
     assignment_slot_usage,
     aggregated_assignment_rows,
@@ -313,6 +314,122 @@ def test_recompute_storage_slot_capacities_treats_liter_containers_without_conte
         conn.close()
 
 
+def test_place_storage_containers_matches_full_rebuild(tmp_path) -> None:
+    from services.storage import place_storage_containers, recompute_storage_slot_capacities
+
+    conn = connect_profile(tmp_path / "profile.db")
+    try:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT,
+                kind TEXT,
+                storage_slot_count INTEGER,
+                content_qty_liters INTEGER
+            )
+            """
+        )
+        conn.execute("INSERT INTO items(key, kind, storage_slot_count) VALUES('wood_chest', 'item', 27)")
+        conn.execute("INSERT INTO items(key, kind, content_qty_liters) VALUES('steam_tank', 'item', 16000)")
+        conn.execute("INSERT INTO storage_units(name, kind) VALUES('Ore Storage', 'ore')")
+        main_storage = default_storage_id(conn)
+        ore_storage = conn.execute("SELECT id FROM storage_units WHERE name='Ore Storage'").fetchone()["id"]
+
+        # The first placement in a never-computed storage falls back to a rebuild.
+        place_storage_containers(conn, storage_id=main_storage, item_id=1, placed_count=2, content_conn=conn)
+        assert conn.execute("SELECT slot_count FROM storage_units WHERE id=?", (main_storage,)).fetchone()[0] == 90
+
+        for storage_id, item_id, placed in [
+            (ore_storage, 1, 3),
+            (ore_storage, 2, 2),
+            (main_storage, 1, 1),
+            (ore_storage, 1, 0),
+            (ore_storage, 2, 5),
+        ]:
+            place_storage_containers(conn, storage_id=storage_id, item_id=item_id, placed_count=placed, content_conn=conn)
+        incremental = conn.execute("SELECT id, slot_count, liter_capacity FROM storage_units ORDER BY id").fetchall()
+
+        assert recompute_storage_slot_capacities(conn, player_slots=36, content_conn=conn) == 0
+        rebuilt = conn.execute("SELECT id, slot_count, liter_capacity FROM storage_units ORDER BY id").fetchall()
+        assert [tuple(row) for row in incremental] == [tuple(row) for row in rebuilt]
+        assert [tuple(row) for row in rebuilt] == [(main_storage, 63, 0), (ore_storage, 0, 80000)]
+    finally:
+        conn.close()
+
+
+def test_attached_content_joins_match_map_based_storage_queries(tmp_path) -> None:
+    from services.db import connect
+    from services.storage import (
+        aggregated_assignment_rows_for_planner,
+        place_storage_containers,
+        recompute_storage_slot_capacities,
+        storage_slot_usage,
+        validate_storage_fit_for_item,
+    )
+
+    content_path = tmp_path / "content.db"
+    content = connect(content_path)
+    content.execute("INSERT INTO items(key, kind, max_stack_size) VALUES('pearl', 'item', 16)")
+    content.execute("INSERT INTO items(key, kind, is_storage_container, storage_slot_count) VALUES('chest', 'item', 1, 27)")
+    content.execute("INSERT INTO items(key, kind) VALUES('water', 'fluid')")
+    content.execute("INSERT INTO items(key, kind, content_fluid_id, content_qty_liters) VALUES('cell', 'item', 3, 8000)")
+    content.commit()
+    ids = {row["key"]: int(row["id"]) for row in content.execute("SELECT id, key FROM items")}
+    stack_sizes = {int(row["id"]): max(1, int(row["max_stack_size"] or 64)) for row in content.execute("SELECT id, max_stack_size FROM items")}
+    container_ids = {ids["chest"], ids["cell"]}
+
+    separate = connect_profile(tmp_path / "separate.db")
+    joined = connect_profile(tmp_path / "joined.db", content_path=content_path)
+    try:
+        for conn in (separate, joined):
+            storage_id = create_storage_unit(conn, name="Box")
+            upsert_assignment(conn, storage_id=storage_id, item_id=ids["pearl"], qty_count=40, qty_liters=None)
+            upsert_assignment(conn, storage_id=storage_id, item_id=ids["chest"], qty_count=5, qty_liters=None)
+            upsert_assignment(conn, storage_id=storage_id, item_id=ids["water"], qty_count=None, qty_liters=500)
+            upsert_assignment(conn, storage_id=storage_id, item_id=999, qty_count=65, qty_liters=None)
+            place_storage_containers(conn, storage_id=storage_id, item_id=ids["chest"], placed_count=2, content_conn=content)
+            place_storage_containers(conn, storage_id=storage_id, item_id=ids["cell"], placed_count=3, content_conn=content)
+            recompute_storage_slot_capacities(conn, content_conn=content)
+
+        def capacities(conn):
+            return [tuple(row) for row in conn.execute("SELECT name, slot_count, liter_capacity FROM storage_units ORDER BY id")]
+
+        assert capacities(joined) == capacities(separate)
+        assert ("Box", 54, 24000) in capacities(joined)
+        assert storage_slot_usage(joined, storage_id=storage_id) == storage_slot_usage(
+            separate,
+            storage_id=storage_id,
+            known_item_stack_sizes=stack_sizes,
+            known_container_item_ids=container_ids,
+        )
+        for item_id, qty_count, qty_liters in [(ids["pearl"], 100, None), (ids["chest"], 9, None), (ids["water"], None, 30000)]:
+            assert validate_storage_fit_for_item(
+                joined,
+                storage_id=storage_id,
+                item_id=item_id,
+                qty_count=qty_count,
+                qty_liters=qty_liters,
+                item_max_stack_size=stack_sizes[item_id],
+            ) == validate_storage_fit_for_item(
+                separate,
+                storage_id=storage_id,
+                item_id=item_id,
+                qty_count=qty_count,
+                qty_liters=qty_liters,
+                item_max_stack_size=stack_sizes[item_id],
+                known_item_stack_sizes=stack_sizes,
+                known_container_item_ids=container_ids,
+            )
+        assert {row["item_id"]: row["kind"] for row in aggregated_assignment_rows_for_planner(joined, with_kinds=True)}[
+            ids["water"]
+        ] == "fluid"
+    finally:
+        separate.close()
+        joined.close()
+        content.close()
+
+
 def test_storage_slot_usage_ignores_container_items(tmp_path) -> None:
     from services.storage import storage_slot_usage
 
@@ -434,3 +551,75 @@ def test_adjust_assignment_qty_for_storage_active_mode_preserves_locked_flag(tmp
         conn.close()
 
 
+
+
+def _seed_ledger(conn) -> tuple[int, int, int]:
+    high = create_storage_unit(conn, name="High", priority=9)
+    low = create_storage_unit(conn, name="Low", priority=1)
+    manual = create_storage_unit(conn, name="Manual", priority=20, allow_planner_use=False)
+    upsert_assignment(conn, storage_id=high, item_id=1, qty_count=5, qty_liters=None, locked=False)
+    upsert_assignment(conn, storage_id=low, item_id=1, qty_count=30, qty_liters=None, locked=False)
+    upsert_assignment(conn, storage_id=manual, item_id=1, qty_count=50, qty_liters=None, locked=False)
+    upsert_assignment(conn, storage_id=low, item_id=2, qty_count=None, qty_liters=1000, locked=True)
+    upsert_assignment(conn, storage_id=high, item_id=3, qty_count=4, qty_liters=None, locked=False)
+    conn.commit()
+    return high, low, manual
+
+
+def _ledger_rows(conn) -> list[tuple]:
+    return [
+        tuple(row)
+        for row in conn.execute(
+            "SELECT storage_id, item_id, qty_count, qty_liters, locked FROM storage_assignments ORDER BY 1, 2"
+        ).fetchall()
+    ]
+
+
+def test_apply_inventory_adjustments_matches_per_item_calls() -> None:
+    kinds = {1: "item", 2: "fluid", 3: "item"}
+    adjustments = [(1, -12), (2, -250), (3, 6), (1, 3), (3, -20), (3, 2), (4, 0)]
+
+    for consume_by_priority in (False, True):
+        batched = connect_profile(":memory:")
+        looped = connect_profile(":memory:")
+        high, _low, _manual = _seed_ledger(batched)
+        _seed_ledger(looped)
+
+        apply_inventory_adjustments(
+            batched,
+            adjustments,
+            item_kinds=kinds,
+            storage_id=high,
+            consume_by_priority=consume_by_priority,
+        )
+        for item_id, delta in adjustments:
+            if delta < 0 and consume_by_priority:
+                consume_assignment_qty_for_planner(looped, item_id=item_id, qty=-delta, item_kind=kinds.get(item_id, ""))
+            elif delta:
+                adjust_assignment_qty_for_storage(
+                    looped, storage_id=high, item_id=item_id, delta=delta, item_kind=kinds.get(item_id, "")
+                )
+
+        assert _ledger_rows(batched) == _ledger_rows(looped)
+        batched.close()
+        looped.close()
+
+
+def test_apply_inventory_adjustments_batches_writes() -> None:
+    conn = connect_profile(":memory:")
+    high, _low, _manual = _seed_ledger(conn)
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    apply_inventory_adjustments(
+        conn,
+        [(item_id, -1) for item_id in (1, 2, 3)] + [(100 + n, 5) for n in range(200)],
+        item_kinds={},
+        storage_id=high,
+        consume_by_priority=True,
+    )
+
+    conn.set_trace_callback(None)
+    reads = [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert len(reads) == 2
+    assert conn.execute("SELECT COUNT(*) FROM storage_assignments WHERE item_id >= 100").fetchone()[0] == 200
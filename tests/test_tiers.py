@@ -0,0 +1,45 @@
+from services import tiers
+from services.db import ALL_TIERS, set_all_tiers
+from services.planner import apply_overclock
+
+
+def test_tier_rank_interns_names_and_normalizes_whitespace():
+    table = tiers.tier_table()
+
+    assert table.rank("LV") == table.names.index("LV")
+    assert table.rank("  LV ") == table.rank("LV")
+    assert table.rank("") is None
+    assert table.rank(None) is None
+    assert table.rank("Not A Tier") is None
+    assert table.name(table.rank("HV")) == "HV"
+
+
+def test_tier_rank_memo_stays_bounded_on_unknown_strings():
+    table = tiers.tier_table()
+
+    for idx in range(tiers.LOOKUP_MEMO_LIMIT + 50):
+        assert table.rank(f"typed {idx}") is None
+
+    assert len(table._lookup) <= tiers.LOOKUP_MEMO_LIMIT
+    assert table.rank(" MV") == table.names.index("MV")
+
+
+def test_set_tiers_bumps_version_and_updates_legacy_list():
+    before = tiers.tier_table()
+
+    after = tiers.set_tiers(["Primitive", "LV", "MV"])
+
+    assert after.version == before.version + 1
+    assert tiers.tier_rank("MV") == 2
+    assert tiers.tier_rank("HV") is None
+    assert tiers.default_tier() == "Primitive"
+    assert ALL_TIERS == ["Primitive", "LV", "MV"]
+    assert tiers.set_tiers(["Primitive", "LV", "MV"]) is after
+
+
+def test_set_all_tiers_reorders_planner_overclocking():
+    set_all_tiers(["LV", "HV", "MV"])
+
+    # HV now sits directly above LV, so only one overclock step applies.
+    assert apply_overclock(200, 32, "LV", "HV") == (100, 128)
+    assert tiers.tier_table().highest(["MV", "HV", "bogus"]) == "MV"
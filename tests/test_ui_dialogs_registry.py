@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("PySide6.QtWidgets", exc_type=ImportError)
+
+import ui_dialogs
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_registry_resolves_every_dialog_from_its_module() -> None:
+    for name in ui_dialogs.__all__:
+        dialog_cls = getattr(ui_dialogs, name)
+        assert dialog_cls.__name__ == name
+        assert dialog_cls.__module__ == f"ui_dialogs.{ui_dialogs._DIALOG_MODULES[name]}"
+
+    with pytest.raises(AttributeError):
+        ui_dialogs.NotADialog
+
+
+def test_importing_main_window_does_not_load_dialog_modules() -> None:
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, ui_main; print(sorted(m for m in sys.modules if m.startswith('ui_dialogs.')))",
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
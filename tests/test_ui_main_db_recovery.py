@@ -118,3 +118,35 @@ def test_switch_db_failure_keeps_current_handles(monkeypatch: pytest.MonkeyPatch
     assert app.profile_conn is original_profile_conn
     assert len(warnings) == 1
     assert "current database remains open" in warnings[0][1].lower()
+
+
+def test_recover_closed_connection_keeps_pending_inventory(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    from services.db import connect_profile
+    from services.storage import create_storage_unit, get_assignment
+
+    profile_path = tmp_path / "gtnh_profile.db"
+
+    class _ProfileDb(_DummyDb):
+        def switch_db(self, new_path: Path) -> None:
+            self.switch_calls.append(Path(new_path))
+            self.profile_conn = connect_profile(profile_path)
+
+    dummy_db = _ProfileDb()
+    dummy_db.profile_db_path = profile_path
+    dummy_db.profile_conn = connect_profile(profile_path)
+    storage_id = create_storage_unit(dummy_db.profile_conn, name="Main")
+    dummy_db.profile_conn.commit()
+
+    app = _make_app(dummy_db)
+    app._inventory_flush_timer = ui_main.QtCore.QTimer()
+    app._sync_db_handles()
+    app.inventory_ledger.apply([(7, 12)], item_kinds={7: "item"}, storage_id=storage_id)
+    dummy_db.profile_conn.close()
+    monkeypatch.setattr(ui_main.QtWidgets.QMessageBox, "information", lambda *_args: None)
+
+    app._recover_closed_connection("inventory refresh")
+
+    assert app.inventory_ledger.pending
+    app.flush_inventory()
+    assert not app.inventory_ledger.pending
+    assert get_assignment(app.profile_conn, storage_id=storage_id, item_id=7)["qty_count"] == 12
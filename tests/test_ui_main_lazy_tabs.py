@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+QtWidgets = pytest.importorskip("PySide6.QtWidgets", exc_type=ImportError)
+
+import ui_main
+
+
+def _get_app() -> QtWidgets.QApplication:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        app = QtWidgets.QApplication([])
+    return app
+
+
+class _RecordingTab(QtWidgets.QWidget):
+    def __init__(self, tab_id: str, renders: list[str]) -> None:
+        super().__init__()
+        self.setProperty("tab_id", tab_id)
+        self._tab_id = tab_id
+        self._renders = renders
+
+    def render_items(self, _items) -> None:
+        self._renders.append(self._tab_id)
+
+    def render_recipes(self, _recipes) -> None:
+        self._renders.append(self._tab_id)
+
+
+def _make_app(monkeypatch: pytest.MonkeyPatch, tab_order: list[str]):
+    app = ui_main.App.__new__(ui_main.App)
+    QtWidgets.QMainWindow.__init__(app)
+    created: list[str] = []
+    renders: list[str] = []
+    recipe_fetches: list[int] = []
+
+    def create(tab_id: str) -> QtWidgets.QWidget:
+        created.append(tab_id)
+        return _RecordingTab(tab_id, renders)
+
+    monkeypatch.setattr(app, "_create_tab_widget", create)
+    monkeypatch.setattr(app, "get_enabled_tiers", lambda: ["LV"])
+    monkeypatch.setattr(ui_main, "fetch_items", lambda _conn: [{"id": 1}])
+    monkeypatch.setattr(ui_main, "fetch_recipes", lambda _conn, _tiers: recipe_fetches.append(1) or [])
+
+    app.conn = object()
+    app.tab_registry = {tab_id: {"label": tab_id.title()} for tab_id in tab_order}
+    app.tab_order = list(tab_order)
+    app.enabled_tabs = list(tab_order)
+    app.tab_widgets = {}
+    app.detached_tabs = {}
+    app._tab_placeholders = {}
+    app._dirty_tabs = set()
+    app.items = []
+    app.recipes = []
+    app.recipe_index = None
+    app._recipes_stale = True
+    app.nb = QtWidgets.QTabWidget()
+    app.nb.currentChanged.connect(app._on_current_tab_changed)
+    return app, created, renders, recipe_fetches
+
+
+def test_tabs_are_built_and_rendered_on_first_show(monkeypatch: pytest.MonkeyPatch) -> None:
+    _get_app()
+    app, created, renders, recipe_fetches = _make_app(monkeypatch, ["items", "recipes", "fluids"])
+
+    app._rebuild_tabs()
+    app.refresh_items()
+    app.refresh_recipes()
+
+    assert created == []
+    assert app.nb.count() == 3
+
+    app._show_current_tab()
+
+    assert created == ["items"]
+    assert renders == ["items"]
+    assert recipe_fetches == []
+    assert app.nb.widget(0) is app.tab_widgets["items"]
+
+    app.nb.setCurrentIndex(1)
+
+    assert created == ["items", "recipes"]
+    assert renders == ["items", "recipes"]
+    assert recipe_fetches == [1]
+    assert app.nb.tabText(1) == "Recipes"
+    assert app.nb.currentWidget() is app.tab_widgets["recipes"]
+
+    app.nb.setCurrentIndex(0)
+    assert renders == ["items", "recipes"]
+    app.deleteLater()
+
+
+def test_refresh_renders_hidden_tabs_only_when_shown(monkeypatch: pytest.MonkeyPatch) -> None:
+    _get_app()
+    app, _created, renders, recipe_fetches = _make_app(monkeypatch, ["items", "recipes"])
+    app._rebuild_tabs()
+    app._show_current_tab()
+    app.nb.setCurrentIndex(1)
+    renders.clear()
+    recipe_fetches.clear()
+
+    app.refresh_items()
+    app.refresh_recipes()
+    app.refresh_recipes()
+
+    # The shown Recipes tab re-renders for the item refresh too (output names).
+    assert renders == ["recipes", "recipes", "recipes"]
+    assert recipe_fetches == [1, 1]
+
+    app.nb.setCurrentIndex(0)
+
+    assert renders == ["recipes", "recipes", "recipes", "items"]
+    app.deleteLater()
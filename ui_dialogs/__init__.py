@@ -0,0 +1,45 @@
+"""Dialogs for the GTNH Helper application.
+
+Each dialog lives in a submodule that is imported the first time the dialog
+class is looked up on this package (``ui_dialogs.AddRecipeDialog``), so
+importing the package, or a tab that uses it, does not load the item and
+recipe editors until one is opened.
+"""
+
+from __future__ import annotations
+
+import importlib
+
+_DIALOG_MODULES = {
+    "StorageUnitDialog": "storage",
+    "StorageUnitsDialog": "storage",
+    "StorageContainerPlacementsDialog": "storage",
+    "ItemPickerDialog": "item_picker",
+    "ItemMergeConflictDialog": "merge",
+    "AddItemDialog": "items",
+    "EditItemDialog": "items",
+    "ItemLineDialog": "recipes",
+    "AddRecipeDialog": "recipes",
+    "EditRecipeDialog": "recipes",
+    "MachineMetadataEditorDialog": "machine_metadata",
+    "ContainerTransformManagerDialog": "managers",
+    "MaterialManagerDialog": "managers",
+    "TierManagerDialog": "managers",
+    "CraftingGridManagerDialog": "managers",
+    "ItemKindManagerDialog": "managers",
+}
+
+__all__ = sorted(_DIALOG_MODULES)
+
+
+def __getattr__(name: str):
+    module_name = _DIALOG_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_DIALOG_MODULES))
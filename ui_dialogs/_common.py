@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+
+def _row_get(row, key: str, default=None):
+    """Safe key access for sqlite3.Row/dicts."""
+    try:
+        if row is None:
+            return default
+        if hasattr(row, "keys") and key in row.keys():
+            return row[key]
+        if hasattr(row, "get"):
+            return row.get(key, default)
+        return row[key]
+    except Exception:
+        return default
+
+
+TPS = 20  # Minecraft target ticks per second
+
+# User-facing label for "no tier" (stored as NULL in DB)
+NONE_TIER_LABEL = "— none —"
+
+# Separate label for Item Kind "none" (stored as NULL)
+NONE_KIND_LABEL = "— none —"
+
+NONE_MATERIAL_LABEL = "(None)"
+NONE_FLUID_LABEL = "(None)"
+
+ADD_NEW_KIND_LABEL = "+ Add new…"
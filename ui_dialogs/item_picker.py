@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+from PySide6 import QtCore, QtWidgets
+
+from ui_dialogs._common import _row_get
+
+
+class ItemPickerDialog(QtWidgets.QDialog):
+    """Searchable tree picker for Items.
+
+    Returns: self.result = {"id": int, "name": str, "kind": "item"|"fluid"}
+    """
+
+    def __init__(
+        self,
+        app,
+        title: str = "Pick Item",
+        machines_only: bool = False,
+        kinds: list[str] | None = None,
+        *,
+        crafting_grids_only: bool = False,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.app = app
+        self.machines_only = machines_only
+        self.crafting_grids_only = crafting_grids_only
+        self.kinds = kinds
+        self._base_kinds = set(kinds) if kinds else {"item", "fluid", "gas", "machine", "crafting_grid"}
+        self.result: dict | None = None
+        self._items = []
+        self._display_map: dict[QtWidgets.QTreeWidgetItem, dict] = {}
+        self._dup_name_counts: dict[tuple[str, str], int] = {}
+        self._tab_kinds: list[set[str]] = []
+
+        self.setWindowTitle(title)
+        self.resize(520, 520)
+        layout = QtWidgets.QVBoxLayout(self)
+
+        top = QtWidgets.QHBoxLayout()
+        top.addWidget(QtWidgets.QLabel("Search"))
+        self.search_edit = QtWidgets.QLineEdit()
+        self.search_edit.returnPressed.connect(self.on_ok)
+        self._search_timer = QtCore.QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self.rebuild_tree)
+        self.search_edit.textChanged.connect(self._schedule_rebuild)
+        top.addWidget(self.search_edit)
+        layout.addLayout(top)
+
+        self.tree = QtWidgets.QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.itemDoubleClicked.connect(lambda *_: self.on_ok())
+
+        self._build_tabs(layout)
+        layout.addWidget(self.tree, stretch=1)
+
+        btns = QtWidgets.QHBoxLayout()
+        self.new_button = QtWidgets.QPushButton("New Item…")
+        self.new_button.clicked.connect(self.new_item)
+        btns.addWidget(self.new_button)
+        btns.addStretch(1)
+        cancel_btn = QtWidgets.QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        ok_btn = QtWidgets.QPushButton("OK")
+        ok_btn.clicked.connect(self.on_ok)
+        btns.addWidget(cancel_btn)
+        btns.addWidget(ok_btn)
+        layout.addLayout(btns)
+
+        self.reload_items()
+        self.rebuild_tree()
+        self.search_edit.setFocus()
+
+    def _build_tabs(self, layout: QtWidgets.QVBoxLayout) -> None:
+        if self.machines_only or self.crafting_grids_only:
+            return
+        self.tabs = QtWidgets.QTabBar()
+        self.tabs.setExpanding(True)
+        self.tabs.setUsesScrollButtons(False)
+        self._tab_kinds = []
+
+        def _add_tab(label: str, kinds: set[str]) -> None:
+            self._tab_kinds.append(kinds)
+            self.tabs.addTab(label)
+
+        if "item" in self._base_kinds:
+            _add_tab("Items", {"item"})
+        if self._base_kinds & {"fluid", "gas"}:
+            _add_tab("Fluids", {"fluid", "gas"})
+        if "machine" in self._base_kinds:
+            _add_tab("Machines", {"machine"})
+        if "crafting_grid" in self._base_kinds:
+            _add_tab("Crafting Grids", {"crafting_grid"})
+        _add_tab("All", set(self._base_kinds))
+
+        self.tabs.currentChanged.connect(self.rebuild_tree)
+        layout.addWidget(self.tabs)
+        self._select_default_tab()
+
+    def _select_default_tab(self) -> None:
+        if not getattr(self, "tabs", None):
+            return
+        for idx, kinds in enumerate(self._tab_kinds):
+            if kinds == self._base_kinds:
+                self.tabs.setCurrentIndex(idx)
+                return
+        self.tabs.setCurrentIndex(0)
+
+    def _active_kinds(self) -> set[str]:
+        if self.machines_only:
+            return {"machine"}
+        if self.crafting_grids_only:
+            return {"crafting_grid"}
+        if getattr(self, "tabs", None) and self._tab_kinds:
+            idx = self.tabs.currentIndex()
+            if 0 <= idx < len(self._tab_kinds):
+                return set(self._tab_kinds[idx])
+        return set(self._base_kinds)
+
+    def _schedule_rebuild(self) -> None:
+        self._search_timer.start()
+
+    def reload_items(self) -> None:
+        if self.machines_only:
+            # Select all machines (kind='machine' OR kind='item' flagged as machine)
+            # We do NOT filter by enabled tiers here, so recipe editors can see all available machines.
+            sql = (
+                "SELECT i.id, i.key, COALESCE(i.display_name, i.key) AS name, i.kind, "
+                "       i.machine_tier, i.is_machine, k.name AS item_kind_name "
+                "FROM items i "
+                "LEFT JOIN item_kinds k ON k.id = i.item_kind_id "
+                "WHERE (i.kind='machine') "
+                "   OR (i.kind='item' AND (LOWER(COALESCE(k.name,''))=LOWER('Machine') OR i.is_machine=1)) "
+                "ORDER BY name"
+            )
+            self._items = self.app.conn.execute(sql).fetchall()
+        elif self.crafting_grids_only:
+            self._items = self.app.conn.execute(
+                "SELECT i.id, i.key, COALESCE(i.display_name, i.key) AS name, i.kind, "
+                "       i.item_kind_id, k.name AS item_kind_name, i.crafting_grid_size "
+                "FROM items i "
+                "LEFT JOIN item_kinds k ON k.id = i.item_kind_id "
+                "WHERE i.kind='crafting_grid' "
+                "ORDER BY name"
+            ).fetchall()
+        else:
+            if self.kinds:
+                placeholders = ",".join(["?"] * len(self.kinds))
+                self._items = self.app.conn.execute(
+                    "SELECT i.id, i.key, COALESCE(i.display_name, i.key) AS name, i.kind, "
+                    "       i.item_kind_id, k.name AS item_kind_name "
+                    "FROM items i "
+                    "LEFT JOIN item_kinds k ON k.id = i.item_kind_id "
+                    f"WHERE i.kind IN ({placeholders}) "
+                    "ORDER BY name",
+                    tuple(self.kinds),
+                ).fetchall()
+            else:
+                self._items = self.app.conn.execute(
+                    "SELECT i.id, i.key, COALESCE(i.display_name, i.key) AS name, i.kind, "
+                    "       i.item_kind_id, k.name AS item_kind_name "
+                    "FROM items i "
+                    "LEFT JOIN item_kinds k ON k.id = i.item_kind_id "
+                    "ORDER BY name"
+                ).fetchall()
+
+    def _label_for(self, row) -> str:
+        name = row["name"]
+        kind = row["kind"]
+        if self._dup_name_counts.get((kind, name), 0) > 1:
+            return f"{name}  (#{row['id']})"
+        return name
+
+    def rebuild_tree(self) -> None:
+        self.tree.clear()
+        self._display_map.clear()
+        query = (self.search_edit.text() or "").strip().lower()
+        self._dup_name_counts = {}
+        for row in self._items:
+            key = (row["kind"], row["name"])
+            self._dup_name_counts[key] = self._dup_name_counts.get(key, 0) + 1
+
+        active_kinds = None if self.machines_only else self._active_kinds()
+
+        def _matches(row) -> bool:
+            if active_kinds is not None and row["kind"] not in active_kinds:
+                return False
+            if not query:
+                return True
+            return query in (row["name"] or "").lower()
+
+        if self.machines_only:
+            p_machines = QtWidgets.QTreeWidgetItem(self.tree, ["Machines"])
+            p_machines.setExpanded(True)
+            for row in self._items:
+                if not _matches(row):
+                    continue
+                child = QtWidgets.QTreeWidgetItem(p_machines, [self._label_for(row)])
+                self._display_map[child] = row
+            self._select_first_child(p_machines)
+            if p_machines.childCount() == 0:
+                self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(p_machines))
+            return
+        if self.crafting_grids_only:
+            p_grids = QtWidgets.QTreeWidgetItem(self.tree, ["Crafting Grids"])
+            p_grids.setExpanded(True)
+            for row in self._items:
+                if not _matches(row):
+                    continue
+                child = QtWidgets.QTreeWidgetItem(p_grids, [self._label_for(row)])
+                self._display_map[child] = row
+            self._select_first_child(p_grids)
+            if p_grids.childCount() == 0:
+                self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(p_grids))
+            return
+
+        active_kinds = self._active_kinds()
+        kind_labels = {
+            "item": "Items",
+            "fluid": "Fluids",
+            "gas": "Gases",
+            "machine": "Machines",
+            "crafting_grid": "Crafting Grids",
+        }
+
+        grouped: dict[str, dict[str | None, list]] = {
+            "item": {},
+            "fluid": {},
+            "gas": {},
+            "machine": {},
+            "crafting_grid": {},
+        }
+
+        def _category_label(row) -> str | None:
+            kind = row["kind"]
+            if kind == "gas":
+                return None
+            if kind == "crafting_grid":
+                label = (_row_get(row, "crafting_grid_size") or "").strip()
+                return label.replace("_", " ") if label else "(crafting grid)"
+            label = (_row_get(row, "item_kind_name") or "").strip()
+            label = label.replace("_", " ")
+            if label:
+                return label
+            return "(no type)" if kind == "item" else f"({kind})"
+
+        for row in self._items:
+            if not _matches(row):
+                continue
+            kind = row["kind"]
+            if kind not in active_kinds:
+                continue
+            category = _category_label(row)
+            grouped.setdefault(kind, {})
+            grouped[kind].setdefault(category, []).append(row)
+
+        for kind in ("item", "fluid", "gas", "machine", "crafting_grid"):
+            if kind not in active_kinds:
+                continue
+            categories = grouped.get(kind, {})
+            if not categories:
+                continue
+            parent_item = QtWidgets.QTreeWidgetItem(self.tree, [kind_labels[kind]])
+            parent_item.setExpanded(True)
+            for category in sorted(categories.keys(), key=lambda val: "" if val is None else val.casefold()):
+                rows = categories[category]
+                if category is None:
+                    category_item = parent_item
+                else:
+                    category_item = QtWidgets.QTreeWidgetItem(parent_item, [category])
+                    category_item.setExpanded(bool(query))
+                for row in sorted(rows, key=lambda r: self._label_for(r).casefold()):
+                    child = QtWidgets.QTreeWidgetItem(category_item, [self._label_for(row)])
+                    self._display_map[child] = row
+
+        for idx in range(self.tree.topLevelItemCount()):
+            p = self.tree.topLevelItem(idx)
+            if p is not None and self._select_first_child(p):
+                return
+
+    def _children(self, item: QtWidgets.QTreeWidgetItem) -> list[QtWidgets.QTreeWidgetItem]:
+        return [item.child(i) for i in range(item.childCount())]
+
+    def _select_first_child(self, parent: QtWidgets.QTreeWidgetItem) -> bool:
+        for child in self._children(parent):
+            if child in self._display_map:
+                self.tree.setCurrentItem(child)
+                return True
+            if self._select_first_child(child):
+                return True
+        return False
+
+    def get_selected_row(self):
+        sel = self.tree.currentItem()
+        if not sel:
+            return None
+        return self._display_map.get(sel)
+
+    def new_item(self) -> None:
+        # The item editor is large and only needed here on demand.
+        from ui_dialogs.items import AddItemDialog
+
+        dlg = AddItemDialog(self.app, parent=self)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self.reload_items()
+            self.rebuild_tree()
+
+    def on_ok(self) -> None:
+        row = self.get_selected_row()
+        if not row:
+            QtWidgets.QMessageBox.warning(self, "Missing selection", "Select an item.")
+            return
+        self.result = {"id": row["id"], "name": row["name"], "kind": row["kind"]}
+        self.accept()
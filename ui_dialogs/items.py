@@ -0,0 +1,1034 @@
+from __future__ import annotations
+
+from PySide6 import QtGui, QtWidgets
+
+from services.db import ALL_TIERS, canonical_name, item_canonical_name
+from services.machines import fetch_machine_metadata
+from services.materials import fetch_materials
+from ui_dialogs._common import _row_get, NONE_TIER_LABEL, NONE_KIND_LABEL, NONE_MATERIAL_LABEL, NONE_FLUID_LABEL, ADD_NEW_KIND_LABEL
+
+
+class _ItemDialogBase(QtWidgets.QDialog):
+    KIND_OPTIONS = [
+        ("item", "Item"),
+        ("fluid", "Fluid"),
+        ("gas", "Gas"),
+        ("machine", "Machine"),
+        ("crafting_grid", "Crafting Grid"),
+    ]
+
+    def __init__(
+        self,
+        app,
+        title: str,
+        *,
+        row=None,
+        parent=None,
+        allowed_kinds: list[str] | None = None,
+        default_kind: str | None = None,
+        show_availability: bool = False,
+    ):
+        super().__init__(parent)
+        self.app = app
+        self._row = row
+        self.item_id = row["id"] if row else None
+        self.item_kind_id = row["item_kind_id"] if row else None
+        self.machine_kind_id = None
+        self.material_id = row["material_id"] if row else None
+        self.content_fluid_id = None
+        self.crafting_grid_size = None
+        
+        # Safe access to new columns if they exist in _row, else None
+        self.content_fluid_id_val = _row_get(row, "content_fluid_id")
+        self.content_qty_val = _row_get(row, "content_qty_liters")
+        self.is_storage_container_val = int(_row_get(row, "is_storage_container", 0) or 0)
+        self.storage_slot_count_val = _row_get(row, "storage_slot_count")
+
+        self._all_item_kinds: list[dict] = []
+        self._kind_name_to_id: dict[str, int] = {}
+        self._kind_id_to_applies: dict[int, str] = {}
+        self._material_name_to_id: dict[str, int] = {}
+        self._fluid_name_to_id: dict[str, int] = {}
+        self._allowed_kinds = allowed_kinds
+        self._default_kind = default_kind
+        self._show_availability = show_availability
+        self.availability_group = None
+        self.owned_spin = None
+        self.online_spin = None
+        
+        self.setWindowTitle(title)
+        self.setModal(True)
+        self.setMinimumWidth(520)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        form = QtWidgets.QGridLayout()
+        layout.addLayout(form)
+
+        form.addWidget(QtWidgets.QLabel("Display Name"), 0, 0)
+        self.display_name_edit = QtWidgets.QLineEdit()
+        form.addWidget(self.display_name_edit, 0, 1)
+
+        form.addWidget(QtWidgets.QLabel("Kind"), 1, 0)
+        self.kind_combo = QtWidgets.QComboBox()
+        kind_values = allowed_kinds or [value for value, _label in self.KIND_OPTIONS]
+        for value, label in self.KIND_OPTIONS:
+            if value not in kind_values:
+                continue
+            self.kind_combo.addItem(label, value)
+        form.addWidget(self.kind_combo, 1, 1)
+
+        self.item_kind_label = QtWidgets.QLabel("Item Type")
+        form.addWidget(self.item_kind_label, 2, 0)
+        self.item_kind_combo = QtWidgets.QComboBox()
+        form.addWidget(self.item_kind_combo, 2, 1)
+
+        # Row 3: Crafting Grid Size (for Crafting Grid item kind)
+        self.crafting_grid_label = QtWidgets.QLabel("Crafting Grid")
+        self.crafting_grid_combo = QtWidgets.QComboBox()
+        form.addWidget(self.crafting_grid_label, 3, 0)
+        form.addWidget(self.crafting_grid_combo, 3, 1)
+        self.crafting_grid_label.hide()
+        self.crafting_grid_combo.hide()
+
+        # Has Material Checkbox (Row 4)
+        self.has_material_check = QtWidgets.QCheckBox("Has Material?")
+        form.addWidget(self.has_material_check, 4, 1)
+
+        # Row 5: Material OR Machine Type
+        self.material_label = QtWidgets.QLabel("Material")
+        self.material_combo = QtWidgets.QComboBox()
+        form.addWidget(self.material_label, 5, 0)
+        form.addWidget(self.material_combo, 5, 1)
+
+        self.machine_type_label = QtWidgets.QLabel("Machine Type")
+        self.machine_type_combo = QtWidgets.QComboBox()
+        self.machine_type_combo.setEditable(True)
+        form.addWidget(self.machine_type_label, 5, 0)
+        form.addWidget(self.machine_type_combo, 5, 1)
+        self.machine_type_label.hide()
+        self.machine_type_combo.hide()
+
+        self.tier_label = QtWidgets.QLabel("Tier")
+        self.tier_combo = QtWidgets.QComboBox()
+        tiers = self.app.get_all_tiers() if hasattr(self.app, "get_all_tiers") else list(ALL_TIERS)
+        self.tier_combo.addItems([NONE_TIER_LABEL] + list(tiers))
+        form.addWidget(self.tier_label, 6, 0)
+        form.addWidget(self.tier_combo, 6, 1)
+        self.tier_label.hide()
+        self.tier_combo.hide()
+
+        self.is_multiblock_check = QtWidgets.QCheckBox("Multi-block machine")
+        form.addWidget(self.is_multiblock_check, 7, 1)
+        self.is_multiblock_check.hide()
+        
+        # Row 8: Fluid Container options
+        self.container_group = QtWidgets.QGroupBox("Fluid Container")
+        container_layout = QtWidgets.QGridLayout(self.container_group)
+        self.is_container_check = QtWidgets.QCheckBox("Is Fluid Container? (e.g. Cell/Bucket)")
+        container_layout.addWidget(self.is_container_check, 0, 0, 1, 2)
+
+        self.content_fluid_label = QtWidgets.QLabel("Contains Fluid")
+        self.content_fluid_combo = QtWidgets.QComboBox()
+        container_layout.addWidget(self.content_fluid_label, 1, 0)
+        container_layout.addWidget(self.content_fluid_combo, 1, 1)
+
+        self.content_qty_label = QtWidgets.QLabel("Amount (L)")
+        self.content_qty_edit = QtWidgets.QLineEdit("1000")
+        self.content_qty_edit.setValidator(QtGui.QIntValidator(1, 1000000))
+        container_layout.addWidget(self.content_qty_label, 2, 0)
+        container_layout.addWidget(self.content_qty_edit, 2, 1)
+        form.addWidget(self.container_group, 8, 0, 1, 2)
+
+        self.storage_container_group = QtWidgets.QGroupBox("Inventory Container")
+        storage_container_layout = QtWidgets.QGridLayout(self.storage_container_group)
+        self.is_storage_container_check = QtWidgets.QCheckBox("Is Inventory Container? (e.g. Chest, Iron Chest)")
+        storage_container_layout.addWidget(self.is_storage_container_check, 0, 0, 1, 2)
+        self.storage_slot_count_label = QtWidgets.QLabel("Storage Slots")
+        self.storage_slot_count_spin = QtWidgets.QSpinBox()
+        self.storage_slot_count_spin.setRange(1, 1_000_000)
+        self.storage_slot_count_spin.setValue(int(self.storage_slot_count_val or 27))
+        storage_container_layout.addWidget(self.storage_slot_count_label, 1, 0)
+        storage_container_layout.addWidget(self.storage_slot_count_spin, 1, 1)
+        form.addWidget(self.storage_container_group, 9, 0, 1, 2)
+
+        self.is_base_check = QtWidgets.QCheckBox("Base resource (planner stops here later)")
+        form.addWidget(self.is_base_check, 10, 1)
+
+        self.has_cell_check = QtWidgets.QCheckBox("Has Cell? (auto-create '<Name> Cell')")
+        form.addWidget(self.has_cell_check, 11, 1)
+        self.has_cell_check.hide()
+
+        self.auto_cell_size_group = QtWidgets.QGroupBox("Auto Cell Size")
+        auto_cell_size_layout = QtWidgets.QHBoxLayout(self.auto_cell_size_group)
+        self.auto_cell_144_radio = QtWidgets.QRadioButton("144 L")
+        self.auto_cell_1000_radio = QtWidgets.QRadioButton("1000 L")
+        self.auto_cell_1000_radio.setChecked(True)
+        auto_cell_size_layout.addWidget(self.auto_cell_144_radio)
+        auto_cell_size_layout.addWidget(self.auto_cell_1000_radio)
+        auto_cell_size_layout.addStretch(1)
+        form.addWidget(self.auto_cell_size_group, 11, 1)
+        self.auto_cell_size_group.hide()
+
+        if self._show_availability:
+            self.availability_group = QtWidgets.QGroupBox("Availability")
+            availability_layout = QtWidgets.QGridLayout(self.availability_group)
+            availability_layout.addWidget(QtWidgets.QLabel("Owned"), 0, 0)
+            self.owned_spin = QtWidgets.QSpinBox()
+            self.owned_spin.setRange(0, 999)
+            availability_layout.addWidget(self.owned_spin, 0, 1)
+            availability_layout.addWidget(QtWidgets.QLabel("Online"), 1, 0)
+            self.online_spin = QtWidgets.QSpinBox()
+            self.online_spin.setRange(0, 999)
+            self.online_spin.setMaximum(0)
+            availability_layout.addWidget(self.online_spin, 1, 1)
+            self.owned_spin.valueChanged.connect(self._on_owned_changed)
+            form.addWidget(self.availability_group, 12, 0, 1, 2)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._reload_item_kinds()
+        self._reload_materials()
+        self._reload_machine_types()
+        self._reload_fluids()
+        self._reload_crafting_grids()
+
+        self.kind_combo.currentTextChanged.connect(self._on_high_level_kind_changed)
+        self.item_kind_combo.currentTextChanged.connect(self._on_item_kind_selected)
+        self.material_combo.currentTextChanged.connect(self._on_material_selected)
+        self.machine_type_combo.currentTextChanged.connect(self._on_machine_type_selected)
+        self.has_material_check.toggled.connect(self._on_has_material_toggled)
+        self.is_container_check.toggled.connect(self._on_is_container_toggled)
+        self.is_storage_container_check.toggled.connect(self._on_is_storage_container_toggled)
+        self.has_cell_check.toggled.connect(self._on_has_cell_toggled)
+        self.content_fluid_combo.currentTextChanged.connect(self._on_content_fluid_selected)
+        self.crafting_grid_combo.currentTextChanged.connect(self._on_crafting_grid_selected)
+
+        self._load_row_defaults()
+        self._on_high_level_kind_changed()
+        self._on_item_kind_selected()
+
+    def _load_row_defaults(self) -> None:
+        if not self._row:
+            self.display_name_edit.setText("")
+            if self._default_kind:
+                self._set_kind_value(self._default_kind)
+            else:
+                self.kind_combo.setCurrentIndex(0)
+            self.item_kind_combo.setCurrentText(NONE_KIND_LABEL)
+            self.material_combo.setCurrentText(NONE_MATERIAL_LABEL)
+            if self.crafting_grid_combo.count() > 0:
+                self.crafting_grid_combo.setCurrentIndex(0)
+            self.is_base_check.setChecked(False)
+            self.has_material_check.setChecked(False)
+            self.is_container_check.setChecked(False)
+            self.is_multiblock_check.setChecked(False)
+            self.is_storage_container_check.setChecked(False)
+            self.storage_slot_count_spin.setValue(27)
+            self.content_fluid_combo.setCurrentText(NONE_FLUID_LABEL)
+            self.content_qty_edit.setText("1000")
+            if self._show_availability:
+                if self.owned_spin is not None:
+                    self.owned_spin.setValue(0)
+                if self.online_spin is not None:
+                    self.online_spin.setValue(0)
+                self._on_owned_changed()
+            return
+
+        item_kind_name = (self._row["item_kind_name"] or "") or NONE_KIND_LABEL
+        row_kind = (self._row["kind"] or "").strip().lower()
+        has_machine_metadata = item_kind_name.strip().lower() == "machine" or bool(self._row["is_machine"])
+        known_kinds = {"item", "fluid", "gas", "machine", "crafting_grid"}
+        is_legacy_machine = has_machine_metadata and (
+            row_kind == "item" or row_kind == "" or row_kind not in known_kinds
+        )
+
+        self.display_name_edit.setText(self._row["display_name"] or self._row["key"])
+        self._set_kind_value("machine" if is_legacy_machine else self._row["kind"])
+        self.item_kind_combo.setCurrentText(item_kind_name)
+        if _row_get(self._row, "crafting_grid_size"):
+            self.crafting_grid_combo.setCurrentText(str(_row_get(self._row, "crafting_grid_size")))
+
+        if (item_kind_name.strip().lower() == "machine") or bool(self._row["is_machine"]):
+            # Prefer machine_type, fallback to display_name for legacy/migration
+            m_type = _row_get(self._row, "machine_type")
+            if not m_type:
+                 m_type = self._row["display_name"]
+            self.machine_type_combo.setCurrentText(m_type or "")
+            self.tier_combo.setCurrentText(self._row["machine_tier"] or NONE_TIER_LABEL)
+            self.is_multiblock_check.setChecked(bool(_row_get(self._row, "is_multiblock")))
+        else:
+            self.is_multiblock_check.setChecked(False)
+
+        material_name = (self._row["material_name"] or "") or NONE_MATERIAL_LABEL
+        if material_name != NONE_MATERIAL_LABEL:
+            self.has_material_check.setChecked(True)
+        else:
+            self.has_material_check.setChecked(False)
+        self.material_combo.setCurrentText(material_name)
+        
+        # Fluid container defaults
+        if self.content_fluid_id_val:
+            self.is_container_check.setChecked(True)
+            # Find name for this id
+            # This is slightly inefficient but safe
+            row = self.app.conn.execute("SELECT COALESCE(display_name, key) as name FROM items WHERE id=?", (self.content_fluid_id_val,)).fetchone()
+            if row:
+                self.content_fluid_combo.setCurrentText(row["name"])
+            if self.content_qty_val:
+                self.content_qty_edit.setText(str(self.content_qty_val))
+        else:
+            self.is_container_check.setChecked(False)
+            self.content_fluid_combo.setCurrentText(NONE_FLUID_LABEL)
+            self.content_qty_edit.setText("1000")
+
+        self.is_storage_container_check.setChecked(bool(self.is_storage_container_val))
+        if self.storage_slot_count_val:
+            self.storage_slot_count_spin.setValue(int(self.storage_slot_count_val))
+        self._on_is_storage_container_toggled()
+
+        self.is_base_check.setChecked(bool(self._row["is_base"]))
+        if self._show_availability:
+            if self.owned_spin is not None:
+                self.owned_spin.setValue(0)
+            if self.online_spin is not None:
+                self.online_spin.setValue(0)
+            self._on_owned_changed()
+
+    def _reload_item_kinds(self) -> None:
+        # 1. Fetch all kinds
+        rows = self.app.conn.execute(
+            "SELECT id, name, applies_to FROM item_kinds ORDER BY sort_order ASC, name COLLATE NOCASE ASC"
+        ).fetchall()
+        self._all_item_kinds = rows
+        self._kind_name_to_id = {r["name"]: r["id"] for r in rows}
+        self._kind_id_to_applies = {r["id"]: (r["applies_to"] or "item").strip().lower() for r in rows}
+        self.machine_kind_id = next((r["id"] for r in rows if (r["name"] or "").strip().lower() == "machine"), None)
+
+        self._update_item_kind_combo()
+
+    def _update_item_kind_combo(self) -> None:
+        current_kind_super = self._current_kind_value()
+        if not current_kind_super:
+            current_kind_super = "item"
+
+        # Determine which names to show
+        filtered_names = [NONE_KIND_LABEL]
+        if current_kind_super in ("item", "fluid"):
+            for r in self._all_item_kinds:
+                kid = r["id"]
+                applies_to = self._kind_id_to_applies.get(kid, "item")
+                if applies_to == current_kind_super:
+                    filtered_names.append(r["name"])
+            filtered_names.append(ADD_NEW_KIND_LABEL)
+
+        # Update Combo
+        cur = self.item_kind_combo.currentText()
+        self.item_kind_combo.blockSignals(True)
+        self.item_kind_combo.clear()
+        self.item_kind_combo.addItems(filtered_names)
+        
+        if cur not in filtered_names:
+            cur = NONE_KIND_LABEL
+        
+        self.item_kind_combo.setCurrentText(cur)
+        self.item_kind_combo.blockSignals(False)
+
+        v = (self.item_kind_combo.currentText() or "").strip()
+        self.item_kind_id = self._kind_name_to_id.get(v) if v and v != NONE_KIND_LABEL else None
+
+    def _reload_materials(self) -> None:
+        rows = fetch_materials(self.app.conn)
+        self._material_name_to_id = {r["name"]: r["id"] for r in rows}
+        values = [NONE_MATERIAL_LABEL] + [r["name"] for r in rows]
+        cur = self.material_combo.currentText()
+        self.material_combo.blockSignals(True)
+        self.material_combo.clear()
+        self.material_combo.addItems(values)
+        if cur not in values:
+            cur = NONE_MATERIAL_LABEL
+        self.material_combo.setCurrentText(cur)
+        self.material_combo.blockSignals(False)
+
+        v = (self.material_combo.currentText() or "").strip()
+        self.material_id = self._material_name_to_id.get(v) if v and v != NONE_MATERIAL_LABEL else None
+    
+    def _reload_fluids(self) -> None:
+        # Fetch all items that are kind='fluid' or 'gas'
+        rows = self.app.conn.execute(
+            "SELECT id, COALESCE(display_name, key) as name FROM items WHERE kind IN ('fluid', 'gas') ORDER BY name COLLATE NOCASE ASC"
+        ).fetchall()
+        self._fluid_name_to_id = {r["name"]: r["id"] for r in rows}
+        values = [NONE_FLUID_LABEL] + [r["name"] for r in rows]
+        
+        cur = self.content_fluid_combo.currentText()
+        self.content_fluid_combo.blockSignals(True)
+        self.content_fluid_combo.clear()
+        self.content_fluid_combo.addItems(values)
+        if cur not in values:
+            cur = NONE_FLUID_LABEL
+        self.content_fluid_combo.setCurrentText(cur)
+        self.content_fluid_combo.blockSignals(False)
+        
+        v = (self.content_fluid_combo.currentText() or "").strip()
+        self.content_fluid_id = self._fluid_name_to_id.get(v) if v and v != NONE_FLUID_LABEL else None
+
+    def _reload_crafting_grids(self) -> None:
+        grids = self.app.get_crafting_grids() if hasattr(self.app, "get_crafting_grids") else ["2x2", "3x3"]
+        values = [g for g in grids if g]
+        if not values:
+            values = ["2x2", "3x3"]
+        cur = self.crafting_grid_combo.currentText()
+        self.crafting_grid_combo.blockSignals(True)
+        self.crafting_grid_combo.clear()
+        self.crafting_grid_combo.addItems(values)
+        if cur not in values:
+            cur = values[0]
+        self.crafting_grid_combo.setCurrentText(cur)
+        self.crafting_grid_combo.blockSignals(False)
+        self._on_crafting_grid_selected()
+
+    def _reload_machine_types(self) -> None:
+        rows = fetch_machine_metadata(self.app.conn)
+        types = sorted({(row["machine_type"] or "").strip() for row in rows if row["machine_type"]})
+        self.machine_type_combo.blockSignals(True)
+        self.machine_type_combo.clear()
+        self.machine_type_combo.addItems([""] + types)
+        self.machine_type_combo.blockSignals(False)
+
+    def _ensure_item_kind(self, name: str, applies_to: str) -> str | None:
+        name = (name or "").strip()
+        if not name:
+            return None
+        applies_to = (applies_to or "item").strip().lower()
+        if applies_to not in ("item", "fluid"):
+            applies_to = "item"
+        row = self.app.conn.execute(
+            "SELECT name FROM item_kinds WHERE name_canonical=? ORDER BY id LIMIT 1",
+            (canonical_name(name),),
+        ).fetchone()
+        if row:
+            return row["name"]
+        self.app.conn.execute(
+            "INSERT INTO item_kinds(name, name_canonical, sort_order, is_builtin, applies_to) VALUES(?, ?, 500, 0, ?)",
+            (name, canonical_name(name), applies_to),
+        )
+        self.app.conn.commit()
+        return name
+
+    def _on_item_kind_selected(self) -> None:
+        v = (self.item_kind_combo.currentText() or "").strip()
+        kind_high = self._current_kind_value()
+
+        # "Machine" is now a top-level Kind
+        is_machine_kind = kind_high == "machine"
+        is_fluid_kind = kind_high == "fluid"
+        is_gas_kind = kind_high == "gas"
+        is_fluid_like = is_fluid_kind or is_gas_kind
+        is_crafting_grid_kind = kind_high == "crafting_grid"
+        show_item_kind = kind_high in ("item", "fluid")
+
+        self.item_kind_label.setVisible(show_item_kind)
+        self.item_kind_combo.setVisible(show_item_kind)
+
+        self.crafting_grid_label.setVisible(is_crafting_grid_kind)
+        self.crafting_grid_combo.setVisible(is_crafting_grid_kind)
+        if is_crafting_grid_kind:
+            self._on_crafting_grid_selected()
+        else:
+            self.crafting_grid_size = None
+
+        # Machine-specific fields depend on KIND, not Item Type
+        self.machine_type_label.setVisible(is_machine_kind)
+        self.machine_type_combo.setVisible(is_machine_kind)
+        self.tier_label.setVisible(is_machine_kind)
+        self.tier_combo.setVisible(is_machine_kind)
+        self.is_multiblock_check.setVisible(is_machine_kind)
+        self.is_base_check.setVisible(not is_machine_kind and not is_crafting_grid_kind)
+        if is_machine_kind or is_crafting_grid_kind:
+            self.is_base_check.setChecked(False)
+            if not is_machine_kind:
+                self.is_multiblock_check.setChecked(False)
+
+        if self._show_availability and self.availability_group is not None:
+            self.availability_group.setVisible(is_machine_kind)
+            if not is_machine_kind:
+                if self.owned_spin is not None:
+                    self.owned_spin.setValue(0)
+                if self.online_spin is not None:
+                    self.online_spin.setValue(0)
+            else:
+                self._on_owned_changed()
+
+        # Material is hidden if Machine Kind OR Fluid/Gas.
+        if is_machine_kind or is_fluid_like or is_crafting_grid_kind:
+            self.has_material_check.setVisible(False)
+            self.material_label.setVisible(False)
+            self.material_combo.setVisible(False)
+            self.material_id = None
+
+            self.container_group.setVisible(False)
+            self.is_container_check.setChecked(False)
+            self._on_is_container_toggled()
+            self.storage_container_group.setVisible(False)
+            self.is_storage_container_check.setChecked(False)
+            self._on_is_storage_container_toggled()
+        else:
+            self.has_material_check.setVisible(True)
+            self._on_has_material_toggled()
+
+            self.container_group.setVisible(True)
+            self._on_is_container_toggled()
+            self.storage_container_group.setVisible(kind_high == "item")
+            self._on_is_storage_container_toggled()
+
+        canonical = None
+        if v == ADD_NEW_KIND_LABEL and show_item_kind:
+            new_name, ok = QtWidgets.QInputDialog.getText(self, "Add Item Kind", "New kind name:")
+            if not ok or not new_name.strip():
+                self.item_kind_combo.setCurrentText(NONE_KIND_LABEL)
+                self.item_kind_id = None
+                return
+            canonical = self._ensure_item_kind(new_name, kind_high)
+
+        if v == ADD_NEW_KIND_LABEL and show_item_kind:
+            self._reload_item_kinds()
+
+        if canonical:
+            # If strictly filtering, the new kind isn't associated yet, so we must force-add it
+            # Insert before "Add New..." (which is always last)
+            if self.item_kind_combo.findText(canonical) == -1:
+                self.item_kind_combo.insertItem(self.item_kind_combo.count() - 1, canonical)
+            self.item_kind_combo.setCurrentText(canonical)
+
+        v2 = (self.item_kind_combo.currentText() or "").strip()
+        if is_machine_kind:
+            self.item_kind_id = self.machine_kind_id
+        elif is_crafting_grid_kind:
+            self.item_kind_id = None
+        elif show_item_kind:
+            self.item_kind_id = self._kind_name_to_id.get(v2) if v2 and v2 != NONE_KIND_LABEL else None
+        else:
+            self.item_kind_id = None
+
+    def _on_has_material_toggled(self) -> None:
+        checked = self.has_material_check.isChecked()
+        if self.has_material_check.isVisible():
+            self.material_label.setVisible(checked)
+            self.material_combo.setVisible(checked)
+            if checked:
+                self._on_material_selected()
+            else:
+                self.material_id = None
+        else:
+            self.material_label.setVisible(False)
+            self.material_combo.setVisible(False)
+            self.material_id = None
+            
+    def _on_is_container_toggled(self) -> None:
+        checked = self.is_container_check.isChecked()
+        if self.is_container_check.isVisible():
+            self.content_fluid_label.setVisible(checked)
+            self.content_fluid_combo.setVisible(checked)
+            self.content_qty_label.setVisible(checked)
+            self.content_qty_edit.setVisible(checked)
+            if checked:
+                self._on_content_fluid_selected()
+            else:
+                self.content_fluid_id = None
+        else:
+            self.content_fluid_label.setVisible(False)
+            self.content_fluid_combo.setVisible(False)
+            self.content_qty_label.setVisible(False)
+            self.content_qty_edit.setVisible(False)
+            self.content_fluid_id = None
+
+    def _on_is_storage_container_toggled(self) -> None:
+        checked = self.is_storage_container_check.isVisible() and self.is_storage_container_check.isChecked()
+        self.storage_slot_count_label.setVisible(checked)
+        self.storage_slot_count_spin.setVisible(checked)
+
+    def _on_material_selected(self) -> None:
+        if self.material_combo.isVisible():
+            v = (self.material_combo.currentText() or "").strip()
+            self.material_id = self._material_name_to_id.get(v) if v and v != NONE_MATERIAL_LABEL else None
+        else:
+            self.material_id = None
+            
+    def _on_content_fluid_selected(self) -> None:
+        if self.content_fluid_combo.isVisible():
+            v = (self.content_fluid_combo.currentText() or "").strip()
+            self.content_fluid_id = self._fluid_name_to_id.get(v) if v and v != NONE_FLUID_LABEL else None
+        else:
+            self.content_fluid_id = None
+
+    def _on_crafting_grid_selected(self) -> None:
+        if self.crafting_grid_combo.isVisible():
+            v = (self.crafting_grid_combo.currentText() or "").strip()
+            self.crafting_grid_size = v if v else None
+        else:
+            self.crafting_grid_size = None
+
+    def _on_machine_type_selected(self) -> None:
+        return
+
+    def _on_owned_changed(self) -> None:
+        if not self._show_availability or self.owned_spin is None or self.online_spin is None:
+            return
+        owned = self.owned_spin.value()
+        self.online_spin.setMaximum(owned)
+        if self.online_spin.value() > owned:
+            self.online_spin.setValue(owned)
+
+    def _on_high_level_kind_changed(self) -> None:
+        self._update_item_kind_combo()
+        self._on_item_kind_selected()
+        kind_high = self._current_kind_value()
+        is_fluid_like = kind_high in ("fluid", "gas")
+        show_has_cell = is_fluid_like and self.item_id is None
+        self.has_cell_check.setVisible(show_has_cell)
+        if not show_has_cell:
+            self.has_cell_check.setChecked(False)
+        self._on_has_cell_toggled()
+
+        if kind_high in ("machine", "gas", "crafting_grid"):
+            self.item_kind_combo.setEnabled(False)
+        else:
+            self.item_kind_combo.setEnabled(True)
+
+    def _current_kind_value(self) -> str:
+        data = self.kind_combo.currentData()
+        if isinstance(data, str) and data:
+            return data.strip().lower()
+        return (self.kind_combo.currentText() or "").strip().lower().replace(" ", "_")
+
+    def _set_kind_value(self, value: str | None) -> None:
+        if not value:
+            return
+        target = value.strip().lower()
+        for idx in range(self.kind_combo.count()):
+            if (self.kind_combo.itemData(idx) or "").strip().lower() == target:
+                self.kind_combo.setCurrentIndex(idx)
+                return
+
+    def _on_has_cell_toggled(self) -> None:
+        visible = self.has_cell_check.isVisible() and self.has_cell_check.isChecked()
+        self.auto_cell_size_group.setVisible(visible)
+
+    def _clear_layout(self, layout: QtWidgets.QGridLayout) -> None:
+        while layout.count():
+            item = layout.takeAt(0)
+            widget = item.widget()
+            if widget is not None:
+                widget.deleteLater()
+
+    def _parse_int_opt(self, text: str) -> int | None:
+        text = (text or "").strip()
+        if text == "":
+            return None
+        if not text.isdigit():
+            raise ValueError("Must be a whole number.")
+        return int(text)
+
+    def _set_status(self, message: str) -> None:
+        if hasattr(self.app, "status_bar"):
+            self.app.status_bar.showMessage(message)
+        elif hasattr(self.app, "status"):
+            try:
+                self.app.status.set(message)
+            except Exception:
+                pass
+
+    def _slugify(self, s: str) -> str:
+        s = (s or "").strip().lower()
+        out = []
+        last_us = False
+        for ch in s:
+            if ch.isalnum():
+                out.append(ch)
+                last_us = False
+            else:
+                if not last_us:
+                    out.append("_")
+                    last_us = True
+        key = "".join(out).strip("_")
+        return key or "item"
+
+    def _get_machine_values(self) -> dict:
+        if not self.machine_type_combo.isVisible():
+            return {}
+
+        m_type = self.machine_type_combo.currentText().strip()
+        tier = self.tier_combo.currentText().strip()
+
+        if not m_type or not tier or tier == NONE_TIER_LABEL:
+            return {}
+        return {"machine_tier": tier}
+
+    def save(self) -> None:
+        raise NotImplementedError
+
+
+class AddItemDialog(_ItemDialogBase):
+    def __init__(
+        self,
+        app,
+        parent=None,
+        *,
+        title: str = "Add Item",
+        allowed_kinds: list[str] | None = None,
+        default_kind: str | None = None,
+    ):
+        super().__init__(
+            app,
+            title,
+            parent=parent,
+            allowed_kinds=allowed_kinds,
+            default_kind=default_kind,
+            show_availability=False,
+        )
+
+    def save(self) -> None:
+        display_name = (self.display_name_edit.text() or "").strip()
+        if not display_name:
+            QtWidgets.QMessageBox.warning(self, "Missing name", "Display Name is required.")
+            return
+
+        key = self._slugify(display_name)
+
+        kind = self._current_kind_value()
+        if kind not in ("item", "fluid", "gas", "machine", "crafting_grid"):
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Invalid kind",
+                "Kind must be item, fluid, gas, machine, or crafting grid.",
+            )
+            return
+
+        is_base = 1 if self.is_base_check.isChecked() else 0
+        is_multiblock = 1 if self.is_multiblock_check.isChecked() else 0
+
+        # "Machine" is now a top-level Kind
+        is_machine = 1 if kind == "machine" else 0
+        item_kind_id = None if kind in ("gas", "crafting_grid") else self.item_kind_id
+
+        crafting_grid_size = None
+        if kind == "crafting_grid":
+            crafting_grid_size = self.crafting_grid_size
+            if not crafting_grid_size:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Missing grid size",
+                    "Crafting Grid items require a grid size selection.",
+                )
+                return
+
+        if self.has_material_check.isVisible() and self.has_material_check.isChecked():
+            material_id = self.material_id
+        else:
+            material_id = None
+            
+        # Parse Fluid Container Fields
+        content_fluid_id = None
+        content_qty = None
+        if self.is_container_check.isVisible() and self.is_container_check.isChecked():
+            content_fluid_id = self.content_fluid_id
+            if content_fluid_id is not None:
+                try:
+                    content_qty = int(self.content_qty_edit.text())
+                except ValueError:
+                    content_qty = 0
+        
+        is_storage_container = 1 if (kind == "item" and self.is_storage_container_check.isChecked()) else 0
+        storage_slot_count = self.storage_slot_count_spin.value() if is_storage_container else None
+
+        md = {}
+        machine_type_val = None
+        if is_machine:
+            md = self._get_machine_values()
+            machine_type_val = (self.machine_type_combo.currentText() or "").strip() or None
+            if not machine_type_val:
+                QtWidgets.QMessageBox.warning(self, "Missing machine type", "Machine Type is required.")
+                return
+            if not md.get("machine_tier"):
+                QtWidgets.QMessageBox.warning(self, "Missing tier", "Tier is required for machines.")
+                return
+
+        key = self._next_unique_key(key)
+
+        try:
+            cur = self.app.conn.execute(
+                "INSERT INTO items(key, display_name, name_canonical, kind, is_base, is_machine, item_kind_id, material_id, "
+                "machine_type, machine_tier, is_multiblock, content_fluid_id, content_qty_liters, crafting_grid_size, is_storage_container, storage_slot_count) "
+                "VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                (
+                    key,
+                    display_name,
+                    item_canonical_name(display_name, key),
+                    kind,
+                    is_base,
+                    is_machine,
+                    item_kind_id,
+                    material_id,
+                    machine_type_val,
+                    md.get("machine_tier"),
+                    is_multiblock,
+                    content_fluid_id,
+                    content_qty,
+                    crafting_grid_size,
+                    is_storage_container,
+                    storage_slot_count,
+                ),
+            )
+            item_id = cur.lastrowid
+
+            if kind in ("fluid", "gas") and self.has_cell_check.isChecked():
+                self._ensure_auto_cell_for_fluid(
+                    fluid_item_id=item_id,
+                    fluid_name=display_name,
+                    is_base=is_base,
+                    liters=self._selected_auto_cell_liters(),
+                )
+
+            self.app.conn.commit()
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(
+                self,
+                "Save failed",
+                f"Could not add item.\n\nDetails: {exc}",
+            )
+            return
+
+        if hasattr(self.app, "last_added_item_id"):
+            self.app.last_added_item_id = item_id
+
+        if is_machine and self._show_availability and self.owned_spin is not None and self.online_spin is not None:
+            owned = int(self.owned_spin.value())
+            online = int(self.online_spin.value())
+            if online > owned:
+                online = owned
+            try:
+                self.app.set_machine_availability(
+                    [
+                        (
+                            machine_type_val or "",
+                            md.get("machine_tier") or "",
+                            owned,
+                            online,
+                        )
+                    ]
+                )
+            except Exception as exc:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Availability save failed",
+                    f"Item added, but availability could not be saved.\n\nDetails: {exc}",
+                )
+
+        self._set_status(f"Added item: {display_name}")
+        if hasattr(self.app, "_machines_load_from_db"):
+            self.app._machines_load_from_db()
+        self.accept()
+
+    def _next_unique_key(self, key: str) -> str:
+        cur = self.app.conn.execute("SELECT 1 FROM items WHERE key=?", (key,)).fetchone()
+        if not cur:
+            return key
+        base = key
+        n = 2
+        while self.app.conn.execute("SELECT 1 FROM items WHERE key=?", (f"{base}_{n}",)).fetchone():
+            n += 1
+        return f"{base}_{n}"
+
+    def _selected_auto_cell_liters(self) -> int:
+        if self.auto_cell_144_radio.isChecked():
+            return 144
+        return 1000
+
+    def _ensure_auto_cell_for_fluid(
+        self,
+        *,
+        fluid_item_id: int,
+        fluid_name: str,
+        is_base: int,
+        liters: int,
+    ) -> None:
+        cell_display_name = f"{fluid_name} Cell"
+        cell_key = self._slugify(cell_display_name)
+        cell_item_kind_id = self._get_or_create_cell_item_kind_id()
+        existing = self.app.conn.execute(
+            "SELECT id FROM items WHERE kind='item' AND (LOWER(key)=LOWER(?) OR content_fluid_id=?) LIMIT 1",
+            (cell_key, fluid_item_id),
+        ).fetchone()
+        if existing:
+            return
+
+        cell_key = self._next_unique_key(cell_key)
+        self.app.conn.execute(
+            "INSERT INTO items(key, display_name, name_canonical, kind, is_base, is_machine, item_kind_id, material_id, "
+            "machine_type, machine_tier, is_multiblock, content_fluid_id, content_qty_liters, crafting_grid_size, is_storage_container, storage_slot_count) "
+            "VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
+            (
+                cell_key,
+                cell_display_name,
+                item_canonical_name(cell_display_name, cell_key),
+                "item",
+                is_base,
+                0,
+                cell_item_kind_id,
+                None,
+                None,
+                None,
+                0,
+                fluid_item_id,
+                liters,
+                None,
+                0,
+                None,
+            ),
+        )
+
+    def _get_or_create_cell_item_kind_id(self) -> int | None:
+        row = self.app.conn.execute(
+            "SELECT id FROM item_kinds WHERE name_canonical='cell' AND LOWER(COALESCE(applies_to, 'item'))='item' LIMIT 1"
+        ).fetchone()
+        if row:
+            return int(row["id"])
+
+        kind_name = self._ensure_item_kind("Cell", "item")
+        if not kind_name:
+            return None
+        row = self.app.conn.execute(
+            "SELECT id FROM item_kinds WHERE name_canonical=? ORDER BY id LIMIT 1",
+            (canonical_name(kind_name),),
+        ).fetchone()
+        if not row:
+            return None
+        return int(row["id"])
+
+
+class EditItemDialog(_ItemDialogBase):
+    def __init__(self, app, item_id: int, parent=None):
+        row = app.conn.execute(
+            "SELECT i.id, i.key, COALESCE(i.display_name, i.key) AS name, i.display_name, i.kind, "
+            "       i.is_base, i.is_machine, i.machine_type, i.machine_tier, i.is_multiblock, "
+            "       i.content_fluid_id, i.content_qty_liters, i.crafting_grid_size, i.is_storage_container, i.storage_slot_count, "
+            "       i.item_kind_id, i.material_id, k.name AS item_kind_name, m.name AS material_name "
+            "FROM items i "
+            "LEFT JOIN item_kinds k ON k.id = i.item_kind_id "
+            "LEFT JOIN materials m ON m.id = i.material_id "
+            "WHERE i.id=?",
+            (item_id,),
+        ).fetchone()
+        self._original_key = row["key"] if row else None
+        super().__init__(app, "Edit Item", row=row, parent=parent)
+        if not row:
+            QtWidgets.QMessageBox.warning(self, "Not found", "Item not found.")
+            self.reject()
+
+    def save(self) -> None:
+        display_name = (self.display_name_edit.text() or "").strip()
+        if not display_name:
+            QtWidgets.QMessageBox.warning(self, "Missing name", "Display Name is required.")
+            return
+
+        kind = self._current_kind_value()
+        if kind not in ("item", "fluid", "gas", "machine", "crafting_grid"):
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Invalid kind",
+                "Kind must be item, fluid, gas, machine, or crafting grid.",
+            )
+            return
+
+        is_base = 1 if self.is_base_check.isChecked() else 0
+        is_multiblock = 1 if self.is_multiblock_check.isChecked() else 0
+
+        # "Machine" is now a top-level Kind
+        is_machine = 1 if kind == "machine" else 0
+        item_kind_id = None if kind in ("gas", "crafting_grid") else self.item_kind_id
+
+        crafting_grid_size = None
+        if kind == "crafting_grid":
+            crafting_grid_size = self.crafting_grid_size
+            if not crafting_grid_size:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Missing grid size",
+                    "Crafting Grid items require a grid size selection.",
+                )
+                return
+
+        if self.has_material_check.isVisible() and self.has_material_check.isChecked():
+            material_id = self.material_id
+        else:
+            material_id = None
+            
+        content_fluid_id = None
+        content_qty = None
+        if self.is_container_check.isVisible() and self.is_container_check.isChecked():
+            content_fluid_id = self.content_fluid_id
+            if content_fluid_id is not None:
+                try:
+                    content_qty = int(self.content_qty_edit.text())
+                except ValueError:
+                    content_qty = 0
+
+        is_storage_container = 1 if (kind == "item" and self.is_storage_container_check.isChecked()) else 0
+        storage_slot_count = self.storage_slot_count_spin.value() if is_storage_container else None
+
+        md = {}
+        machine_type_val = None
+        if is_machine:
+            md = self._get_machine_values()
+            machine_type_val = (self.machine_type_combo.currentText() or "").strip() or None
+            if not machine_type_val:
+                QtWidgets.QMessageBox.warning(self, "Missing machine type", "Machine Type is required.")
+                return
+            if not md.get("machine_tier"):
+                QtWidgets.QMessageBox.warning(self, "Missing tier", "Tier is required for machines.")
+                return
+
+        try:
+            self.app.conn.execute(
+                "UPDATE items SET display_name=?, name_canonical=?, kind=?, is_base=?, is_machine=?, item_kind_id=?, material_id=?, "
+                "machine_type=?, machine_tier=?, is_multiblock=?, content_fluid_id=?, content_qty_liters=?, crafting_grid_size=?, is_storage_container=?, storage_slot_count=? "
+                "WHERE id=?",
+                (
+                    display_name,
+                    item_canonical_name(display_name, self._original_key),
+                    kind,
+                    is_base,
+                    is_machine,
+                    item_kind_id,
+                    material_id,
+                    machine_type_val,
+                    md.get("machine_tier"),
+                    is_multiblock,
+                    content_fluid_id,
+                    content_qty,
+                    crafting_grid_size,
+                    is_storage_container,
+                    storage_slot_count,
+                    self.item_id,
+                ),
+            )
+
+            self.app.conn.commit()
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(
+                self,
+                "Save failed",
+                f"Could not update item.\n\nDetails: {exc}",
+            )
+            return
+
+        self._set_status(f"Updated item: {display_name}")
+        if hasattr(self.app, "_machines_load_from_db"):
+            self.app._machines_load_from_db()
+        self.accept()
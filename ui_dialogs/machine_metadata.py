@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+from PySide6 import QtWidgets
+
+from services.db import ALL_TIERS
+from services.machines import fetch_machine_metadata, replace_machine_metadata
+from ui_dialogs.managers import TierManagerDialog
+
+
+class MachineMetadataEditorDialog(QtWidgets.QDialog):
+    _slot_defaults = {
+        "input_slots": 1,
+        "output_slots": 1,
+        "storage_slots": 0,
+        "power_slots": 0,
+        "circuit_slots": 0,
+        "input_tanks": 0,
+        "input_tank_capacity_l": 0,
+        "output_tanks": 0,
+        "output_tank_capacity_l": 0,
+    }
+
+    def __init__(
+        self,
+        app,
+        parent=None,
+        *,
+        initial_machine_type: str | None = None,
+        initial_tiers: list[str] | None = None,
+    ):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Edit Machine Metadata")
+        self.setModal(True)
+        self.resize(960, 520)
+
+        self._metadata: dict[tuple[str, str], dict[str, object]] = {}
+        self._current_key: tuple[str, str] | None = None
+        self._loading = False
+        self._initial_machine_type = (initial_machine_type or "").strip()
+        self._initial_tiers = [
+            (tier or "").strip() for tier in (initial_tiers or []) if (tier or "").strip()
+        ]
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(
+            QtWidgets.QLabel(
+                "Define machine tiers and per-tier slot/tank capabilities."
+            )
+        )
+
+        header = QtWidgets.QHBoxLayout()
+        header.addWidget(QtWidgets.QLabel("Machine Type"))
+        self.machine_type_combo = QtWidgets.QComboBox()
+        self.machine_type_combo.setEditable(True)
+        self.machine_type_combo.currentTextChanged.connect(self._on_machine_type_changed)
+        header.addWidget(self.machine_type_combo, stretch=1)
+        self.remove_machine_btn = QtWidgets.QPushButton("Remove Type")
+        self.remove_machine_btn.clicked.connect(self._remove_machine_type)
+        header.addWidget(self.remove_machine_btn)
+        layout.addLayout(header)
+
+        body = QtWidgets.QHBoxLayout()
+        layout.addLayout(body, stretch=1)
+
+        left = QtWidgets.QVBoxLayout()
+        body.addLayout(left, stretch=0)
+
+        left.addWidget(QtWidgets.QLabel("Tiers"))
+        self.tier_list = QtWidgets.QListWidget()
+        self.tier_list.currentRowChanged.connect(self._on_tier_selected)
+        left.addWidget(self.tier_list, stretch=1)
+
+        tier_controls = QtWidgets.QHBoxLayout()
+        self.tier_combo = QtWidgets.QComboBox()
+        self.tier_combo.setEditable(True)
+        self.tier_combo.addItems(self._get_tier_list())
+        tier_controls.addWidget(self.tier_combo, stretch=1)
+        self.add_tier_btn = QtWidgets.QPushButton("Add Tier")
+        self.add_tier_btn.clicked.connect(self._add_tier)
+        tier_controls.addWidget(self.add_tier_btn)
+        self.remove_tier_btn = QtWidgets.QPushButton("Remove Tier")
+        self.remove_tier_btn.clicked.connect(self._remove_selected_tier)
+        tier_controls.addWidget(self.remove_tier_btn)
+        left.addLayout(tier_controls)
+
+        self.manage_tiers_btn = QtWidgets.QPushButton("Manage Tiers…")
+        self.manage_tiers_btn.clicked.connect(self._open_tier_manager)
+        left.addWidget(self.manage_tiers_btn)
+
+        right = QtWidgets.QVBoxLayout()
+        body.addLayout(right, stretch=1)
+
+        right.addWidget(QtWidgets.QLabel("Metadata"))
+        self.form = QtWidgets.QGridLayout()
+        right.addLayout(self.form)
+
+        name_row = self.form.rowCount()
+        self.machine_name_label = QtWidgets.QLabel("Machine Name")
+        self.machine_name_edit = QtWidgets.QLineEdit()
+        self.machine_name_edit.setPlaceholderText("e.g. Basic Cutting Machine")
+        self.machine_name_edit.textChanged.connect(lambda _=None: self._on_value_changed("machine_name"))
+        self.form.addWidget(self.machine_name_label, name_row, 0)
+        self.form.addWidget(self.machine_name_edit, name_row, 1)
+
+        self.slot_widgets: dict[str, tuple[QtWidgets.QCheckBox, QtWidgets.QSpinBox]] = {}
+        self._required_slot_keys: set[str] = set()
+        self.capacity_widgets: dict[str, QtWidgets.QSpinBox] = {}
+        self.capacity_labels: dict[str, QtWidgets.QLabel] = {}
+
+        self._add_slot_row("input_slots", "Input Slots", 1, 64, required=True)
+        self._add_slot_row("output_slots", "Output Slots", 1, 64, required=True)
+        self._add_slot_row("storage_slots", "Storage Slots", 0, 64)
+        self._add_slot_row("power_slots", "Power Slots", 0, 16)
+        self._add_slot_row("circuit_slots", "Circuit Slots", 0, 16)
+        self._add_slot_row("input_tanks", "Input Tanks", 0, 32, with_capacity="input_tank_capacity_l")
+        self._add_slot_row("output_tanks", "Output Tanks", 0, 32, with_capacity="output_tank_capacity_l")
+
+        right.addStretch(1)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._load_metadata()
+        self._apply_initial_selection()
+
+    def _apply_initial_selection(self) -> None:
+        machine_type = self._initial_machine_type
+        if not machine_type:
+            return
+        requested_tiers = self._sorted_tiers(list(dict.fromkeys(self._initial_tiers)))
+        for tier in requested_tiers:
+            key = (machine_type, tier)
+            if key not in self._metadata:
+                self._metadata[key] = {"machine_name": f"{tier} {machine_type}", **dict(self._slot_defaults)}
+        self._refresh_machine_types()
+        if requested_tiers:
+            self._select_tier(machine_type, requested_tiers[0])
+        else:
+            self.machine_type_combo.setCurrentText(machine_type)
+
+    def _get_tier_list(self) -> list[str]:
+        if hasattr(self.app, "get_all_tiers"):
+            return list(self.app.get_all_tiers())
+        return list(ALL_TIERS)
+
+    def _load_metadata(self) -> None:
+        self._metadata = {}
+        rows = fetch_machine_metadata(self.app.conn, tiers=self._get_tier_list())
+        for row in rows:
+            machine_type = (row["machine_type"] or "").strip()
+            tier = (row["tier"] or "").strip()
+            if not machine_type or not tier:
+                continue
+            self._metadata[(machine_type, tier)] = {
+                "machine_name": (row["machine_name"] or "").strip(),
+                "input_slots": int(row["input_slots"] or 1),
+                "output_slots": int(row["output_slots"] or 1),
+                "storage_slots": int(row["storage_slots"] or 0),
+                "power_slots": int(row["power_slots"] or 0),
+                "circuit_slots": int(row["circuit_slots"] or 0),
+                "input_tanks": int(row["input_tanks"] or 0),
+                "input_tank_capacity_l": int(row["input_tank_capacity_l"] or 0),
+                "output_tanks": int(row["output_tanks"] or 0),
+                "output_tank_capacity_l": int(row["output_tank_capacity_l"] or 0),
+            }
+        self._refresh_machine_types()
+
+    def _refresh_machine_types(self) -> None:
+        machine_types = sorted({machine for machine, _ in self._metadata.keys()}, key=str.casefold)
+        current = self.machine_type_combo.currentText().strip()
+        self.machine_type_combo.blockSignals(True)
+        self.machine_type_combo.clear()
+        self.machine_type_combo.addItems([""] + machine_types)
+        if current:
+            self.machine_type_combo.setCurrentText(current)
+        self.machine_type_combo.blockSignals(False)
+        self._on_machine_type_changed(self.machine_type_combo.currentText())
+
+    def _sorted_tiers(self, tiers: list[str]) -> list[str]:
+        tier_list = self._get_tier_list()
+        order = {tier: idx for idx, tier in enumerate(tier_list)}
+        extras = sorted([tier for tier in tiers if tier not in order])
+        ordered = sorted([tier for tier in tiers if tier in order], key=lambda t: order[t])
+        return ordered + extras
+
+    def _on_machine_type_changed(self, machine_type: str) -> None:
+        self._update_current_metadata()
+        machine_type = (machine_type or "").strip()
+        tiers = [tier for (m_type, tier) in self._metadata.keys() if m_type == machine_type]
+        self._loading = True
+        self.tier_list.clear()
+        for tier in self._sorted_tiers(tiers):
+            self.tier_list.addItem(tier)
+        self._loading = False
+        if self.tier_list.count() > 0:
+            self.tier_list.setCurrentRow(0)
+        else:
+            self._current_key = None
+            self._set_form_enabled(False)
+
+    def _on_tier_selected(self, row: int) -> None:
+        if self._loading:
+            return
+        self._update_current_metadata()
+        machine_type = (self.machine_type_combo.currentText() or "").strip()
+        tier = self.tier_list.item(row).text() if 0 <= row < self.tier_list.count() else ""
+        if not machine_type or not tier:
+            self._current_key = None
+            self._set_form_enabled(False)
+            return
+        self._current_key = (machine_type, tier)
+        self._load_form_values(self._metadata.get(self._current_key, {}))
+
+    def _set_form_enabled(self, enabled: bool) -> None:
+        self.machine_name_edit.setEnabled(enabled)
+        for key, (checkbox, spin) in self.slot_widgets.items():
+            checkbox.setEnabled(enabled and key not in self._required_slot_keys)
+            spin.setEnabled(enabled)
+        for spin in self.capacity_widgets.values():
+            spin.setEnabled(enabled)
+        for label in self.capacity_labels.values():
+            label.setEnabled(enabled)
+
+    def _add_slot_row(
+        self,
+        key: str,
+        label: str,
+        minimum: int,
+        maximum: int,
+        *,
+        required: bool = False,
+        with_capacity: str | None = None,
+    ) -> None:
+        row = self.form.rowCount()
+        checkbox = QtWidgets.QCheckBox(label)
+        spin = QtWidgets.QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(self._slot_defaults.get(key, 0))
+        self.form.addWidget(checkbox, row, 0)
+        self.form.addWidget(spin, row, 1)
+        self.slot_widgets[key] = (checkbox, spin)
+        spin.valueChanged.connect(lambda _=0, k=key: self._on_value_changed(k))
+        checkbox.toggled.connect(lambda checked, k=key: self._on_slot_toggled(k, checked))
+        if required:
+            checkbox.setChecked(True)
+            checkbox.setEnabled(False)
+            self._required_slot_keys.add(key)
+
+        if with_capacity:
+            cap_row = self.form.rowCount()
+            cap_label = QtWidgets.QLabel("Capacity (L)")
+            cap_spin = QtWidgets.QSpinBox()
+            cap_spin.setRange(0, 10**9)
+            cap_spin.setValue(self._slot_defaults.get(with_capacity, 0))
+            cap_spin.valueChanged.connect(lambda _=0, k=with_capacity: self._on_value_changed(k))
+            self.form.addWidget(cap_label, cap_row, 0)
+            self.form.addWidget(cap_spin, cap_row, 1)
+            self.capacity_labels[with_capacity] = cap_label
+            self.capacity_widgets[with_capacity] = cap_spin
+
+    def _on_slot_toggled(self, key: str, checked: bool) -> None:
+        if self._loading:
+            return
+        slot = self.slot_widgets.get(key)
+        if slot is None:
+            return
+        checkbox, spin = slot
+        if checked and spin.value() == 0:
+            spin.setValue(max(1, spin.minimum()))
+        spin.setVisible(checked)
+        if key == "input_tanks":
+            self._toggle_capacity("input_tank_capacity_l", checked)
+        elif key == "output_tanks":
+            self._toggle_capacity("output_tank_capacity_l", checked)
+        self._on_value_changed(key)
+
+    def _toggle_capacity(self, key: str, visible: bool) -> None:
+        label = self.capacity_labels.get(key)
+        spin = self.capacity_widgets.get(key)
+        if label:
+            label.setVisible(visible)
+        if spin:
+            spin.setVisible(visible)
+
+    def _on_value_changed(self, _key: str) -> None:
+        if self._loading:
+            return
+        self._update_current_metadata()
+
+    def _load_form_values(self, values: dict[str, object]) -> None:
+        self._loading = True
+        self.machine_name_edit.setText((values.get("machine_name") or "").strip())
+        for key, (checkbox, spin) in self.slot_widgets.items():
+            value = int(values.get(key, self._slot_defaults.get(key, 0)))
+            checkbox.setChecked(value > 0)
+            spin.setVisible(value > 0)
+            spin.setValue(max(spin.minimum(), value))
+        for key, spin in self.capacity_widgets.items():
+            value = int(values.get(key, self._slot_defaults.get(key, 0)))
+            spin.setValue(max(spin.minimum(), value))
+        self._loading = False
+
+        input_checked = self.slot_widgets["input_tanks"][0].isChecked()
+        output_checked = self.slot_widgets["output_tanks"][0].isChecked()
+        self._toggle_capacity("input_tank_capacity_l", input_checked)
+        self._toggle_capacity("output_tank_capacity_l", output_checked)
+        self._set_form_enabled(True)
+
+    def _update_current_metadata(self) -> None:
+        if self._current_key is None:
+            return
+        values: dict[str, object] = {
+            "machine_name": (self.machine_name_edit.text() or "").strip()
+        }
+        for key, (checkbox, spin) in self.slot_widgets.items():
+            if checkbox.isEnabled() and not checkbox.isChecked():
+                values[key] = 0
+            else:
+                values[key] = int(spin.value())
+        for key, spin in self.capacity_widgets.items():
+            tank_key = "input_tanks" if "input" in key else "output_tanks"
+            tank_checkbox = self.slot_widgets[tank_key][0]
+            values[key] = int(spin.value()) if tank_checkbox.isChecked() else 0
+        self._metadata[self._current_key] = values
+
+    def _add_tier(self) -> None:
+        machine_type = (self.machine_type_combo.currentText() or "").strip()
+        if not machine_type:
+            QtWidgets.QMessageBox.warning(self, "Missing machine type", "Enter a machine type first.")
+            return
+        tier = (self.tier_combo.currentText() or "").strip()
+        if not tier:
+            QtWidgets.QMessageBox.warning(self, "Missing tier", "Select a tier to add.")
+            return
+        key = (machine_type, tier)
+        if key in self._metadata:
+            QtWidgets.QMessageBox.information(self, "Tier exists", f"{machine_type} already has tier '{tier}'.")
+            return
+        self._metadata[key] = {"machine_name": f"{tier} {machine_type}", **dict(self._slot_defaults)}
+        self._refresh_machine_types()
+        self._select_tier(machine_type, tier)
+
+    def _select_tier(self, machine_type: str, tier: str) -> None:
+        self.machine_type_combo.setCurrentText(machine_type)
+        for idx in range(self.tier_list.count()):
+            if self.tier_list.item(idx).text() == tier:
+                self.tier_list.setCurrentRow(idx)
+                return
+
+    def _remove_selected_tier(self) -> None:
+        if self._current_key is None:
+            return
+        machine_type, tier = self._current_key
+        confirm = QtWidgets.QMessageBox.question(
+            self,
+            "Remove tier?",
+            f"Remove tier '{tier}' from {machine_type}?",
+        )
+        if confirm != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+        self._metadata.pop(self._current_key, None)
+        self._current_key = None
+        self._refresh_machine_types()
+
+    def _remove_machine_type(self) -> None:
+        machine_type = (self.machine_type_combo.currentText() or "").strip()
+        if not machine_type:
+            return
+        confirm = QtWidgets.QMessageBox.question(
+            self,
+            "Remove machine type?",
+            f"Remove all tiers for '{machine_type}'?",
+        )
+        if confirm != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+        for key in list(self._metadata.keys()):
+            if key[0] == machine_type:
+                self._metadata.pop(key, None)
+        self._current_key = None
+        self._refresh_machine_types()
+
+    def _open_tier_manager(self) -> None:
+        if not hasattr(self.app, "editor_enabled") or not self.app.editor_enabled:
+            QtWidgets.QMessageBox.information(
+                self,
+                "Editor locked",
+                "Editing tiers is only available in editor mode.",
+            )
+            return
+        dlg = TierManagerDialog(self.app, parent=self)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self.tier_combo.clear()
+            self.tier_combo.addItems(self._get_tier_list())
+
+    def _validate_rows(self) -> list[tuple] | None:
+        rows: list[tuple] = []
+        for (machine_type, tier), values in sorted(self._metadata.items()):
+            if not machine_type or not tier:
+                continue
+            machine_name = (values.get("machine_name") or "").strip()
+            if not machine_name:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Missing machine name",
+                    f"Enter a machine name for {machine_type} ({tier}).",
+                )
+                return None
+            input_slots = max(1, int(values.get("input_slots", 1)))
+            output_slots = max(1, int(values.get("output_slots", 1)))
+            rows.append(
+                (
+                    machine_type,
+                    tier,
+                    machine_name,
+                    input_slots,
+                    output_slots,
+                    0,
+                    int(values.get("storage_slots", 0)),
+                    int(values.get("power_slots", 0)),
+                    int(values.get("circuit_slots", 0)),
+                    int(values.get("input_tanks", 0)),
+                    int(values.get("input_tank_capacity_l", 0)),
+                    int(values.get("output_tanks", 0)),
+                    int(values.get("output_tank_capacity_l", 0)),
+                )
+            )
+        return rows
+
+    def _save(self) -> None:
+        self._update_current_metadata()
+        rows = self._validate_rows()
+        if rows is None:
+            return
+        try:
+            replace_machine_metadata(self.app.conn, rows)
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        if hasattr(self.app, "refresh_recipes"):
+            self.app.refresh_recipes()
+        if hasattr(self.app, "_machines_load_from_db"):
+            self.app._machines_load_from_db()
+        self.accept()
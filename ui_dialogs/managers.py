@@ -0,0 +1,787 @@
+from __future__ import annotations
+
+from PySide6 import QtCore, QtWidgets
+
+from services.db import ALL_TIERS, canonical_name
+from services.materials import (
+    add_material,
+    delete_material,
+    fetch_materials,
+    update_material,
+)
+from services.container_transforms import fetch_container_transforms, replace_container_transforms
+
+
+class ContainerTransformManagerDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Container Transforms")
+        self.setModal(True)
+        self.resize(980, 440)
+
+        self._items = self.app.conn.execute(
+            "SELECT id, display_name AS name, kind FROM items ORDER BY display_name COLLATE NOCASE ASC"
+        ).fetchall()
+        self._item_by_id = {int(r["id"]): r for r in self._items}
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Define explicit container transform mappings used by planner fill/empty steps. Lower priority runs first."))
+
+        self.table = QtWidgets.QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels([
+            "Priority",
+            "Container Item",
+            "Empty Item",
+            "Content Item",
+            "Content Qty",
+            "Direction",
+            "Id",
+        ])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(3, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        self.table.setColumnHidden(6, True)
+        layout.addWidget(self.table, stretch=1)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.add_row_btn = QtWidgets.QPushButton("Add Row")
+        self.add_row_btn.clicked.connect(self._add_row)
+        self.remove_row_btn = QtWidgets.QPushButton("Remove Selected")
+        self.remove_row_btn.clicked.connect(self._remove_selected_rows)
+        self.duplicate_row_btn = QtWidgets.QPushButton("Duplicate Selected")
+        self.duplicate_row_btn.clicked.connect(self._duplicate_selected_rows)
+        controls.addWidget(self.add_row_btn)
+        controls.addWidget(self.duplicate_row_btn)
+        controls.addWidget(self.remove_row_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._load_rows()
+
+    def _build_item_combo(self, *, kinds: tuple[str, ...], selected_id: int | None = None) -> QtWidgets.QComboBox:
+        combo = QtWidgets.QComboBox()
+        for row in self._items:
+            if (row["kind"] or "").strip().lower() not in kinds:
+                continue
+            combo.addItem(row["name"], int(row["id"]))
+        if combo.count() == 0:
+            combo.addItem("(No matching items)", -1)
+        if selected_id is not None:
+            idx = combo.findData(int(selected_id))
+            if idx >= 0:
+                combo.setCurrentIndex(idx)
+        return combo
+
+    def _add_row(self, row=None) -> None:
+        if isinstance(row, bool):
+            row = None
+        row_idx = self.table.rowCount()
+        self.table.insertRow(row_idx)
+
+        priority_item = QtWidgets.QTableWidgetItem(str(int(row["priority"]) if row else 0))
+        self.table.setItem(row_idx, 0, priority_item)
+
+        container_combo = self._build_item_combo(kinds=("item", "machine"), selected_id=int(row["container_item_id"]) if row else None)
+        empty_combo = self._build_item_combo(kinds=("item", "machine"), selected_id=int(row["empty_item_id"]) if row else None)
+        content_combo = self._build_item_combo(kinds=("fluid", "gas"), selected_id=int(row["content_item_id"]) if row else None)
+        self.table.setCellWidget(row_idx, 1, container_combo)
+        self.table.setCellWidget(row_idx, 2, empty_combo)
+        self.table.setCellWidget(row_idx, 3, content_combo)
+
+        qty_item = QtWidgets.QTableWidgetItem(str(int(row["content_qty"]) if row else 1000))
+        self.table.setItem(row_idx, 4, qty_item)
+
+        direction_combo = QtWidgets.QComboBox()
+        direction_combo.addItem("Bidirectional", "bidirectional")
+        direction_combo.addItem("Empty Only", "empty_only")
+        direction_combo.addItem("Fill Only", "fill_only")
+        if row:
+            idx = direction_combo.findData((row["transform_kind"] or "bidirectional"))
+            if idx >= 0:
+                direction_combo.setCurrentIndex(idx)
+        self.table.setCellWidget(row_idx, 5, direction_combo)
+
+        id_item = QtWidgets.QTableWidgetItem(str(int(row["id"]) if row else 0))
+        self.table.setItem(row_idx, 6, id_item)
+
+    def _load_rows(self) -> None:
+        self.table.setRowCount(0)
+        for row in fetch_container_transforms(self.app.conn):
+            self._add_row(row)
+        if self.table.rowCount() == 0:
+            self._add_row()
+
+    def _remove_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
+        for row_idx in rows:
+            self.table.removeRow(row_idx)
+
+    def _duplicate_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()})
+        for row_idx in rows:
+            row = {
+                "priority": int((self.table.item(row_idx, 0).text() if self.table.item(row_idx, 0) else "0").strip() or "0"),
+                "container_item_id": int(self.table.cellWidget(row_idx, 1).currentData() or 0),
+                "empty_item_id": int(self.table.cellWidget(row_idx, 2).currentData() or 0),
+                "content_item_id": int(self.table.cellWidget(row_idx, 3).currentData() or 0),
+                "content_qty": int((self.table.item(row_idx, 4).text() if self.table.item(row_idx, 4) else "1000").strip() or "1000"),
+                "transform_kind": str(self.table.cellWidget(row_idx, 5).currentData() or "bidirectional"),
+            }
+            self._add_row(row)
+
+    def _validate_rows(self) -> list[dict] | None:
+        rows: list[dict] = []
+        seen: set[tuple[int, int, int]] = set()
+        for row_idx in range(self.table.rowCount()):
+            priority_item = self.table.item(row_idx, 0)
+            qty_item = self.table.item(row_idx, 4)
+            try:
+                priority = int((priority_item.text() if priority_item else "0").strip() or "0")
+            except ValueError:
+                QtWidgets.QMessageBox.warning(self, "Invalid priority", f"Row {row_idx + 1} needs an integer priority.")
+                return None
+            try:
+                content_qty = int((qty_item.text() if qty_item else "").strip() or "0")
+            except ValueError:
+                QtWidgets.QMessageBox.warning(self, "Invalid quantity", f"Row {row_idx + 1} needs a whole-number content qty.")
+                return None
+            if content_qty <= 0:
+                QtWidgets.QMessageBox.warning(self, "Invalid quantity", f"Row {row_idx + 1} content qty must be > 0.")
+                return None
+
+            container_combo = self.table.cellWidget(row_idx, 1)
+            empty_combo = self.table.cellWidget(row_idx, 2)
+            content_combo = self.table.cellWidget(row_idx, 3)
+            direction_combo = self.table.cellWidget(row_idx, 5)
+
+            container_item_id = int(container_combo.currentData() or -1)
+            empty_item_id = int(empty_combo.currentData() or -1)
+            content_item_id = int(content_combo.currentData() or -1)
+            transform_kind = str(direction_combo.currentData() or "bidirectional")
+
+            if min(container_item_id, empty_item_id, content_item_id) <= 0:
+                QtWidgets.QMessageBox.warning(self, "Missing mapping", f"Row {row_idx + 1} requires valid item selections.")
+                return None
+            if container_item_id == empty_item_id:
+                QtWidgets.QMessageBox.warning(self, "Invalid mapping", f"Row {row_idx + 1} container and empty item cannot be the same.")
+                return None
+
+            key = (container_item_id, empty_item_id, content_item_id)
+            if key in seen:
+                QtWidgets.QMessageBox.warning(self, "Duplicate mapping", f"Row {row_idx + 1} duplicates an existing mapping.")
+                return None
+            seen.add(key)
+
+            rows.append(
+                {
+                    "priority": priority,
+                    "container_item_id": container_item_id,
+                    "empty_item_id": empty_item_id,
+                    "content_item_id": content_item_id,
+                    "content_qty": content_qty,
+                    "transform_kind": transform_kind,
+                }
+            )
+        return rows
+
+    def _save(self) -> None:
+        rows = self._validate_rows()
+        if rows is None:
+            return
+        try:
+            replace_container_transforms(self.app.conn, rows)
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        if hasattr(self.app, "refresh_recipes"):
+            self.app.refresh_recipes()
+        if hasattr(self.app, "status_bar"):
+            self.app.status_bar.showMessage("Updated container transforms.")
+        self.accept()
+
+
+class MaterialManagerDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Materials")
+        self.setModal(True)
+        self.resize(640, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Define materials to associate with items."))
+
+        self.table = QtWidgets.QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Name", "Attributes"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.add_row_btn = QtWidgets.QPushButton("Add Row")
+        self.add_row_btn.clicked.connect(self._add_row)
+        self.remove_row_btn = QtWidgets.QPushButton("Remove Selected")
+        self.remove_row_btn.clicked.connect(self._remove_selected_rows)
+        self.duplicate_row_btn = QtWidgets.QPushButton("Duplicate Selected")
+        self.duplicate_row_btn.clicked.connect(self._duplicate_selected_rows)
+        controls.addWidget(self.add_row_btn)
+        controls.addWidget(self.duplicate_row_btn)
+        controls.addWidget(self.remove_row_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._existing_ids: set[int] = set()
+        self._load_rows()
+
+    def _load_rows(self) -> None:
+        self.table.setRowCount(0)
+        rows = fetch_materials(self.app.conn)
+        self._existing_ids = {int(row["id"]) for row in rows}
+        for row in rows:
+            self._add_row(row)
+        if self.table.rowCount() == 0:
+            self._add_row()
+
+    def _add_row(self, row=None) -> None:
+        focus_new_row = isinstance(row, bool)
+        if focus_new_row:
+            row = None
+        row_idx = self.table.rowCount()
+        self.table.insertRow(row_idx)
+
+        name_item = QtWidgets.QTableWidgetItem((row["name"] or "").strip() if row else "")
+        if row:
+            name_item.setData(QtCore.Qt.ItemDataRole.UserRole, int(row["id"]))
+        self.table.setItem(row_idx, 0, name_item)
+
+        attributes_item = QtWidgets.QTableWidgetItem((row["attributes"] or "").strip() if row else "")
+        self.table.setItem(row_idx, 1, attributes_item)
+
+        if focus_new_row:
+            self.table.setCurrentCell(row_idx, 0)
+            self.table.editItem(name_item)
+
+    def _remove_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
+        for row_idx in rows:
+            self.table.removeRow(row_idx)
+
+    def _duplicate_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()})
+        for row_idx in rows:
+            name_item = self.table.item(row_idx, 0)
+            attrs_item = self.table.item(row_idx, 1)
+            self._add_row(
+                {
+                    "name": (name_item.text() if name_item else "").strip(),
+                    "attributes": (attrs_item.text() if attrs_item else "").strip(),
+                }
+            )
+
+    def _validate_rows(self) -> list[dict] | None:
+        rows: list[dict] = []
+        seen: set[str] = set()
+        for row_idx in range(self.table.rowCount()):
+            name_item = self.table.item(row_idx, 0)
+            name = (name_item.text() if name_item else "").strip()
+            if not name:
+                QtWidgets.QMessageBox.warning(self, "Missing name", f"Row {row_idx + 1} needs a material name.")
+                return None
+            canon = name.casefold()
+            if canon in seen:
+                QtWidgets.QMessageBox.warning(self, "Duplicate name", f"Material '{name}' is listed twice.")
+                return None
+            seen.add(canon)
+            attributes_item = self.table.item(row_idx, 1)
+            attributes = (attributes_item.text() if attributes_item else "").strip() or None
+            material_id = None
+            if name_item is not None:
+                material_id = name_item.data(QtCore.Qt.ItemDataRole.UserRole)
+            rows.append({"id": material_id, "name": name, "attributes": attributes})
+        return rows
+
+    def _save(self) -> None:
+        rows = self._validate_rows()
+        if rows is None:
+            return
+
+        current_ids = {int(r["id"]) for r in rows if r["id"] is not None}
+        removed_ids = self._existing_ids - current_ids
+        try:
+            for material_id in removed_ids:
+                delete_material(self.app.conn, int(material_id))
+            for row in rows:
+                if row["id"] is None:
+                    add_material(self.app.conn, row["name"], row["attributes"])
+                else:
+                    update_material(self.app.conn, int(row["id"]), row["name"], row["attributes"])
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        self.accept()
+
+
+class TierManagerDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Tiers")
+        self.setModal(True)
+        self.resize(520, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Define the tier list used across dropdowns and filters."))
+
+        self.table = QtWidgets.QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Tier Name", "Sort Order"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.add_row_btn = QtWidgets.QPushButton("Add Row")
+        self.add_row_btn.clicked.connect(self._add_row)
+        self.remove_row_btn = QtWidgets.QPushButton("Remove Selected")
+        self.remove_row_btn.clicked.connect(self._remove_selected_rows)
+        self.duplicate_row_btn = QtWidgets.QPushButton("Duplicate Selected")
+        self.duplicate_row_btn.clicked.connect(self._duplicate_selected_rows)
+        controls.addWidget(self.add_row_btn)
+        controls.addWidget(self.duplicate_row_btn)
+        controls.addWidget(self.remove_row_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._load_rows()
+
+    def _load_rows(self) -> None:
+        self.table.setRowCount(0)
+        tiers = self.app.get_all_tiers() if hasattr(self.app, "get_all_tiers") else list(ALL_TIERS)
+        for idx, tier in enumerate(tiers):
+            self._add_row({"name": tier, "order": idx + 1})
+        if self.table.rowCount() == 0:
+            self._add_row()
+
+    def _add_row(self, row=None) -> None:
+        if isinstance(row, bool):
+            row = None
+        row_idx = self.table.rowCount()
+        self.table.insertRow(row_idx)
+
+        name_item = QtWidgets.QTableWidgetItem((row["name"] or "").strip() if row else "")
+        self.table.setItem(row_idx, 0, name_item)
+
+        order_val = str(row["order"]) if row and row.get("order") else str(row_idx + 1)
+        order_item = QtWidgets.QTableWidgetItem(order_val)
+        self.table.setItem(row_idx, 1, order_item)
+
+    def _remove_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
+        for row_idx in rows:
+            self.table.removeRow(row_idx)
+
+    def _duplicate_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()})
+        for row_idx in rows:
+            name_item = self.table.item(row_idx, 0)
+            order_item = self.table.item(row_idx, 1)
+            self._add_row(
+                {
+                    "name": (name_item.text() if name_item else "").strip(),
+                    "order": (order_item.text() if order_item else "").strip() or str(row_idx + 1),
+                }
+            )
+
+    def _validate_rows(self) -> list[str] | None:
+        rows: list[tuple[int, str]] = []
+        seen: set[str] = set()
+        for row_idx in range(self.table.rowCount()):
+            name_item = self.table.item(row_idx, 0)
+            name = (name_item.text() if name_item else "").strip()
+            if not name:
+                QtWidgets.QMessageBox.warning(self, "Missing name", f"Row {row_idx + 1} needs a tier name.")
+                return None
+            canon = name.casefold()
+            if canon in seen:
+                QtWidgets.QMessageBox.warning(self, "Duplicate name", f"Tier '{name}' is listed twice.")
+                return None
+            seen.add(canon)
+
+            order_item = self.table.item(row_idx, 1)
+            order_text = (order_item.text() if order_item else "").strip()
+            try:
+                order = int(order_text or row_idx + 1)
+            except ValueError:
+                QtWidgets.QMessageBox.warning(self, "Invalid order", f"Row {row_idx + 1} has an invalid sort order.")
+                return None
+            rows.append((order, name))
+        if not rows:
+            QtWidgets.QMessageBox.warning(self, "Missing tiers", "Define at least one tier.")
+            return None
+        rows.sort(key=lambda item: item[0])
+        return [name for _, name in rows]
+
+    def _save(self) -> None:
+        tiers = self._validate_rows()
+        if tiers is None:
+            return
+        if hasattr(self.app, "set_all_tiers"):
+            self.app.set_all_tiers(tiers)
+        enabled = [tier for tier in self.app.get_enabled_tiers() if tier in tiers]
+        if not enabled:
+            enabled = [tiers[0]]
+        self.app.set_enabled_tiers(enabled)
+        self.app.set_crafting_6x6_unlocked(self.app.is_crafting_6x6_unlocked())
+
+        if hasattr(self.app, "_tiers_load_from_db"):
+            self.app._tiers_load_from_db()
+        if hasattr(self.app, "refresh_recipes"):
+            self.app.refresh_recipes()
+        if hasattr(self.app, "_machines_load_from_db"):
+            self.app._machines_load_from_db()
+        if hasattr(self.app, "status_bar"):
+            self.app.status_bar.showMessage("Updated tier list.")
+        self.accept()
+
+
+class CraftingGridManagerDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Crafting Grids")
+        self.setModal(True)
+        self.resize(420, 320)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Define the crafting grid sizes available in recipes and items."))
+
+        self.table = QtWidgets.QTableWidget(0, 1)
+        self.table.setHorizontalHeaderLabels(["Grid Size (e.g. 3x3)"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.add_row_btn = QtWidgets.QPushButton("Add Row")
+        self.add_row_btn.clicked.connect(self._add_row)
+        self.remove_row_btn = QtWidgets.QPushButton("Remove Selected")
+        self.remove_row_btn.clicked.connect(self._remove_selected_rows)
+        self.duplicate_row_btn = QtWidgets.QPushButton("Duplicate Selected")
+        self.duplicate_row_btn.clicked.connect(self._duplicate_selected_rows)
+        controls.addWidget(self.add_row_btn)
+        controls.addWidget(self.duplicate_row_btn)
+        controls.addWidget(self.remove_row_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._load_rows()
+
+    def _load_rows(self) -> None:
+        self.table.setRowCount(0)
+        grids = self.app.get_crafting_grids() if hasattr(self.app, "get_crafting_grids") else ["2x2", "3x3"]
+        for grid in grids:
+            self._add_row({"size": grid})
+        if self.table.rowCount() == 0:
+            self._add_row()
+
+    def _add_row(self, row=None) -> None:
+        if isinstance(row, bool):
+            row = None
+        row_idx = self.table.rowCount()
+        self.table.insertRow(row_idx)
+        size_item = QtWidgets.QTableWidgetItem((row["size"] or "").strip() if row else "")
+        self.table.setItem(row_idx, 0, size_item)
+
+    def _remove_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
+        for row_idx in rows:
+            self.table.removeRow(row_idx)
+
+    def _duplicate_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()})
+        for row_idx in rows:
+            size_item = self.table.item(row_idx, 0)
+            self._add_row({"size": (size_item.text() if size_item else "").strip()})
+
+    @staticmethod
+    def _parse_grid_size(value: str) -> tuple[int, int] | None:
+        raw = (value or "").strip().lower().replace("×", "x")
+        if "x" not in raw:
+            return None
+        parts = [p.strip() for p in raw.split("x", 1)]
+        if len(parts) != 2:
+            return None
+        if not parts[0].isdigit() or not parts[1].isdigit():
+            return None
+        rows = int(parts[0])
+        cols = int(parts[1])
+        if rows <= 0 or cols <= 0:
+            return None
+        return rows, cols
+
+    def _validate_rows(self) -> list[str] | None:
+        grids: list[str] = []
+        seen: set[str] = set()
+        for row_idx in range(self.table.rowCount()):
+            size_item = self.table.item(row_idx, 0)
+            size = (size_item.text() if size_item else "").strip()
+            if not size:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Missing grid size",
+                    f"Row {row_idx + 1} needs a grid size.",
+                )
+                return None
+            if not self._parse_grid_size(size):
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Invalid grid size",
+                    f"Row {row_idx + 1} must be in NxM format (e.g. 3x3).",
+                )
+                return None
+            canon = size.lower()
+            if canon in seen:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Duplicate grid size",
+                    f"Grid size '{size}' is listed twice.",
+                )
+                return None
+            seen.add(canon)
+            grids.append(size)
+        if not grids:
+            QtWidgets.QMessageBox.warning(self, "Missing grids", "Define at least one crafting grid size.")
+            return None
+        return grids
+
+    def _save(self) -> None:
+        grids = self._validate_rows()
+        if grids is None:
+            return
+        if hasattr(self.app, "set_crafting_grids"):
+            self.app.set_crafting_grids(grids)
+        if hasattr(self.app, "status_bar"):
+            self.app.status_bar.showMessage("Updated crafting grids.")
+        self.accept()
+
+
+class ItemKindManagerDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Item Kinds")
+        self.setModal(True)
+        self.resize(640, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Define item kinds for item classification and grouping."))
+
+        self.table = QtWidgets.QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Name", "Sort Order", "Applies To", "Built-in"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.add_row_btn = QtWidgets.QPushButton("Add Row")
+        self.add_row_btn.clicked.connect(self._add_row)
+        self.remove_row_btn = QtWidgets.QPushButton("Remove Selected")
+        self.remove_row_btn.clicked.connect(self._remove_selected_rows)
+        self.duplicate_row_btn = QtWidgets.QPushButton("Duplicate Selected")
+        self.duplicate_row_btn.clicked.connect(self._duplicate_selected_rows)
+        controls.addWidget(self.add_row_btn)
+        controls.addWidget(self.duplicate_row_btn)
+        controls.addWidget(self.remove_row_btn)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self._save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        self._existing_ids: set[int] = set()
+        self._load_rows()
+
+    def _load_rows(self) -> None:
+        self.table.setRowCount(0)
+        rows = self.app.conn.execute(
+            "SELECT id, name, sort_order, is_builtin, applies_to "
+            "FROM item_kinds ORDER BY sort_order ASC, name COLLATE NOCASE ASC"
+        ).fetchall()
+        self._existing_ids = {int(row["id"]) for row in rows}
+        for row in rows:
+            self._add_row(row)
+        if self.table.rowCount() == 0:
+            self._add_row()
+
+    def _add_row(self, row=None) -> None:
+        if isinstance(row, bool):
+            row = None
+        row_idx = self.table.rowCount()
+        self.table.insertRow(row_idx)
+
+        name_item = QtWidgets.QTableWidgetItem((row["name"] or "").strip() if row else "")
+        if row:
+            name_item.setData(QtCore.Qt.ItemDataRole.UserRole, int(row["id"]))
+        self.table.setItem(row_idx, 0, name_item)
+
+        sort_item = QtWidgets.QTableWidgetItem(str(row["sort_order"]) if row else "0")
+        self.table.setItem(row_idx, 1, sort_item)
+
+        applies_combo = QtWidgets.QComboBox()
+        applies_combo.addItems(["Item", "Fluid"])
+        applies_to = (row["applies_to"] or "item").strip().lower() if row else "item"
+        applies_combo.setCurrentText("Fluid" if applies_to == "fluid" else "Item")
+        self.table.setCellWidget(row_idx, 2, applies_combo)
+
+        builtin_item = QtWidgets.QTableWidgetItem("Yes" if row and row["is_builtin"] else "No")
+        builtin_item.setFlags(builtin_item.flags() & ~QtCore.Qt.ItemFlag.ItemIsEditable)
+        if row and row["is_builtin"]:
+            builtin_item.setData(QtCore.Qt.ItemDataRole.UserRole, True)
+        self.table.setItem(row_idx, 3, builtin_item)
+
+    def _remove_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()}, reverse=True)
+        for row_idx in rows:
+            builtin_item = self.table.item(row_idx, 3)
+            if builtin_item and builtin_item.data(QtCore.Qt.ItemDataRole.UserRole):
+                QtWidgets.QMessageBox.warning(
+                    self, "Cannot remove built-in", "Built-in kinds cannot be removed."
+                )
+                continue
+            self.table.removeRow(row_idx)
+
+    def _duplicate_selected_rows(self) -> None:
+        rows = sorted({idx.row() for idx in self.table.selectionModel().selectedRows()})
+        for row_idx in rows:
+            name_item = self.table.item(row_idx, 0)
+            sort_item = self.table.item(row_idx, 1)
+            applies_combo = self.table.cellWidget(row_idx, 2)
+            applies_to = "item"
+            if isinstance(applies_combo, QtWidgets.QComboBox):
+                applies_to = "fluid" if (applies_combo.currentText() or "").strip().lower() == "fluid" else "item"
+            self._add_row(
+                {
+                    "name": (name_item.text() if name_item else "").strip(),
+                    "sort_order": int((sort_item.text() if sort_item else "0").strip() or "0"),
+                    "applies_to": applies_to,
+                    "is_builtin": 0,
+                }
+            )
+
+    def _validate_rows(self) -> list[dict] | None:
+        rows: list[dict] = []
+        seen: set[str] = set()
+        for row_idx in range(self.table.rowCount()):
+            name_item = self.table.item(row_idx, 0)
+            name = (name_item.text() if name_item else "").strip()
+            if not name:
+                QtWidgets.QMessageBox.warning(self, "Missing name", f"Row {row_idx + 1} needs a kind name.")
+                return None
+            canon = name.casefold()
+            if canon in seen:
+                QtWidgets.QMessageBox.warning(self, "Duplicate name", f"Kind '{name}' is listed twice.")
+                return None
+            seen.add(canon)
+            sort_item = self.table.item(row_idx, 1)
+            sort_raw = (sort_item.text() if sort_item else "").strip()
+            try:
+                sort_order = int(sort_raw) if sort_raw != "" else 0
+            except ValueError:
+                QtWidgets.QMessageBox.warning(self, "Invalid sort order", f"Row {row_idx + 1} needs a number.")
+                return None
+            applies_combo = self.table.cellWidget(row_idx, 2)
+            applies_to = "item"
+            if isinstance(applies_combo, QtWidgets.QComboBox):
+                applies_to_raw = (applies_combo.currentText() or "").strip().lower()
+                applies_to = "fluid" if applies_to_raw == "fluid" else "item"
+            kind_id = None
+            if name_item is not None:
+                kind_id = name_item.data(QtCore.Qt.ItemDataRole.UserRole)
+            rows.append({"id": kind_id, "name": name, "sort_order": sort_order, "applies_to": applies_to})
+        return rows
+
+    def _save(self) -> None:
+        rows = self._validate_rows()
+        if rows is None:
+            return
+
+        current_ids = {int(r["id"]) for r in rows if r["id"] is not None}
+        removed_ids = self._existing_ids - current_ids
+        try:
+            for kind_id in removed_ids:
+                row = self.app.conn.execute(
+                    "SELECT is_builtin FROM item_kinds WHERE id=?",
+                    (int(kind_id),),
+                ).fetchone()
+                if row and int(row["is_builtin"] or 0) == 1:
+                    continue
+                self.app.conn.execute("UPDATE items SET item_kind_id=NULL WHERE item_kind_id=?", (int(kind_id),))
+                self.app.conn.execute("DELETE FROM item_kinds WHERE id=?", (int(kind_id),))
+            for row in rows:
+                if row["id"] is None:
+                    self.app.conn.execute(
+                        "INSERT INTO item_kinds(name, name_canonical, sort_order, is_builtin, applies_to) VALUES(?, ?, ?, 0, ?)",
+                        (row["name"], canonical_name(row["name"]), row["sort_order"], row["applies_to"]),
+                    )
+                else:
+                    self.app.conn.execute(
+                        "UPDATE item_kinds SET name=?, name_canonical=?, sort_order=?, applies_to=? WHERE id=?",
+                        (row["name"], canonical_name(row["name"]), row["sort_order"], row["applies_to"], int(row["id"])),
+                    )
+            self.app.conn.commit()
+        except Exception as exc:
+            self.app.conn.rollback()
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        self.accept()
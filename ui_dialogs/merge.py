@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from PySide6 import QtWidgets
+
+
+
+class ItemMergeConflictDialog(QtWidgets.QDialog):
+    """Resolve ambiguous item matches during DB merge."""
+    def __init__(self, conflicts: list[dict], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Resolve Item Conflicts")
+        self.resize(720, 420)
+        self._conflicts = conflicts
+        self.result: dict[int, int] | None = None
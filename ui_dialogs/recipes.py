@@ -0,0 +1,1516 @@
+from __future__ import annotations
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from services.db import ALL_TIERS
+from services.recipes import save_recipe
+from ui_dialogs._common import TPS, NONE_TIER_LABEL
+from ui_dialogs.item_picker import ItemPickerDialog
+from ui_dialogs.items import AddItemDialog
+
+
+class ItemLineDialog(QtWidgets.QDialog):
+    def __init__(
+        self,
+        app,
+        title: str,
+        *,
+        show_chance: bool = False,
+        show_consumption: bool = False,
+        input_slot_choices: list[int] | None = None,
+        fixed_input_slot: int | None = None,
+        require_input_slot: bool = False,
+        output_slot_choices: list[int] | None = None,
+        fixed_output_slot: int | None = None,
+        require_chance: bool = False,
+        initial_line: dict | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle(title)
+        self.show_chance = show_chance
+        self.show_consumption = show_consumption
+        self.input_slot_choices = input_slot_choices
+        self.fixed_input_slot = fixed_input_slot
+        self.require_input_slot = require_input_slot
+        self.output_slot_choices = output_slot_choices
+        self.fixed_output_slot = fixed_output_slot
+        self.require_chance = require_chance
+        self.result = None
+        self._selected = None
+
+        layout = QtWidgets.QGridLayout(self)
+
+        layout.addWidget(QtWidgets.QLabel("Item"), 0, 0)
+        self.item_label = QtWidgets.QLabel("(none selected)")
+        layout.addWidget(self.item_label, 0, 1)
+        btns_item = QtWidgets.QHBoxLayout()
+        pick_btn = QtWidgets.QPushButton("Pick…")
+        pick_btn.clicked.connect(self.pick_item)
+        new_btn = QtWidgets.QPushButton("New Item…")
+        new_btn.clicked.connect(self.new_item)
+        btns_item.addWidget(pick_btn)
+        btns_item.addWidget(new_btn)
+        layout.addLayout(btns_item, 0, 2)
+
+        layout.addWidget(QtWidgets.QLabel("Kind"), 1, 0)
+        self.kind_label = QtWidgets.QLabel("(select an item)")
+        layout.addWidget(self.kind_label, 1, 1)
+
+        self.qty_label = QtWidgets.QLabel("Quantity")
+        layout.addWidget(self.qty_label, 2, 0)
+        self.qty_edit = QtWidgets.QLineEdit()
+        self.qty_edit.setValidator(QtGui.QIntValidator(1, 10**9))
+        layout.addWidget(self.qty_edit, 2, 1)
+
+        row = 3
+        if self.show_consumption:
+            layout.addWidget(QtWidgets.QLabel("Consumption Chance (%)"), row, 0)
+            self.consumption_edit = QtWidgets.QLineEdit()
+            self.consumption_edit.setValidator(QtGui.QDoubleValidator(0.0, 100.0, 3))
+            layout.addWidget(self.consumption_edit, row, 1)
+            consumption_btns = QtWidgets.QHBoxLayout()
+            consumption_zero = QtWidgets.QPushButton("0%")
+            consumption_zero.clicked.connect(lambda: self.consumption_edit.setText("0"))
+            consumption_full = QtWidgets.QPushButton("100%")
+            consumption_full.clicked.connect(lambda: self.consumption_edit.setText("100"))
+            consumption_btns.addWidget(consumption_zero)
+            consumption_btns.addWidget(consumption_full)
+            consumption_btn_frame = QtWidgets.QWidget()
+            consumption_btn_layout = QtWidgets.QHBoxLayout(consumption_btn_frame)
+            consumption_btn_layout.setContentsMargins(0, 0, 0, 0)
+            consumption_btn_layout.addLayout(consumption_btns)
+            layout.addWidget(consumption_btn_frame, row, 2)
+            row += 1
+        if self.fixed_input_slot is not None or self.input_slot_choices:
+            layout.addWidget(QtWidgets.QLabel("Grid Slot"), row, 0)
+            if self.fixed_input_slot is not None:
+                self.input_slot_label = QtWidgets.QLabel(str(self.fixed_input_slot))
+                layout.addWidget(self.input_slot_label, row, 1)
+            else:
+                values = [str(v) for v in (self.input_slot_choices or [])]
+                self.input_slot_combo = QtWidgets.QComboBox()
+                self.input_slot_combo.addItems(values)
+                if values:
+                    self.input_slot_combo.setCurrentIndex(0)
+                layout.addWidget(self.input_slot_combo, row, 1)
+            row += 1
+        if self.fixed_output_slot is not None or self.output_slot_choices:
+            layout.addWidget(QtWidgets.QLabel("Output Slot"), row, 0)
+            if self.fixed_output_slot is not None:
+                self.output_slot_label = QtWidgets.QLabel(str(self.fixed_output_slot))
+                layout.addWidget(self.output_slot_label, row, 1)
+            else:
+                values = [str(v) for v in (self.output_slot_choices or [])]
+                self.output_slot_combo = QtWidgets.QComboBox()
+                self.output_slot_combo.addItems(values)
+                if values:
+                    self.output_slot_combo.setCurrentIndex(0)
+                layout.addWidget(self.output_slot_combo, row, 1)
+            row += 1
+        if self.show_chance:
+            layout.addWidget(QtWidgets.QLabel("Chance (%)"), row, 0)
+            self.chance_edit = QtWidgets.QLineEdit()
+            self.chance_edit.setValidator(QtGui.QDoubleValidator(0.0, 100.0, 3))
+            layout.addWidget(self.chance_edit, row, 1)
+            chance_note = "Chance is required for extra output slots." if self.require_chance else "Leave blank for 100% (guaranteed)"
+            layout.addWidget(QtWidgets.QLabel(chance_note), row, 2)
+            row += 1
+
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Ok
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.save)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons, row, 0, 1, 3)
+
+        row_count = self.app.conn.execute("SELECT COUNT(*) AS c FROM items").fetchone()
+        if row_count and row_count["c"] == 1:
+            only = self.app.conn.execute(
+                "SELECT id, COALESCE(display_name, key) AS name, kind FROM items LIMIT 1"
+            ).fetchone()
+            if only:
+                self._set_selected({"id": only["id"], "name": only["name"], "kind": only["kind"]})
+
+        if initial_line:
+            row_sel = self.app.conn.execute(
+                "SELECT id, COALESCE(display_name, key) AS name, kind FROM items WHERE id=?",
+                (initial_line.get("item_id"),),
+            ).fetchone()
+            if row_sel:
+                self._set_selected({"id": row_sel["id"], "name": row_sel["name"], "kind": row_sel["kind"]})
+            if initial_line.get("qty_liters") is not None:
+                self.qty_edit.setText(str(self._coerce_whole_number(initial_line["qty_liters"])))
+            elif initial_line.get("qty_count") is not None:
+                self.qty_edit.setText(str(self._coerce_whole_number(initial_line["qty_count"])))
+            if self.show_chance:
+                chance = initial_line.get("chance_percent")
+                if chance is None or abs(float(chance) - 100.0) < 1e-9:
+                    self.chance_edit.setText("")
+                else:
+                    self.chance_edit.setText(str(chance))
+            if self.show_consumption:
+                consumption = initial_line.get("consumption_chance")
+                if consumption is None:
+                    self.consumption_edit.setText("")
+                else:
+                    display_percent = self._fraction_to_percent(consumption)
+                    if isinstance(display_percent, (int, float)):
+                        if abs(display_percent - int(display_percent)) < 1e-9:
+                            self.consumption_edit.setText(str(int(display_percent)))
+                        else:
+                            self.consumption_edit.setText(str(display_percent))
+                    else:
+                        self.consumption_edit.setText(str(display_percent))
+            if (
+                self.fixed_output_slot is None
+                and self.output_slot_choices is not None
+                and initial_line.get("output_slot_index") is not None
+            ):
+                self.output_slot_combo.setCurrentText(str(initial_line["output_slot_index"]))
+            if (
+                self.fixed_input_slot is None
+                and self.input_slot_choices is not None
+                and initial_line.get("input_slot_index") is not None
+            ):
+                self.input_slot_combo.setCurrentText(str(initial_line["input_slot_index"]))
+        self.update_kind_ui()
+
+    @staticmethod
+    def _coerce_whole_number(value):
+        if value is None:
+            return None
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return value
+
+    @staticmethod
+    def _fraction_to_percent(value):
+        if value is None:
+            return None
+        try:
+            v = float(value)
+        except (TypeError, ValueError):
+            return value
+        if 0 <= v <= 1:
+            return v * 100
+        return v
+
+    def _set_selected(self, sel: dict | None) -> None:
+        self._selected = sel
+        if not sel:
+            self.item_label.setText("(none selected)")
+        else:
+            self.item_label.setText(sel["name"])
+        self.update_kind_ui()
+
+    def update_kind_ui(self) -> None:
+        if not self._selected:
+            self.kind_label.setText("(select an item)")
+            self.qty_label.setText("Quantity")
+            return
+        kind = self._selected["kind"]
+        self.kind_label.setText(kind)
+        self.qty_label.setText("Liters (L)" if kind in ("fluid", "gas") else "Count")
+
+    def pick_item(self) -> None:
+        dlg = ItemPickerDialog(self.app, title="Pick Item", parent=self)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted and dlg.result:
+            self._set_selected({"id": dlg.result["id"], "name": dlg.result["name"], "kind": dlg.result["kind"]})
+
+    def new_item(self) -> None:
+        dlg = AddItemDialog(self.app, parent=self)
+        if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            newest = self.app.conn.execute(
+                "SELECT id, COALESCE(display_name, key) AS name, kind "
+                "FROM items ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if newest:
+                self._set_selected({"id": newest["id"], "name": newest["name"], "kind": newest["kind"]})
+
+    def save(self) -> None:
+        it = self._selected
+        if not it:
+            QtWidgets.QMessageBox.warning(self, "Missing item", "Select an item.")
+            return
+        qty_s = (self.qty_edit.text() or "").strip()
+        try:
+            if not qty_s.isdigit():
+                raise ValueError
+            qty = int(qty_s)
+        except ValueError:
+            QtWidgets.QMessageBox.warning(self, "Invalid quantity", "Quantity must be a whole number.")
+            return
+        if qty <= 0:
+            QtWidgets.QMessageBox.warning(self, "Invalid quantity", "Quantity must be > 0.")
+            return
+
+        if it["kind"] in ("fluid", "gas"):
+            self.result = {"item_id": it["id"], "name": it["name"], "kind": it["kind"], "qty_liters": qty, "qty_count": None}
+        else:
+            self.result = {"item_id": it["id"], "name": it["name"], "kind": it["kind"], "qty_liters": None, "qty_count": qty}
+
+        if self.show_consumption:
+            cons_s = (self.consumption_edit.text() or "").strip()
+            if cons_s == "":
+                self.result["consumption_chance"] = 1.0
+            else:
+                try:
+                    consumption = float(cons_s)
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Invalid consumption chance",
+                        "Consumption chance must be a number between 0 and 100.",
+                    )
+                    return
+                if consumption < 0 or consumption > 100:
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Invalid consumption chance",
+                        "Consumption chance must be between 0 and 100.",
+                    )
+                    return
+                self.result["consumption_chance"] = consumption / 100.0
+
+        if self.show_chance:
+            ch_s = (self.chance_edit.text() or "").strip()
+            if ch_s == "":
+                if self.require_chance:
+                    slot_val = None
+                    if self.fixed_output_slot is not None:
+                        slot_val = self.fixed_output_slot
+                    elif getattr(self, "output_slot_combo", None):
+                        try:
+                            slot_val = int(self.output_slot_combo.currentText())
+                        except Exception:
+                            slot_val = None
+                    if slot_val is not None and slot_val <= 0:
+                        chance = 100.0
+                        self.result["chance_percent"] = chance
+                    else:
+                        QtWidgets.QMessageBox.warning(self, "Invalid chance", "Chance is required for extra output slots.")
+                        return
+                else:
+                    self.result["chance_percent"] = 100.0
+            else:
+                try:
+                    chance = float(ch_s)
+                except ValueError:
+                    QtWidgets.QMessageBox.warning(self, "Invalid chance", "Chance must be a number between 0 and 100.")
+                    return
+                if chance <= 0 or chance > 100:
+                    QtWidgets.QMessageBox.warning(self, "Invalid chance", "Chance must be > 0 and <= 100.")
+                    return
+                self.result["chance_percent"] = chance
+
+        if self.fixed_input_slot is not None or self.input_slot_choices:
+            try:
+                if self.fixed_input_slot is not None:
+                    slot_val = self.fixed_input_slot
+                else:
+                    slot_val = int(self.input_slot_combo.currentText())
+                self.result["input_slot_index"] = slot_val
+            except Exception:
+                QtWidgets.QMessageBox.warning(self, "Invalid grid slot", "Select a valid grid slot.")
+                return
+            if self.require_input_slot and self.result.get("input_slot_index") is None:
+                QtWidgets.QMessageBox.warning(self, "Missing grid slot", "Select a grid slot.")
+                return
+
+        if self.fixed_output_slot is not None or self.output_slot_choices:
+            try:
+                if self.fixed_output_slot is not None:
+                    slot_val = self.fixed_output_slot
+                else:
+                    slot_val = int(self.output_slot_combo.currentText())
+                self.result["output_slot_index"] = slot_val
+            except Exception:
+                QtWidgets.QMessageBox.warning(self, "Invalid output slot", "Select a valid output slot.")
+                return
+
+        self.accept()
+
+
+class _RecipeDialogBase(QtWidgets.QDialog):
+    def __init__(self, app, title: str, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle(title)
+        self.resize(850, 520)
+        self.inputs: list[dict] = []
+        self.outputs: list[dict] = []
+        self.name_item_id: int | None = None
+        self.duplicate_of_recipe_id: int | None = None
+        self._station_grid_lock = False
+
+        layout = QtWidgets.QVBoxLayout(self)
+        form = QtWidgets.QGridLayout()
+        layout.addLayout(form)
+
+        form.addWidget(QtWidgets.QLabel("Name"), 0, 0)
+        self.name_edit = QtWidgets.QLineEdit()
+        self.name_edit.setReadOnly(True)
+        self.name_edit.setPlaceholderText("Use 'Pick' button...")
+
+        name_btns = QtWidgets.QHBoxLayout()
+        name_pick = QtWidgets.QPushButton("Pick…")
+        name_pick.clicked.connect(self.pick_name)
+        name_clear = QtWidgets.QPushButton("Clear")
+        name_clear.clicked.connect(self.clear_name)
+        name_btns.addWidget(name_pick)
+        name_btns.addWidget(name_clear)
+
+        name_frame = QtWidgets.QWidget()
+        name_layout = QtWidgets.QHBoxLayout(name_frame)
+        name_layout.setContentsMargins(0, 0, 0, 0)
+        name_layout.addWidget(self.name_edit)
+        name_layout.addLayout(name_btns)
+        form.addWidget(name_frame, 0, 1)
+
+        form.addWidget(QtWidgets.QLabel("Method"), 0, 2)
+        self.method_combo = QtWidgets.QComboBox()
+        self.method_combo.addItems(["Machine", "Crafting"])
+        form.addWidget(self.method_combo, 0, 3)
+
+        self.variant_label = QtWidgets.QLabel("Variant")
+        self.variant_combo = QtWidgets.QComboBox()
+        self.variant_label.setVisible(False)
+        self.variant_combo.setVisible(False)
+        form.addWidget(self.variant_label, 1, 0)
+        form.addWidget(self.variant_combo, 1, 1, 1, 3)
+
+        self.machine_label = QtWidgets.QLabel("Machine")
+        self.grid_label = QtWidgets.QLabel("Grid")
+        self.method_label_stack = QtWidgets.QStackedWidget()
+        self.method_label_stack.addWidget(self.machine_label)
+        self.method_label_stack.addWidget(self.grid_label)
+        form.addWidget(self.method_label_stack, 2, 0)
+
+        self.machine_edit = QtWidgets.QLineEdit()
+        self.machine_edit.setReadOnly(True)
+        self.machine_edit.setPlaceholderText("Use 'Pick' button...")
+        self.machine_item_id = None
+        machine_btns = QtWidgets.QHBoxLayout()
+        machine_pick = QtWidgets.QPushButton("Pick…")
+        machine_pick.clicked.connect(self.pick_machine)
+        machine_clear = QtWidgets.QPushButton("Clear")
+        machine_clear.clicked.connect(self.clear_machine)
+        machine_btns.addWidget(machine_pick)
+        machine_btns.addWidget(machine_clear)
+        machine_frame = QtWidgets.QWidget()
+        machine_layout = QtWidgets.QHBoxLayout(machine_frame)
+        machine_layout.setContentsMargins(0, 0, 0, 0)
+        machine_layout.addWidget(self.machine_edit)
+        machine_layout.addLayout(machine_btns)
+
+        self.grid_combo = QtWidgets.QComboBox()
+        self.grid_combo.addItems(self._get_available_grid_sizes())
+        grid_frame = QtWidgets.QWidget()
+        grid_layout = QtWidgets.QVBoxLayout(grid_frame)
+        grid_layout.setContentsMargins(0, 0, 0, 0)
+        grid_select_row = QtWidgets.QHBoxLayout()
+        grid_select_row.addWidget(self.grid_combo)
+        grid_select_row.addStretch(1)
+        grid_layout.addLayout(grid_select_row)
+        self.grid_preview = QtWidgets.QWidget()
+        self.grid_preview_layout = QtWidgets.QGridLayout(self.grid_preview)
+        self.grid_preview_layout.setContentsMargins(0, 0, 0, 0)
+        self.grid_preview_layout.setSpacing(4)
+        grid_layout.addWidget(self.grid_preview)
+        self.grid_note_label = QtWidgets.QLabel("Grid slots are numbered left → right, top → bottom.")
+        self.grid_note_label.setStyleSheet("color: #888;")
+        grid_layout.addWidget(self.grid_note_label)
+
+        self.method_field_stack = QtWidgets.QStackedWidget()
+        self.method_field_stack.addWidget(machine_frame)
+        self.method_field_stack.addWidget(grid_frame)
+        form.addWidget(self.method_field_stack, 2, 1)
+
+        self.tier_label = QtWidgets.QLabel("Tier")
+        form.addWidget(self.tier_label, 2, 2)
+        self.tier_combo = QtWidgets.QComboBox()
+        enabled_tiers = self.app.get_enabled_tiers() if hasattr(self.app, "get_enabled_tiers") else ALL_TIERS
+        self.tier_combo.addItems([NONE_TIER_LABEL] + list(enabled_tiers))
+        form.addWidget(self.tier_combo, 2, 3)
+
+        self.max_tier_label = QtWidgets.QLabel("Max Tier")
+        form.addWidget(self.max_tier_label, 3, 2)
+        self.max_tier_combo = QtWidgets.QComboBox()
+        self.max_tier_combo.addItems([NONE_TIER_LABEL] + list(enabled_tiers))
+        form.addWidget(self.max_tier_combo, 3, 3)
+
+        self.circuit_label = QtWidgets.QLabel("Circuit")
+        form.addWidget(self.circuit_label, 3, 0)
+        self.circuit_edit = QtWidgets.QLineEdit()
+        self.circuit_edit.setValidator(QtGui.QIntValidator(0, 10**9))
+        form.addWidget(self.circuit_edit, 3, 1)
+
+        self.perfect_overclock_check = QtWidgets.QCheckBox("Perfect overclock (4x speed / 4x EU)")
+        self.perfect_overclock_check.setChecked(False)
+        form.addWidget(self.perfect_overclock_check, 5, 2, 1, 2)
+
+        self.station_label = QtWidgets.QLabel("Station")
+        self.station_edit = QtWidgets.QLineEdit()
+        self.station_edit.setReadOnly(True)
+        self.station_item_id = None
+        station_btns = QtWidgets.QHBoxLayout()
+        station_pick = QtWidgets.QPushButton("Pick…")
+        station_pick.clicked.connect(self.pick_station)
+        station_clear = QtWidgets.QPushButton("Clear")
+        station_clear.clicked.connect(self.clear_station)
+        station_btns.addWidget(station_pick)
+        station_btns.addWidget(station_clear)
+        self.station_frame = QtWidgets.QWidget()
+        station_layout = QtWidgets.QHBoxLayout(self.station_frame)
+        station_layout.setContentsMargins(0, 0, 0, 0)
+        station_layout.addWidget(self.station_edit)
+        station_layout.addLayout(station_btns)
+        form.addWidget(self.station_label, 3, 2)
+        form.addWidget(self.station_frame, 3, 3)
+
+        self.duration_label = QtWidgets.QLabel("Duration (seconds)")
+        form.addWidget(self.duration_label, 4, 0)
+        self.duration_edit = QtWidgets.QLineEdit()
+        self.duration_edit.setValidator(QtGui.QDoubleValidator(0.0, 10**9, 3))
+        form.addWidget(self.duration_edit, 4, 1)
+
+        self.eut_label = QtWidgets.QLabel("EU/t")
+        form.addWidget(self.eut_label, 4, 2)
+        self.eut_edit = QtWidgets.QLineEdit()
+        self.eut_edit.setValidator(QtGui.QIntValidator(0, 10**9))
+        form.addWidget(self.eut_edit, 4, 3)
+
+        self.additional_notes_check = QtWidgets.QCheckBox("Additional Notes")
+        self.additional_notes_check.setChecked(False)
+        form.addWidget(self.additional_notes_check, 5, 0, 1, 2)
+
+        splitter = QtWidgets.QSplitter(QtCore.Qt.Orientation.Vertical)
+        layout.addWidget(splitter, stretch=1)
+
+        self.notes_widget = QtWidgets.QWidget()
+        notes_layout = QtWidgets.QVBoxLayout(self.notes_widget)
+        notes_layout.setContentsMargins(0, 0, 0, 0)
+        notes_layout.addWidget(QtWidgets.QLabel("Notes"))
+        self.notes_edit = QtWidgets.QTextEdit()
+        notes_layout.addWidget(self.notes_edit)
+        splitter.addWidget(self.notes_widget)
+        self.notes_widget.setVisible(False)
+
+        lists_widget = QtWidgets.QWidget()
+        lists_layout = QtWidgets.QHBoxLayout(lists_widget)
+        lists_layout.setContentsMargins(0, 0, 0, 0)
+
+        in_col = QtWidgets.QVBoxLayout()
+        lists_layout.addLayout(in_col)
+        in_col.addWidget(QtWidgets.QLabel("Inputs"))
+        self.in_list = QtWidgets.QListWidget()
+        in_col.addWidget(self.in_list, stretch=1)
+        in_btns = QtWidgets.QHBoxLayout()
+        self.btn_add_input = QtWidgets.QPushButton("Add Input")
+        self.btn_add_input.clicked.connect(self.add_input)
+        in_btns.addWidget(self.btn_add_input)
+        in_col.addLayout(in_btns)
+        self.in_btns_layout = in_btns
+
+        out_col = QtWidgets.QVBoxLayout()
+        lists_layout.addLayout(out_col)
+        out_col.addWidget(QtWidgets.QLabel("Outputs"))
+        self.out_list = QtWidgets.QListWidget()
+        out_col.addWidget(self.out_list, stretch=1)
+        out_btns = QtWidgets.QHBoxLayout()
+        self.btn_add_output = QtWidgets.QPushButton("Add Output")
+        self.btn_add_output.clicked.connect(self.add_output)
+        out_btns.addWidget(self.btn_add_output)
+        out_col.addLayout(out_btns)
+        self.out_btns_layout = out_btns
+
+        splitter.addWidget(lists_widget)
+        splitter.setStretchFactor(0, 0)
+        splitter.setStretchFactor(1, 1)
+
+        bottom = QtWidgets.QHBoxLayout()
+        bottom.addWidget(QtWidgets.QLabel("Tip: Close window or Cancel to discard. No partial saves."))
+        bottom.addStretch(1)
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save
+            | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        self.button_box = buttons
+        buttons.accepted.connect(self.save)
+        buttons.rejected.connect(self.reject)
+        bottom.addWidget(buttons)
+        layout.addLayout(bottom)
+
+        self.method_combo.currentTextChanged.connect(self._toggle_method_fields)
+        self.grid_combo.currentTextChanged.connect(self._refresh_crafting_grid)
+        self.additional_notes_check.toggled.connect(self._toggle_notes_editor)
+        self._toggle_method_fields()
+
+    def _set_variant_visible(self, visible: bool) -> None:
+        self.variant_label.setVisible(visible)
+        self.variant_combo.setVisible(visible)
+
+    def _toggle_notes_editor(self, checked: bool) -> None:
+        self.notes_widget.setVisible(checked)
+        if not checked:
+            self.notes_edit.clear()
+
+    def _toggle_method_fields(self) -> None:
+        method = (self.method_combo.currentText() or "Machine").strip().lower()
+        is_crafting = method == "crafting"
+
+        self.method_label_stack.setCurrentIndex(1 if is_crafting else 0)
+        self.method_field_stack.setCurrentIndex(1 if is_crafting else 0)
+
+        self.station_label.setVisible(is_crafting)
+        self.station_frame.setVisible(is_crafting)
+        self.max_tier_label.setVisible(not is_crafting)
+        self.max_tier_combo.setVisible(not is_crafting)
+        self.perfect_overclock_check.setVisible(not is_crafting)
+        if is_crafting:
+            self._apply_station_grid_size()
+            self._refresh_crafting_grid()
+        else:
+            self.grid_combo.setEnabled(True)
+
+    def _get_available_grid_sizes(self) -> list[str]:
+        if hasattr(self.app, "get_crafting_grids"):
+            grid_values = list(self.app.get_crafting_grids())
+        else:
+            grid_values = ["2x2", "3x3"]
+        grid_values = [g for g in grid_values if g]
+        if "2x2" not in grid_values:
+            grid_values.insert(0, "2x2")
+        if hasattr(self.app, "is_crafting_6x6_unlocked"):
+            if self.app.is_crafting_6x6_unlocked():
+                if "6x6" not in grid_values:
+                    grid_values.append("6x6")
+            else:
+                grid_values = [g for g in grid_values if g.strip().lower() != "6x6"]
+        return grid_values
+
+    @staticmethod
+    def _parse_grid_size(value: str) -> tuple[int, int] | None:
+        raw = (value or "").strip().lower().replace("×", "x")
+        if "x" not in raw:
+            return None
+        parts = [p.strip() for p in raw.split("x", 1)]
+        if len(parts) != 2:
+            return None
+        if not parts[0].isdigit() or not parts[1].isdigit():
+            return None
+        rows = int(parts[0])
+        cols = int(parts[1])
+        if rows <= 0 or cols <= 0:
+            return None
+        return rows, cols
+
+    def _refresh_crafting_grid(self) -> None:
+        if self._station_grid_lock:
+            return
+        while self.grid_preview_layout.count():
+            item = self.grid_preview_layout.takeAt(0)
+            widget = item.widget()
+            if widget is not None:
+                widget.deleteLater()
+
+        dims = self._parse_grid_size(self.grid_combo.currentText())
+        if not dims:
+            return
+        rows, cols = dims
+        slot = 1
+        for r in range(rows):
+            for c in range(cols):
+                label = QtWidgets.QLabel(str(slot))
+                label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+                label.setMinimumSize(26, 26)
+                label.setStyleSheet("border: 1px solid #3a3c40; border-radius: 3px;")
+                self.grid_preview_layout.addWidget(label, r, c)
+                slot += 1
+
+    def _fetch_crafting_grid_size(self, item_id: int) -> str | None:
+        row = self.app.conn.execute(
+            "SELECT crafting_grid_size FROM items WHERE id=?",
+            (item_id,),
+        ).fetchone()
+        if not row:
+            return None
+        return (row["crafting_grid_size"] or "").strip() or None
+
+    def _apply_station_grid_size(self) -> None:
+        if self.station_item_id is None:
+            self.grid_combo.setEnabled(True)
+            return
+        grid_size = self._fetch_crafting_grid_size(self.station_item_id)
+        if not grid_size:
+            self.grid_combo.setEnabled(True)
+            return
+        if self.grid_combo.findText(grid_size) == -1:
+            self.grid_combo.addItem(grid_size)
+        self._station_grid_lock = True
+        try:
+            self.grid_combo.setCurrentText(grid_size)
+        finally:
+            self._station_grid_lock = False
+        self.grid_combo.setEnabled(False)
+        self._refresh_crafting_grid()
+
+    def pick_machine(self) -> None:
+        d = ItemPickerDialog(self.app, title="Pick Machine", machines_only=True, parent=self)
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            self.machine_item_id = d.result["id"]
+            self.machine_edit.setText(d.result["name"])
+            row = self.app.conn.execute(
+                "SELECT machine_tier FROM items WHERE id=?",
+                (self.machine_item_id,),
+            ).fetchone()
+            if row:
+                machine_tier = (row["machine_tier"] or "").strip()
+                if machine_tier:
+                    if self.tier_combo.findText(machine_tier) == -1:
+                        self.tier_combo.addItem(machine_tier)
+                    self.tier_combo.setCurrentText(machine_tier)
+
+    def clear_machine(self) -> None:
+        self.machine_item_id = None
+        self.machine_edit.setText("")
+
+    def pick_station(self) -> None:
+        d = ItemPickerDialog(self.app, title="Pick Station", crafting_grids_only=True, parent=self)
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            self.station_item_id = d.result["id"]
+            self.station_edit.setText(d.result["name"])
+            self._apply_station_grid_size()
+
+    def pick_name(self) -> None:
+        d = ItemPickerDialog(self.app, title="Pick Recipe Item", parent=self)
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            self.name_item_id = d.result["id"]
+            self.name_edit.setText(d.result["name"])
+
+    def clear_name(self) -> None:
+        self.name_item_id = None
+        self.name_edit.setText("")
+
+    def clear_station(self) -> None:
+        self.station_item_id = None
+        self.station_edit.setText("")
+        self.grid_combo.setEnabled(True)
+
+    def _resolve_name_item_id(self, *, warn: bool = True) -> int | None:
+        # If we have a specific item ID from the picker (or loaded from DB), use it.
+        if self.name_item_id is not None:
+            return self.name_item_id
+
+        # Fallback logic (legacy or if ID was somehow cleared but text remains)
+        name = (self.name_edit.text() or "").strip()
+        if not name:
+            if warn:
+                QtWidgets.QMessageBox.warning(self, "Missing name", "Recipe name is required.")
+            return None
+        rows = self.app.conn.execute(
+            "SELECT id FROM items WHERE COALESCE(display_name, key)=?",
+            (name,),
+        ).fetchall()
+        if not rows:
+            if warn:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Unknown item",
+                    "Pick a recipe name from the items list so it matches an item.",
+                )
+            return None
+        if len(rows) > 1:
+            if warn:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Ambiguous name",
+                    "Multiple items share that name. Please pick the item from the list.",
+                )
+            return None
+        return int(rows[0]["id"])
+
+    def _validate_name_output(self, item_id: int) -> bool:
+        if not any(line.get("item_id") == item_id for line in self.outputs):
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Missing output",
+                "The recipe outputs must include the selected item name.",
+            )
+            return False
+        return True
+
+    def _fmt_line(self, line: dict, *, is_output: bool = False) -> str:
+        chance = line.get("chance_percent")
+        chance_txt = ""
+        if chance is not None:
+            try:
+                c = float(chance)
+            except Exception:
+                c = None
+            if c is not None and c < 99.999:
+                if abs(c - int(c)) < 1e-9:
+                    chance_txt = f" ({int(c)}%)"
+                else:
+                    chance_txt = f" ({c}%)"
+        slot_txt = ""
+        if is_output:
+            slot_idx = line.get("output_slot_index")
+            if slot_idx is not None:
+                slot_txt = f" (Slot {slot_idx})"
+        else:
+            slot_idx = line.get("input_slot_index")
+            if slot_idx is not None:
+                slot_txt = f" (Slot {slot_idx})"
+        if line["kind"] in ("fluid", "gas"):
+            qty = self._coerce_whole_number(line["qty_liters"])
+            return f"{line['name']} × {qty} L{slot_txt}{chance_txt}"
+        qty = self._coerce_whole_number(line["qty_count"])
+        return f"{line['name']} × {qty}{slot_txt}{chance_txt}"
+
+    @staticmethod
+    def _coerce_whole_number(value):
+        if value is None:
+            return None
+        try:
+            return int(float(value))
+        except (TypeError, ValueError):
+            return value
+
+    def _get_machine_output_slots(self) -> int | None:
+        if self.machine_item_id is None:
+            return None
+        row = self.app.conn.execute(
+            "SELECT machine_type, machine_tier FROM items WHERE id=?",
+            (self.machine_item_id,),
+        ).fetchone()
+        if not row:
+            return None
+        tier_raw = (self.tier_combo.currentText() or "").strip()
+        tier = None if tier_raw in ("", NONE_TIER_LABEL) else tier_raw
+        if tier is None:
+            tier = (row["machine_tier"] or "").strip() or None
+        if tier:
+            machine_type = (row["machine_type"] or "").strip()
+            if machine_type:
+                meta = self.app.conn.execute(
+                    """
+                    SELECT output_slots
+                    FROM machine_metadata
+                    WHERE LOWER(machine_type)=LOWER(?) AND tier=?
+                    """,
+                    (machine_type, tier),
+                ).fetchone()
+                if meta:
+                    try:
+                        slots = int(meta["output_slots"] or 1)
+                    except Exception:
+                        slots = 1
+                    return slots if slots > 0 else 1
+        return 1
+
+    def _get_machine_tank_limits(self) -> tuple[int | None, int | None]:
+        if self.machine_item_id is None:
+            return None, None
+        row = self.app.conn.execute(
+            "SELECT machine_type, machine_tier FROM items WHERE id=?",
+            (self.machine_item_id,),
+        ).fetchone()
+        if not row:
+            return None, None
+        tier_raw = (self.tier_combo.currentText() or "").strip()
+        tier = None if tier_raw in ("", NONE_TIER_LABEL) else tier_raw
+        if tier is None:
+            tier = (row["machine_tier"] or "").strip() or None
+        if tier:
+            machine_type = (row["machine_type"] or "").strip()
+            if machine_type:
+                meta = self.app.conn.execute(
+                    """
+                    SELECT input_tanks, output_tanks
+                    FROM machine_metadata
+                    WHERE LOWER(machine_type)=LOWER(?) AND tier=?
+                    """,
+                    (machine_type, tier),
+                ).fetchone()
+                if meta:
+                    in_tanks = int(meta["input_tanks"] or 0)
+                    out_tanks = int(meta["output_tanks"] or 0)
+                    return (in_tanks if in_tanks > 0 else None, out_tanks if out_tanks > 0 else None)
+        return None, None
+
+    def _parse_int_opt(self, s: str):
+        s = (s or "").strip()
+        if s == "":
+            return None
+        if not s.isdigit():
+            raise ValueError("Must be an integer.")
+        return int(s)
+
+    def _parse_float_opt(self, s: str) -> float | None:
+        s = (s or "").strip()
+        if s == "":
+            return None
+        try:
+            v = float(s)
+        except ValueError as exc:
+            raise ValueError("Must be a number.") from exc
+        if v < 0:
+            raise ValueError("Must be zero or greater.")
+        return v
+
+    def _get_overclock_values(self) -> tuple[str | None, int]:
+        max_tier_raw = (self.max_tier_combo.currentText() or "").strip()
+        max_tier = None if (max_tier_raw == "" or max_tier_raw == NONE_TIER_LABEL) else max_tier_raw
+        is_perfect_overclock = 1 if self.perfect_overclock_check.isChecked() else 0
+        return max_tier, is_perfect_overclock
+
+    def _save_recipe(self, recipe: dict, *, recipe_id: int | None = None, name_item_id: int | None = None) -> int:
+        return save_recipe(
+            self.app.conn,
+            recipe,
+            self.inputs,
+            self.outputs,
+            recipe_id=recipe_id,
+            name_item_id=name_item_id,
+        )
+
+    def save(self) -> None:
+        raise NotImplementedError
+
+    # --- Shared List Management Methods (Moved from EditRecipeDialog) ---
+
+    def add_input(self) -> None:
+        dialog_kwargs = self._get_input_dialog_kwargs()
+        if dialog_kwargs is None:
+            return
+        d = ItemLineDialog(self.app, "Add Input", parent=self, **dialog_kwargs)
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            if d.result.get("kind") in ("fluid", "gas") and not self._check_tank_limit(direction="in"):
+                return
+            self.inputs.append(d.result)
+            self.in_list.addItem(self._fmt_line(d.result))
+
+    def add_output(self) -> None:
+        dialog_kwargs = self._get_output_dialog_kwargs()
+        d = ItemLineDialog(self.app, "Add Output", parent=self, **dialog_kwargs)
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            if d.result.get("kind") in ("fluid", "gas") and not self._check_tank_limit(direction="out"):
+                return
+            self.outputs.append(d.result)
+            self.out_list.addItem(self._fmt_line(d.result, is_output=True))
+
+    def edit_selected(self, list_widget: QtWidgets.QListWidget, backing_list: list, *, is_output: bool = False) -> None:
+        idx = list_widget.currentRow()
+        if idx < 0:
+            return
+        line = backing_list[idx]
+        dialog_kwargs = {}
+        if is_output:
+            dialog_kwargs = self._get_output_dialog_kwargs(current_slot=line.get("output_slot_index"))
+        else:
+            dialog_kwargs = self._get_input_dialog_kwargs(current_slot=line.get("input_slot_index"))
+        if dialog_kwargs is None:
+            return
+        d = ItemLineDialog(
+            self.app,
+            "Edit Output" if is_output else "Edit Input",
+            initial_line=line,
+            parent=self,
+            **dialog_kwargs,
+        )
+        if d.exec() == QtWidgets.QDialog.DialogCode.Accepted and d.result:
+            if d.result.get("kind") in ("fluid", "gas"):
+                if is_output and not self._check_tank_limit(direction="out", exclude_idx=idx):
+                    return
+                if not is_output and not self._check_tank_limit(direction="in", exclude_idx=idx):
+                    return
+            new_line = d.result
+            new_line["id"] = line.get("id")
+            backing_list[idx] = new_line
+            list_widget.item(idx).setText(self._fmt_line(new_line, is_output=is_output))
+
+    def remove_selected(self, list_widget: QtWidgets.QListWidget, backing_list: list) -> None:
+        idx = list_widget.currentRow()
+        if idx < 0:
+            return
+        backing_list.pop(idx)
+        list_widget.takeItem(idx)
+
+    @staticmethod
+    def _count_fluid_lines(lines: list[dict], *, exclude_idx: int | None = None) -> int:
+        count = 0
+        for idx, line in enumerate(lines):
+            if exclude_idx is not None and idx == exclude_idx:
+                continue
+            if line.get("kind") in ("fluid", "gas"):
+                count += 1
+        return count
+
+    def _check_tank_limit(self, *, direction: str, exclude_idx: int | None = None) -> bool:
+        in_tanks, out_tanks = self._get_machine_tank_limits()
+        limit = in_tanks if direction == "in" else out_tanks
+        if limit is None:
+            return True
+        lines = self.inputs if direction == "in" else self.outputs
+        if self._count_fluid_lines(lines, exclude_idx=exclude_idx) >= limit:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "No tank available",
+                f"This machine only has {limit} fluid {direction} tank(s).",
+            )
+            return False
+        return True
+
+    def _get_used_output_slots(self, *, exclude_slot: int | None = None) -> set[int]:
+        used = set()
+        for line in self.outputs:
+            slot_idx = line.get("output_slot_index")
+            if slot_idx is not None:
+                slot_val = int(slot_idx)
+                if exclude_slot is not None and slot_val == exclude_slot:
+                    continue
+                used.add(slot_val)
+        return used
+
+    def _get_used_input_slots(self, *, exclude_slot: int | None = None) -> set[int]:
+        used = set()
+        for line in self.inputs:
+            slot_idx = line.get("input_slot_index")
+            if slot_idx is not None:
+                slot_val = int(slot_idx)
+                if exclude_slot is not None and slot_val == exclude_slot:
+                    continue
+                used.add(slot_val)
+        return used
+
+    def _get_crafting_grid_slots(self) -> list[int]:
+        dims = self._parse_grid_size(self.grid_combo.currentText())
+        if not dims:
+            return []
+        rows, cols = dims
+        return list(range(1, rows * cols + 1))
+
+    def _get_input_dialog_kwargs(self, *, current_slot: int | None = None) -> dict | None:
+        method = (self.method_combo.currentText() or "Machine").strip().lower()
+        dialog_kwargs = {"show_consumption": True}
+        if method != "crafting":
+            return dialog_kwargs
+        slots = self._get_crafting_grid_slots()
+        if not slots:
+            QtWidgets.QMessageBox.warning(self, "Invalid grid", "Select a valid crafting grid size first.")
+            return None
+        used_slots = self._get_used_input_slots(exclude_slot=current_slot)
+        available = [slot for slot in slots if slot not in used_slots]
+        if current_slot is not None and current_slot not in available:
+            available.append(current_slot)
+        available.sort()
+        dialog_kwargs.update(
+            {
+                "input_slot_choices": available,
+                "require_input_slot": True,
+            }
+        )
+        return dialog_kwargs
+
+    def _validate_crafting_inputs(self, grid_size: str) -> bool:
+        dims = self._parse_grid_size(grid_size)
+        if not dims:
+            QtWidgets.QMessageBox.warning(self, "Invalid grid", "Select a valid crafting grid size.")
+            return False
+        rows, cols = dims
+        max_slot = rows * cols
+        seen = set()
+        for line in self.inputs:
+            slot = line.get("input_slot_index")
+            if slot is None:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Missing grid slot",
+                    "Each crafting input must be assigned to a grid slot.",
+                )
+                return False
+            if slot < 1 or slot > max_slot:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Invalid grid slot",
+                    f"Slot {slot} is outside the {grid_size} grid.",
+                )
+                return False
+            if slot in seen:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Duplicate grid slot",
+                    f"Slot {slot} is already used by another input.",
+                )
+                return False
+            seen.add(slot)
+        return True
+
+    def _get_output_dialog_kwargs(self, *, current_slot: int | None = None) -> dict:
+        method = (self.method_combo.currentText() or "Machine").strip().lower()
+        if method == "machine" and self.machine_item_id is not None:
+            mos = self._get_machine_output_slots() or 1
+            if mos <= 1:
+                if current_slot is not None and current_slot != 0:
+                    return {"show_chance": True, "output_slot_choices": [current_slot], "require_chance": True}
+                return {"show_chance": True, "fixed_output_slot": 0}
+            used_slots = self._get_used_output_slots(exclude_slot=current_slot)
+            slots = [i for i in range(0, mos) if i not in used_slots]
+            if current_slot is not None and current_slot not in slots:
+                slots.append(current_slot)
+            slots.sort()
+            return {"show_chance": True, "output_slot_choices": slots, "require_chance": True}
+        return {"show_chance": True}
+
+
+class AddRecipeDialog(_RecipeDialogBase):
+    def __init__(self, app, parent=None):
+        super().__init__(app, "Add Recipe", parent=parent)
+
+        # Add Edit/Remove buttons which are not in base layout
+        self.btn_edit_input = QtWidgets.QPushButton("Edit")
+        self.btn_edit_input.clicked.connect(lambda: self.edit_selected(self.in_list, self.inputs))
+        self.btn_remove_input = QtWidgets.QPushButton("Remove")
+        self.btn_remove_input.clicked.connect(lambda: self.remove_selected(self.in_list, self.inputs))
+        self.in_btns_layout.addWidget(self.btn_edit_input)
+        self.in_btns_layout.addWidget(self.btn_remove_input)
+
+        self.btn_edit_output = QtWidgets.QPushButton("Edit")
+        self.btn_edit_output.clicked.connect(lambda: self.edit_selected(self.out_list, self.outputs, is_output=True))
+        self.btn_remove_output = QtWidgets.QPushButton("Remove")
+        self.btn_remove_output.clicked.connect(lambda: self.remove_selected(self.out_list, self.outputs))
+        self.out_btns_layout.addWidget(self.btn_edit_output)
+        self.out_btns_layout.addWidget(self.btn_remove_output)
+
+    def save(self) -> None:
+        name = self.name_edit.text().strip()
+        name_item_id = self._resolve_name_item_id()
+        if name_item_id is None:
+            return
+        self.name_item_id = name_item_id
+        if not self._validate_name_output(name_item_id):
+            return
+
+        method = (self.method_combo.currentText() or "Machine").strip().lower()
+        if method == "crafting":
+            method_db = "crafting"
+            machine = None
+            self.machine_item_id = None
+            machine_item_id = None
+            station_item_id = self.station_item_id
+            if station_item_id is None:
+                grid_size = (self.grid_combo.currentText() or "2x2").strip()
+                if grid_size != "2x2":
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Missing crafting grid",
+                        "Only the built-in 2x2 grid can be used without a Crafting Grid item.",
+                    )
+                    return
+            else:
+                grid_size = self._fetch_crafting_grid_size(station_item_id)
+                if not grid_size:
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Missing grid size",
+                        "Selected crafting grid item does not have a grid size.",
+                    )
+                    return
+                if self.grid_combo.currentText().strip() != grid_size:
+                    self.grid_combo.setCurrentText(grid_size)
+            if not self._validate_crafting_inputs(grid_size):
+                return
+        else:
+            method_db = "machine"
+            machine = self.machine_edit.text().strip() or None
+            machine_item_id = None if machine is None else self.machine_item_id
+            grid_size = None
+            station_item_id = None
+            for line in self.inputs:
+                line["input_slot_index"] = None
+        tier_raw = (self.tier_combo.currentText() or "").strip()
+        tier = None if (tier_raw == "" or tier_raw == NONE_TIER_LABEL) else tier_raw
+        max_tier, is_perfect_overclock = self._get_overclock_values()
+        if method_db == "crafting":
+            max_tier = None
+            is_perfect_overclock = 0
+        notes = self.notes_edit.toPlainText().strip() or None
+        if not self.additional_notes_check.isChecked():
+            notes = None
+
+        try:
+            circuit = self._parse_int_opt(self.circuit_edit.text())
+            duration_s = self._parse_float_opt(self.duration_edit.text())
+            eut = self._parse_int_opt(self.eut_edit.text())
+        except ValueError as exc:
+            QtWidgets.QMessageBox.warning(self, "Invalid number", str(exc))
+            return
+
+        duration_ticks = None if duration_s is None else int(round(duration_s * TPS))
+
+        if not self.inputs and not self.outputs:
+            ok = QtWidgets.QMessageBox.question(self, "No lines?", "No inputs/outputs added. Save anyway?")
+            if ok != QtWidgets.QMessageBox.StandardButton.Yes:
+                return
+
+        recipe = {
+            "name": name,
+            "method": method_db,
+            "machine": machine,
+            "machine_item_id": machine_item_id,
+            "grid_size": grid_size,
+            "station_item_id": station_item_id,
+            "circuit": circuit,
+            "tier": tier,
+            "duration_ticks": duration_ticks,
+            "eu_per_tick": eut,
+            "notes": notes,
+            "max_tier": max_tier,
+            "is_perfect_overclock": is_perfect_overclock,
+        }
+        try:
+            recipe_id = self._save_recipe(recipe, name_item_id=name_item_id)
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+        self.app.recipe_focus_id = int(recipe_id)
+
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        if hasattr(self.app, "refresh_recipes"):
+            self.app.refresh_recipes()
+        self.accept()
+
+
+class EditRecipeDialog(_RecipeDialogBase):
+    def __init__(self, app, recipe_id: int, parent=None):
+        self.recipe_id = recipe_id
+        self._variant_change_block = False
+        super().__init__(app, "Edit Recipe", parent=parent)
+        self._set_variant_visible(False)
+        self.variant_combo.currentIndexChanged.connect(self._on_variant_change)
+        self._load_recipe(recipe_id)
+
+        self.btn_edit_input = QtWidgets.QPushButton("Edit")
+        self.btn_edit_input.clicked.connect(lambda: self.edit_selected(self.in_list, self.inputs))
+        self.btn_remove_input = QtWidgets.QPushButton("Remove")
+        self.btn_remove_input.clicked.connect(lambda: self.remove_selected(self.in_list, self.inputs))
+        self.in_btns_layout.addWidget(self.btn_edit_input)
+        self.in_btns_layout.addWidget(self.btn_remove_input)
+
+        self.btn_edit_output = QtWidgets.QPushButton("Edit")
+        self.btn_edit_output.clicked.connect(lambda: self.edit_selected(self.out_list, self.outputs, is_output=True))
+        self.btn_remove_output = QtWidgets.QPushButton("Remove")
+        self.btn_remove_output.clicked.connect(lambda: self.remove_selected(self.out_list, self.outputs))
+        self.out_btns_layout.addWidget(self.btn_edit_output)
+        self.out_btns_layout.addWidget(self.btn_remove_output)
+
+        self._update_variant_read_only_state()
+
+    def _update_variant_read_only_state(self) -> None:
+        is_variant = self.duplicate_of_recipe_id is not None
+        save_btn = self.button_box.button(QtWidgets.QDialogButtonBox.StandardButton.Save)
+        if save_btn is not None:
+            save_btn.setEnabled(not is_variant)
+            save_btn.setToolTip(
+                "" if not is_variant else "Select the canonical recipe variant to enable saving."
+            )
+
+    def _load_recipe(self, recipe_id: int) -> None:
+        r = self.app.conn.execute("SELECT * FROM recipes WHERE id=?", (recipe_id,)).fetchone()
+        if not r:
+            QtWidgets.QMessageBox.warning(self, "Not found", "Recipe not found.")
+            self.reject()
+            return
+
+        self.recipe_id = recipe_id
+        self.duplicate_of_recipe_id = r["duplicate_of_recipe_id"]
+        self.name_edit.setText(r["name"])
+        self.name_item_id = self._resolve_name_item_id(warn=False)
+        initial_method = (r["method"] or "machine").strip().lower()
+        self.method_combo.setCurrentText("Crafting" if initial_method == "crafting" else "Machine")
+        self.machine_edit.setText(r["machine"] or "")
+        self.machine_item_id = r["machine_item_id"]
+
+        grid_values = [self.grid_combo.itemText(i) for i in range(self.grid_combo.count())]
+        if r["grid_size"] and r["grid_size"] not in grid_values:
+            self.grid_combo.addItem(r["grid_size"])
+        if r["grid_size"]:
+            self.grid_combo.setCurrentText(r["grid_size"])
+
+        enabled_tiers = self.app.get_enabled_tiers() if hasattr(self.app, "get_enabled_tiers") else ALL_TIERS
+        current_tier = (r["tier"] or "").strip()
+        tiers = list(enabled_tiers)
+        values = [NONE_TIER_LABEL]
+        if current_tier and current_tier not in tiers:
+            values.append(current_tier)
+        values.extend(tiers)
+        self.tier_combo.clear()
+        self.tier_combo.addItems(values)
+        self.tier_combo.setCurrentText(current_tier or NONE_TIER_LABEL)
+
+        current_max_tier = (r["max_tier"] or "").strip()
+        max_tier_values = list(values)
+        if current_max_tier and current_max_tier not in max_tier_values:
+            max_tier_values.append(current_max_tier)
+        self.max_tier_combo.clear()
+        self.max_tier_combo.addItems(max_tier_values)
+        self.max_tier_combo.setCurrentText(current_max_tier or NONE_TIER_LABEL)
+        self.perfect_overclock_check.setChecked(bool(r["is_perfect_overclock"]))
+
+        self.circuit_edit.setText("" if r["circuit"] is None else str(r["circuit"]))
+        seconds = "" if r["duration_ticks"] is None else f"{(r['duration_ticks'] / TPS):g}"
+        self.duration_edit.setText(seconds)
+        self.eut_edit.setText("" if r["eu_per_tick"] is None else str(r["eu_per_tick"]))
+        notes = (r["notes"] or "").strip()
+        self.additional_notes_check.setChecked(bool(notes))
+        self.notes_edit.setPlainText(notes)
+
+        self.station_item_id = r["station_item_id"]
+        self.station_edit.setText("")
+        if self.station_item_id is not None:
+            row = self.app.conn.execute(
+                "SELECT COALESCE(display_name, key) AS name FROM items WHERE id=?",
+                (self.station_item_id,),
+            ).fetchone()
+            if row:
+                self.station_edit.setText(row["name"])
+        self._apply_station_grid_size()
+
+        self.inputs = []
+        self.outputs = []
+        self.in_list.clear()
+        self.out_list.clear()
+        self._load_lines(recipe_id)
+
+        self._toggle_method_fields()
+        self._refresh_variant_choices(r)
+        self._update_variant_read_only_state()
+
+    def _refresh_variant_choices(self, recipe_row) -> None:
+        canonical_id = recipe_row["duplicate_of_recipe_id"] or recipe_row["id"]
+        rows = self.app.conn.execute(
+            """
+            SELECT r.id, r.name, r.method, r.machine, r.machine_item_id, r.grid_size, r.tier,
+                   r.station_item_id, r.duplicate_of_recipe_id,
+                   COALESCE(mi.display_name, mi.key) AS machine_item_name,
+                   COALESCE(si.display_name, si.key) AS station_item_name
+            FROM recipes r
+            LEFT JOIN items mi ON mi.id = r.machine_item_id
+            LEFT JOIN items si ON si.id = r.station_item_id
+            WHERE r.id=? OR r.duplicate_of_recipe_id=?
+            ORDER BY r.name, r.method, r.machine, r.tier, r.id
+            """,
+            (canonical_id, canonical_id),
+        ).fetchall()
+        base_name = (recipe_row["name"] or "").strip()
+
+        self._variant_change_block = True
+        try:
+            self.variant_combo.clear()
+            current_index = 0
+            for idx, row in enumerate(rows):
+                self.variant_combo.addItem(self._format_variant_label(row, base_name=base_name))
+                self.variant_combo.setItemData(idx, row["id"])
+                if row["id"] == self.recipe_id:
+                    current_index = idx
+            if rows:
+                self.variant_combo.setCurrentIndex(current_index)
+        finally:
+            self._variant_change_block = False
+
+    @staticmethod
+    def _format_variant_label(row, *, base_name: str = "") -> str:
+        name = (row["name"] or "").strip()
+        tier = (row["tier"] or "").strip()
+        tier_label = tier if tier else NONE_TIER_LABEL
+        method = (row["method"] or "machine").strip().lower()
+        name_prefix = ""
+        if name and base_name and name != base_name:
+            name_prefix = f"{name} • "
+        if method == "crafting":
+            grid = (row["grid_size"] or "").strip()
+            grid_label = f" {grid}" if grid else ""
+            return f"{name_prefix}Crafting{grid_label} • Tier: {tier_label}"
+        machine_label = (row["machine"] or row["machine_item_name"] or "").strip() or "Machine"
+        return f"{name_prefix}{machine_label} • Tier: {tier_label}"
+
+    def _on_variant_change(self) -> None:
+        if self._variant_change_block:
+            return
+        recipe_id = self.variant_combo.currentData()
+        if recipe_id is None or recipe_id == self.recipe_id:
+            return
+        self._load_recipe(int(recipe_id))
+
+    def _load_lines(self, recipe_id: int) -> None:
+        ins = self.app.conn.execute(
+            """
+            SELECT rl.id, rl.item_id, COALESCE(i.display_name, i.key) AS name, i.kind,
+                   rl.qty_count, rl.qty_liters, rl.chance_percent, rl.consumption_chance,
+                   rl.output_slot_index, rl.input_slot_index
+            FROM recipe_lines rl
+            JOIN items i ON i.id = rl.item_id
+            WHERE rl.recipe_id=? AND rl.direction='in'
+            ORDER BY rl.id
+            """,
+            (recipe_id,),
+        ).fetchall()
+
+        outs = self.app.conn.execute(
+            """
+            SELECT rl.id, rl.item_id, COALESCE(i.display_name, i.key) AS name, i.kind,
+                   rl.qty_count, rl.qty_liters, rl.chance_percent, rl.output_slot_index, rl.input_slot_index
+            FROM recipe_lines rl
+            JOIN items i ON i.id = rl.item_id
+            WHERE rl.recipe_id=? AND rl.direction='out'
+            ORDER BY rl.id
+            """,
+            (recipe_id,),
+        ).fetchall()
+
+        for row in ins:
+            qty_count = self._coerce_whole_number(row["qty_count"])
+            qty_liters = self._coerce_whole_number(row["qty_liters"])
+            line = {
+                "id": row["id"],
+                "item_id": row["item_id"],
+                "name": row["name"],
+                "kind": row["kind"],
+                "qty_count": qty_count,
+                "qty_liters": qty_liters,
+                "chance_percent": row["chance_percent"],
+                "consumption_chance": row["consumption_chance"],
+                "output_slot_index": row["output_slot_index"],
+                "input_slot_index": row["input_slot_index"],
+            }
+            self.inputs.append(line)
+            self.in_list.addItem(self._fmt_line(line))
+
+        for row in outs:
+            qty_count = self._coerce_whole_number(row["qty_count"])
+            qty_liters = self._coerce_whole_number(row["qty_liters"])
+            line = {
+                "id": row["id"],
+                "item_id": row["item_id"],
+                "name": row["name"],
+                "kind": row["kind"],
+                "qty_count": qty_count,
+                "qty_liters": qty_liters,
+                "chance_percent": row["chance_percent"],
+                "output_slot_index": row["output_slot_index"],
+                "input_slot_index": row["input_slot_index"],
+            }
+            self.outputs.append(line)
+            self.out_list.addItem(self._fmt_line(line, is_output=True))
+
+    def save(self) -> None:
+        if self.duplicate_of_recipe_id is not None:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Variant is read-only",
+                "Recipe variants are read-only in this dialog. Select the canonical recipe variant to make edits.",
+            )
+            return
+
+        name = self.name_edit.text().strip()
+        name_item_id = self._resolve_name_item_id()
+        if name_item_id is None:
+            return
+        self.name_item_id = name_item_id
+        if not self._validate_name_output(name_item_id):
+            return
+
+        method = (self.method_combo.currentText() or "Machine").strip().lower()
+        if method == "crafting":
+            method_db = "crafting"
+            machine = None
+            self.machine_item_id = None
+            machine_item_id = None
+            station_item_id = self.station_item_id
+            if station_item_id is None:
+                grid_size = (self.grid_combo.currentText() or "2x2").strip()
+                if grid_size != "2x2":
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Missing crafting grid",
+                        "Only the built-in 2x2 grid can be used without a Crafting Grid item.",
+                    )
+                    return
+            else:
+                grid_size = self._fetch_crafting_grid_size(station_item_id)
+                if not grid_size:
+                    QtWidgets.QMessageBox.warning(
+                        self,
+                        "Missing grid size",
+                        "Selected crafting grid item does not have a grid size.",
+                    )
+                    return
+                if self.grid_combo.currentText().strip() != grid_size:
+                    self.grid_combo.setCurrentText(grid_size)
+            if not self._validate_crafting_inputs(grid_size):
+                return
+        else:
+            method_db = "machine"
+            machine = self.machine_edit.text().strip() or None
+            machine_item_id = None if machine is None else self.machine_item_id
+            grid_size = None
+            station_item_id = None
+            for line in self.inputs:
+                line["input_slot_index"] = None
+        tier_raw = (self.tier_combo.currentText() or "").strip()
+        tier = None if (tier_raw == "" or tier_raw == NONE_TIER_LABEL) else tier_raw
+        max_tier, is_perfect_overclock = self._get_overclock_values()
+        if method_db == "crafting":
+            max_tier = None
+            is_perfect_overclock = 0
+        notes = self.notes_edit.toPlainText().strip() or None
+        if not self.additional_notes_check.isChecked():
+            notes = None
+
+        try:
+            circuit = self._parse_int_opt(self.circuit_edit.text())
+            duration_s = self._parse_float_opt(self.duration_edit.text())
+            eut = self._parse_int_opt(self.eut_edit.text())
+        except ValueError as exc:
+            QtWidgets.QMessageBox.warning(self, "Invalid number", str(exc))
+            return
+
+        duration_ticks = None if duration_s is None else int(round(duration_s * TPS))
+
+        if not self.inputs and not self.outputs:
+            ok = QtWidgets.QMessageBox.question(self, "No lines?", "No inputs/outputs added. Save anyway?")
+            if ok != QtWidgets.QMessageBox.StandardButton.Yes:
+                return
+
+        recipe = {
+            "name": name,
+            "method": method_db,
+            "machine": machine,
+            "machine_item_id": machine_item_id,
+            "grid_size": grid_size,
+            "station_item_id": station_item_id,
+            "circuit": circuit,
+            "tier": tier,
+            "duration_ticks": duration_ticks,
+            "eu_per_tick": eut,
+            "notes": notes,
+            "max_tier": max_tier,
+            "is_perfect_overclock": is_perfect_overclock,
+        }
+        try:
+            self._save_recipe(recipe, recipe_id=self.recipe_id, name_item_id=name_item_id)
+        except Exception as exc:
+            QtWidgets.QMessageBox.critical(self, "Save failed", str(exc))
+            return
+
+        if hasattr(self.app, "refresh_items"):
+            self.app.refresh_items()
+        if hasattr(self.app, "refresh_recipes"):
+            self.app.refresh_recipes()
+        self.accept()
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+from PySide6 import QtCore, QtWidgets
+
+from services.db import attached_content
+from services.storage import (
+    create_storage_unit,
+    delete_assignment,
+    default_storage_id,
+    delete_storage_unit,
+    get_assignment,
+    list_storage_container_placements,
+    list_storage_units,
+    placed_container_count,
+    recompute_storage_slot_capacities,
+    set_storage_container_placement,
+    storage_slot_usage,
+    update_storage_unit,
+)
+
+
+class StorageUnitDialog(QtWidgets.QDialog):
+    def __init__(self, app, *, storage: dict | None = None, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.storage = storage
+        self.result_data: dict | None = None
+        self.setWindowTitle("Edit Storage" if storage else "Create Storage")
+        self.resize(460, 320)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        form = QtWidgets.QFormLayout()
+        layout.addLayout(form)
+
+        self.name_edit = QtWidgets.QLineEdit((storage or {}).get("name", ""))
+        form.addRow("Name", self.name_edit)
+
+        self.kind_combo = QtWidgets.QComboBox()
+        self.kind_combo.addItem("Item Storage", "item")
+        self.kind_combo.addItem("Gas Storage", "gas")
+        self.kind_combo.addItem("Liquid Storage", "fluid")
+        selected_kind = str((storage or {}).get("kind") or "item").strip().lower()
+        if selected_kind in ("generic", "liquid", ""):
+            selected_kind = "item" if selected_kind != "liquid" else "fluid"
+        selected_idx = max(0, self.kind_combo.findData(selected_kind))
+        self.kind_combo.setCurrentIndex(selected_idx)
+        form.addRow("Kind", self.kind_combo)
+
+        self.priority_spin = QtWidgets.QSpinBox()
+        self.priority_spin.setRange(-10_000, 10_000)
+        self.priority_spin.setValue(int((storage or {}).get("priority") or 0))
+        form.addRow("Priority", self.priority_spin)
+
+        self.allow_planner_checkbox = QtWidgets.QCheckBox("Allow planner to consume from this storage")
+        self.allow_planner_checkbox.setChecked(bool((storage or {}).get("allow_planner_use", 1)))
+        form.addRow("", self.allow_planner_checkbox)
+
+        self.notes_edit = QtWidgets.QPlainTextEdit((storage or {}).get("notes", "") or "")
+        self.notes_edit.setPlaceholderText("Optional notes")
+        form.addRow("Notes", self.notes_edit)
+
+        info_label = QtWidgets.QLabel(
+            "Container items and computed capacities are managed in the Containers… dialog."
+        )
+        info_label.setWordWrap(True)
+        layout.addWidget(info_label)
+
+        btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Cancel | QtWidgets.QDialogButtonBox.StandardButton.Save)
+        btns.accepted.connect(self._on_save)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def _on_save(self) -> None:
+        name = self.name_edit.text().strip()
+        if not name:
+            QtWidgets.QMessageBox.critical(self, "Invalid name", "Storage name is required.")
+            return
+        existing_names = {
+            str(row["name"]).strip().casefold()
+            for row in list_storage_units(self.app.profile_conn)
+            if self.storage is None or int(row["id"]) != int(self.storage["id"])
+        }
+        if name.casefold() in existing_names:
+            QtWidgets.QMessageBox.critical(self, "Duplicate name", "Storage name must be unique.")
+            return
+
+        self.result_data = {
+            "name": name,
+            "kind": str(self.kind_combo.currentData() or "item"),
+            "priority": self.priority_spin.value(),
+            "allow_planner_use": self.allow_planner_checkbox.isChecked(),
+            "notes": (self.notes_edit.toPlainText().strip() or None),
+        }
+        self.accept()
+
+
+class StorageUnitsDialog(QtWidgets.QDialog):
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Manage Storages")
+        self.resize(760, 380)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.table = QtWidgets.QTableWidget(0, 8)
+        self.table.setHorizontalHeaderLabels([
+            "Name", "Kind", "Total Slots", "Used", "Free", "Total L", "Used L", "Free L"
+        ])
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table, stretch=1)
+
+        row = QtWidgets.QHBoxLayout()
+        self.btn_new = QtWidgets.QPushButton("New…")
+        self.btn_edit = QtWidgets.QPushButton("Edit…")
+        self.btn_containers = QtWidgets.QPushButton("Containers…")
+        self.btn_delete = QtWidgets.QPushButton("Delete")
+        self.btn_close = QtWidgets.QPushButton("Close")
+        self.btn_new.clicked.connect(self._on_new)
+        self.btn_edit.clicked.connect(self._on_edit)
+        self.btn_containers.clicked.connect(self._on_containers)
+        self.btn_delete.clicked.connect(self._on_delete)
+        self.btn_close.clicked.connect(self.accept)
+        row.addWidget(self.btn_new)
+        row.addWidget(self.btn_edit)
+        row.addWidget(self.btn_containers)
+        row.addWidget(self.btn_delete)
+        row.addStretch(1)
+        row.addWidget(self.btn_close)
+        layout.addLayout(row)
+
+        self.reload()
+
+    def reload(self) -> None:
+        raw_rows = list_storage_units(self.app.profile_conn)
+        rows = [dict(r) for r in raw_rows]
+        self.table.setRowCount(len(rows))
+        # With the content DB attached, slot usage joins item metadata in SQL.
+        stack_map: dict[int, int] | None = None
+        container_ids: set[int] | None = None
+        if not attached_content(self.app.profile_conn):
+            stack_map = {}
+            container_ids = set()
+            for item_row in self.app.conn.execute(
+                "SELECT id, COALESCE(max_stack_size, 64) AS max_stack_size, COALESCE(is_storage_container, 0) AS is_storage_container FROM items"
+            ).fetchall():
+                item_id = int(item_row["id"])
+                stack_map[item_id] = max(1, int(item_row["max_stack_size"] or 64))
+                if int(item_row["is_storage_container"] or 0):
+                    container_ids.add(item_id)
+
+        for idx, row in enumerate(rows):
+            storage_id = int(row["id"])
+            usage = storage_slot_usage(
+                self.app.profile_conn,
+                storage_id=storage_id,
+                known_item_stack_sizes=stack_map,
+                known_container_item_ids=container_ids,
+            )
+            liters_used_row = self.app.profile_conn.execute(
+                "SELECT COALESCE(SUM(qty_liters), 0) AS liters_used FROM storage_assignments WHERE storage_id=?",
+                (storage_id,),
+            ).fetchone()
+            liters_used = float((liters_used_row["liters_used"] if liters_used_row else 0) or 0)
+            liter_capacity = row.get("liter_capacity")
+            liter_free = None if liter_capacity is None else max(0.0, float(liter_capacity) - liters_used)
+
+            self.table.setItem(idx, 0, QtWidgets.QTableWidgetItem(str(row["name"])))
+            self.table.setItem(idx, 1, QtWidgets.QTableWidgetItem(str(row.get("kind") or "generic")))
+            self.table.setItem(idx, 2, QtWidgets.QTableWidgetItem("" if usage["slot_count"] is None else str(int(usage["slot_count"]))))
+            self.table.setItem(idx, 3, QtWidgets.QTableWidgetItem(str(int(usage["slot_used"]))))
+            self.table.setItem(idx, 4, QtWidgets.QTableWidgetItem("" if usage["slot_free"] is None else str(int(usage["slot_free"]))))
+            self.table.setItem(idx, 5, QtWidgets.QTableWidgetItem("" if liter_capacity is None else str(int(round(float(liter_capacity))))))
+            self.table.setItem(idx, 6, QtWidgets.QTableWidgetItem(str(int(round(liters_used)))))
+            self.table.setItem(idx, 7, QtWidgets.QTableWidgetItem("" if liter_free is None else str(int(round(liter_free)))))
+            self.table.item(idx, 0).setData(QtCore.Qt.ItemDataRole.UserRole, storage_id)
+        if rows:
+            self.table.selectRow(0)
+
+    def _selected_storage_id(self) -> int | None:
+        row = self.table.currentRow()
+        if row < 0:
+            return None
+        item = self.table.item(row, 0)
+        if item is None:
+            return None
+        storage_id = item.data(QtCore.Qt.ItemDataRole.UserRole)
+        if storage_id is None:
+            return None
+        return int(storage_id)
+
+    def _selected_storage_row(self) -> dict | None:
+        storage_id = self._selected_storage_id()
+        if storage_id is None:
+            return None
+        for row in list_storage_units(self.app.profile_conn):
+            if int(row["id"]) == storage_id:
+                return dict(row)
+        return None
+
+    def _on_new(self) -> None:
+        dialog = StorageUnitDialog(self.app, parent=self)
+        if dialog.exec() != QtWidgets.QDialog.DialogCode.Accepted or not dialog.result_data:
+            return
+        create_storage_unit(self.app.profile_conn, **dialog.result_data)
+        self.app.profile_conn.commit()
+        self.reload()
+
+    def _on_edit(self) -> None:
+        storage = self._selected_storage_row()
+        if storage is None:
+            return
+        dialog = StorageUnitDialog(self.app, storage=storage, parent=self)
+        if dialog.exec() != QtWidgets.QDialog.DialogCode.Accepted or not dialog.result_data:
+            return
+        update_storage_unit(self.app.profile_conn, int(storage["id"]), **dialog.result_data)
+        self.app.profile_conn.commit()
+        self.reload()
+
+    def _on_containers(self) -> None:
+        storage = self._selected_storage_row()
+        if storage is None:
+            return
+        dialog = StorageContainerPlacementsDialog(self.app, storage=storage, parent=self)
+        if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            self.reload()
+
+    def _on_delete(self) -> None:
+        storage = self._selected_storage_row()
+        if storage is None:
+            return
+        if str(storage.get("name") or "") == "Main Storage":
+            QtWidgets.QMessageBox.information(self, "Delete blocked", "Main Storage cannot be deleted.")
+            return
+        answer = QtWidgets.QMessageBox.question(
+            self,
+            "Delete storage",
+            f"Delete storage '{storage['name']}'? Assigned inventory for this storage will be removed.",
+        )
+        if answer != QtWidgets.QMessageBox.StandardButton.Yes:
+            return
+        delete_storage_unit(self.app.profile_conn, int(storage["id"]))
+        self.app.profile_conn.commit()
+        self.reload()
+
+
+class StorageContainerPlacementsDialog(QtWidgets.QDialog):
+    def __init__(self, app, *, storage: dict, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.storage = storage
+        self.setWindowTitle(f"Container Placements — {storage['name']}")
+        self.resize(520, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(QtWidgets.QLabel("Set how many container items are placed in this storage."))
+
+        self.table = QtWidgets.QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Container Item", "Slots/Container", "Placed"])
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table, stretch=1)
+
+        self.capacity_summary_label = QtWidgets.QLabel("")
+        self.capacity_summary_label.setWordWrap(True)
+        layout.addWidget(self.capacity_summary_label)
+
+        self._rows: list[dict] = []
+        self._load_rows()
+
+        btns = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.StandardButton.Save | QtWidgets.QDialogButtonBox.StandardButton.Cancel
+        )
+        btns.accepted.connect(self._on_save)
+        btns.rejected.connect(self.reject)
+        layout.addWidget(btns)
+
+    def _load_rows(self) -> None:
+        placement_rows = {
+            int(row["item_id"]): int(row.get("placed_count") or 0)
+            for row in list_storage_container_placements(self.app.profile_conn, int(self.storage["id"]))
+        }
+        container_rows = self.app.conn.execute(
+            """
+            SELECT
+                i.id,
+                COALESCE(i.display_name, i.key) AS name,
+                COALESCE(i.storage_slot_count, 0) AS storage_slot_count,
+                COALESCE(i.content_qty_liters, 0) AS content_qty_liters,
+                CASE
+                    WHEN LOWER(COALESCE(content.kind, ''))='gas' THEN 'gas'
+                    WHEN LOWER(COALESCE(content.kind, '')) IN ('fluid', 'liquid') THEN 'fluid'
+                    WHEN LOWER(COALESCE(i.kind, ''))='gas' THEN 'gas'
+                    WHEN LOWER(COALESCE(i.kind, '')) IN ('fluid', 'liquid') THEN 'fluid'
+                    WHEN COALESCE(i.content_qty_liters, 0) > 0 THEN 'fluid'
+                    ELSE 'item'
+                END AS container_storage_kind
+            FROM items i
+            LEFT JOIN items content ON content.id = i.content_fluid_id
+            WHERE COALESCE(i.is_storage_container, 0)=1
+               OR COALESCE(i.storage_slot_count, 0)>0
+               OR i.content_fluid_id IS NOT NULL
+               OR COALESCE(i.content_qty_liters, 0)>0
+            ORDER BY LOWER(COALESCE(i.display_name, i.key)), i.id
+            """
+        ).fetchall()
+        self._rows = [dict(r) for r in container_rows]
+
+        self.table.setRowCount(len(self._rows))
+        for idx, row in enumerate(self._rows):
+            item_id = int(row["id"])
+            self.table.setItem(idx, 0, QtWidgets.QTableWidgetItem(str(row["name"])))
+            self.table.item(idx, 0).setData(QtCore.Qt.ItemDataRole.UserRole, item_id)
+            self.table.setItem(idx, 1, QtWidgets.QTableWidgetItem(str(int(row.get("storage_slot_count") or 0))))
+            spin = QtWidgets.QSpinBox()
+            spin.setRange(0, 1_000_000)
+            spin.setValue(placement_rows.get(item_id, 0))
+            spin.valueChanged.connect(self._refresh_capacity_preview)
+            self.table.setCellWidget(idx, 2, spin)
+
+        self._refresh_capacity_preview()
+
+    def _refresh_capacity_preview(self) -> None:
+        total_slots = 0
+        total_liters = 0
+        for idx, row in enumerate(self._rows):
+            spin = self.table.cellWidget(idx, 2)
+            placed = int(spin.value()) if isinstance(spin, QtWidgets.QSpinBox) else 0
+            per_slots = int(row.get("storage_slot_count") or 0)
+            per_liters = int(row.get("content_qty_liters") or 0)
+            total_slots += placed * per_slots
+            total_liters += placed * per_liters
+
+        self.capacity_summary_label.setText(
+            f"Calculated capacity from placements: {total_slots} slots, {total_liters:,} L"
+        )
+
+    def _on_save(self) -> None:
+        storage_id = int(self.storage["id"])
+
+        main_storage_id = default_storage_id(self.app.profile_conn)
+        ownership_map: dict[int, int] = {}
+        if main_storage_id is not None:
+            for row in self._rows:
+                item_id = int(row["id"])
+                owned_row = get_assignment(self.app.profile_conn, storage_id=int(main_storage_id), item_id=item_id)
+                ownership_map[item_id] = max(0, int(float((owned_row["qty_count"] if owned_row else 0) or 0)))
+
+        requested_by_item_id: dict[int, int] = {}
+        requested_types: set[str] = set()
+
+        # Validate all requested placements before writing any rows.
+        for idx, row in enumerate(self._rows):
+            item_id = int(row["id"])
+            spin = self.table.cellWidget(idx, 2)
+            requested = int(spin.value()) if isinstance(spin, QtWidgets.QSpinBox) else 0
+            requested_by_item_id[item_id] = requested
+            if requested > 0:
+                requested_types.add(str(row.get("container_storage_kind") or "item").strip().lower())
+
+            owned_total = ownership_map.get(item_id, 0)
+            already_elsewhere = placed_container_count(
+                self.app.profile_conn,
+                item_id=item_id,
+                exclude_storage_id=storage_id,
+            )
+            max_allowed_here = max(0, owned_total - already_elsewhere)
+            if requested > max_allowed_here:
+                QtWidgets.QMessageBox.warning(
+                    self,
+                    "Placement exceeds owned",
+                    (
+                        f"Cannot place {requested} of '{row.get('name')}'.\n\n"
+                        f"Owned in Main Storage: {owned_total}\n"
+                        f"Already placed elsewhere: {already_elsewhere}\n"
+                        f"Max placeable in this storage: {max_allowed_here}"
+                    ),
+                )
+                return
+
+        if len(requested_types) > 1:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Mixed container types",
+                "A storage can only contain one container storage type at a time (item, fluid, or gas).",
+            )
+            return
+
+        requested_type = next(iter(requested_types), None)
+        current_kind = str(self.storage.get("kind") or "").strip().lower()
+        normalized_kind = "fluid" if current_kind == "liquid" else current_kind
+        if requested_type and normalized_kind and normalized_kind != "generic" and requested_type != normalized_kind:
+            QtWidgets.QMessageBox.warning(
+                self,
+                "Storage kind mismatch",
+                f"This storage is '{current_kind}' but selected containers are '{requested_type}'.",
+            )
+            return
+
+        for idx, row in enumerate(self._rows):
+            item_id = int(row["id"])
+            placed = requested_by_item_id.get(item_id, 0)
+            set_storage_container_placement(
+                self.app.profile_conn,
+                storage_id=storage_id,
+                item_id=item_id,
+                placed_count=placed,
+            )
+            # Placed containers provide storage capacity; they are not inventory entries
+            # in the target storage (except Main Storage, which tracks global ownership).
+            if main_storage_id is not None and storage_id != int(main_storage_id):
+                delete_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item_id)
+
+        if requested_type and normalized_kind in ("", "generic"):
+            update_storage_unit(self.app.profile_conn, storage_id, kind=requested_type)
+
+        recompute_storage_slot_capacities(
+            self.app.profile_conn,
+            content_conn=self.app.conn,
+            storage_ids=(storage_id,),
+        )
+        self.app.profile_conn.commit()
+        self.accept()
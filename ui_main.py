@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import datetime
-import shutil
 import sqlite3
 import sys
 from pathlib import Path
@@ -9,17 +8,12 @@ from PySide6 import QtCore, QtGui, QtWidgets
 
 from services.db import DEFAULT_DB_PATH, find_item_merge_conflicts, find_missing_attributes
 from services.db_lifecycle import DbLifecycle
+from services.inventory_ledger import InventoryLedger
 from services.items import fetch_items
-from services.recipes import fetch_recipes
+from services.recipes import RecipeTierIndex, fetch_recipes
+from services.startup_profile import startup_profiler
 from services.tab_config import apply_tab_reorder, config_path, load_tab_config, save_tab_config
-from ui_dialogs import (
-    ContainerTransformManagerDialog,
-    CraftingGridManagerDialog,
-    ItemKindManagerDialog,
-    ItemMergeConflictDialog,
-    MaterialManagerDialog,
-    TierManagerDialog,
-)
+import ui_dialogs
 from ui_tabs.inventory_tab import InventoryTab
 from ui_tabs.items_tab_qt import ItemsTab, FluidsTab, GasesTab
 from ui_tabs.recipes_tab_qt import RecipesTab
@@ -31,6 +25,9 @@ from ui_constants import DARK_STYLESHEET, LIGHT_STYLESHEET
 from ui_dialog_sizing import install_dialog_sizing_hooks
 
 
+INVENTORY_FLUSH_DELAY_MS = 500
+
+
 class ReorderTabsDialog(QtWidgets.QDialog):
     def __init__(self, tab_order: list[str], tab_registry: dict[str, dict[str, str]], parent=None):
         super().__init__(parent)
@@ -73,6 +70,14 @@ class PlaceholderTab(QtWidgets.QWidget):
         layout.addWidget(QtWidgets.QLabel(f"{label} (Qt UI pending)", alignment=QtCore.Qt.AlignmentFlag.AlignCenter))
 
 
+class LazyTabPlaceholder(QtWidgets.QWidget):
+    """Stands in for a tab in the notebook until the tab is first shown."""
+
+    def __init__(self, tab_id: str, parent=None):
+        super().__init__(parent)
+        self.setProperty("tab_id", tab_id)
+
+
 class DetachedTabWindow(QtWidgets.QMainWindow):
     def __init__(
         self,
@@ -125,7 +130,16 @@ class App(QtWidgets.QMainWindow):
         # next to this script enables editor capabilities.
         self.editor_enabled = self._detect_editor_enabled()
 
-        self.db = DbLifecycle(editor_enabled=self.editor_enabled, db_path=DEFAULT_DB_PATH)
+        # Build Mode inventory changes are held by the ledger and written back
+        # shortly after the last change (and before anything else reads the DB).
+        self._inventory_flush_timer = QtCore.QTimer(self)
+        self._inventory_flush_timer.setSingleShot(True)
+        self._inventory_flush_timer.setInterval(INVENTORY_FLUSH_DELAY_MS)
+        self._inventory_flush_timer.timeout.connect(self.flush_inventory)
+
+        profiler = startup_profiler()
+        with profiler.phase("DbLifecycle"):
+            self.db = DbLifecycle(editor_enabled=self.editor_enabled, db_path=DEFAULT_DB_PATH)
         self._sync_db_handles()
         self._apply_theme(self.db.get_theme())
         if self.db.last_open_error:
@@ -157,26 +171,40 @@ class App(QtWidgets.QMainWindow):
         self.tab_actions: dict[str, QtGui.QAction] = {}
         self.tab_widgets: dict[str, QtWidgets.QWidget] = {}
         self.detached_tabs: dict[str, DetachedTabWindow] = {}
+        self._tab_placeholders: dict[str, LazyTabPlaceholder] = {}
+        self._dirty_tabs: set[str] = set()
 
-        self._build_menu()
+        with profiler.phase("build menu"):
+            self._build_menu()
         self._update_title()
 
         self.items: list = []
         self.recipes: list = []
+        self.recipe_index: RecipeTierIndex | None = None
+        self._recipes_stale = True
         self.recipe_focus_id: int | None = None
         self.last_added_item_id: int | None = None
 
         self.nb = QtWidgets.QTabWidget()
         self.nb.tabBar().setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.nb.tabBar().customContextMenuRequested.connect(self._open_tab_context_menu)
+        self.nb.currentChanged.connect(self._on_current_tab_changed)
         self.setCentralWidget(self.nb)
 
-        self._rebuild_tabs()
-
-        self.refresh_items()
+        # Tabs are constructed and rendered on first show; only the shared item
+        # list is fetched up front because several tabs and dialogs read it.
+        with profiler.phase("build tab placeholders"):
+            self._rebuild_tabs()
+        with profiler.phase("fetch items"):
+            self.refresh_items()
         self.refresh_recipes()
-        self._tiers_load_from_db()
-        self._machines_load_from_db()
+        QtCore.QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        profiler = startup_profiler()
+        with profiler.phase("first tab"):
+            self._show_current_tab()
+        profiler.finish()
 
     # ---------- Mode detection ----------
     def _detect_editor_enabled(self) -> bool:
@@ -186,11 +214,23 @@ class App(QtWidgets.QMainWindow):
         except Exception:
             return False
 
-    def _sync_db_handles(self) -> None:
+    def _sync_db_handles(self, *, keep_pending_inventory: bool = True) -> None:
+        old_ledger = getattr(self, "inventory_ledger", None)
+        old_profile_path = getattr(self, "profile_db_path", None)
         self.db_path = self.db.db_path
         self.profile_db_path = self.db.profile_db_path
         self.conn = self.db.conn
         self.profile_conn = self.db.profile_conn
+        self.inventory_ledger = InventoryLedger(self.profile_conn)
+        if old_ledger is not None:
+            old_ledger.unsubscribe(self._on_inventory_ledger_changed)
+            # Changes the old connection could not write (e.g. it was closed
+            # under us) belong to the same profile, so keep them pending.
+            if keep_pending_inventory and old_ledger.pending and old_profile_path == self.profile_db_path:
+                self.inventory_ledger.adopt_pending(old_ledger)
+        self.inventory_ledger.subscribe(self._on_inventory_ledger_changed)
+        if self.inventory_ledger.pending:
+            self._inventory_flush_timer.start()
 
         tab_widgets = getattr(self, "tab_widgets", None)
         if not isinstance(tab_widgets, dict):
@@ -253,8 +293,12 @@ class App(QtWidgets.QMainWindow):
         return widget
 
     def _clear_tabs(self) -> None:
-        while self.nb.count() > 0:
-            self.nb.removeTab(0)
+        blocked = self.nb.blockSignals(True)
+        try:
+            while self.nb.count() > 0:
+                self.nb.removeTab(0)
+        finally:
+            self.nb.blockSignals(blocked)
 
     def _insert_tab_in_order(self, tab_id: str, widget: QtWidgets.QWidget) -> None:
         index = 0
@@ -268,12 +312,74 @@ class App(QtWidgets.QMainWindow):
 
     def _rebuild_tabs(self) -> None:
         self._clear_tabs()
-        for tab_id in self.tab_order:
-            if tab_id not in self.enabled_tabs or tab_id in self.detached_tabs:
+        blocked = self.nb.blockSignals(True)
+        try:
+            for tab_id in self.tab_order:
+                if tab_id not in self.enabled_tabs or tab_id in self.detached_tabs:
+                    continue
+                widget = self.tab_widgets.get(tab_id) or self._tab_placeholder(tab_id)
+                self.nb.addTab(widget, self.tab_registry[tab_id]["label"])
+        finally:
+            self.nb.blockSignals(blocked)
+
+    def _tab_placeholder(self, tab_id: str) -> LazyTabPlaceholder:
+        placeholder = self._tab_placeholders.get(tab_id)
+        if placeholder is None:
+            placeholder = LazyTabPlaceholder(tab_id)
+            self._tab_placeholders[tab_id] = placeholder
+        return placeholder
+
+    def _ensure_tab_widget(self, tab_id: str) -> QtWidgets.QWidget:
+        widget = self.tab_widgets.get(tab_id)
+        if widget is not None:
+            return widget
+        with startup_profiler().phase(f"construct {tab_id} tab"):
+            widget = self._create_tab_widget(tab_id)
+        self.tab_widgets[tab_id] = widget
+        self._dirty_tabs.add(tab_id)
+        placeholder = self._tab_placeholders.pop(tab_id, None)
+        if placeholder is not None:
+            index = self.nb.indexOf(placeholder)
+            if index >= 0:
+                was_current = self.nb.currentIndex() == index
+                blocked = self.nb.blockSignals(True)
+                try:
+                    self.nb.removeTab(index)
+                    self.nb.insertTab(index, widget, self.tab_registry[tab_id]["label"])
+                    if was_current:
+                        self.nb.setCurrentIndex(index)
+                finally:
+                    self.nb.blockSignals(blocked)
+            placeholder.deleteLater()
+        return widget
+
+    def _on_current_tab_changed(self, index: int) -> None:
+        widget = self.nb.widget(index) if index >= 0 else None
+        tab_id = widget.property("tab_id") if widget is not None else None
+        if not tab_id:
+            return
+        self._ensure_tab_widget(tab_id)
+        if tab_id in self._dirty_tabs:
+            self._render_tab(tab_id)
+
+    def _show_current_tab(self) -> None:
+        self._on_current_tab_changed(self.nb.currentIndex())
+
+    def _is_tab_shown(self, tab_id: str) -> bool:
+        if tab_id in self.detached_tabs:
+            return True
+        widget = self.tab_widgets.get(tab_id)
+        return widget is not None and self.nb.currentWidget() is widget
+
+    def _invalidate_tabs(self, *tab_ids: str) -> None:
+        """Mark built tabs as needing a render; only the visible ones render now."""
+        for tab_id in tab_ids:
+            if tab_id not in self.tab_widgets:
+                # Not built yet: it renders when first shown.
                 continue
-            widget = self.tab_widgets.get(tab_id) or self._create_tab_widget(tab_id)
-            self.tab_widgets[tab_id] = widget
-            self.nb.addTab(widget, self.tab_registry[tab_id]["label"])
+            self._dirty_tabs.add(tab_id)
+            if self._is_tab_shown(tab_id):
+                self._render_tab(tab_id)
 
     def _open_tab_context_menu(self, pos) -> None:
         index = self.nb.tabBar().tabAt(pos)
@@ -291,10 +397,7 @@ class App(QtWidgets.QMainWindow):
     def _detach_tab(self, tab_id: str) -> None:
         if tab_id in self.detached_tabs:
             return
-        widget = self.tab_widgets.get(tab_id)
-        if widget is None:
-            widget = self._create_tab_widget(tab_id)
-            self.tab_widgets[tab_id] = widget
+        widget = self._ensure_tab_widget(tab_id)
         index = self.nb.indexOf(widget)
         if index >= 0:
             self.nb.removeTab(index)
@@ -302,7 +405,7 @@ class App(QtWidgets.QMainWindow):
         window = DetachedTabWindow(tab_id, self.tab_registry[tab_id]["label"], widget, self._reattach_tab, self)
         self.detached_tabs[tab_id] = window
         window.show()
-        self._refresh_detached_tab(tab_id)
+        self._render_tab(tab_id)
 
     def _reattach_tab(self, tab_id: str) -> None:
         window = self.detached_tabs.pop(tab_id, None)
@@ -315,26 +418,32 @@ class App(QtWidgets.QMainWindow):
         self._insert_tab_in_order(tab_id, widget)
         widget.show()
         self.nb.setCurrentWidget(widget)
-        self._refresh_detached_tab(tab_id)
+        self._render_tab(tab_id)
 
-    def _refresh_detached_tab(self, tab_id: str) -> None:
+    def _render_tab(self, tab_id: str) -> None:
+        self._dirty_tabs.discard(tab_id)
         widget = self.tab_widgets.get(tab_id)
         if widget is None:
             return
-        if tab_id == "items" and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        elif tab_id == "fluids" and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        elif tab_id == "gases" and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        elif tab_id == "recipes" and hasattr(widget, "render_recipes"):
-            widget.render_recipes(self.recipes)
-        elif tab_id == "inventory" and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        elif tab_id == "tiers" and hasattr(widget, "load_from_db"):
-            widget.load_from_db()
-        elif tab_id == "machines" and hasattr(widget, "load_from_db"):
-            widget.load_from_db()
+        with startup_profiler().phase(f"render {tab_id} tab"):
+            if tab_id == "items" and hasattr(widget, "render_items"):
+                widget.render_items(self.items)
+            elif tab_id == "fluids" and hasattr(widget, "render_items"):
+                widget.render_items(self.items)
+            elif tab_id == "gases" and hasattr(widget, "render_items"):
+                widget.render_items(self.items)
+            elif tab_id == "recipes" and hasattr(widget, "render_recipes"):
+                if self._recipes_stale:
+                    self._load_recipes()
+                widget.render_recipes(self.recipes)
+            elif tab_id == "inventory" and hasattr(widget, "render_items"):
+                widget.render_items(self.items)
+            elif tab_id == "tiers" and hasattr(widget, "load_from_db"):
+                widget.load_from_db()
+            elif tab_id == "machines" and hasattr(widget, "load_from_db"):
+                widget.load_from_db()
+            elif tab_id == "automation" and hasattr(widget, "refresh"):
+                widget.refresh()
 
     def _toggle_tab(self, tab_id: str, checked: bool) -> None:
         enabled = set(self.enabled_tabs)
@@ -355,10 +464,7 @@ class App(QtWidgets.QMainWindow):
                 window.deleteLater()
         self._save_ui_config()
         self._rebuild_tabs()
-        self.refresh_items()
-        self.refresh_recipes()
-        self._tiers_load_from_db()
-        self._machines_load_from_db()
+        self._show_current_tab()
 
     def _open_reorder_tabs_dialog(self) -> None:
         dialog = ReorderTabsDialog(self.tab_order, self.tab_registry, self)
@@ -376,10 +482,7 @@ class App(QtWidgets.QMainWindow):
         self.enabled_tabs = config.enabled
         self._save_ui_config()
         self._rebuild_tabs()
-        self.refresh_items()
-        self.refresh_recipes()
-        self._tiers_load_from_db()
-        self._machines_load_from_db()
+        self._show_current_tab()
 
     # ---------- Menu / DB handling ----------
     def _build_menu(self) -> None:
@@ -470,12 +573,14 @@ class App(QtWidgets.QMainWindow):
 
     def closeEvent(self, event) -> None:
         try:
+            self.flush_inventory()
             self.db.close()
         finally:
             event.accept()
 
     def _switch_db(self, new_path: Path) -> None:
         """Close current DB connection and open a new one."""
+        self.flush_inventory()
         try:
             self.db.switch_db(Path(new_path))
         except Exception as exc:
@@ -594,7 +699,7 @@ class App(QtWidgets.QMainWindow):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dlg = MaterialManagerDialog(self, parent=self)
+        dlg = ui_dialogs.MaterialManagerDialog(self, parent=self)
         dlg.exec()
 
     def menu_manage_item_kinds(self) -> None:
@@ -606,7 +711,7 @@ class App(QtWidgets.QMainWindow):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dlg = ItemKindManagerDialog(self, parent=self)
+        dlg = ui_dialogs.ItemKindManagerDialog(self, parent=self)
         dlg.exec()
 
     def menu_manage_tiers(self) -> None:
@@ -618,11 +723,11 @@ class App(QtWidgets.QMainWindow):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dlg = TierManagerDialog(self, parent=self)
+        dlg = ui_dialogs.TierManagerDialog(self, parent=self)
         dlg.exec()
 
     def menu_manage_crafting_grids(self) -> None:
-        dlg = CraftingGridManagerDialog(self, parent=self)
+        dlg = ui_dialogs.CraftingGridManagerDialog(self, parent=self)
         dlg.exec()
 
     def menu_manage_container_transforms(self) -> None:
@@ -634,7 +739,7 @@ class App(QtWidgets.QMainWindow):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dlg = ContainerTransformManagerDialog(self, parent=self)
+        dlg = ui_dialogs.ContainerTransformManagerDialog(self, parent=self)
         dlg.exec()
 
     def menu_export_content_db(self) -> None:
@@ -699,11 +804,10 @@ class App(QtWidgets.QMainWindow):
             return
 
         source = Path(path)
+        self.flush_inventory()
         try:
-            self.db.close()
-            shutil.copyfile(source, profile_path)
-            self.db.switch_db(self.db_path)
-            self._sync_db_handles()
+            self.db.import_profile_db(source)
+            self._sync_db_handles(keep_pending_inventory=False)
         except Exception as exc:
             QtWidgets.QMessageBox.critical(
                 self,
@@ -749,7 +853,7 @@ class App(QtWidgets.QMainWindow):
         item_conflicts = {}
         conflicts = find_item_merge_conflicts(self.conn, Path(path))
         if conflicts:
-            dlg = ItemMergeConflictDialog(conflicts, parent=self)
+            dlg = ui_dialogs.ItemMergeConflictDialog(conflicts, parent=self)
             if dlg.exec() != QtWidgets.QDialog.DialogCode.Accepted:
                 return
             item_conflicts = dlg.result or {}
@@ -835,40 +939,41 @@ class App(QtWidgets.QMainWindow):
                 raise
             self._recover_closed_connection("items refresh")
             self.items = fetch_items(self.conn)
-        widget = self.tab_widgets.get("items")
-        if widget and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        widget = self.tab_widgets.get("fluids")
-        if widget and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        widget = self.tab_widgets.get("gases")
-        if widget and hasattr(widget, "render_items"):
-            widget.render_items(self.items)
-        inventory_widget = self.tab_widgets.get("inventory")
-        if inventory_widget and hasattr(inventory_widget, "render_items"):
-            inventory_widget.render_items(self.items)
-
-    def refresh_recipes(self) -> None:
-        try:
-            self.recipes = fetch_recipes(self.conn, self.get_enabled_tiers())
-        except sqlite3.ProgrammingError as exc:
-            if "closed" not in str(exc).lower():
-                raise
-            self._recover_closed_connection("recipes refresh")
-            self.recipes = fetch_recipes(self.conn, self.get_enabled_tiers())
-        widget = self.tab_widgets.get("recipes")
-        if widget and hasattr(widget, "render_recipes"):
-            widget.render_recipes(self.recipes)
+        # The Recipes tab caches output item names and groups per recipe.
+        self._invalidate_tabs("items", "fluids", "gases", "inventory", "recipes")
+
+    def refresh_recipes(self, *, tiers_only: bool = False) -> None:
+        """Re-read recipes; ``tiers_only`` when just the enabled tiers changed.
+
+        A tier change is answered from ``recipe_index`` without touching the DB.
+        """
+        # Recipes are only read by the Recipes tab, so the fetch waits for it.
+        if not tiers_only:
+            self.recipe_index = None
+        self._recipes_stale = True
+        self._invalidate_tabs("recipes")
+
+    def refresh_automation(self) -> None:
+        self._invalidate_tabs("automation")
+
+    def _load_recipes(self) -> None:
+        if self.recipe_index is None:
+            try:
+                rows = fetch_recipes(self.conn, None)
+            except sqlite3.ProgrammingError as exc:
+                if "closed" not in str(exc).lower():
+                    raise
+                self._recover_closed_connection("recipes refresh")
+                rows = fetch_recipes(self.conn, None)
+            self.recipe_index = RecipeTierIndex(rows)
+        self.recipes = self.recipe_index.recipes(self.get_enabled_tiers())
+        self._recipes_stale = False
 
     def _tiers_load_from_db(self) -> None:
-        widget = self.tab_widgets.get("tiers")
-        if widget and hasattr(widget, "load_from_db"):
-            widget.load_from_db()
+        self._invalidate_tabs("tiers")
 
     def _machines_load_from_db(self) -> None:
-        widget = self.tab_widgets.get("machines")
-        if widget and hasattr(widget, "load_from_db"):
-            widget.load_from_db()
+        self._invalidate_tabs("machines")
 
 
     def list_storage_units(self) -> list[dict[str, int | str]]:
@@ -889,6 +994,29 @@ class App(QtWidgets.QMainWindow):
         if planner_widget and hasattr(planner_widget, "clear_planner_cache"):
             planner_widget.clear_planner_cache()
 
+    def _on_inventory_ledger_changed(self, _item_ids) -> None:
+        timer = getattr(self, "_inventory_flush_timer", None)
+        ledger = getattr(self, "inventory_ledger", None)
+        if timer is not None and ledger is not None and ledger.pending:
+            timer.start()
+
+    def flush_inventory(self) -> None:
+        """Write pending ledger changes now; call before other connections read inventory."""
+        timer = getattr(self, "_inventory_flush_timer", None)
+        if timer is not None:
+            timer.stop()
+        ledger = getattr(self, "inventory_ledger", None)
+        if ledger is None or not ledger.pending:
+            return
+        try:
+            ledger.flush()
+        except sqlite3.Error as exc:
+            self.status_bar.showMessage(f"Inventory save failed: {exc}")
+            return
+        if ledger.pending and timer is not None:
+            # Another transaction was open on the connection; try again shortly.
+            timer.start()
+
     def notify_inventory_change(self) -> None:
         widget = self.tab_widgets.get("planner")
         if widget and hasattr(widget, "on_inventory_changed"):
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from PySide6 import QtCore, QtWidgets
+
+SEARCH_DEBOUNCE_MS = 250
+
+
+class _SearchSignals(QtCore.QObject):
+    finished = QtCore.Signal(int, str, object, object)
+
+
+class _SearchTask(QtCore.QRunnable):
+    def __init__(self, generation: int, text: str, job: Callable[[], object], signals: _SearchSignals) -> None:
+        super().__init__()
+        self._generation = generation
+        self._text = text
+        self._job = job
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            result, error = self._job(), None
+        except Exception as exc:
+            result, error = None, exc
+        try:
+            self._signals.finished.emit(self._generation, self._text, result, error)
+        except RuntimeError:
+            # The owning tab was destroyed while the search was running.
+            pass
+
+
+class SearchController(QtCore.QObject):
+    """Debounced search for a line edit, filtered off the GUI thread.
+
+    ``make_job(text)`` runs on the GUI thread and must return a callable that
+    only touches snapshots (or its own DB connection); that callable runs on
+    the global thread pool. ``apply(text, result)`` runs back on the GUI
+    thread, and only for the newest generation: every keystroke, flush or
+    ``discard_pending`` bumps the generation so late results are dropped.
+    A job that raises emits ``failed(text, error)`` instead, and the
+    previous result stays applied.
+    """
+
+    failed = QtCore.Signal(str, object)
+
+    def __init__(
+        self,
+        line_edit: QtWidgets.QLineEdit,
+        *,
+        make_job: Callable[[str], Callable[[], object]],
+        apply: Callable[[str, object], None],
+        delay_ms: int = SEARCH_DEBOUNCE_MS,
+        background: bool = True,
+        parent: QtCore.QObject | None = None,
+    ) -> None:
+        super().__init__(parent or line_edit)
+        self._line_edit = line_edit
+        self._make_job = make_job
+        self._apply = apply
+        self.background = background
+        self._generation = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._start)
+        self._signals = _SearchSignals(self)
+        self._signals.finished.connect(self._on_finished)
+        line_edit.textChanged.connect(self._on_text_changed)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def text(self) -> str:
+        return (self._line_edit.text() or "").strip()
+
+    def is_pending(self) -> bool:
+        return self._timer.isActive()
+
+    def discard_pending(self) -> None:
+        """Forget queued and in-flight searches; the caller just applied the current text."""
+        self._timer.stop()
+        self._generation += 1
+
+    def flush(self) -> None:
+        """Run the current search synchronously and apply it now."""
+        self.discard_pending()
+        text = self.text()
+        self._apply(text, self._make_job(text)())
+
+    def _on_text_changed(self, _text: str) -> None:
+        self._generation += 1
+        self._timer.start()
+
+    def _start(self) -> None:
+        generation = self._generation
+        text = self.text()
+        job = self._make_job(text)
+        if not self.background:
+            try:
+                result = job()
+            except Exception as exc:
+                self.failed.emit(text, exc)
+                return
+            self._apply(text, result)
+            return
+        QtCore.QThreadPool.globalInstance().start(_SearchTask(generation, text, job, self._signals))
+
+    @QtCore.Slot(int, str, object, object)
+    def _on_finished(self, generation: int, text: str, result: object, error: object) -> None:
+        if generation != self._generation:
+            return
+        if error is not None:
+            self.failed.emit(text, error)
+            return
+        self._apply(text, result)
+
+
+def apply_tree_filter(tree: QtWidgets.QTreeWidget, matched_ids: set[int] | None) -> None:
+    """Hide leaves whose ``UserRole`` id is not in ``matched_ids`` (``None`` shows all).
+
+    Only nodes whose visibility changes are touched, and group nodes are hidden
+    when none of their children remain visible, so narrowing or widening a
+    search never rebuilds the tree.
+    """
+
+    def walk(node: QtWidgets.QTreeWidgetItem) -> bool:
+        count = node.childCount()
+        if count:
+            visible = False
+            for idx in range(count):
+                visible = walk(node.child(idx)) or visible
+        else:
+            item_id = node.data(0, QtCore.Qt.UserRole)
+            visible = matched_ids is None or item_id is None or item_id in matched_ids
+        if node.isHidden() == visible:
+            node.setHidden(not visible)
+        return visible
+
+    for idx in range(tree.topLevelItemCount()):
+        walk(tree.topLevelItem(idx))
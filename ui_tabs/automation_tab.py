@@ -5,7 +5,7 @@ import sqlite3
 from PySide6 import QtCore, QtWidgets
 
 from services.automation import add_step, create_plan, delete_step, list_plans, list_steps, update_step_status
-from ui_dialogs import ItemPickerDialog
+import ui_dialogs
 
 
 class AutomationTab(QtWidgets.QWidget):
@@ -122,7 +122,7 @@ class AutomationTab(QtWidgets.QWidget):
         self.refresh()
 
     def _pick_item(self, *, title: str, machines_only: bool = False, optional: bool = False) -> dict | None:
-        dialog = ItemPickerDialog(self.app, title=title, machines_only=machines_only, parent=self)
+        dialog = ui_dialogs.ItemPickerDialog(self.app, title=title, machines_only=machines_only, parent=self)
         if dialog.exec() != QtWidgets.QDialog.DialogCode.Accepted:
             return None
         return dialog.result
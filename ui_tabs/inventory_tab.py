@@ -2,20 +2,22 @@ from __future__ import annotations
 
 from PySide6 import QtCore, QtWidgets
 
+from services.db import attached_content
 from services.storage import (
     aggregate_assignment_for_item,
     default_storage_id,
     delete_assignment,
     get_assignment,
     placed_container_count,
+    place_storage_containers,
     storage_inventory_totals,
     upsert_assignment,
     validate_storage_fit_for_item,
     recompute_storage_slot_capacities,
-    set_storage_container_placement,
     list_storage_container_placements,
 )
-from ui_dialogs import StorageUnitsDialog
+import ui_dialogs
+from ui_search import SearchController, apply_tree_filter
 
 
 class InventoryTab(QtWidgets.QWidget):
@@ -24,9 +26,12 @@ class InventoryTab(QtWidgets.QWidget):
         self.app = app
         self.items: list = []
         self.items_by_id: dict[int, dict] = {}
+        self._item_stack_sizes: dict[int, int] = {}
+        self._container_item_ids: set[int] = set()
         self._machine_availability_target: dict[str, str] | None = None
         self.machine_availability_checks: list[QtWidgets.QCheckBox] = []
         self.storage_units: list[dict[str, int | str]] = []
+        self._search_matches: set[int] | None = None
 
 
         root_layout = QtWidgets.QHBoxLayout(self)
@@ -50,7 +55,13 @@ class InventoryTab(QtWidgets.QWidget):
 
         self.search_entry = QtWidgets.QLineEdit()
         self.search_entry.setPlaceholderText("Search inventory items...")
-        self.search_entry.textChanged.connect(self._on_search_changed)
+        self.search_controller = SearchController(
+            self.search_entry,
+            make_job=self._search_job,
+            apply=self._apply_search,
+            parent=self,
+        )
+        self.search_controller.failed.connect(self._on_search_failed)
         left.addWidget(self.search_entry)
 
         self.inventory_tabs = QtWidgets.QTabWidget()
@@ -175,6 +186,18 @@ class InventoryTab(QtWidgets.QWidget):
         self._sync_inventory_management_toggle()
         self.items = list(items)
         self.items_by_id = {it["id"]: it for it in self.items}
+        self._item_stack_sizes = {
+            int(candidate["id"]): max(1, int(self._item_value(candidate, "max_stack_size") or 64))
+            for candidate in self.items
+        }
+        self._container_item_ids = {
+            int(candidate["id"]) for candidate in self.items if self._is_storage_container_item(candidate)
+        }
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            ledger.set_item_metadata(self._item_stack_sizes, self._container_item_ids)
+        self.search_controller.discard_pending()
+        self._search_matches = self._matching_ids(self.items, self.search_controller.text().lower())
         selected_id = self._selected_item_id()
 
         for tree in self.inventory_trees.values():
@@ -305,16 +328,90 @@ class InventoryTab(QtWidgets.QWidget):
         self.on_inventory_select(current, None)
 
     def _open_storage_manager(self) -> None:
-        dialog = StorageUnitsDialog(self.app, parent=self)
+        self._flush_inventory()
+        dialog = ui_dialogs.StorageUnitsDialog(self.app, parent=self)
         dialog.exec()
         self._refresh_storage_selector()
         self._refresh_summary_panel()
         current = self._current_tree().currentItem()
         self.on_inventory_select(current, None)
 
+    # ---------- inventory reads/writes (through the app ledger when present) ----------
+    def _inventory_ledger(self):
+        return getattr(self.app, "inventory_ledger", None)
+
+    def _flush_inventory(self) -> None:
+        # Pending Build Mode changes must land before code below reads the DB.
+        if hasattr(self.app, "flush_inventory"):
+            self.app.flush_inventory()
+
+    def _storage_fit(self, storage_id: int, item: dict, *, qty_count, qty_liters) -> dict:
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            return ledger.validate_fit(
+                storage_id=storage_id,
+                item_id=int(item["id"]),
+                qty_count=qty_count,
+                qty_liters=qty_liters,
+            )
+        # An attached content DB supplies item metadata to the query itself.
+        joined = attached_content(self.app.profile_conn)
+        return validate_storage_fit_for_item(
+            self.app.profile_conn,
+            storage_id=storage_id,
+            item_id=item["id"],
+            qty_count=qty_count,
+            qty_liters=qty_liters,
+            item_max_stack_size=max(1, int(self._item_value(item, "max_stack_size") or 64)),
+            known_item_stack_sizes=None if joined else self._item_stack_sizes,
+            known_container_item_ids=None if joined else self._container_item_ids,
+        )
+
+    def _storage_totals(self, storage_id: int | None) -> dict[str, float | int]:
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            return ledger.storage_totals(storage_id)
+        return storage_inventory_totals(self.app.profile_conn, storage_id)
+
+    def _item_totals(self, item_id: int):
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            return ledger.item_totals(item_id)
+        return aggregate_assignment_for_item(self.app.profile_conn, item_id)
+
+    def _assignment(self, storage_id: int, item_id: int):
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            return ledger.get(storage_id, item_id)
+        return get_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item_id)
+
+    def _save_assignment(self, storage_id: int, item_id: int, *, qty_count, qty_liters) -> None:
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            ledger.set_assignment(storage_id=storage_id, item_id=item_id, qty_count=qty_count, qty_liters=qty_liters)
+            ledger.flush()
+            return
+        with self.app.profile_conn:
+            upsert_assignment(
+                self.app.profile_conn,
+                storage_id=storage_id,
+                item_id=item_id,
+                qty_count=qty_count,
+                qty_liters=qty_liters,
+            )
+
+    def _delete_assignment(self, storage_id: int, item_id: int) -> None:
+        ledger = self._inventory_ledger()
+        if ledger is not None:
+            ledger.delete_assignment(storage_id=storage_id, item_id=item_id)
+            ledger.flush()
+            return
+        with self.app.profile_conn:
+            delete_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item_id)
+
     def _refresh_summary_panel(self) -> None:
         storage_id = self._current_storage_id()
-        aggregate_totals = storage_inventory_totals(self.app.profile_conn, None)
+        aggregate_totals = self._storage_totals(None)
         if storage_id is None:
             self.storage_totals_label.setText(
                 "Aggregate totals: "
@@ -323,7 +420,7 @@ class InventoryTab(QtWidgets.QWidget):
                 f"{aggregate_totals['total_liters']} L"
             )
             return
-        selected = storage_inventory_totals(self.app.profile_conn, storage_id)
+        selected = self._storage_totals(storage_id)
         self.storage_totals_label.setText(
             "Selected storage: "
             f"{selected['entry_count']} entries, "
@@ -395,9 +492,9 @@ class InventoryTab(QtWidgets.QWidget):
 
         storage_id = self._current_storage_id()
         if storage_id is None:
-            db_row = aggregate_assignment_for_item(self.app.profile_conn, item["id"])
+            db_row = self._item_totals(item["id"])
         else:
-            db_row = get_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item["id"])
+            db_row = self._assignment(storage_id, item["id"])
         if unit == "L":
             qty = db_row["qty_liters"] if db_row else None
         else:
@@ -414,6 +511,7 @@ class InventoryTab(QtWidgets.QWidget):
         return str(int(round(qty_f)))
 
     def save_inventory_item(self) -> None:
+        self._flush_inventory()
         item = self._inventory_selected_item()
         if not item:
             QtWidgets.QMessageBox.information(self, "Select an item", "Click an item first.")
@@ -444,13 +542,12 @@ class InventoryTab(QtWidgets.QWidget):
             return
         raw = self.inventory_qty_entry.text().strip()
         if raw == "":
-            with self.app.profile_conn:
-                delete_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item["id"])
+            self._delete_assignment(storage_id, item["id"])
             self.app.status_bar.showMessage(f"Cleared inventory for: {item['name']}")
             self.app.notify_inventory_change()
             self._refresh_summary_panel()
             if self._is_machine_item(item):
-                agg = aggregate_assignment_for_item(self.app.profile_conn, item["id"])
+                agg = self._item_totals(item["id"])
                 total_owned = int(agg["qty_count"]) if agg and agg["qty_count"] else 0
                 machine_type = (self._item_value(item, "machine_type") or "").strip()
                 machine_tier = (self._item_value(item, "machine_tier") or "").strip()
@@ -486,36 +583,14 @@ class InventoryTab(QtWidgets.QWidget):
         qty_liters = qty if unit == "L" else None
 
         if self._inventory_management_enabled():
-            stack_sizes = {
-                int(candidate["id"]): max(1, int(self._item_value(candidate, "max_stack_size") or 64))
-                for candidate in self.items
-            }
-            container_ids = {
-                int(candidate["id"])
-                for candidate in self.items
-                if self._is_storage_container_item(candidate)
-            }
-            fit = validate_storage_fit_for_item(
-                self.app.profile_conn,
-                storage_id=storage_id,
-                item_id=item["id"],
-                qty_count=qty_count,
-                qty_liters=qty_liters,
-                item_max_stack_size=max(1, int(self._item_value(item, "max_stack_size") or 64)),
-                known_item_stack_sizes=stack_sizes,
-                known_container_item_ids=container_ids,
-            )
+            fit = self._storage_fit(storage_id, item, qty_count=qty_count, qty_liters=qty_liters)
             if not fit["fits"]:
-                current_row = get_assignment(self.app.profile_conn, storage_id=storage_id, item_id=item["id"])
-                current_fit = validate_storage_fit_for_item(
-                    self.app.profile_conn,
-                    storage_id=storage_id,
-                    item_id=item["id"],
+                current_row = self._assignment(storage_id, item["id"])
+                current_fit = self._storage_fit(
+                    storage_id,
+                    item,
                     qty_count=(current_row["qty_count"] if current_row else None),
                     qty_liters=(current_row["qty_liters"] if current_row else None),
-                    item_max_stack_size=max(1, int(self._item_value(item, "max_stack_size") or 64)),
-                    known_item_stack_sizes=stack_sizes,
-                    known_container_item_ids=container_ids,
                 )
                 improving_or_equal = (
                     int(fit["slot_overflow"] or 0) <= int(current_fit["slot_overflow"] or 0)
@@ -536,20 +611,13 @@ class InventoryTab(QtWidgets.QWidget):
                     self._show_storage_capacity_warning(reasons)
                     return
 
-        with self.app.profile_conn:
-            upsert_assignment(
-                self.app.profile_conn,
-                storage_id=storage_id,
-                item_id=item["id"],
-                qty_count=qty_count,
-                qty_liters=qty_liters,
-            )
+        self._save_assignment(storage_id, item["id"], qty_count=qty_count, qty_liters=qty_liters)
         self.inventory_qty_entry.setText(str(qty))
         self.app.status_bar.showMessage(f"Saved inventory for: {item['name']}")
         self.app.notify_inventory_change()
         self._refresh_summary_panel()
         if self._is_machine_item(item):
-            agg = aggregate_assignment_for_item(self.app.profile_conn, item["id"])
+            agg = self._item_totals(item["id"])
             total_owned = int(agg["qty_count"]) if agg and agg["qty_count"] else 0
             online = min(self._current_online_count(), total_owned)
             self._save_machine_availability(item, owned=total_owned, online=online)
@@ -617,7 +685,7 @@ class InventoryTab(QtWidgets.QWidget):
         main_storage_id = default_storage_id(self.app.profile_conn)
         main_row = None
         if main_storage_id is not None:
-            main_row = get_assignment(self.app.profile_conn, storage_id=int(main_storage_id), item_id=int(item["id"]))
+            main_row = self._assignment(int(main_storage_id), int(item["id"]))
         owned_total = max(0, int(float((main_row["qty_count"] if main_row else 0) or 0)))
 
         # Keep target selector synced to currently selected storage by default.
@@ -656,14 +724,28 @@ class InventoryTab(QtWidgets.QWidget):
         if storage_id is None:
             return
 
-        # Main Storage owns container inventory; keep slot capacities synced whenever
-        # container ownership changes so custom storage capacity updates immediately.
-        recompute_storage_slot_capacities(self.app.profile_conn, player_slots=36, content_conn=self.app.conn)
+        # Main Storage owns container inventory; rebuild the capacity of storages this
+        # container is placed in so edits to its slot/liter size show up immediately.
+        placed_in = {
+            int(row["storage_id"])
+            for row in self.app.profile_conn.execute(
+                "SELECT storage_id FROM storage_container_placements WHERE item_id=?",
+                (int(item["id"]),),
+            ).fetchall()
+        }
+        if placed_in:
+            recompute_storage_slot_capacities(
+                self.app.profile_conn,
+                player_slots=36,
+                content_conn=self.app.conn,
+                storage_ids=placed_in,
+            )
         self.app.profile_conn.commit()
         self.storage_units = list(self.app.list_storage_units()) if hasattr(self.app, "list_storage_units") else self.storage_units
         self._refresh_summary_panel()
 
     def _apply_container_placement(self) -> None:
+        self._flush_inventory()
         item = self._inventory_selected_item()
         if not self._is_storage_container_item(item):
             self.container_placement_group.setVisible(False)
@@ -680,7 +762,7 @@ class InventoryTab(QtWidgets.QWidget):
             return
         target_storage_id = int(target_storage_id)
 
-        main_row = get_assignment(self.app.profile_conn, storage_id=int(main_storage_id), item_id=int(item["id"]))
+        main_row = self._assignment(int(main_storage_id), int(item["id"]))
         owned_total = max(0, int(float((main_row["qty_count"] if main_row else 0) or 0)))
         requested = self.container_placed_spin.value()
         already_elsewhere = placed_container_count(
@@ -702,19 +784,18 @@ class InventoryTab(QtWidgets.QWidget):
             return
         placed = requested
 
-        set_storage_container_placement(
+        place_storage_containers(
             self.app.profile_conn,
             storage_id=target_storage_id,
             item_id=int(item["id"]),
             placed_count=placed,
+            content_conn=self.app.conn,
         )
 
         # Placed containers are storage space, not inventory entries in that storage.
         if target_storage_id != int(main_storage_id):
             delete_assignment(self.app.profile_conn, storage_id=target_storage_id, item_id=int(item["id"]))
 
-        recompute_storage_slot_capacities(self.app.profile_conn, player_slots=36, content_conn=self.app.conn)
-
         self.app.profile_conn.commit()
         if hasattr(self.app, "list_storage_units"):
             self.storage_units = list(self.app.list_storage_units())
@@ -724,13 +805,44 @@ class InventoryTab(QtWidgets.QWidget):
             f"Updated container placement for {item['name']}: {placed}/{owned_total} placed"
         )
 
-    def _on_search_changed(self, _text: str) -> None:
-        selected_id = self._selected_item_id()
+    def _matches_search(self, item: dict, query: str) -> bool:
+        return (
+            query in (self._item_value(item, "name") or "").lower()
+            or query in (self._item_value(item, "item_kind_name") or "").lower()
+            or query in (self._item_value(item, "material_name") or "").lower()
+        )
+
+    def _matching_ids(self, items, query: str) -> set[int] | None:
+        if not query:
+            return None
+        return {it["id"] for it in items if self._matches_search(it, query)}
+
+    def _search_job(self, text: str):
+        items = tuple(self.items)
+        query = text.lower()
+        return lambda: self._matching_ids(items, query)
+
+    def _apply_search(self, text: str, matched_ids: set[int] | None) -> None:
+        self._search_matches = matched_ids
         for tree in self.inventory_trees.values():
-            self._render_tree(tree, selected_id)
+            tree.blockSignals(True)
+            try:
+                apply_tree_filter(tree, matched_ids)
+                current = tree.currentItem()
+                if current is not None and current.isHidden():
+                    tree.setCurrentItem(None)
+                if text:
+                    tree.expandAll()
+                else:
+                    tree.collapseAll()
+            finally:
+                tree.blockSignals(False)
         current = self._current_tree().currentItem()
         self.on_inventory_select(current, None)
 
+    def _on_search_failed(self, text: str, error: object) -> None:
+        self.app.status_bar.showMessage(f"Inventory search for '{text}' failed: {error}")
+
     def _on_tab_changed(self, _index: int) -> None:
         tree = self._current_tree()
         current = tree.currentItem()
@@ -766,7 +878,7 @@ class InventoryTab(QtWidgets.QWidget):
             self._set_machine_availability_target(None)
             return
 
-        agg = aggregate_assignment_for_item(self.app.profile_conn, item["id"])
+        agg = self._item_totals(item["id"])
         total_owned = int(agg["qty_count"]) if agg and agg["qty_count"] else 0
 
         availability = (
@@ -833,7 +945,7 @@ class InventoryTab(QtWidgets.QWidget):
             )
 
     def _filtered_items(self, kind_filter: str | None) -> list[dict]:
-        query = self.search_entry.text().strip().lower()
+        # The search text is applied by hiding nodes, see ``_apply_search``.
         items = self.items
         if kind_filter:
             items = [
@@ -843,30 +955,26 @@ class InventoryTab(QtWidgets.QWidget):
             ]
         if self.filter_to_selected_storage.isChecked() and not self._is_aggregate_mode():
             storage_id = self._current_storage_id()
-            assigned_ids = {
-                int(row["item_id"])
-                for row in self.app.profile_conn.execute(
-                    "SELECT item_id FROM storage_assignments WHERE storage_id=?",
-                    (storage_id,),
-                ).fetchall()
-            }
+            ledger = self._inventory_ledger()
+            if ledger is not None:
+                assigned_ids = ledger.item_ids_in_storage(storage_id)
+            else:
+                assigned_ids = {
+                    int(row["item_id"])
+                    for row in self.app.profile_conn.execute(
+                        "SELECT item_id FROM storage_assignments WHERE storage_id=?",
+                        (storage_id,),
+                    ).fetchall()
+                }
             items = [it for it in items if int(it["id"]) in assigned_ids]
 
-        if not query:
-            return items
-        return [
-            it
-            for it in items
-            if query in (self._item_value(it, "name") or "").lower()
-            or query in (self._item_value(it, "item_kind_name") or "").lower()
-            or query in (self._item_value(it, "material_name") or "").lower()
-        ]
+        return items
 
     def _render_tree(self, tree: QtWidgets.QTreeWidget, selected_id: int | None) -> None:
         tree.blockSignals(True)
         try:
             tree.clear()
-            query = self.search_entry.text().strip()
+            query = self.search_controller.text()
             kind_filter = tree.property("kind_filter")
             items = self._filtered_items(kind_filter)
             kind_nodes: dict[str, QtWidgets.QTreeWidgetItem] = {}
@@ -951,7 +1059,8 @@ class InventoryTab(QtWidgets.QWidget):
                 parent_node.addChild(item_node)
                 id_nodes[it["id"]] = item_node
 
-            if selected_id is not None and selected_id in id_nodes:
+            apply_tree_filter(tree, self._search_matches)
+            if selected_id is not None and selected_id in id_nodes and not id_nodes[selected_id].isHidden():
                 tree.setCurrentItem(id_nodes[selected_id])
 
             if query:
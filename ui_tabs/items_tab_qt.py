@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from PySide6 import QtCore, QtWidgets
 
-from ui_dialogs import AddItemDialog, EditItemDialog
+import ui_dialogs
+from ui_search import SearchController, apply_tree_filter
 
 
 class BaseItemTab(QtWidgets.QWidget):
@@ -30,7 +31,13 @@ class BaseItemTab(QtWidgets.QWidget):
 
         self.search_edit = QtWidgets.QLineEdit()
         self.search_edit.setPlaceholderText(self.search_placeholder())
-        self.search_edit.textChanged.connect(self._on_search_changed)
+        self.search_controller = SearchController(
+            self.search_edit,
+            make_job=self._search_job,
+            apply=self._apply_search,
+            parent=self,
+        )
+        self.search_controller.failed.connect(self._on_search_failed)
         left.addWidget(self.search_edit)
 
         self.item_tree = QtWidgets.QTreeWidget()
@@ -94,9 +101,7 @@ class BaseItemTab(QtWidgets.QWidget):
         new_item_id = getattr(self.app, "last_added_item_id", None)
 
         self.all_items = list(items)
-        search_text = (self.search_edit.text() or "").strip().lower()
-        self.items = [it for it in self.all_items if self._matches_search(it, search_text)]
-        self.items_by_id = {it["id"]: it for it in self.items}
+        self.items_by_id = {it["id"]: it for it in self.all_items}
         self.item_tree.clear()
 
         kind_nodes: dict[str, QtWidgets.QTreeWidgetItem] = {}
@@ -127,7 +132,7 @@ class BaseItemTab(QtWidgets.QWidget):
                 (self._get_value(it, "name") or "").strip().lower(),
             )
 
-        for it in sorted(self.items, key=_sort_key):
+        for it in sorted(self.all_items, key=_sort_key):
             if not self.should_display_item(it):
                 continue
 
@@ -190,9 +195,11 @@ class BaseItemTab(QtWidgets.QWidget):
             parent_node.addChild(item_node)
             id_nodes[it["id"]] = item_node
 
-        if search_text:
-            self.item_tree.expandAll()
-        else:
+        # The tree holds every item; the search only hides nodes.
+        self.search_controller.discard_pending()
+        search_text = self.search_controller.text().lower()
+        self._apply_search(search_text, self._matching_ids(self.all_items, search_text))
+        if not search_text:
             self._restore_expanded_paths(expanded_paths)
 
         target_id = selected_id
@@ -200,13 +207,32 @@ class BaseItemTab(QtWidgets.QWidget):
             target_id = new_item_id
             self.app.last_added_item_id = None
 
-        if target_id is not None and target_id in id_nodes:
+        if target_id is not None and target_id in id_nodes and not id_nodes[target_id].isHidden():
             target_item = id_nodes[target_id]
             self.item_tree.setCurrentItem(target_item)
             self._expand_to_item(target_item)
 
-    def _on_search_changed(self, _value: str) -> None:
-        self.render_items(self.all_items)
+    def _matching_ids(self, items, search_text: str) -> set[int] | None:
+        if not search_text:
+            return None
+        return {it["id"] for it in items if self._matches_search(it, search_text)}
+
+    def _search_job(self, text: str):
+        items = tuple(self.all_items)
+        search_text = text.lower()
+        return lambda: self._matching_ids(items, search_text)
+
+    def _apply_search(self, search_text: str, matched_ids: set[int] | None) -> None:
+        self.items = [it for it in self.all_items if matched_ids is None or it["id"] in matched_ids]
+        apply_tree_filter(self.item_tree, matched_ids)
+        if search_text:
+            self.item_tree.expandAll()
+        current = self.item_tree.currentItem()
+        if current is not None and current.isHidden():
+            self.item_tree.setCurrentItem(None)
+
+    def _on_search_failed(self, text: str, error: object) -> None:
+        self.app.status_bar.showMessage(f"Item search for '{text}' failed: {error}")
 
     def on_item_select(self, current: QtWidgets.QTreeWidgetItem | None, _previous=None) -> None:
         if current is None:
@@ -316,7 +342,7 @@ class BaseItemTab(QtWidgets.QWidget):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dialog = AddItemDialog(
+        dialog = ui_dialogs.AddItemDialog(
             self.app,
             parent=self,
             allowed_kinds=["item", "machine", "crafting_grid"],
@@ -333,7 +359,7 @@ class BaseItemTab(QtWidgets.QWidget):
         if item_id is None:
             QtWidgets.QMessageBox.information(self, "Select an item", "Click an item first.")
             return
-        dialog = EditItemDialog(self.app, item_id, parent=self)
+        dialog = ui_dialogs.EditItemDialog(self.app, item_id, parent=self)
         if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             self.app.refresh_items()
 
@@ -397,7 +423,7 @@ class FluidsTab(BaseItemTab):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dialog = AddItemDialog(
+        dialog = ui_dialogs.AddItemDialog(
             self.app,
             parent=self,
             title="Add Fluid",
@@ -434,7 +460,7 @@ class GasesTab(BaseItemTab):
                 "To enable editing, create a file named '.enable_editor' next to the app.",
             )
             return
-        dialog = AddItemDialog(
+        dialog = ui_dialogs.AddItemDialog(
             self.app,
             parent=self,
             title="Add Gas",
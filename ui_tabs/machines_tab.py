@@ -3,7 +3,7 @@ from __future__ import annotations
 from PySide6 import QtCore, QtWidgets
 
 from services.db import ALL_TIERS
-from ui_dialogs import MachineMetadataEditorDialog
+import ui_dialogs
 
 
 class MachinesTab(QtWidgets.QWidget):
@@ -317,7 +317,7 @@ class MachinesTab(QtWidgets.QWidget):
         tiers = dialog.selected_tiers
         if not machine_type:
             return
-        editor = MachineMetadataEditorDialog(
+        editor = ui_dialogs.MachineMetadataEditorDialog(
             self.app,
             parent=self,
             initial_machine_type=machine_type,
@@ -347,7 +347,7 @@ class MachinesTab(QtWidgets.QWidget):
                 "Select a machine type first.",
             )
             return
-        editor = MachineMetadataEditorDialog(self.app, parent=self, initial_machine_type=machine_type)
+        editor = ui_dialogs.MachineMetadataEditorDialog(self.app, parent=self, initial_machine_type=machine_type)
         if editor.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             self.load_from_db()
             self._select_machine_by_type(machine_type)
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 
 from PySide6 import QtCore, QtWidgets
 
-from services.planner import PlannerService
-from services.db import connect, connect_profile
+from services.automation import import_rate_plan
+from services.planner import NETTING_MODES, PlannerService, PlanSweep, RatePlan
+from services.recipe_optimizer import OBJECTIVES, solver_available
+from services.db import canonical_name, connect, connect_profile
 from services.storage import (
+    apply_inventory_adjustments,
     default_storage_id,
-    adjust_assignment_qty_for_storage,
-    consume_assignment_qty_for_planner,
 )
-from ui_dialogs import AddRecipeDialog, ItemPickerDialog
+import ui_dialogs
 
 
 class PlannerWorker(QtCore.QObject):
@@ -27,32 +29,61 @@ class PlannerWorker(QtCore.QObject):
         use_inventory: bool,
         enabled_tiers: list[str],
         crafting_6x6_unlocked: bool,
+        content_immutable: bool = False,
+        objective: str | None = None,
+        netting: str | None = None,
+        sweep_quantities: list[int] | None = None,
+        target_rate: float | None = None,
     ) -> None:
         super().__init__()
         self._db_path = db_path
+        self._content_immutable = content_immutable
         self._profile_db_path = profile_db_path
         self._target_item_id = target_item_id
         self._target_qty = target_qty
         self._use_inventory = use_inventory
         self._enabled_tiers = enabled_tiers
         self._crafting_6x6_unlocked = crafting_6x6_unlocked
+        self._objective = objective
+        self._netting = netting
+        self._sweep_quantities = sweep_quantities
+        self._target_rate = target_rate
 
     @QtCore.Slot()
     def run(self) -> None:
         content_conn = None
         profile_conn = None
         try:
-            content_conn = connect(self._db_path, read_only=True)
+            content_conn = connect(self._db_path, read_only=True, immutable=self._content_immutable)
             profile_path = self._profile_db_path or ":memory:"
             profile_conn = connect_profile(profile_path)
             planner = PlannerService(content_conn, profile_conn)
-            result = planner.plan(
-                self._target_item_id,
-                self._target_qty,
-                use_inventory=self._use_inventory,
-                enabled_tiers=self._enabled_tiers,
-                crafting_6x6_unlocked=self._crafting_6x6_unlocked,
-            )
+            if self._target_rate is not None:
+                result = planner.plan_rate(
+                    self._target_item_id,
+                    self._target_rate,
+                    enabled_tiers=self._enabled_tiers,
+                    crafting_6x6_unlocked=self._crafting_6x6_unlocked,
+                )
+            elif self._sweep_quantities is not None:
+                result = planner.sweep(
+                    self._target_item_id,
+                    self._sweep_quantities,
+                    enabled_tiers=self._enabled_tiers,
+                    crafting_6x6_unlocked=self._crafting_6x6_unlocked,
+                    objective=self._objective,
+                    netting=self._netting,
+                )
+            else:
+                result = planner.plan(
+                    self._target_item_id,
+                    self._target_qty,
+                    use_inventory=self._use_inventory,
+                    enabled_tiers=self._enabled_tiers,
+                    crafting_6x6_unlocked=self._crafting_6x6_unlocked,
+                    objective=self._objective,
+                    netting=self._netting,
+                )
             self.finished.emit(result, None)
         except Exception as exc:
             self.finished.emit(None, exc)
@@ -111,11 +142,135 @@ class ByproductDialog(QtWidgets.QDialog):
         return selections
 
 
+class PlanSweepDialog(QtWidgets.QDialog):
+    def __init__(self, parent, sweep: PlanSweep) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("What-if quantities")
+        self.resize(640, 420)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        if sweep.errors:
+            errors_label = QtWidgets.QLabel("\n".join(sweep.errors))
+            errors_label.setWordWrap(True)
+            layout.addWidget(errors_label)
+
+        self.table = QtWidgets.QTableWidget(len(sweep.shopping_table), len(sweep.quantities) + 2)
+        self.table.setHorizontalHeaderLabels(["Item", "Unit", *(f"× {qty:,}" for qty in sweep.quantities)])
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        for row_idx, (name, unit, qtys) in enumerate(sweep.shopping_table):
+            self.table.setItem(row_idx, 0, QtWidgets.QTableWidgetItem(name))
+            self.table.setItem(row_idx, 1, QtWidgets.QTableWidgetItem(unit))
+            for lane, qty in enumerate(qtys):
+                cell = QtWidgets.QTableWidgetItem(f"{qty:,}")
+                cell.setTextAlignment(
+                    QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+                )
+                self.table.setItem(row_idx, lane + 2, cell)
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table, stretch=1)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+
+class RatePlanDialog(QtWidgets.QDialog):
+    def __init__(self, parent, rate_plan: RatePlan, target_name: str) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Throughput plan")
+        self.resize(820, 520)
+        self.rate_plan = rate_plan
+        self.target_name = target_name
+
+        layout = QtWidgets.QVBoxLayout(self)
+        summary = [
+            f"{target_name}: {rate_plan.target_rate:,.3g}/s",
+            f"Total power: {rate_plan.total_eu_per_tick:,.0f} EU/t",
+        ]
+        if rate_plan.bottlenecks:
+            names = ", ".join(step.recipe_name for step in rate_plan.bottlenecks)
+            summary.append(f"Bottlenecks: {names}")
+        if rate_plan.max_target_rate is not None:
+            summary.append(f"Sustainable with available machines: {rate_plan.max_target_rate:,.3g}/s")
+        summary.extend(rate_plan.errors)
+        summary_label = QtWidgets.QLabel("\n".join(summary))
+        summary_label.setWordWrap(True)
+        layout.addWidget(summary_label)
+
+        headers = ["Step", "Output /s", "Machine", "Tier", "Machines", "Available", "EU/t"]
+        self.steps_table = QtWidgets.QTableWidget(len(rate_plan.steps), len(headers))
+        self.steps_table.setHorizontalHeaderLabels(headers)
+        bottlenecks = {id(step) for step in rate_plan.bottlenecks}
+        for row_idx, step in enumerate(rate_plan.steps):
+            machines = "" if step.machines is None else f"{step.machines:,.2f} ({step.machines_needed})"
+            available = str(step.machines_available) if step.machines_available is not None else ""
+            if step.machines_available is None and step.method == "machine":
+                available = "unknown"
+            values = [
+                step.recipe_name,
+                f"{step.output_rate:,.3g} {step.output_unit}",
+                step.machine_item_name or step.machine or step.method,
+                step.machine_tier or "",
+                machines,
+                available,
+                f"{step.total_eu_per_tick:,.0f}" if step.total_eu_per_tick else "",
+            ]
+            for col, value in enumerate(values):
+                cell = QtWidgets.QTableWidgetItem(value)
+                if id(step) in bottlenecks:
+                    cell.setForeground(QtCore.Qt.GlobalColor.red)
+                self.steps_table.setItem(row_idx, col, cell)
+        layout.addWidget(self.steps_table, stretch=2)
+
+        layout.addWidget(QtWidgets.QLabel("Raw inputs"))
+        self.raw_table = QtWidgets.QTableWidget(len(rate_plan.raw_inputs), 2)
+        self.raw_table.setHorizontalHeaderLabels(["Item", "Rate /s"])
+        for row_idx, (name, rate, unit) in enumerate(rate_plan.raw_inputs):
+            self.raw_table.setItem(row_idx, 0, QtWidgets.QTableWidgetItem(name))
+            self.raw_table.setItem(row_idx, 1, QtWidgets.QTableWidgetItem(f"{rate:,.3g} {unit}"))
+        layout.addWidget(self.raw_table, stretch=1)
+
+        for table in (self.steps_table, self.raw_table):
+            table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+            table.verticalHeader().setVisible(False)
+            table.resizeColumnsToContents()
+            table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeMode.Stretch)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.StandardButton.Close)
+        self.btn_export = button_box.addButton(
+            "Export to Automation…", QtWidgets.QDialogButtonBox.ButtonRole.ActionRole
+        )
+        self.btn_export.setEnabled(bool(rate_plan.steps))
+        self.btn_export.clicked.connect(self._export)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def _export(self) -> None:
+        app = self.parent().app
+        name, ok = QtWidgets.QInputDialog.getText(
+            self,
+            "Export to Automation",
+            "Automation plan name:",
+            text=f"{self.target_name} @ {self.rate_plan.target_rate:g}/s",
+        )
+        if not ok or not name.strip():
+            return
+        try:
+            import_rate_plan(app.profile_conn, name, self.rate_plan)
+        except sqlite3.IntegrityError:
+            QtWidgets.QMessageBox.warning(self, "Plan exists", "A plan with that name already exists.")
+            return
+        app.refresh_automation()
+        app.status_bar.showMessage(f"Exported {len(self.rate_plan.steps)} steps to automation plan '{name.strip()}'")
+
+
 class PlannerTab(QtWidgets.QWidget):
     def __init__(self, app, parent=None):
         super().__init__(parent)
         self.app = app
-        self.planner = PlannerService(app.conn, app.profile_conn)
+        self.planner = self._make_planner_service()
         self._planner_thread: QtCore.QThread | None = None
         self._planner_worker: PlannerWorker | None = None
         self._planner_mode: str | None = None
@@ -167,21 +322,55 @@ class PlannerTab(QtWidgets.QWidget):
         self.show_steps_checkbox.toggled.connect(self._toggle_steps)
         controls_layout.addWidget(self.show_steps_checkbox, 3, 0, 1, 2)
 
+        controls_layout.addWidget(QtWidgets.QLabel("Recipe choice:"), 4, 0)
+        self.objective_combo = QtWidgets.QComboBox()
+        self.objective_combo.addItem("Ranked per item", None)
+        for objective, label in OBJECTIVES.items():
+            self.objective_combo.addItem(f"Optimal: {label}", objective)
+        if not solver_available():
+            for index in range(1, self.objective_combo.count()):
+                self.objective_combo.model().item(index).setEnabled(False)
+            self.objective_combo.setToolTip("Install SciPy to optimize recipe choice across the whole plan.")
+        controls_layout.addWidget(self.objective_combo, 4, 1, alignment=QtCore.Qt.AlignmentFlag.AlignLeft)
+
+        controls_layout.addWidget(QtWidgets.QLabel("Byproducts:"), 5, 0)
+        self.netting_combo = QtWidgets.QComboBox()
+        self.netting_combo.addItem("Reuse in step order", None)
+        for netting, label in NETTING_MODES.items():
+            self.netting_combo.addItem(label, netting)
+        self.netting_combo.setToolTip(
+            "Net credits byproducts against every requirement in the plan; "
+            "expected also counts chanced outputs at their average."
+        )
+        controls_layout.addWidget(self.netting_combo, 5, 1, alignment=QtCore.Qt.AlignmentFlag.AlignLeft)
+
         btns_layout = QtWidgets.QVBoxLayout()
         self.btn_plan = QtWidgets.QPushButton("Plan")
         self.btn_build = QtWidgets.QPushButton("Build")
+        self.btn_sweep = QtWidgets.QPushButton("What-if…")
+        self.btn_rate = QtWidgets.QPushButton("Throughput…")
         self.btn_clear = QtWidgets.QPushButton("Clear")
         self.btn_save_plan = QtWidgets.QPushButton("Save Plan…")
         self.btn_load_plan = QtWidgets.QPushButton("Load Plan…")
         self.btn_plan.clicked.connect(self.run_plan)
         self.btn_build.clicked.connect(self.run_build)
+        self.btn_sweep.clicked.connect(self.run_sweep)
+        self.btn_rate.clicked.connect(self.run_rate_plan)
         self.btn_clear.clicked.connect(self.clear_results)
         self.btn_save_plan.clicked.connect(self.save_plan)
         self.btn_load_plan.clicked.connect(self.load_plan)
-        for btn in (self.btn_plan, self.btn_build, self.btn_clear, self.btn_save_plan, self.btn_load_plan):
+        for btn in (
+            self.btn_plan,
+            self.btn_build,
+            self.btn_sweep,
+            self.btn_rate,
+            self.btn_clear,
+            self.btn_save_plan,
+            self.btn_load_plan,
+        ):
             btns_layout.addWidget(btn)
         btns_layout.addStretch(1)
-        controls_layout.addLayout(btns_layout, 0, 3, 4, 1)
+        controls_layout.addLayout(btns_layout, 0, 3, 6, 1)
         controls_layout.setColumnStretch(1, 1)
 
         self.main_splitter = QtWidgets.QSplitter(QtCore.Qt.Orientation.Vertical)
@@ -267,7 +456,7 @@ class PlannerTab(QtWidgets.QWidget):
         if not self.app.items:
             QtWidgets.QMessageBox.information(self, "No items", "There are no items to plan against.")
             return
-        dlg = ItemPickerDialog(self.app, title="Pick target item", parent=self)
+        dlg = ui_dialogs.ItemPickerDialog(self.app, title="Pick target item", parent=self)
         if dlg.exec() != QtWidgets.QDialog.DialogCode.Accepted or not dlg.result:
             return
         self.target_item_id = dlg.result["id"]
@@ -285,11 +474,85 @@ class PlannerTab(QtWidgets.QWidget):
             return
         self._start_plan_worker(qty, mode="plan")
 
+    def run_sweep(self) -> None:
+        if self.target_item_id is None:
+            QtWidgets.QMessageBox.information(self, "Select an item", "Choose a target item first.")
+            return
+        if not self._has_recipes():
+            QtWidgets.QMessageBox.information(self, "No recipes", "There are no recipes to plan against.")
+            return
+        qty = self._parse_target_qty(show_errors=False) or 1
+        raw, ok = QtWidgets.QInputDialog.getText(
+            self,
+            "What-if quantities",
+            "Plan the target without inventory at each quantity (comma separated):",
+            text=", ".join(str(value) for value in sorted({1, qty, qty * 16, qty * 64})),
+        )
+        if not ok:
+            return
+        quantities = self._parse_sweep_quantities(raw)
+        if quantities is None:
+            QtWidgets.QMessageBox.critical(
+                self, "Invalid quantities", "Enter whole numbers separated by commas."
+            )
+            return
+        self._start_plan_worker(qty, mode="sweep", sweep_quantities=quantities)
+
+    def run_rate_plan(self) -> None:
+        if self.target_item_id is None:
+            QtWidgets.QMessageBox.information(self, "Select an item", "Choose a target item first.")
+            return
+        if not self._has_recipes():
+            QtWidgets.QMessageBox.information(self, "No recipes", "There are no recipes to plan against.")
+            return
+        unit = self._unit_for_kind(self.target_item_kind)
+        rate, ok = QtWidgets.QInputDialog.getDouble(
+            self,
+            "Throughput",
+            f"Target rate ({unit} per second):",
+            1.0,
+            0.001,
+            1_000_000.0,
+            3,
+        )
+        if not ok:
+            return
+        qty = self._parse_target_qty(show_errors=False) or 1
+        self._start_plan_worker(qty, mode="rate", target_rate=rate)
+
+    def _plan_objective(self) -> str | None:
+        return self.objective_combo.currentData()
+
+    def _plan_netting(self) -> str | None:
+        return self.netting_combo.currentData()
+
+    def _parse_sweep_quantities(self, raw: str) -> list[int] | None:
+        quantities = []
+        for part in raw.replace(";", ",").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                qty_float = float(part)
+            except ValueError:
+                return None
+            if not qty_float.is_integer() or qty_float <= 0:
+                return None
+            quantities.append(int(qty_float))
+        return quantities or None
+
     def clear_planner_cache(self) -> None:
         self.planner.clear_cache()
 
+    def _make_planner_service(self) -> PlannerService:
+        return PlannerService(
+            self.app.conn,
+            self.app.profile_conn,
+            inventory_ledger=getattr(self.app, "inventory_ledger", None),
+        )
+
     def reset_planner_service(self) -> None:
-        self.planner = PlannerService(self.app.conn, self.app.profile_conn)
+        self.planner = self._make_planner_service()
 
     def on_inventory_changed(self) -> None:
         if not self.last_plan_run or not self.last_plan_used_inventory or not self.use_inventory_checkbox.isChecked():
@@ -338,6 +601,8 @@ class PlannerTab(QtWidgets.QWidget):
             use_inventory=self.use_inventory_checkbox.isChecked(),
             enabled_tiers=self.app.get_enabled_tiers(),
             crafting_6x6_unlocked=self.app.is_crafting_6x6_unlocked(),
+            objective=self._plan_objective(),
+            netting=self._plan_netting(),
         )
 
         self._apply_plan_result(result, set_status=set_status)
@@ -406,7 +671,10 @@ class PlannerTab(QtWidgets.QWidget):
 
         self.last_plan_run = True
         self.last_plan_used_inventory = self.use_inventory_checkbox.isChecked()
-        if set_status:
+        warnings = getattr(result, "warnings", [])
+        if warnings:
+            self.app.status_bar.showMessage(" ".join(warnings))
+        elif set_status:
             self.app.status_bar.showMessage("Planner run complete")
         self._persist_state()
 
@@ -423,7 +691,14 @@ class PlannerTab(QtWidgets.QWidget):
             return
         self._start_plan_worker(qty, mode="build")
 
-    def _start_plan_worker(self, qty: int, *, mode: str) -> None:
+    def _start_plan_worker(
+        self,
+        qty: int,
+        *,
+        mode: str,
+        sweep_quantities: list[int] | None = None,
+        target_rate: float | None = None,
+    ) -> None:
         if self._planner_thread is not None:
             return
         if self.target_item_id is None:
@@ -431,6 +706,9 @@ class PlannerTab(QtWidgets.QWidget):
 
         self._set_planning_state(True, mode=mode)
         self._planner_mode = mode
+        if hasattr(self.app, "flush_inventory"):
+            # The worker reads inventory through its own profile connection.
+            self.app.flush_inventory()
 
         self._planner_thread = QtCore.QThread(self)
         self._planner_worker = PlannerWorker(
@@ -441,6 +719,12 @@ class PlannerTab(QtWidgets.QWidget):
             use_inventory=self.use_inventory_checkbox.isChecked(),
             enabled_tiers=self.app.get_enabled_tiers(),
             crafting_6x6_unlocked=self.app.is_crafting_6x6_unlocked(),
+            # Client mode never writes the content DB while a plan runs.
+            content_immutable=not getattr(self.app, "editor_enabled", True),
+            objective=self._plan_objective(),
+            netting=self._plan_netting(),
+            sweep_quantities=sweep_quantities,
+            target_rate=target_rate,
         )
         self._planner_worker.moveToThread(self._planner_thread)
         self._planner_thread.started.connect(self._planner_worker.run)
@@ -461,11 +745,23 @@ class PlannerTab(QtWidgets.QWidget):
         self._planner_mode = None
 
     def _set_planning_state(self, active: bool, *, mode: str) -> None:
-        for btn in (self.btn_plan, self.btn_build, self.btn_clear, self.btn_save_plan, self.btn_load_plan):
+        for btn in (
+            self.btn_plan,
+            self.btn_build,
+            self.btn_sweep,
+            self.btn_rate,
+            self.btn_clear,
+            self.btn_save_plan,
+            self.btn_load_plan,
+        ):
             btn.setEnabled(not active)
         if active:
             QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
-            label = "Building plan..." if mode == "build" else "Planning..."
+            label = {
+                "build": "Building plan...",
+                "sweep": "Planning what-if quantities...",
+                "rate": "Planning throughput...",
+            }.get(mode, "Planning...")
             self.app.status_bar.showMessage(label)
         else:
             QtWidgets.QApplication.restoreOverrideCursor()
@@ -490,6 +786,12 @@ class PlannerTab(QtWidgets.QWidget):
             self.clear_build_steps(persist=False)
         elif mode == "build":
             self._apply_build_result(result)
+        elif mode == "sweep":
+            self.app.status_bar.showMessage(f"What-if: planned {len(result.quantities)} quantities")
+            PlanSweepDialog(self, result).exec()
+        elif mode == "rate":
+            self.app.status_bar.showMessage(f"Throughput: {len(result.steps)} steps")
+            RatePlanDialog(self, result, self.target_item_name.text()).exec()
         else:
             self.app.status_bar.showMessage("Planner complete")
 
@@ -671,6 +973,8 @@ class PlannerTab(QtWidgets.QWidget):
             use_inventory=self.use_inventory_checkbox.isChecked(),
             enabled_tiers=self.app.get_enabled_tiers(),
             crafting_6x6_unlocked=self.app.is_crafting_6x6_unlocked(),
+            objective=self._plan_objective(),
+            netting=self._plan_netting(),
         )
         if result.errors:
             self.app.status_bar.showMessage("Build steps not updated: missing recipe")
@@ -779,6 +1083,7 @@ class PlannerTab(QtWidgets.QWidget):
                     )
                     return False
 
+                additions = []
                 for item_id, name, qty, unit, available in missing:
                     add_qty, ok = QtWidgets.QInputDialog.getInt(
                         self,
@@ -789,7 +1094,9 @@ class PlannerTab(QtWidgets.QWidget):
                         1_000_000_000,
                     )
                     if ok and add_qty:
-                        self._adjust_inventory_qty(item_id, add_qty)
+                        additions.append((item_id, add_qty))
+                if additions:
+                    self._adjust_inventory_qtys(additions)
 
                 self.build_base_inventory = self.planner.load_inventory(self._items_by_id())
                 inventory = self._effective_build_inventory()
@@ -820,8 +1127,7 @@ class PlannerTab(QtWidgets.QWidget):
 
         try:
             with self.app.profile_conn:
-                for item_id, delta in adjustments:
-                    self._adjust_inventory_qty(item_id, delta, commit=False)
+                self._adjust_inventory_qtys(adjustments, commit=False)
         except Exception as exc:
             QtWidgets.QMessageBox.critical(
                 self,
@@ -864,30 +1170,29 @@ class PlannerTab(QtWidgets.QWidget):
         return default_storage_id(self.app.profile_conn)
 
     def _adjust_inventory_qty(self, item_id: int, delta: int, *, commit: bool = True) -> None:
-        item = next((item for item in self.app.items if item["id"] == item_id), None)
-        if not item:
-            return
+        self._adjust_inventory_qtys([(item_id, delta)], commit=commit)
 
+    def _adjust_inventory_qtys(self, adjustments: list[tuple[int, int]], *, commit: bool = True) -> None:
+        item_kinds = {int(item["id"]): str(item.get("kind") or "") for item in self.app.items}
         active_storage_id = self.app.get_active_storage_id() if hasattr(self.app, "get_active_storage_id") else None
-        if delta < 0 and active_storage_id is None:
-            consume_assignment_qty_for_planner(
-                self.app.profile_conn,
-                item_id=item_id,
-                qty=(-delta),
-                item_kind=str(item.get("kind") or ""),
-            )
-        else:
-            storage_id = self._planner_storage_id()
-            if storage_id is None:
-                return
-
-            adjust_assignment_qty_for_storage(
-                self.app.profile_conn,
-                storage_id=storage_id,
-                item_id=item_id,
-                delta=delta,
-                item_kind=str(item.get("kind") or ""),
+        adjustments = [(item_id, delta) for item_id, delta in adjustments if item_id in item_kinds]
+        ledger = getattr(self.app, "inventory_ledger", None)
+        if ledger is not None:
+            # Written back by the app's ledger flush rather than per step.
+            ledger.apply(
+                adjustments,
+                item_kinds=item_kinds,
+                storage_id=self._planner_storage_id(),
+                consume_by_priority=active_storage_id is None,
             )
+            return
+        apply_inventory_adjustments(
+            self.app.profile_conn,
+            adjustments,
+            item_kinds=item_kinds,
+            storage_id=self._planner_storage_id(),
+            consume_by_priority=active_storage_id is None,
+        )
         if commit:
             self.app.profile_conn.commit()
 
@@ -917,7 +1222,7 @@ class PlannerTab(QtWidgets.QWidget):
                 f"{message}\n\nWould you like to add a recipe now?",
             )
             if ok == QtWidgets.QMessageBox.StandardButton.Yes:
-                dlg = AddRecipeDialog(self.app, parent=self)
+                dlg = ui_dialogs.AddRecipeDialog(self.app, parent=self)
                 dlg.exec()
         else:
             QtWidgets.QMessageBox.information(
@@ -1042,6 +1347,8 @@ class PlannerTab(QtWidgets.QWidget):
             "target_qty": self.target_qty_entry.text(),
             "target_unit": self.target_qty_unit.text(),
             "use_inventory": self.use_inventory_checkbox.isChecked(),
+            "objective": self._plan_objective(),
+            "netting": self._plan_netting(),
             "shopping_text": self.shopping_text.toPlainText().rstrip(),
             "steps_text": self.steps_text.toPlainText().rstrip(),
             "show_steps": self.show_steps_checkbox.isChecked(),
@@ -1063,7 +1370,10 @@ class PlannerTab(QtWidgets.QWidget):
         if item_id is not None:
             matched = next((item for item in self.app.items if item["id"] == item_id), None)
         if matched is None and item_name:
-            matched = next((item for item in self.app.items if item["name"] == item_name), None)
+            matched = self.app.conn.execute(
+                "SELECT id, kind, COALESCE(display_name, key) AS name FROM items WHERE name_canonical=? ORDER BY id LIMIT 1",
+                (canonical_name(item_name),),
+            ).fetchone()
         if matched:
             self.target_item_id = matched["id"]
             self.target_item_kind = matched["kind"]
@@ -1077,6 +1387,11 @@ class PlannerTab(QtWidgets.QWidget):
 
         self.target_qty_entry.setText(state.get("target_qty") or "1")
         self.use_inventory_checkbox.setChecked(bool(state.get("use_inventory", True)))
+        objective_index = self.objective_combo.findData(state.get("objective"))
+        if objective_index > 0 and not solver_available():
+            objective_index = 0
+        self.objective_combo.setCurrentIndex(max(objective_index, 0))
+        self.netting_combo.setCurrentIndex(max(self.netting_combo.findData(state.get("netting")), 0))
         self.show_steps_checkbox.setChecked(bool(state.get("show_steps", False)))
         self._toggle_steps_visibility(persist=False)
         self._set_text(self.shopping_text, state.get("shopping_text", ""))
@@ -1091,6 +1406,8 @@ class PlannerTab(QtWidgets.QWidget):
         self.target_qty_entry.setText("1")
         self.target_qty_unit.setText("")
         self.use_inventory_checkbox.setChecked(True)
+        self.objective_combo.setCurrentIndex(0)
+        self.netting_combo.setCurrentIndex(0)
         self.show_steps_checkbox.setChecked(False)
         self.last_plan_run = False
         self.last_plan_used_inventory = False
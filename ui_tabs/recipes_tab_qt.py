@@ -2,8 +2,20 @@ from __future__ import annotations
 
 from PySide6 import QtCore, QtWidgets
 
-from services.recipes import fetch_item_name, fetch_machine_output_slots, fetch_recipe_lines
-from ui_dialogs import AddRecipeDialog, EditRecipeDialog
+from services.db import connect_reader
+from services.recipes import (
+    fetch_item_name,
+    fetch_machine_output_slots,
+    fetch_recipe_lines,
+    fetch_recipe_outputs,
+    search_recipe_ids_by_output,
+)
+import ui_dialogs
+from ui_search import SearchController
+
+# Top-level groups of the recipe tree: kind -> (label, position).
+_KIND_ORDER = {"item": ("Items", 0), "fluid": ("Fluids", 1), "gas": ("Gases", 2)}
+_SORT_KEY_ROLE = QtCore.Qt.UserRole + 1
 
 
 class RecipesTab(QtWidgets.QWidget):
@@ -23,7 +35,13 @@ class RecipesTab(QtWidgets.QWidget):
 
         self.search_edit = QtWidgets.QLineEdit()
         self.search_edit.setPlaceholderText("Search by item name...")
-        self.search_edit.textChanged.connect(self._on_search_changed)
+        self.search_controller = SearchController(
+            self.search_edit,
+            make_job=self._search_job,
+            apply=self._apply_search,
+            parent=self,
+        )
+        self.search_controller.failed.connect(self._on_search_failed)
         left.addWidget(self.search_edit)
 
         self.recipe_tree = QtWidgets.QTreeWidget()
@@ -56,180 +74,268 @@ class RecipesTab(QtWidgets.QWidget):
         self.recipe_details.setReadOnly(True)
         right.addWidget(self.recipe_details)
         self._all_recipes: list = []
+        self._reset_recipe_tree(None)
 
     def render_recipes(self, recipes: list) -> None:
+        self._all_recipes = list(recipes)
+        self.search_controller.discard_pending()
+        self.recipes = self._filter_recipes_by_item_name(self._all_recipes, self.search_controller.text())
+        self._render_recipe_tree()
+
+    def _render_recipe_tree(self) -> None:
         selected_item_id = None
-        focus_id = getattr(self.app, "recipe_focus_id", None)
         current_item = self.recipe_tree.currentItem()
         if current_item is not None:
             selected_item_id = self.recipe_item_node_map.get(current_item)
 
-        self._all_recipes = list(recipes)
-        search_text = (self.search_edit.text() or "").strip()
-        self.recipes = self._filter_recipes_by_item_name(self._all_recipes, search_text)
-        self.recipe_tree.clear()
+        self._sync_recipe_tree(self.recipes)
 
-        canonical_names = {
-            self._canonical_name(recipe["name"])
-            for recipe in self.recipes
-            if recipe["duplicate_of_recipe_id"] is None and recipe["name"]
-        }
-
-        normal = []
-        for recipe in self.recipes:
-            if recipe["duplicate_of_recipe_id"] is None:
-                normal.append(recipe)
-                continue
-            name = (recipe["name"] or "").strip()
-            if not name:
-                continue
-            if self._canonical_name(name) not in canonical_names:
-                normal.append(recipe)
+        focus_id = getattr(self.app, "recipe_focus_id", None)
+        if focus_id is not None and focus_id in self._shown_recipe_ids:
+            rows = self._recipe_outputs.get(focus_id)
+            if rows:
+                selected_item_id = self._preferred_output_item(self._tree_recipes[focus_id], rows)
+                self.app.recipe_focus_id = None
 
+        target_item = self._item_nodes.get(selected_item_id) if selected_item_id is not None else None
+        if target_item is None:
+            target_item = self._first_item_node()
+        if target_item is None:
+            self._recipe_details_set("")
+        elif target_item is self.recipe_tree.currentItem():
+            # Kept across an in-place update; the details may have been cleared.
+            self.on_recipe_select(target_item)
+        else:
+            self.recipe_tree.setCurrentItem(target_item)
+            self._expand_to_item(target_item)
+
+    def _sync_recipe_tree(self, recipes: list) -> None:
+        """Bring the tree in line with ``recipes``, touching only the changed items.
+
+        A tier toggle or search adds and removes a slice of the recipe list; only
+        the outputs of recipes new to the tree are fetched, and item nodes are
+        inserted or removed in place. The tree is rebuilt when the app's recipe
+        index changes (recipe edits) or its item list is re-read (item, kind
+        and material edits), since the cached output rows carry item names.
+        """
+        index = getattr(self.app, "recipe_index", None)
+        items = getattr(self.app, "items", None)
+        if index is None or index is not self._tree_index or items is not self._tree_items:
+            self._reset_recipe_tree(index, items)
+
+        wanted = {recipe["id"]: recipe for recipe in recipes}
+        removed = [recipe_id for recipe_id in self._tree_recipes if recipe_id not in wanted]
+        added = [recipe for recipe_id, recipe in wanted.items() if recipe_id not in self._tree_recipes]
+        if not removed and not added:
+            return
+
+        # Canonical recipes hide same-named duplicates, so names whose canonical
+        # count crosses zero re-evaluate their duplicates.
+        touched_names: set[str] = set()
+        for recipe_id in removed:
+            recipe = self._tree_recipes.pop(recipe_id)
+            self._hide_recipe(recipe_id)
+            name = self._canonical_name(recipe["name"])
+            if recipe["duplicate_of_recipe_id"] is not None:
+                self._duplicates_by_name.get(name, set()).discard(recipe_id)
+            elif recipe["name"]:
+                self._canonical_counts[name] -= 1
+                if not self._canonical_counts[name]:
+                    del self._canonical_counts[name]
+                    touched_names.add(name)
+        for recipe in added:
+            self._tree_recipes[recipe["id"]] = recipe
+            name = self._canonical_name(recipe["name"])
+            if recipe["duplicate_of_recipe_id"] is not None:
+                self._duplicates_by_name.setdefault(name, set()).add(recipe["id"])
+            elif recipe["name"]:
+                self._canonical_counts[name] = self._canonical_counts.get(name, 0) + 1
+                if self._canonical_counts[name] == 1:
+                    touched_names.add(name)
+
+        to_show: list[int] = []
+        for name in touched_names:
+            for recipe_id in self._duplicates_by_name.get(name, ()):
+                if self._is_recipe_shown(self._tree_recipes[recipe_id]):
+                    to_show.append(recipe_id)
+                else:
+                    self._hide_recipe(recipe_id)
+        to_show.extend(recipe["id"] for recipe in added if self._is_recipe_shown(recipe))
+        self._show_recipes(to_show)
+
+    def _reset_recipe_tree(self, index, items=None) -> None:
+        self.recipe_tree.clear()
+        self._tree_index = index
+        self._tree_items = items
+        self._tree_recipes: dict[int, dict] = {}
+        self._recipe_outputs: dict[int, list] = {}
+        self._canonical_counts: dict[str, int] = {}
+        self._duplicates_by_name: dict[str, set[int]] = {}
+        self._shown_recipe_ids: set[int] = set()
+        self._item_refs: dict[int, int] = {}
+        self._item_nodes: dict[int, QtWidgets.QTreeWidgetItem] = {}
+        self._group_nodes: dict[tuple, QtWidgets.QTreeWidgetItem] = {}
         self.recipe_item_node_map = {}
-        item_nodes: dict[int, QtWidgets.QTreeWidgetItem] = {}
-        output_rows = self._fetch_recipe_outputs(normal)
-        grouped: dict[str, dict[str | None, dict[str | None, dict[int, dict]]]] = {
-            "item": {},
-            "fluid": {},
-            "gas": {},
-        }
-
-        def _label(value: str | None, fallback: str) -> str:
-            if value is None:
-                return fallback
-            value = value.strip().replace("_", " ")
-            return value if value else fallback
-
-        recipes_by_id = {recipe["id"]: recipe for recipe in normal}
-        outputs_by_recipe: dict[int, list[dict]] = {}
-        for row in output_rows:
-            outputs_by_recipe.setdefault(row["recipe_id"], []).append(row)
-
-        preferred_output_item: dict[int, int] = {}
-        for recipe_id, rows in outputs_by_recipe.items():
-            recipe = recipes_by_id.get(recipe_id)
-            if recipe is None:
-                continue
-            recipe_name = self._canonical_name(recipe["name"])
-            preferred_item_id = rows[0]["item_id"]
-            if recipe_name:
-                for row in rows:
-                    if self._canonical_name(row["item_name"]) == recipe_name:
-                        preferred_item_id = row["item_id"]
-                        break
-            preferred_output_item[recipe_id] = preferred_item_id
-            if focus_id is not None and recipe_id == focus_id:
-                selected_item_id = preferred_item_id
-                self.app.recipe_focus_id = None
 
-        for row in output_rows:
-            recipe = recipes_by_id.get(row["recipe_id"])
-            if recipe is None:
-                continue
-            kind = (row["kind"] or "item").strip().lower()
-            if kind not in grouped:
-                kind = "item"
-            use_item_kind_grouping = kind != "gas"
-            item_kind_label = _label(row["item_kind_name"], "(No kind)") if use_item_kind_grouping else None
-            material_label = row["material_name"]
-            if material_label is not None:
-                material_label = material_label.strip()
-                if not material_label:
-                    material_label = None
-            if not use_item_kind_grouping:
-                material_label = None
-            grouped.setdefault(kind, {})
-            grouped[kind].setdefault(item_kind_label, {})
-            grouped[kind][item_kind_label].setdefault(material_label, {})
-            item_group = grouped[kind][item_kind_label][material_label]
+    def _is_recipe_shown(self, recipe: dict) -> bool:
+        if recipe["duplicate_of_recipe_id"] is None:
+            return True
+        name = (recipe["name"] or "").strip()
+        return bool(name) and self._canonical_name(name) not in self._canonical_counts
+
+    def _show_recipes(self, recipe_ids: list[int]) -> None:
+        recipe_ids = [recipe_id for recipe_id in dict.fromkeys(recipe_ids) if recipe_id not in self._shown_recipe_ids]
+        missing = [self._tree_recipes[recipe_id] for recipe_id in recipe_ids if recipe_id not in self._recipe_outputs]
+        if missing:
+            for recipe in missing:
+                self._recipe_outputs[recipe["id"]] = []
+            for row in self._fetch_recipe_outputs(missing):
+                self._recipe_outputs[row["recipe_id"]].append(row)
+        for recipe_id in sorted(recipe_ids):
+            self._shown_recipe_ids.add(recipe_id)
+            for row in self._distinct_outputs(recipe_id):
+                item_id = row["item_id"]
+                self._item_refs[item_id] = self._item_refs.get(item_id, 0) + 1
+                if item_id not in self._item_nodes:
+                    self._add_item_node(row)
+
+    def _hide_recipe(self, recipe_id: int) -> None:
+        if recipe_id not in self._shown_recipe_ids:
+            return
+        self._shown_recipe_ids.discard(recipe_id)
+        for row in self._distinct_outputs(recipe_id):
             item_id = row["item_id"]
-            if item_id not in item_group:
-                item_group[item_id] = {"name": row["item_name"]}
-
-        group_order = [("Items", "item"), ("Fluids", "fluid"), ("Gases", "gas")]
-        for label, kind in group_order:
-            kind_groups = grouped.get(kind, {})
-            if not kind_groups:
-                continue
-            parent = QtWidgets.QTreeWidgetItem([label])
-            parent.setExpanded(True)
-            self.recipe_tree.addTopLevelItem(parent)
-            for item_kind_label in sorted(
-                kind_groups.keys(),
-                key=lambda val: "" if val is None else val.casefold(),
-            ):
-                if item_kind_label is None:
-                    item_kind_node = parent
-                else:
-                    item_kind_node = QtWidgets.QTreeWidgetItem([item_kind_label])
-                    parent.addChild(item_kind_node)
-                material_groups = kind_groups[item_kind_label]
-                for material_label in sorted(
-                    material_groups.keys(),
-                    key=lambda val: "" if val is None else val.casefold(),
-                ):
-                    item_groups = material_groups[material_label]
-                    if material_label is None:
-                        material_node = item_kind_node
-                    else:
-                        material_node = QtWidgets.QTreeWidgetItem([material_label])
-                        item_kind_node.addChild(material_node)
-                    for item_id in sorted(
-                        item_groups.keys(),
-                        key=lambda val: item_groups[val]["name"].casefold(),
-                    ):
-                        item_info = item_groups[item_id]
-                        item_node = QtWidgets.QTreeWidgetItem([item_info["name"]])
-                        item_node.setData(0, QtCore.Qt.UserRole, item_id)
-                        material_node.addChild(item_node)
-                        self.recipe_item_node_map[item_node] = item_id
-                        item_nodes[item_id] = item_node
-
-        if selected_item_id is not None:
-            target_item = item_nodes.get(selected_item_id)
-            if target_item is not None:
-                self.recipe_tree.setCurrentItem(target_item)
-                self._expand_to_item(target_item)
-        elif item_nodes:
-            first_item = next(iter(item_nodes.values()))
-            self.recipe_tree.setCurrentItem(first_item)
-            self._expand_to_item(first_item)
+            self._item_refs[item_id] -= 1
+            if not self._item_refs[item_id]:
+                del self._item_refs[item_id]
+                self._remove_item_node(row)
+
+    def _distinct_outputs(self, recipe_id: int) -> list:
+        seen: set[int] = set()
+        rows = []
+        for row in self._recipe_outputs.get(recipe_id, ()):
+            if row["item_id"] not in seen:
+                seen.add(row["item_id"])
+                rows.append(row)
+        return rows
+
+    @staticmethod
+    def _group_label(value: str | None, fallback: str) -> str:
+        if value is None:
+            return fallback
+        value = value.strip().replace("_", " ")
+        return value if value else fallback
+
+    def _item_group_path(self, row) -> tuple:
+        """Group node path for an output item: (kind,) + item kind + material."""
+        kind = (row["kind"] or "item").strip().lower()
+        if kind not in _KIND_ORDER:
+            kind = "item"
+        if kind == "gas":
+            return (kind,)
+        path = (kind, self._group_label(row["item_kind_name"], "(No kind)"))
+        material_label = (row["material_name"] or "").strip()
+        return path + (material_label,) if material_label else path
+
+    def _group_node(self, path: tuple) -> QtWidgets.QTreeWidgetItem:
+        node = self._group_nodes.get(path)
+        if node is not None:
+            return node
+        if len(path) == 1:
+            parent = self.recipe_tree.invisibleRootItem()
+            node = QtWidgets.QTreeWidgetItem([_KIND_ORDER[path[0]][0]])
+            sort_key = str(_KIND_ORDER[path[0]][1])
         else:
-            self._recipe_details_set("")
+            parent = self._group_node(path[:-1])
+            node = QtWidgets.QTreeWidgetItem([path[-1]])
+            sort_key = "1" + path[-1].casefold()
+        self._insert_sorted(parent, node, sort_key)
+        self._group_nodes[path] = node
+        return node
+
+    def _add_item_node(self, row) -> None:
+        item_id = row["item_id"]
+        item_node = QtWidgets.QTreeWidgetItem([row["item_name"]])
+        item_node.setData(0, QtCore.Qt.UserRole, item_id)
+        # Items sort ahead of the sub-groups that share their parent; the id keeps
+        # same-named items in one order however the tree was built up.
+        sort_key = f"0{row['item_name'].casefold()}\0{item_id:012d}"
+        self._insert_sorted(self._group_node(self._item_group_path(row)), item_node, sort_key)
+        self.recipe_item_node_map[item_node] = item_id
+        self._item_nodes[item_id] = item_node
+
+    def _remove_item_node(self, row) -> None:
+        item_node = self._item_nodes.pop(row["item_id"])
+        self.recipe_item_node_map.pop(item_node, None)
+        path = self._item_group_path(row)
+        self._group_nodes[path].removeChild(item_node)
+        while path and not self._group_nodes[path].childCount():
+            node = self._group_nodes.pop(path)
+            parent = node.parent() or self.recipe_tree.invisibleRootItem()
+            parent.removeChild(node)
+            path = path[:-1]
+
+    @staticmethod
+    def _insert_sorted(parent: QtWidgets.QTreeWidgetItem, node: QtWidgets.QTreeWidgetItem, sort_key: str) -> None:
+        node.setData(0, _SORT_KEY_ROLE, sort_key)
+        lo, hi = 0, parent.childCount()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if sort_key < parent.child(mid).data(0, _SORT_KEY_ROLE):
+                hi = mid
+            else:
+                lo = mid + 1
+        parent.insertChild(lo, node)
+
+    def _first_item_node(self) -> QtWidgets.QTreeWidgetItem | None:
+        node = self.recipe_tree.invisibleRootItem()
+        while node.childCount():
+            node = node.child(0)
+        return node if node in self.recipe_item_node_map else None
+
+    def _preferred_output_item(self, recipe: dict, rows: list) -> int:
+        recipe_name = self._canonical_name(recipe["name"])
+        if recipe_name:
+            for row in rows:
+                if self._canonical_name(row["item_name"]) == recipe_name:
+                    return row["item_id"]
+        return rows[0]["item_id"]
+
+    def _search_job(self, text: str):
+        query = text.casefold()
+        db_path = getattr(self.app, "db_path", None)
+        if not query:
+            return lambda: None
+        if db_path is None:
+            # Without a file path the UI connection cannot be shared with a worker.
+            matched_ids = search_recipe_ids_by_output(self.app.conn, query)
+            return lambda: matched_ids
+
+        def run() -> set[int]:
+            conn = connect_reader(db_path, immutable=not getattr(self.app, "editor_enabled", True))
+            try:
+                return search_recipe_ids_by_output(conn, query)
+            finally:
+                conn.close()
 
-    def _on_search_changed(self, _value: str) -> None:
-        self.render_recipes(self._all_recipes)
+        return run
+
+    def _apply_search(self, _text: str, matched_ids: set[int] | None) -> None:
+        if matched_ids is None:
+            self.recipes = list(self._all_recipes)
+        else:
+            self.recipes = [recipe for recipe in self._all_recipes if recipe["id"] in matched_ids]
+        self._render_recipe_tree()
+
+    def _on_search_failed(self, text: str, error: object) -> None:
+        self.app.status_bar.showMessage(f"Recipe search for '{text}' failed: {error}")
 
     def _filter_recipes_by_item_name(self, recipes: list[dict], search_text: str) -> list[dict]:
         query = search_text.strip().casefold()
         if not query:
             return list(recipes)
 
-        recipe_ids = [recipe["id"] for recipe in recipes]
-        if not recipe_ids:
-            return []
-
-        placeholders = ",".join(["?"] * len(recipe_ids))
-        rows = self.app.conn.execute(
-            f"""
-            SELECT DISTINCT rl.recipe_id
-            FROM recipe_lines rl
-            JOIN items i ON i.id = rl.item_id
-            LEFT JOIN item_kinds k ON k.id = i.item_kind_id
-            LEFT JOIN materials m ON m.id = i.material_id
-            WHERE rl.recipe_id IN ({placeholders})
-              AND rl.direction='out'
-              AND (
-                LOWER(COALESCE(i.display_name, i.key, '')) LIKE ?
-                OR LOWER(COALESCE(k.name, '')) LIKE ?
-                OR LOWER(COALESCE(m.name, '')) LIKE ?
-                OR LOWER(COALESCE(i.kind, '')) LIKE ?
-              )
-            """,
-            (*recipe_ids, f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%"),
-        ).fetchall()
-        matched_ids = {row["recipe_id"] for row in rows}
+        matched_ids = search_recipe_ids_by_output(self.app.conn, query)
         if not matched_ids:
             return []
         return [recipe for recipe in recipes if recipe["id"] in matched_ids]
@@ -284,27 +390,7 @@ class RecipesTab(QtWidgets.QWidget):
         ).fetchall()
 
     def _fetch_recipe_outputs(self, recipes: list[dict]) -> list[dict]:
-        recipe_ids = [recipe["id"] for recipe in recipes]
-        if not recipe_ids:
-            return []
-        placeholders = ",".join(["?"] * len(recipe_ids))
-        return self.app.conn.execute(
-            f"""
-            SELECT rl.recipe_id,
-                   rl.item_id,
-                   i.kind,
-                   COALESCE(i.display_name, i.key) AS item_name,
-                   k.name AS item_kind_name,
-                   m.name AS material_name
-            FROM recipe_lines rl
-            JOIN items i ON i.id = rl.item_id
-            LEFT JOIN item_kinds k ON k.id = i.item_kind_id
-            LEFT JOIN materials m ON m.id = i.material_id
-            WHERE rl.direction='out' AND rl.recipe_id IN ({placeholders})
-            ORDER BY rl.recipe_id, rl.id
-            """,
-            tuple(recipe_ids),
-        ).fetchall()
+        return fetch_recipe_outputs(self.app.conn, [recipe["id"] for recipe in recipes])
 
     def _format_recipe_details(self, recipe: dict, *, index: int) -> str:
         lines = fetch_recipe_lines(self.app.conn, recipe["id"])
@@ -397,7 +483,7 @@ class RecipesTab(QtWidgets.QWidget):
         if not self.app.editor_enabled:
             QtWidgets.QMessageBox.information(self, "Editor locked", "Adding Recipes is only available in editor mode.")
             return
-        dialog = AddRecipeDialog(self.app, parent=self)
+        dialog = ui_dialogs.AddRecipeDialog(self.app, parent=self)
         if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             self.app.refresh_recipes()
 
@@ -412,7 +498,7 @@ class RecipesTab(QtWidgets.QWidget):
         recipe_id = self._select_recipe_for_current_item()
         if recipe_id is None:
             return
-        dialog = EditRecipeDialog(self.app, recipe_id, parent=self)
+        dialog = ui_dialogs.EditRecipeDialog(self.app, recipe_id, parent=self)
         if dialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             self.app.refresh_recipes()
 
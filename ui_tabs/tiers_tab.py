@@ -113,7 +113,7 @@ class TiersTab(QtWidgets.QWidget):
         self.app.set_crafting_grids(self._current_grid_sizes())
 
         if hasattr(self.app, "refresh_recipes"):
-            self.app.refresh_recipes()
+            self.app.refresh_recipes(tiers_only=True)
         widget = getattr(self.app, "tab_widgets", {}).get("recipes")
         if widget and hasattr(widget, "_recipe_details_set"):
             widget._recipe_details_set("")